@@ -6,8 +6,16 @@ from django.conf import settings
 from rest_framework.request import Request
 
 from apps.business.context import build_business_context
+from apps.business.entitlements import get_business_entitlements
 from apps.business.models import Business
+from .authorization_cache import (
+  CachedAuthorization,
+  get_cached_authorization,
+  read_version_stamps,
+  store_authorization,
+)
 from .models import Membership
+from .rbac import permissions_for_service
 
 BUSINESS_COOKIE_NAME = 'bid'
 BUSINESS_COOKIE_MAX_AGE = getattr(settings, 'AUTH_COOKIE_REFRESH_MAX_AGE', 7 * 24 * 60 * 60)
@@ -74,6 +82,27 @@ def _try_resolve_inherited_membership(memberships: List[Membership], requested_i
     return None
 
 
+def _apply_authorization(request: Request, authorization: CachedAuthorization) -> None:
+  request.membership = authorization.membership
+  request.business = authorization.business
+  request._business_context = authorization.context
+  request.active_service = authorization.context['service']
+  request._permission_cache = authorization.permissions
+  request._entitlements_cache = authorization.entitlements
+
+
+def _build_authorization(request: Request, membership: Membership) -> CachedAuthorization:
+  business = getattr(request, 'business', None) or membership.business
+  context = build_business_context(membership.business)
+  return CachedAuthorization(
+    membership=membership,
+    business=business,
+    context=context,
+    permissions=permissions_for_service(context['service'], membership.role),
+    entitlements=frozenset(get_business_entitlements(business)),
+  )
+
+
 def resolve_request_membership(request: Request) -> Optional[Membership]:
   membership = getattr(request, 'membership', None)
   if membership is not None:
@@ -82,13 +111,39 @@ def resolve_request_membership(request: Request) -> Optional[Membership]:
          request.business = membership.business
     return membership
 
-  memberships = _membership_cache(request)
-  if not memberships:
+  user = getattr(request, 'user', None)
+  if not user or not user.is_authenticated:
     return None
 
   # Support header for API clients, fallback to cookie
   requested_business_id = request.META.get('HTTP_X_BUSINESS_ID') or request.COOKIES.get(BUSINESS_COOKIE_NAME)
-  
+
+  cached = get_cached_authorization(user.pk, requested_business_id)
+  if cached is not None:
+    _apply_authorization(request, cached)
+    return cached.membership
+
+  # Los sellos se leen antes de consultar la base: si algo cambia mientras
+  # resolvemos, la entrada guardada ya nace invalidada.
+  stamps = read_version_stamps(user.pk, [requested_business_id] if requested_business_id else [])
+  membership = _resolve_membership_from_db(request, requested_business_id)
+  if membership is None:
+    return None
+
+  authorization = _build_authorization(request, membership)
+  resolved_ids = {membership.business_id, authorization.business.pk}
+  for key, value in read_version_stamps(user.pk, resolved_ids).items():
+    stamps.setdefault(key, value)
+  store_authorization(user.pk, requested_business_id, authorization, stamps)
+  _apply_authorization(request, authorization)
+  return membership
+
+
+def _resolve_membership_from_db(request: Request, requested_business_id: Optional[str]) -> Optional[Membership]:
+  memberships = _membership_cache(request)
+  if not memberships:
+    return None
+
   # 1. Try direct membership match
   membership = select_membership(memberships, requested_business_id)
   
@@ -0,0 +1,128 @@
+"""Cache cross-request del contexto de autorización.
+
+Guarda, por (usuario, negocio solicitado), la membership resuelta, el negocio
+activo, el contexto del plan (feature flags), los entitlements efectivos y el
+mapa de permisos. Cada entrada lleva sellos de versión del usuario y de los
+negocios involucrados; los signals de Membership, Subscription,
+SubscriptionAddon, RolePermissionOverride y Business los rotan, de modo que
+una entrada vieja nunca vuelve a validarse.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+AUTHZ_CACHE_PREFIX = 'authz'
+AUTHZ_CACHE_TTL = getattr(settings, 'AUTHZ_CACHE_TTL_SECONDS', 300)
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+@dataclass
+class CachedAuthorization:
+  membership: object
+  business: object
+  context: Dict[str, object]
+  permissions: Dict[str, bool]
+  entitlements: FrozenSet[str]
+
+
+def _record(outcome: str) -> None:
+  with _stats_lock:
+    _stats[outcome] += 1
+
+
+def auth_cache_stats() -> Dict[str, int]:
+  with _stats_lock:
+    return dict(_stats)
+
+
+def reset_auth_cache_stats() -> None:
+  with _stats_lock:
+    for key in _stats:
+      _stats[key] = 0
+
+
+def _user_version_key(user_id) -> str:
+  return f'{AUTHZ_CACHE_PREFIX}:ver:user:{user_id}'
+
+
+def _business_version_key(business_id) -> str:
+  return f'{AUTHZ_CACHE_PREFIX}:ver:business:{business_id}'
+
+
+def _entry_key(user_id, requested_business_id) -> str:
+  return f'{AUTHZ_CACHE_PREFIX}:entry:{user_id}:{requested_business_id or "-"}'
+
+
+def read_version_stamps(user_id, business_ids: Iterable) -> Dict[str, str]:
+  """Devuelve los sellos vigentes, creando uno nuevo para las claves ausentes.
+
+  Los sellos son tokens aleatorios (no contadores) para que una clave
+  desalojada del cache nunca vuelva a coincidir con una entrada vieja.
+  """
+  keys = [_user_version_key(user_id)] + [_business_version_key(bid) for bid in business_ids if bid is not None]
+  stamps = cache.get_many(keys)
+  for key in keys:
+    if key in stamps:
+      continue
+    token = uuid.uuid4().hex
+    if not cache.add(key, token, timeout=None):
+      token = cache.get(key) or token
+    stamps[key] = token
+  return stamps
+
+
+def stamps_are_current(stamps: Dict[str, str]) -> bool:
+  """True si ninguno de los sellos guardados con una entrada fue rotado."""
+  current = cache.get_many(list(stamps))
+  return all(current.get(key) == value for key, value in stamps.items())
+
+
+def get_cached_authorization(user_id, requested_business_id) -> Optional[CachedAuthorization]:
+  entry = cache.get(_entry_key(user_id, requested_business_id))
+  if entry is None:
+    _record('misses')
+    return None
+  if not stamps_are_current(entry['stamps']):
+    _record('misses')
+    return None
+  _record('hits')
+  return entry['authorization']
+
+
+def store_authorization(user_id, requested_business_id, authorization: CachedAuthorization, stamps: Dict[str, str]) -> None:
+  cache.set(
+    _entry_key(user_id, requested_business_id),
+    {'stamps': stamps, 'authorization': authorization},
+    AUTHZ_CACHE_TTL,
+  )
+
+
+def _rotate(key: str) -> None:
+  cache.set(key, uuid.uuid4().hex, timeout=None)
+
+
+def _rotate_now_and_on_commit(key: str) -> None:
+  # Rotar ya invalida lecturas dentro de la misma transacción; rotar otra vez al
+  # confirmar evita que un request concurrente cachee datos previos al commit.
+  _rotate(key)
+  transaction.on_commit(lambda: _rotate(key))
+
+
+def invalidate_user(user_id) -> None:
+  if user_id is not None:
+    _rotate_now_and_on_commit(_user_version_key(user_id))
+
+
+def invalidate_business(business_id) -> None:
+  if business_id is not None:
+    _rotate_now_and_on_commit(_business_version_key(business_id))
@@ -0,0 +1,103 @@
+"""
+Micro-benchmark de GET /api/v1/auth/me según la cantidad de memberships.
+
+Para cada tamaño crea un usuario dueño de N negocios (plan pro, con un add-on
+de sucursal extra para que el contexto consulte add-ons) y mide la vista
+`MeView` en frío (snapshot invalidado antes de cada request) y en caliente
+(servida desde el snapshot cacheado): latencia y consultas por request.
+
+Todo corre en una transacción que se revierte al final; los sellos de los
+usuarios creados se rotan después para que sus snapshots no vuelvan a validar.
+
+Uso:
+    python manage.py benchmark_session_bootstrap [--sizes 1,10,50] [--requests 20]
+"""
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.accounts.authorization_cache import invalidate_user
+from apps.accounts.models import Membership
+from apps.accounts.views import MeView
+from apps.business.models import Business, Subscription, SubscriptionAddon
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _create_owner(size, label):
+    user = User.objects.create_user(username=f'bench-session-{label}', email=f'bench-session-{label}@example.com')
+    for index in range(size):
+        business = Business.objects.create(name=f'Bench {label} #{index + 1}', default_service='gestion')
+        subscription = Subscription.objects.create(business=business, plan='pro', status='active')
+        SubscriptionAddon.objects.create(subscription=subscription, code='extra_branch', quantity=1)
+        Membership.objects.create(user=user, business=business, role='owner')
+    return user
+
+
+class Command(BaseCommand):
+    help = 'Mide GET /auth/me en frío y en caliente con 1, 10 y 50 memberships'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1,10,50', help='Cantidades de memberships (default: 1,10,50)')
+        parser.add_argument('--requests', type=int, default=20, help='Requests por medición (default: 20)')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(value) for value in options['sizes'].split(',') if value.strip()]
+        except ValueError:
+            raise CommandError('--sizes debe ser una lista de enteros separados por coma')
+        if not sizes or min(sizes) < 1:
+            raise CommandError('--sizes necesita al menos un tamaño mayor a cero')
+        requests = max(options['requests'], 1)
+
+        user_ids = []
+        try:
+            with transaction.atomic():
+                for size in sizes:
+                    user = _create_owner(size, f'{size}-{time.monotonic_ns()}')
+                    user_ids.append(user.pk)
+                    self._measure(user, size, requests)
+                raise _Rollback()
+        except _Rollback:
+            pass
+        finally:
+            for user_id in user_ids:
+                invalidate_user(user_id)
+
+    def _measure(self, user, size, requests):
+        view = MeView.as_view()
+        factory = APIRequestFactory()
+
+        def call(cold):
+            if cold:
+                invalidate_user(user.pk)
+            request = factory.get('/api/v1/auth/me/')
+            force_authenticate(request, user=user)
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = view(request)
+                elapsed = time.perf_counter() - started
+            if response.status_code != 200:
+                raise CommandError(f'MeView respondió {response.status_code}')
+            return elapsed * 1000, len(queries)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {size} memberships'))
+        for label, cold in (('frío', True), ('caliente', False)):
+            call(cold)  # calienta imports y el snapshot
+            samples = [call(cold) for _ in range(requests)]
+            durations = sorted(duration for duration, _ in samples)
+            queries = max(count for _, count in samples)
+            p95 = durations[min(int(len(durations) * 0.95), len(durations) - 1)]
+            self.stdout.write(
+                f'   {label}: media {statistics.mean(durations):.2f} ms · p95 {p95:.2f} ms · '
+                f'{queries} consultas por request'
+            )
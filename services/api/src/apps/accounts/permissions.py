@@ -47,6 +47,16 @@ def request_has_permission(request: Request, permission_code: str) -> bool:
   return bool(permission_map.get(permission_code, False))
 
 
+def request_has_entitlement(request: Request, entitlement_code: str) -> bool:
+  entitlements = getattr(request, '_entitlements_cache', None)
+  if entitlements is None:
+    business = getattr(request, 'business', None)
+    if business is None:
+      return False
+    return has_entitlement(business, entitlement_code)
+  return entitlement_code in entitlements
+
+
 def get_request_membership(request: Request) -> Optional[Membership]:
   return resolve_request_membership(request)
 
@@ -82,7 +92,7 @@ class HasEntitlement(BasePermission):
       return False
     
     # Verificar el entitlement
-    if not has_entitlement(business, required_entitlement):
+    if not request_has_entitlement(request, required_entitlement):
       upgrade_hint = get_upgrade_hint(required_entitlement)
       self.message = {
         'code': 'plan_entitlement_required',
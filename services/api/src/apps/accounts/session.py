@@ -0,0 +1,111 @@
+"""Payload de sesión (GET /auth/me, POST /auth/switch-business) cacheado.
+
+El payload se arma en una sola pasada: memberships, negocios, suscripciones y
+add-ons salen de una consulta más un prefetch, y el contexto de cada negocio se
+calcula una sola vez. El resultado se guarda por (usuario, negocio pedido) con
+los sellos de versión del cache de autorización
+(`apps.accounts.authorization_cache`): el del usuario rota con sus memberships
+y su perfil, y el de cada negocio con su suscripción, add-ons y overrides de
+permisos. Mientras ningún sello cambie, el snapshot se devuelve sin consultar
+la base.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.business.context import build_business_context
+from apps.business.service_catalog import serialize_catalog
+from .access import select_membership
+from .authorization_cache import read_version_stamps, stamps_are_current
+from .models import Membership
+from .rbac import permissions_for_service
+
+SESSION_CACHE_PREFIX = 'session'
+SESSION_SNAPSHOT_TTL = getattr(settings, 'SESSION_SNAPSHOT_TTL_SECONDS', 300)
+
+
+def _snapshot_key(user_id, requested_business_id) -> str:
+  return f'{SESSION_CACHE_PREFIX}:snapshot:{user_id}:{requested_business_id or "-"}'
+
+
+def list_session_memberships(user) -> List[Membership]:
+  return list(
+    Membership.objects.select_related('business', 'business__subscription')
+    .prefetch_related('business__subscription__addons')
+    .filter(user=user)
+    .order_by('created_at')
+  )
+
+
+def build_session_payload(user, membership: Membership, memberships: List[Membership]) -> Dict[str, object]:
+  contexts = {member.business_id: build_business_context(member.business) for member in memberships}
+  context = contexts[membership.business_id]
+  return {
+    'user': {
+      'id': user.id,
+      'email': user.email,
+      'name': user.get_full_name() or user.get_username(),
+    },
+    'memberships': [
+      {
+        'business': {
+          'id': member.business_id,
+          'name': member.business.name,
+        },
+        'role': member.role,
+        'service': contexts[member.business_id]['service'],
+      }
+      for member in memberships
+    ],
+    'current': {
+      'business': {
+        'id': membership.business_id,
+        'name': membership.business.name,
+      },
+      'role': membership.role,
+      'service': context['service'],
+    },
+    'subscription': {
+      'plan': context['plan'],
+      'status': context['status'],
+    },
+    'services': {
+      'available': serialize_catalog(),
+      'enabled': context['enabled_services'],
+      'default': context['service'],
+    },
+    'features': context['features'],
+    'permissions': permissions_for_service(context['service'], membership.role),
+  }
+
+
+def session_snapshot(user, requested_business_id=None) -> Optional[Dict[str, object]]:
+  """Payload de sesión para `requested_business_id` (o la primera membership).
+
+  Devuelve None si el usuario no tiene memberships.
+  """
+  key = _snapshot_key(user.pk, requested_business_id)
+  entry = cache.get(key)
+  if entry is not None and stamps_are_current(entry['stamps']):
+    return entry['payload']
+
+  # Los sellos se leen antes de consultar la base, como en el cache de
+  # autorización: si una membership, suscripción o add-on cambia mientras se
+  # arma el payload, el snapshot guardado ya nace invalidado. Los ids de negocio
+  # alcanzan con una consulta liviana; un alta o baja de membership rota el
+  # sello del usuario.
+  business_ids = Membership.objects.filter(user=user).values_list('business_id', flat=True)
+  stamps = read_version_stamps(user.pk, list(business_ids))
+  memberships = list_session_memberships(user)
+  if not memberships:
+    return None
+  membership = select_membership(memberships, requested_business_id)
+  payload = build_session_payload(user, membership, memberships)
+  for stamp_key, value in read_version_stamps(user.pk, {member.business_id for member in memberships}).items():
+    stamps.setdefault(stamp_key, value)
+  cache.set(key, {'stamps': stamps, 'payload': payload}, SESSION_SNAPSHOT_TTL)
+  return payload
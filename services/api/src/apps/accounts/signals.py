@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.business.models import Business, Subscription, SubscriptionAddon
+from .authorization_cache import invalidate_business, invalidate_user
+from .models import Membership, RolePermissionOverride
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def invalidate_membership_authorization(sender, instance: Membership, **kwargs) -> None:
+  invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_session(sender, instance, update_fields=None, **kwargs) -> None:
+  # El payload de sesión incluye nombre y email; el login solo toca last_login.
+  if update_fields is not None and set(update_fields) <= {'last_login'}:
+    return
+  invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Business)
+@receiver(post_delete, sender=Business)
+def invalidate_business_authorization(sender, instance: Business, **kwargs) -> None:
+  invalidate_business(instance.pk)
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+@receiver(post_save, sender=RolePermissionOverride)
+@receiver(post_delete, sender=RolePermissionOverride)
+def invalidate_subscription_authorization(sender, instance, **kwargs) -> None:
+  invalidate_business(instance.business_id)
+
+
+@receiver(post_save, sender=SubscriptionAddon)
+@receiver(post_delete, sender=SubscriptionAddon)
+def invalidate_addon_authorization(sender, instance: SubscriptionAddon, **kwargs) -> None:
+  subscription_id = instance.subscription_id
+  business_id = (
+    Subscription.objects.filter(pk=subscription_id).values_list('business_id', flat=True).first()
+    if subscription_id
+    else None
+  )
+  invalidate_business(business_id)
@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from apps.accounts.access import resolve_request_membership
+from apps.accounts.authorization_cache import auth_cache_stats, reset_auth_cache_stats
+from apps.accounts.models import Membership
+from apps.accounts.permissions import request_has_entitlement, request_has_permission
+from apps.business.models import Business, Subscription, SubscriptionAddon
+
+User = get_user_model()
+
+
+class AuthorizationCacheTests(TestCase):
+  def setUp(self):
+    cache.clear()
+    reset_auth_cache_stats()
+    self.factory = RequestFactory()
+    self.business = Business.objects.create(name='Cache Biz', default_service='gestion')
+    self.subscription = Subscription.objects.create(business=self.business, plan='start', status='active')
+    self.user = User.objects.create_user(username='cashier', email='cashier@test.com', password='pass')
+    self.membership = Membership.objects.create(user=self.user, business=self.business, role='cashier')
+
+  def _request(self):
+    request = self.factory.get('/api/v1/', HTTP_X_BUSINESS_ID=str(self.business.id))
+    request.user = self.user
+    return request
+
+  def test_second_request_resolves_without_queries(self):
+    first = self._request()
+    self.assertEqual(resolve_request_membership(first), self.membership)
+    self.assertTrue(request_has_permission(first, 'create_sales'))
+
+    second = self._request()
+    with self.assertNumQueries(0):
+      membership = resolve_request_membership(second)
+      self.assertTrue(request_has_permission(second, 'create_sales'))
+      self.assertFalse(request_has_permission(second, 'manage_users'))
+      self.assertTrue(request_has_entitlement(second, 'gestion.products'))
+    self.assertEqual(membership.pk, self.membership.pk)
+    self.assertEqual(second.business.pk, self.business.pk)
+    self.assertEqual(auth_cache_stats(), {'hits': 1, 'misses': 1})
+
+  def test_membership_role_change_invalidates_entry(self):
+    request = self._request()
+    resolve_request_membership(request)
+    self.assertFalse(request_has_permission(request, 'manage_users'))
+
+    self.membership.role = 'owner'
+    self.membership.save()
+
+    request = self._request()
+    self.assertEqual(resolve_request_membership(request).role, 'owner')
+    self.assertTrue(request_has_permission(request, 'manage_users'))
+    self.assertEqual(auth_cache_stats()['misses'], 2)
+
+  def test_addon_change_invalidates_entitlements(self):
+    request = self._request()
+    resolve_request_membership(request)
+    self.assertFalse(request_has_entitlement(request, 'gestion.invoices'))
+
+    SubscriptionAddon.objects.create(subscription=self.subscription, code='invoices_module', is_active=True)
+
+    request = self._request()
+    resolve_request_membership(request)
+    self.assertTrue(request_has_entitlement(request, 'gestion.invoices'))
+
+  def test_health_check_only_shows_cache_stats_to_staff(self):
+    response = self.client.get('/api/v1/health/')
+    self.assertEqual(response.json(), {'status': 'ok'})
+
+    self.user.is_staff = True
+    self.user.save()
+    self.client.force_login(self.user)
+    response = self.client.get('/api/v1/health/')
+    self.assertIn('auth_cache', response.json())
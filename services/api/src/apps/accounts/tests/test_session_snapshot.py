@@ -0,0 +1,92 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Membership
+from apps.accounts.session import build_session_payload
+from apps.business.models import Business, Subscription, SubscriptionAddon
+
+User = get_user_model()
+
+
+class SessionSnapshotTests(APITestCase):
+  def setUp(self):
+    cache.clear()
+    self.user = User.objects.create_user(username='owner', email='owner@test.com', password='pass')
+    self.client.force_authenticate(user=self.user)
+    self.hq = self._business('Casa Central', plan='pro')
+    self.branch = self._business('Sucursal Norte', plan='menu_qr')
+
+  def _business(self, name: str, *, plan: str) -> Business:
+    business = Business.objects.create(name=name, default_service='gestion')
+    Subscription.objects.create(business=business, plan=plan, status='active')
+    Membership.objects.create(user=self.user, business=business, role='owner')
+    return business
+
+  def _me(self, business: Business = None):
+    if business is not None:
+      self.client.cookies['bid'] = str(business.id)
+    return self.client.get(reverse('auth-me'))
+
+  def test_second_request_is_served_from_the_snapshot(self):
+    first = self._me(self.hq)
+    self.assertEqual(first.status_code, status.HTTP_200_OK)
+    self.assertEqual(first.data['current']['business']['id'], self.hq.id)
+    self.assertEqual([member['service'] for member in first.data['memberships']], ['gestion', 'menu_qr'])
+
+    with self.assertNumQueries(0):
+      second = self._me(self.hq)
+    self.assertEqual(second.data, first.data)
+
+  def test_cold_payload_queries_do_not_grow_with_memberships(self):
+    with CaptureQueriesContext(connection) as two_memberships:
+      self._me(self.hq)
+    for index in range(4):
+      self._business(f'Sucursal {index}', plan='pro')
+    cache.clear()
+    with CaptureQueriesContext(connection) as six_memberships:
+      response = self._me(self.hq)
+
+    self.assertEqual(len(response.data['memberships']), 6)
+    self.assertEqual(len(six_memberships), len(two_memberships))
+
+  def test_subscription_and_membership_changes_invalidate_the_snapshot(self):
+    self.assertFalse(self._me(self.hq).data['features']['multi_branch'])
+
+    SubscriptionAddon.objects.create(subscription=self.hq.subscription, code='extra_branch', quantity=1)
+    self.assertTrue(self._me(self.hq).data['features']['multi_branch'])
+
+    Membership.objects.filter(user=self.user, business=self.branch).update(role='cashier')
+    Membership.objects.get(user=self.user, business=self.branch).save()
+    response = self._me(self.branch)
+    self.assertEqual(response.data['current']['role'], 'cashier')
+
+    self.user.first_name = 'Ana'
+    self.user.save()
+    self.assertEqual(self._me(self.branch).data['user']['name'], 'Ana')
+
+  def test_changes_while_building_the_payload_invalidate_the_snapshot(self):
+    def build_after_addon(*args):
+      payload = build_session_payload(*args)
+      SubscriptionAddon.objects.create(subscription=self.hq.subscription, code='extra_branch', quantity=1)
+      return payload
+
+    with mock.patch('apps.accounts.session.build_session_payload', side_effect=build_after_addon):
+      self.assertFalse(self._me(self.hq).data['features']['multi_branch'])
+    self.assertTrue(self._me(self.hq).data['features']['multi_branch'])
+
+  def test_switch_business_uses_the_snapshot_and_rejects_foreign_businesses(self):
+    response = self.client.post(reverse('auth-switch-business'), {'business_id': self.branch.id}, format='json')
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(response.data['current']['business']['id'], self.branch.id)
+    self.assertEqual(response.cookies['bid'].value, str(self.branch.id))
+
+    foreign = Business.objects.create(name='Ajeno')
+    response = self.client.post(reverse('auth-switch-business'), {'business_id': foreign.id}, format='json')
+    self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-from typing import Dict, List
-
 from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model
 from django.db import transaction
@@ -13,18 +11,11 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from apps.accounts.access import (
-	BUSINESS_COOKIE_MAX_AGE,
-	BUSINESS_COOKIE_NAME,
-	list_user_memberships,
-	select_membership,
-)
-from apps.accounts.rbac import permissions_for_service
-from apps.business.context import build_business_context
+from apps.accounts.access import BUSINESS_COOKIE_MAX_AGE, BUSINESS_COOKIE_NAME
 from apps.business.models import Business, Subscription, BusinessPlan
-from apps.business.service_catalog import serialize_catalog
 from .models import Membership
 from .serializers import LoginSerializer, RegisterSerializer
+from .session import session_snapshot
 
 User = get_user_model()
 
@@ -106,49 +97,6 @@ def _ensure_membership(user: User) -> Membership:
 	return membership
 
 
-def _session_payload(user: User, membership: Membership, memberships: List[Membership]) -> Dict[str, object]:
-	context = build_business_context(membership.business)
-	service_catalog = serialize_catalog()
-	permissions = permissions_for_service(context['service'], membership.role)
-	return {
-		'user': {
-			'id': user.id,
-			'email': user.email,
-			'name': user.get_full_name() or user.get_username(),
-		},
-		'memberships': [
-			{
-				'business': {
-					'id': member.business_id,
-					'name': member.business.name,
-				},
-				'role': member.role,
-				'service': build_business_context(member.business)['service'],
-			}
-			for member in memberships
-		],
-		'current': {
-			'business': {
-				'id': membership.business_id,
-				'name': membership.business.name,
-			},
-			'role': membership.role,
-			'service': context['service'],
-		},
-		'subscription': {
-			'plan': context['plan'],
-			'status': context['status'],
-		},
-		'services': {
-			'available': service_catalog,
-			'enabled': context['enabled_services'],
-			'default': context['service'],
-		},
-		'features': context['features'],
-		'permissions': permissions,
-	}
-
-
 class LoginView(APIView):
 	permission_classes = [AllowAny]
 	authentication_classes: list = []
@@ -172,6 +120,8 @@ class LoginView(APIView):
 			return Response({'detail': 'Credenciales inválidas'}, status=status.HTTP_400_BAD_REQUEST)
 
 		membership = _ensure_membership(authenticated_user)
+		# Deja listo el snapshot que va a pedir el primer GET /auth/me.
+		session_snapshot(authenticated_user, str(membership.business_id))
 		refresh = RefreshToken.for_user(authenticated_user)
 		response = Response({'status': 'ok'})
 		_set_auth_cookies(response, refresh)
@@ -248,17 +198,15 @@ class MeView(APIView):
 	permission_classes = [IsAuthenticated]
 
 	def get(self, request: Request) -> Response:
-		memberships = list_user_memberships(request.user)
-		if not memberships:
-			membership = _ensure_membership(request.user)
-			memberships = [membership]
-		else:
-			membership = select_membership(memberships, request.COOKIES.get(BUSINESS_COOKIE_NAME)) or memberships[0]
-		payload = _session_payload(request.user, membership, memberships)
-		response = Response(payload)
 		cookie_business = request.COOKIES.get(BUSINESS_COOKIE_NAME)
-		if cookie_business != str(membership.business_id):
-			_set_business_cookie(response, membership.business_id)
+		payload = session_snapshot(request.user, cookie_business)
+		if payload is None:
+			_ensure_membership(request.user)
+			payload = session_snapshot(request.user, cookie_business)
+		response = Response(payload)
+		business_id = payload['current']['business']['id']
+		if cookie_business != str(business_id):
+			_set_business_cookie(response, business_id)
 		return response
 
 
@@ -272,15 +220,14 @@ class SwitchBusinessView(APIView):
 	def post(self, request: Request) -> Response:
 		serializer = SwitchBusinessSerializer(data=request.data)
 		serializer.is_valid(raise_exception=True)
-		memberships = list_user_memberships(request.user)
-		if not memberships:
-			membership = _ensure_membership(request.user)
-			memberships = [membership]
 		business_id = serializer.validated_data['business_id']
-		membership = next((member for member in memberships if member.business_id == business_id), None)
-		if membership is None:
+		payload = session_snapshot(request.user, str(business_id))
+		if payload is None:
+			_ensure_membership(request.user)
+			payload = session_snapshot(request.user, str(business_id))
+		# Sin membership en ese negocio el snapshot cae en la primera del usuario.
+		if payload['current']['business']['id'] != business_id:
 			return Response({'detail': 'No perteneces a este negocio.'}, status=status.HTTP_404_NOT_FOUND)
-		payload = _session_payload(request.user, membership, memberships)
 		response = Response(payload)
-		_set_business_cookie(response, membership.business_id)
+		_set_business_cookie(response, business_id)
 		return response
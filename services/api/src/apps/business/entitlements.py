@@ -178,27 +178,39 @@ def get_effective_entitlements(subscription) -> Set[str]:
     return entitlements
 
 
-def has_entitlement(business, entitlement_code: str) -> bool:
+def get_business_entitlements(business) -> Set[str]:
     """
-    Verifica si un business tiene un entitlement específico.
+    Entitlements efectivos de un business (vacío si no tiene subscription activa).
     
     Args:
         business: Instancia de Business
-        entitlement_code: Código del entitlement (ej: 'gestion.customers')
     
     Returns:
-        True si el business tiene el entitlement, False en caso contrario
+        Set de códigos de entitlements efectivos
     """
     try:
         subscription = business.subscription
         if not subscription or subscription.status != 'active':
-            return False
+            return set()
         
-        entitlements = get_effective_entitlements(subscription)
-        return entitlement_code in entitlements
+        return get_effective_entitlements(subscription)
     except Exception:
         # Si no hay subscription, no tiene entitlements
-        return False
+        return set()
+
+
+def has_entitlement(business, entitlement_code: str) -> bool:
+    """
+    Verifica si un business tiene un entitlement específico.
+    
+    Args:
+        business: Instancia de Business
+        entitlement_code: Código del entitlement (ej: 'gestion.customers')
+    
+    Returns:
+        True si el business tiene el entitlement, False en caso contrario
+    """
+    return entitlement_code in get_business_entitlements(business)
 
 
 def get_upgrade_hint(entitlement_code: str) -> str:
@@ -105,10 +105,7 @@ class Subscription(models.Model):
   def effective_max_branches(self) -> int:
     """Calcula el límite efectivo de sucursales (plan + add-ons)."""
     base = self.max_branches
-    extra = sum(
-      addon.quantity 
-      for addon in self.addons.filter(code='extra_branch', is_active=True)
-    )
+    extra = sum(addon.quantity for addon in self._active_addons('extra_branch'))
     
     # Aplicar límites máximos según plan
     max_allowed = self.get_max_addon_branches_allowed()
@@ -120,15 +117,20 @@ class Subscription(models.Model):
   def effective_max_seats(self) -> int:
     """Calcula el límite efectivo de usuarios (plan + add-ons)."""
     base = self.max_seats
-    extra = sum(
-      addon.quantity 
-      for addon in self.addons.filter(code='extra_seat', is_active=True)
-    )
+    extra = sum(addon.quantity for addon in self._active_addons('extra_seat'))
     return base + extra
   
+  def _active_addons(self, code: str):
+    # Con los add-ons prefetcheados (`prefetch_related('addons')`) no hay consulta.
+    prefetched = getattr(self, '_prefetched_objects_cache', {}).get('addons')
+    if prefetched is not None:
+      return [addon for addon in prefetched if addon.code == code and addon.is_active]
+    return self.addons.filter(code=code, is_active=True)
+
   def has_addon(self, code: str) -> bool:
     """Verifica si tiene un add-on específico activo."""
-    return self.addons.filter(code=code, is_active=True).exists()
+    addons = self._active_addons(code)
+    return bool(addons) if isinstance(addons, list) else addons.exists()
   
   def get_max_addon_branches_allowed(self) -> int | None:
     """
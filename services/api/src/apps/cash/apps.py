@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CashConfig(AppConfig):
   default_auto_field = 'django.db.models.BigAutoField'
   name = 'apps.cash'
+
+  def ready(self):
+    import apps.cash.signals  # noqa: F401
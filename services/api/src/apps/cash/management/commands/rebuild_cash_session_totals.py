@@ -0,0 +1,72 @@
+"""
+Management command para materializar y auditar los totales de las sesiones de caja.
+
+Las sesiones sin `totals_built_at` (las anteriores a los totales corrientes)
+se reconstruyen siempre. Con --verify además recalcula desde cero las ya
+construidas y las compara con lo mantenido por los signals.
+
+Uso:
+    python manage.py rebuild_cash_session_totals [--business <id>] [--session <uuid>] [--verify] [--fix]
+
+Con --verify sale con código 1 si encuentra diferencias y no se pasó --fix.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.cash.models import CashSession
+from apps.cash.services import diff_session_totals, rebuild_session_totals
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los totales corrientes de las sesiones de caja y reporta diferencias'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, help='ID del business (default: todos)')
+        parser.add_argument('--session', help='ID de la sesión de caja (default: todas)')
+        parser.add_argument('--verify', action='store_true', help='Compara también las sesiones ya construidas')
+        parser.add_argument('--fix', action='store_true', help='Con --verify, reconstruye las sesiones con diferencias')
+
+    def handle(self, *args, **options):
+        sessions = CashSession.objects.order_by('business_id', 'opened_at')
+        if options.get('business') is not None:
+            sessions = sessions.filter(business_id=options['business'])
+        if options.get('session'):
+            sessions = sessions.filter(pk=options['session'])
+            if not sessions.exists():
+                raise CommandError(f"Sesión de caja {options['session']} no encontrada")
+        verify = options.get('verify', False)
+        fix = options.get('fix', False)
+
+        built = 0
+        drifted = 0
+        for session in sessions.iterator():
+            if session.totals_built_at is None:
+                rebuild_session_totals(session)
+                built += 1
+                continue
+            if not verify:
+                continue
+            mismatches = diff_session_totals(session)
+            for row in mismatches:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"#{session.business_id} sesión {session.id} {row['key']}: "
+                        f"esperado={row['expected']} guardado={row['stored']}"
+                    )
+                )
+            if mismatches:
+                drifted += 1
+                if fix:
+                    rebuild_session_totals(session)
+
+        if built:
+            self.stdout.write(self.style.SUCCESS(f'✅ {built} sesiones materializadas'))
+        if not drifted:
+            if verify:
+                self.stdout.write(self.style.SUCCESS('✅ Totales consistentes con pagos, movimientos y ventas'))
+            elif not built:
+                self.stdout.write(self.style.SUCCESS('✅ No hay sesiones pendientes de materializar'))
+            return
+        if fix:
+            self.stdout.write(self.style.SUCCESS(f'✅ {drifted} sesiones reconstruidas'))
+            return
+        raise CommandError(f'{drifted} sesiones con diferencias (usar --fix para reconstruirlas)')
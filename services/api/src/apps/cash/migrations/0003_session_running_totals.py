@@ -0,0 +1,82 @@
+# Generated by Django 5.0.14 on 2026-10-16 23:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cash', '0002_cashsession_opened_by_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cashsession',
+            name='movements_in_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='cashsession',
+            name='movements_out_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='cashsession',
+            name='payments_account_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='cashsession',
+            name='payments_cash_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='cashsession',
+            name='payments_credit_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='cashsession',
+            name='payments_debit_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='cashsession',
+            name='payments_transfer_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='cashsession',
+            name='payments_wallet_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='cashsession',
+            name='pending_sales_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='cashsession',
+            name='pending_sales_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='cashsession',
+            name='sales_count',
+            field=models.IntegerField(default=0),
+        ),
+        # Las sesiones existentes quedan sin materializar (NULL) y se reconstruyen
+        # al leerlas o con `rebuild_cash_session_totals`; solo las nuevas nacen
+        # construidas.
+        migrations.AddField(
+            model_name='cashsession',
+            name='totals_built_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='cashsession',
+            name='totals_built_at',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, null=True),
+        ),
+    ]
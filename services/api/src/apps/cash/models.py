@@ -3,8 +3,9 @@ from __future__ import annotations
 import uuid
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Q
+from django.utils import timezone
 
 
 class CashRegister(models.Model):
@@ -50,6 +51,21 @@ class CashSession(models.Model):
   status = models.CharField(max_length=16, choices=Status.choices, default=Status.OPEN)
   opened_at = models.DateTimeField(auto_now_add=True)
   closed_at = models.DateTimeField(null=True, blank=True)
+  # Totales corrientes mantenidos por los signals de Payment, CashMovement y
+  # Sale (ver `apps.cash.totals`). Sin `totals_built_at` la sesión todavía no
+  # fue materializada y se reconstruye al leerla.
+  payments_cash_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+  payments_debit_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+  payments_credit_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+  payments_transfer_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+  payments_wallet_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+  payments_account_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+  movements_in_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+  movements_out_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+  sales_count = models.IntegerField(default=0)
+  pending_sales_count = models.IntegerField(default=0)
+  pending_sales_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+  totals_built_at = models.DateTimeField(null=True, blank=True, default=timezone.now)
   created_at = models.DateTimeField(auto_now_add=True)
   updated_at = models.DateTimeField(auto_now=True)
 
@@ -104,6 +120,15 @@ class Payment(models.Model):
   def __str__(self) -> str:  # pragma: no cover
     return f"Pago {self.amount} · {self.sale_id}"
 
+  # atomic: la fila y los totales de la sesión se confirman juntos.
+  def save(self, *args, **kwargs):
+    with transaction.atomic():
+      super().save(*args, **kwargs)
+
+  def delete(self, *args, **kwargs):
+    with transaction.atomic():
+      return super().delete(*args, **kwargs)
+
 
 class CashMovement(models.Model):
   class MovementType(models.TextChoices):
@@ -143,3 +168,12 @@ class CashMovement(models.Model):
 
   def __str__(self) -> str:  # pragma: no cover
     return f"Movimiento {self.movement_type} · {self.amount}"
+
+  # atomic: la fila y los totales de la sesión se confirman juntos.
+  def save(self, *args, **kwargs):
+    with transaction.atomic():
+      super().save(*args, **kwargs)
+
+  def delete(self, *args, **kwargs):
+    with transaction.atomic():
+      return super().delete(*args, **kwargs)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from decimal import Decimal
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from django.db import transaction
 from django.db.models import Count, DecimalField, OuterRef, Q, Subquery, Sum, Value
@@ -9,6 +9,8 @@ from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from .models import CashMovement, CashSession, Payment
+from .signals import payments_bulk_created
+from .totals import PAYMENT_TOTAL_FIELDS, TOTAL_FIELDS, apply_created_payments, pending_state
 from apps.sales.models import Sale
 
 
@@ -44,7 +46,8 @@ def get_active_session(business, register_id: Optional[str] = None) -> Optional[
   return queryset.select_related('register', 'opened_by', 'closed_by').order_by('-opened_at').first()
 
 
-def compute_session_totals(session: CashSession) -> Dict[str, Any]:
+def recompute_session_totals(session: CashSession) -> Dict[str, Any]:
+  """Recalcula los totales desde pagos, movimientos y ventas (verificación y reparación)."""
   zero = Decimal('0')
 
   payment_rows = session.payments.values('method').order_by().annotate(total=Sum('amount'))
@@ -98,6 +101,92 @@ def compute_session_totals(session: CashSession) -> Dict[str, Any]:
   }
 
 
+def _totals_from_fields(session: CashSession, values: Dict[str, Any]) -> Dict[str, Any]:
+  zero = Decimal('0')
+  payments_by_method: Dict[str, Decimal] = {
+    method: values[field] for method, field in PAYMENT_TOTAL_FIELDS.items() if values[field]
+  }
+  cash_payments_total = payments_by_method.get(Payment.Method.CASH, zero)
+  cash_in = values['movements_in_total']
+  cash_out = values['movements_out_total']
+  return {
+    'payments_total': sum(payments_by_method.values(), zero),
+    'payments_by_method': payments_by_method,
+    'cash_payments_total': cash_payments_total,
+    'movements_in_total': cash_in,
+    'movements_out_total': cash_out,
+    'cash_expected_total': (session.opening_cash_amount or zero) + cash_payments_total + cash_in - cash_out,
+    'sales_count': values['sales_count'],
+    'pending_sales_count': values['pending_sales_count'],
+    'pending_sales_total': values['pending_sales_total'],
+  }
+
+
+def _fields_from_totals(totals: Dict[str, Any]) -> Dict[str, Any]:
+  zero = Decimal('0')
+  values = {
+    field: totals['payments_by_method'].get(method, zero) for method, field in PAYMENT_TOTAL_FIELDS.items()
+  }
+  for key in ('movements_in_total', 'movements_out_total', 'sales_count', 'pending_sales_count', 'pending_sales_total'):
+    values[key] = totals[key]
+  return values
+
+
+def rebuild_session_totals(session: CashSession) -> Dict[str, Any]:
+  """Reescribe los totales corrientes de la sesión con el recálculo completo.
+
+  Bloquea la fila de la sesión: un pago o movimiento concurrente aplica su
+  delta después del commit, sobre el valor ya reconstruido.
+  """
+  with transaction.atomic():
+    CashSession.objects.select_for_update().filter(pk=session.pk).first()
+    totals = recompute_session_totals(session)
+    values = _fields_from_totals(totals)
+    values['totals_built_at'] = timezone.now()
+    CashSession.objects.filter(pk=session.pk).update(**values)
+  for field, value in values.items():
+    setattr(session, field, value)
+  return totals
+
+
+def diff_session_totals(session: CashSession) -> list:
+  """Diferencias entre los totales mantenidos y el recálculo completo."""
+  stored = CashSession.objects.filter(pk=session.pk).values(*TOTAL_FIELDS).first() or {}
+  expected = _fields_from_totals(recompute_session_totals(session))
+  return [
+    {'key': field, 'expected': value, 'stored': stored.get(field)}
+    for field, value in expected.items()
+    if stored.get(field) != value
+  ]
+
+
+def compute_session_totals(session: CashSession) -> Dict[str, Any]:
+  """Totales de la sesión leídos de sus campos corrientes (una sola consulta).
+
+  Las sesiones todavía no materializadas se reconstruyen en la primera lectura.
+  """
+  values = CashSession.objects.filter(pk=session.pk).values('totals_built_at', *TOTAL_FIELDS).first()
+  if values is None or values['totals_built_at'] is None:
+    return rebuild_session_totals(session)
+  return _totals_from_fields(session, values)
+
+
+def create_payments(payments: List[Payment]) -> List[Payment]:
+  """Da de alta varios cobros con un solo INSERT.
+
+  Bloquea las ventas cobradas (como el signal de un pago suelto), inserta con
+  bulk_create y aplica los totales de caja con un UPDATE por sesión.
+  """
+  if not payments:
+    return payments
+  with transaction.atomic():
+    pending_before = pending_state({payment.sale_id for payment in payments})
+    Payment.objects.bulk_create(payments)
+    apply_created_payments(payments, pending_before)
+    payments_bulk_created.send(sender=Payment, payments=payments)
+  return payments
+
+
 def collect_pending_session_sales(session: CashSession, *, user=None):
   zero = Decimal('0')
   reference = 'Cobro masivo en cierre de caja'
@@ -0,0 +1,120 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+
+from apps.sales.models import Sale
+from apps.sales.signals import sales_bulk_created
+
+from .models import CashMovement, Payment
+from .totals import (
+  MOVEMENT_FIELDS,
+  PAYMENT_FIELDS,
+  SALE_FIELDS,
+  apply_movement_change,
+  apply_payment_change,
+  apply_pending_change,
+  movement_snapshot,
+  payment_snapshot,
+  pending_state,
+)
+
+
+# Alta de varios cobros con bulk_create (`apps.cash.services.create_payments`):
+# los totales de caja ya se aplicaron; reportes recibe los pagos en un solo
+# envío, dentro de la misma transacción. Argumentos: `payments`.
+payments_bulk_created = Signal()
+
+
+def _skips(update_fields, relevant) -> bool:
+  return update_fields is not None and not relevant.intersection(update_fields)
+
+
+@receiver(pre_save, sender=Payment)
+def capture_payment_state(sender, instance, raw=False, update_fields=None, **kwargs):
+  instance._totals_skip = raw or _skips(update_fields, PAYMENT_FIELDS)
+  instance._totals_previous = None
+  if instance._totals_skip:
+    return
+  if not instance._state.adding:
+    instance._totals_previous = (
+      Payment.objects.filter(pk=instance.pk).values('session_id', 'sale_id', 'method', 'amount').first()
+    )
+  sale_ids = {instance.sale_id}
+  if instance._totals_previous:
+    sale_ids.add(instance._totals_previous['sale_id'])
+  instance._totals_sale_ids = sale_ids
+  instance._totals_pending = pending_state(sale_ids)
+
+
+@receiver(post_save, sender=Payment)
+def apply_payment_totals(sender, instance, raw=False, **kwargs):
+  if getattr(instance, '_totals_skip', True):
+    return
+  apply_payment_change(instance._totals_previous, payment_snapshot(instance), payment_id=instance.pk)
+  apply_pending_change(instance._totals_pending, pending_state(instance._totals_sale_ids, lock=False))
+
+
+@receiver(pre_delete, sender=Payment)
+def capture_deleted_payment_state(sender, instance, **kwargs):
+  instance._totals_pending = pending_state({instance.sale_id})
+
+
+@receiver(post_delete, sender=Payment)
+def apply_deleted_payment_totals(sender, instance, **kwargs):
+  apply_payment_change(payment_snapshot(instance), None)
+  apply_pending_change(
+    getattr(instance, '_totals_pending', {}),
+    pending_state({instance.sale_id}, lock=False),
+  )
+
+
+@receiver(pre_save, sender=CashMovement)
+def capture_movement_state(sender, instance, raw=False, update_fields=None, **kwargs):
+  instance._totals_skip = raw or _skips(update_fields, MOVEMENT_FIELDS)
+  instance._totals_previous = None
+  if not instance._totals_skip and not instance._state.adding:
+    instance._totals_previous = (
+      CashMovement.objects.filter(pk=instance.pk).values('session_id', 'movement_type', 'amount').first()
+    )
+
+
+@receiver(post_save, sender=CashMovement)
+def apply_movement_totals(sender, instance, raw=False, **kwargs):
+  if getattr(instance, '_totals_skip', True):
+    return
+  apply_movement_change(instance._totals_previous, movement_snapshot(instance))
+
+
+@receiver(post_delete, sender=CashMovement)
+def apply_deleted_movement_totals(sender, instance, **kwargs):
+  apply_movement_change(movement_snapshot(instance), None)
+
+
+@receiver(pre_save, sender=Sale)
+def capture_sale_pending_state(sender, instance, raw=False, update_fields=None, **kwargs):
+  # Una venta recién creada todavía no aporta pendiente a ninguna sesión.
+  instance._totals_skip = raw or _skips(update_fields, SALE_FIELDS)
+  instance._totals_pending = {}
+  if not instance._totals_skip and not instance._state.adding:
+    instance._totals_pending = pending_state({instance.pk})
+
+
+@receiver(post_save, sender=Sale)
+def apply_sale_pending_totals(sender, instance, raw=False, **kwargs):
+  if getattr(instance, '_totals_skip', True):
+    return
+  apply_pending_change(instance._totals_pending, pending_state({instance.pk}, lock=False))
+
+
+@receiver(pre_delete, sender=Sale)
+def capture_deleted_sale_state(sender, instance, **kwargs):
+  instance._totals_pending = pending_state({instance.pk})
+
+
+@receiver(post_delete, sender=Sale)
+def apply_deleted_sale_totals(sender, instance, **kwargs):
+  apply_pending_change(getattr(instance, '_totals_pending', {}), {})
+
+
+@receiver(sales_bulk_created)
+def apply_bulk_sales_pending_totals(sender, sales, **kwargs):
+  apply_pending_change({}, pending_state({sale.pk for sale in sales}, lock=False))
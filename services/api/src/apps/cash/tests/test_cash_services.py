@@ -1,13 +1,20 @@
 from decimal import Decimal
 from datetime import timedelta
+from io import StringIO
 
 from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
 from django.test import TestCase
 
 from apps.business.models import Business, Subscription
 from apps.cash.models import CashMovement, CashSession, Payment
 from apps.cash.serializers import CashSessionCloseSerializer
-from apps.cash.services import collect_pending_session_sales, compute_session_totals
+from apps.cash.services import (
+  collect_pending_session_sales,
+  compute_session_totals,
+  diff_session_totals,
+  recompute_session_totals,
+)
 from apps.sales.models import Sale
 
 
@@ -191,3 +198,105 @@ class CashServicesTests(TestCase):
     self.assertEqual(Payment.objects.filter(sale=sale_pending).count(), 0)
     self.assertEqual(self.session.payments.count(), 0)
     self.assertIsNone(serializer.data['collection_summary'])
+
+
+class CashSessionRunningTotalsTests(TestCase):
+  def setUp(self):
+    self.user = get_user_model().objects.create_user(username='cashier2', email='cashier2@example.com', password='pass1234')
+    self.business = Business.objects.create(name='Caja Totales')
+    self.session = CashSession.objects.create(
+      business=self.business,
+      opened_by=self.user,
+      opening_cash_amount=Decimal('50.00'),
+    )
+
+  def _sale(self, number, total, **extra):
+    return Sale.objects.create(business=self.business, number=number, total=Decimal(total), **extra)
+
+  def _pay(self, sale, amount, method=Payment.Method.CASH, session=None):
+    return Payment.objects.create(
+      business=self.business,
+      sale=sale,
+      session=session or self.session,
+      method=method,
+      amount=Decimal(amount),
+    )
+
+  def _assert_consistent(self):
+    self.assertEqual(diff_session_totals(self.session), [])
+    stored = compute_session_totals(self.session)
+    expected = recompute_session_totals(self.session)
+    for key in ('payments_total', 'cash_expected_total', 'sales_count', 'pending_sales_count', 'pending_sales_total'):
+      self.assertEqual(stored[key], expected[key], key)
+    return stored
+
+  def test_totals_follow_payments_movements_and_sales(self):
+    linked = self._sale(1, '300.00', cash_session=self.session)
+    legacy = self._sale(2, '80.00')
+    first = self._pay(linked, '100.00')
+    self._pay(linked, '50.00', method=Payment.Method.DEBIT)
+    CashMovement.objects.create(
+      business=self.business,
+      session=self.session,
+      movement_type=CashMovement.MovementType.OUT,
+      method=Payment.Method.CASH,
+      amount=Decimal('20.00'),
+    )
+
+    totals = self._assert_consistent()
+    self.assertEqual(totals['payments_total'], Decimal('150.00'))
+    self.assertEqual(totals['sales_count'], 1)
+    self.assertEqual(totals['pending_sales_count'], 2)
+    self.assertEqual(totals['pending_sales_total'], Decimal('230.00'))
+    self.assertEqual(totals['cash_expected_total'], Decimal('130.00'))
+
+    first.amount = Decimal('150.00')
+    first.save()
+    legacy.status = Sale.Status.CANCELLED
+    legacy.save(update_fields=['status', 'updated_at'])
+    totals = self._assert_consistent()
+    self.assertEqual(totals['pending_sales_count'], 1)
+    self.assertEqual(totals['pending_sales_total'], Decimal('100.00'))
+
+    first.delete()
+    totals = self._assert_consistent()
+    self.assertEqual(totals['sales_count'], 1)
+    self.assertEqual(totals['payments_by_method'], {Payment.Method.DEBIT: Decimal('50.00')})
+
+  def test_payment_in_another_session_reduces_origin_pending(self):
+    other = CashSession.objects.create(business=self.business, opened_by=self.user)
+    sale = self._sale(1, '120.00', cash_session=self.session)
+    self._pay(sale, '120.00', session=other)
+
+    totals = self._assert_consistent()
+    self.assertEqual(totals['pending_sales_count'], 0)
+    self.assertEqual(totals['sales_count'], 0)
+    self.assertEqual(compute_session_totals(other)['sales_count'], 1)
+
+  def test_rebuild_command_materializes_historical_sessions(self):
+    sale = self._sale(1, '90.00', cash_session=self.session)
+    self._pay(sale, '40.00')
+    CashSession.objects.filter(pk=self.session.pk).update(
+      totals_built_at=None,
+      payments_cash_total=0,
+      sales_count=0,
+      pending_sales_count=0,
+      pending_sales_total=0,
+    )
+
+    call_command('rebuild_cash_session_totals', business=self.business.pk, stdout=StringIO())
+
+    self.session.refresh_from_db()
+    self.assertIsNotNone(self.session.totals_built_at)
+    self.assertEqual(self.session.payments_cash_total, Decimal('40.00'))
+    self.assertEqual(self.session.pending_sales_total, Decimal('50.00'))
+    self._assert_consistent()
+
+  def test_verify_reports_drift_until_fixed(self):
+    CashSession.objects.filter(pk=self.session.pk).update(movements_in_total=Decimal('5.00'))
+
+    with self.assertRaises(CommandError):
+      call_command('rebuild_cash_session_totals', verify=True, stdout=StringIO())
+    call_command('rebuild_cash_session_totals', verify=True, fix=True, stdout=StringIO())
+
+    self._assert_consistent()
@@ -0,0 +1,215 @@
+"""
+Totales corrientes de las sesiones de caja.
+
+`CashSession` guarda los cobros por medio de pago, los movimientos de
+ingreso/egreso, la cantidad de ventas cobradas y el saldo pendiente de sus
+ventas. Los signals de Payment, CashMovement y Sale aplican la diferencia
+entre el estado previo y el nuevo con `UPDATE ... SET campo = campo + delta`,
+así dos cobros concurrentes no se pisan. El recálculo completo
+(`apps.cash.services.recompute_session_totals`) queda para verificar y
+reparar.
+
+El pendiente de una venta depende de todos sus pagos (de cualquier sesión),
+de su estado y su total: antes y después de cada cambio se toma una foto de
+lo que aporta a cada sesión, con la fila de la venta bloqueada para que los
+cobros concurrentes sobre la misma venta se apliquen en serie.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from django.db.models import DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from apps.sales.models import Sale
+
+from .models import CashMovement, CashSession, Payment
+
+ZERO = Decimal('0')
+
+PAYMENT_TOTAL_FIELDS = {
+  Payment.Method.CASH: 'payments_cash_total',
+  Payment.Method.DEBIT: 'payments_debit_total',
+  Payment.Method.CREDIT: 'payments_credit_total',
+  Payment.Method.TRANSFER: 'payments_transfer_total',
+  Payment.Method.WALLET: 'payments_wallet_total',
+  Payment.Method.ACCOUNT: 'payments_account_total',
+}
+MOVEMENT_TOTAL_FIELDS = {
+  CashMovement.MovementType.IN: 'movements_in_total',
+  CashMovement.MovementType.OUT: 'movements_out_total',
+}
+TOTAL_FIELDS = (
+  *PAYMENT_TOTAL_FIELDS.values(),
+  *MOVEMENT_TOTAL_FIELDS.values(),
+  'sales_count',
+  'pending_sales_count',
+  'pending_sales_total',
+)
+
+PAYMENT_FIELDS = frozenset({'sale', 'sale_id', 'session', 'session_id', 'method', 'amount'})
+MOVEMENT_FIELDS = frozenset({'session', 'session_id', 'movement_type', 'amount'})
+SALE_FIELDS = frozenset({'status', 'total', 'cash_session', 'cash_session_id', 'created_at'})
+
+
+def apply_session_deltas(deltas: Dict[object, Dict[str, object]]) -> None:
+  """Suma los deltas por sesión con un UPDATE por sesión afectada."""
+  for session_id, fields in deltas.items():
+    changes = {name: F(name) + value for name, value in fields.items() if value}
+    if changes:
+      CashSession.objects.filter(pk=session_id).update(**changes)
+
+
+def _add(deltas, session_id, field: str, value) -> None:
+  if session_id is None or not value:
+    return
+  bucket = deltas.setdefault(session_id, {})
+  bucket[field] = bucket.get(field, 0) + value
+
+
+# Pagos y movimientos ------------------------------------------------------
+
+def payment_snapshot(payment: Payment) -> dict:
+  return {
+    'session_id': payment.session_id,
+    'sale_id': payment.sale_id,
+    'method': payment.method,
+    'amount': payment.amount,
+  }
+
+
+def movement_snapshot(movement: CashMovement) -> dict:
+  return {
+    'session_id': movement.session_id,
+    'movement_type': movement.movement_type,
+    'amount': movement.amount,
+  }
+
+
+def _amount(value) -> Decimal:
+  return Decimal(str(value)) if value not in (None, '') else ZERO
+
+
+def apply_movement_change(previous: Optional[dict], current: Optional[dict]) -> None:
+  deltas: Dict[object, Dict[str, object]] = {}
+  for state, sign in ((previous, -1), (current, 1)):
+    if state is None:
+      continue
+    field = MOVEMENT_TOTAL_FIELDS.get(state['movement_type'])
+    if field:
+      _add(deltas, state['session_id'], field, sign * _amount(state['amount']))
+  apply_session_deltas(deltas)
+
+
+def _payment_pair(state: Optional[dict]) -> Optional[Tuple[object, object]]:
+  if state is None:
+    return None
+  return state['session_id'], state['sale_id']
+
+
+def apply_payment_change(previous: Optional[dict], current: Optional[dict], *, payment_id=None) -> None:
+  """Aplica cobros por medio y la cantidad de ventas cobradas en la sesión.
+
+  Se llama después de escribir el pago: `sales_count` cuenta ventas distintas,
+  así que solo cambia cuando el par (sesión, venta) gana su primer pago o
+  pierde el último.
+  """
+  deltas: Dict[object, Dict[str, object]] = {}
+  for state, sign in ((previous, -1), (current, 1)):
+    if state is None:
+      continue
+    field = PAYMENT_TOTAL_FIELDS.get(state['method'])
+    if field:
+      _add(deltas, state['session_id'], field, sign * _amount(state['amount']))
+
+  old_pair, new_pair = _payment_pair(previous), _payment_pair(current)
+  if old_pair != new_pair:
+    if old_pair is not None:
+      session_id, sale_id = old_pair
+      if not Payment.objects.filter(session_id=session_id, sale_id=sale_id).exists():
+        _add(deltas, session_id, 'sales_count', -1)
+    if new_pair is not None:
+      session_id, sale_id = new_pair
+      others = Payment.objects.filter(session_id=session_id, sale_id=sale_id).exclude(pk=payment_id)
+      if not others.exists():
+        _add(deltas, session_id, 'sales_count', 1)
+  apply_session_deltas(deltas)
+
+
+# Pendiente de las ventas -------------------------------------------------
+
+def _sessions_for_sale(row: dict) -> Iterable:
+  """Sesiones que cuentan la venta: la vinculada o, sin vínculo, las que la
+  contienen en su ventana (mismo criterio que `get_session_sales_queryset`)."""
+  if row['cash_session_id']:
+    return [row['cash_session_id']]
+  return list(
+    CashSession.objects.filter(business_id=row['business_id'], opened_at__lte=row['created_at'])
+    .filter(Q(closed_at__isnull=True) | Q(closed_at__gte=row['created_at']))
+    .values_list('pk', flat=True)
+  )
+
+
+def pending_state(sale_ids: Iterable, *, lock: bool = True) -> Dict[object, Decimal]:
+  """Pendiente que aporta cada venta a cada sesión: {(sesión, venta): monto}."""
+  sale_ids = [sale_id for sale_id in set(sale_ids) if sale_id is not None]
+  if not sale_ids:
+    return {}
+  if lock:
+    list(Sale.objects.select_for_update().filter(pk__in=sale_ids).values_list('pk', flat=True))
+  rows = (
+    Sale.objects.filter(pk__in=sale_ids, status=Sale.Status.COMPLETED)
+    .order_by()
+    .annotate(paid=Coalesce(Sum('payments__amount'), Value(ZERO), output_field=DecimalField(max_digits=12, decimal_places=2)))
+    .values('pk', 'business_id', 'cash_session_id', 'created_at', 'total', 'paid')
+  )
+  state: Dict[object, Decimal] = {}
+  for row in rows:
+    pending = (row['total'] or ZERO) - (row['paid'] or ZERO)
+    if pending <= 0:
+      continue
+    for session_id in _sessions_for_sale(row):
+      state[(session_id, row['pk'])] = pending
+  return state
+
+
+def _pending_deltas(deltas, previous: Dict[object, Decimal], current: Dict[object, Decimal]) -> None:
+  for key in set(previous) | set(current):
+    before, after = previous.get(key, ZERO), current.get(key, ZERO)
+    if before == after:
+      continue
+    session_id = key[0]
+    _add(deltas, session_id, 'pending_sales_total', after - before)
+    _add(deltas, session_id, 'pending_sales_count', int(after > 0) - int(before > 0))
+
+
+def apply_pending_change(previous: Dict[object, Decimal], current: Dict[object, Decimal]) -> None:
+  deltas: Dict[object, Dict[str, object]] = {}
+  _pending_deltas(deltas, previous, current)
+  apply_session_deltas(deltas)
+
+
+def apply_created_payments(payments: Sequence[Payment], pending_before: Dict[object, Decimal]) -> None:
+  """Totales de un alta con bulk_create (no dispara los signals de Payment).
+
+  `pending_before` es el `pending_state` de las ventas tomado antes del INSERT.
+  Cobros, ventas cobradas y pendiente se suman en un único UPDATE por sesión,
+  en lugar de dos por pago.
+  """
+  deltas: Dict[object, Dict[str, object]] = {}
+  for payment in payments:
+    field = PAYMENT_TOTAL_FIELDS.get(payment.method)
+    if field:
+      _add(deltas, payment.session_id, field, _amount(payment.amount))
+
+  created_ids = [payment.pk for payment in payments]
+  for session_id, sale_id in {(payment.session_id, payment.sale_id) for payment in payments}:
+    others = Payment.objects.filter(session_id=session_id, sale_id=sale_id).exclude(pk__in=created_ids)
+    if not others.exists():
+      _add(deltas, session_id, 'sales_count', 1)
+
+  sale_ids = {payment.sale_id for payment in payments}
+  _pending_deltas(deltas, pending_before, pending_state(sale_ids, lock=False))
+  apply_session_deltas(deltas)
@@ -0,0 +1,170 @@
+"""
+Benchmark de la búsqueda de productos, clientes y ventas.
+
+Carga un volumen sintético (por defecto 100k productos, 20k clientes y 500k
+ventas) en el negocio indicado, corre ANALYZE y mide la latencia de cada
+búsqueda con `common.search` frente a los `icontains` encadenados que se
+usaban antes. Todo corre en una transacción que se revierte al final, así que
+no deja datos en la base.
+
+Uso:
+    python manage.py benchmark_search --business <id> [--products 100000] [--sales 500000] [--runs 30]
+
+Ejemplos:
+    python manage.py benchmark_search --business 1
+    python manage.py benchmark_search --business 1 --products 20000 --sales 100000 --runs 10
+"""
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max, Q
+
+from apps.business.models import Business
+from apps.catalog.models import Product
+from apps.customers.models import Customer
+from apps.sales.models import Sale
+from common.search import CUSTOMER_SEARCH, PRODUCT_SEARCH, SALE_SEARCH, SEARCH_RANK_FIELD, search_queryset
+
+WORDS = (
+    'café', 'leche', 'azúcar', 'yerba', 'galletitas', 'jabón', 'arroz', 'fideos', 'aceite', 'té',
+    'limón', 'manzana', 'queso', 'jamón', 'pan', 'agua', 'gaseosa', 'cerveza', 'vino', 'chocolate',
+)
+NAMES = ('José', 'María', 'Martín', 'Lucía', 'Andrés', 'Sofía', 'Ramón', 'Inés', 'Julián', 'Belén')
+SURNAMES = ('Pérez', 'Gómez', 'Fernández', 'Rodríguez', 'López', 'Martínez', 'Sánchez', 'Muñoz', 'Díaz', 'Álvarez')
+BATCH_SIZE = 5000
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _legacy_products(queryset, term):
+    return queryset.filter(Q(name__icontains=term) | Q(sku__icontains=term) | Q(barcode__icontains=term))
+
+
+def _legacy_customers(queryset, term):
+    condition = Q()
+    for field in CUSTOMER_SEARCH.fields:
+        condition |= Q(**{f'{field}__icontains': term})
+    return queryset.filter(condition)
+
+
+def _legacy_sales(queryset, term):
+    condition = Q()
+    for field in SALE_SEARCH.fields:
+        condition |= Q(**{f'{field}__icontains': term})
+    return queryset.filter(condition)
+
+
+class Command(BaseCommand):
+    help = 'Mide la latencia de la búsqueda con índices trigram frente a icontains sobre un volumen sintético'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, required=True, help='ID del business')
+        parser.add_argument('--products', type=int, default=100_000, help='Productos a cargar (default: 100000)')
+        parser.add_argument('--customers', type=int, default=20_000, help='Clientes a cargar (default: 20000)')
+        parser.add_argument('--sales', type=int, default=500_000, help='Ventas a cargar (default: 500000)')
+        parser.add_argument('--runs', type=int, default=30, help='Repeticiones por búsqueda (default: 30)')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('El benchmark requiere PostgreSQL (pg_trgm y unaccent).')
+        try:
+            business = Business.objects.get(pk=options['business'])
+        except Business.DoesNotExist:
+            raise CommandError(f'Business con ID {options["business"]} no encontrado')
+
+        rng = random.Random(42)
+        runs = max(options['runs'], 1)
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                barcode = self._seed(business, rng, options)
+                self.stdout.write(f'Datos cargados en {time.perf_counter() - started:.1f}s')
+                self._run_cases(business, barcode, runs)
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    def _seed(self, business, rng, options):
+        products = []
+        for index in range(max(options['products'], 0)):
+            name = ' '.join(rng.sample(WORDS, 3))
+            products.append(Product(
+                business=business,
+                name=f'{name.capitalize()} {index}',
+                sku=f'BM-{index:06d}',
+                barcode=f'779{index:010d}',
+            ))
+        Product.objects.bulk_create(products, batch_size=BATCH_SIZE)
+
+        customers = [
+            Customer(
+                business=business,
+                name=f'{rng.choice(NAMES)} {rng.choice(SURNAMES)}',
+                doc_number=f'{20_000_000 + index}',
+                email=f'cliente{index}@example.com',
+                phone=f'11{index:08d}',
+            )
+            for index in range(max(options['customers'], 0))
+        ]
+        Customer.objects.bulk_create(customers, batch_size=BATCH_SIZE)
+
+        first_number = (Sale.objects.filter(business=business).aggregate(last=Max('number'))['last'] or 0) + 1
+        total_sales = max(options['sales'], 0)
+        for offset in range(0, total_sales, BATCH_SIZE):
+            Sale.objects.bulk_create([
+                Sale(
+                    business=business,
+                    customer=rng.choice(customers) if customers and rng.random() < 0.7 else None,
+                    number=first_number + index,
+                    notes=rng.choice(('', '', 'Envío a domicilio', 'Retira en local', f'Pedido {rng.choice(WORDS)}')),
+                )
+                for index in range(offset, min(offset + BATCH_SIZE, total_sales))
+            ])
+
+        with connection.cursor() as cursor:
+            for model in (Product, Customer, Sale):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+        return f'779{max(options["products"] - 1, 0):010d}'
+
+    def _run_cases(self, business, barcode, runs):
+        products = Product.objects.filter(business=business, is_active=True)
+        customers = Customer.objects.filter(business=business, is_active=True)
+        sales = Sale.objects.filter(business=business)
+
+        def ranked(queryset, term, spec, default):
+            return search_queryset(queryset, term, spec, rank=True).order_by(f'-{SEARCH_RANK_FIELD}', default)
+
+        cases = (
+            ('productos · nombre', lambda: ranked(products, 'azucar yerba', PRODUCT_SEARCH, 'name'),
+             lambda: _legacy_products(products, 'azúcar').filter(name__icontains='yerba').order_by('name')),
+            ('productos · escaneo', lambda: search_queryset(products, barcode, PRODUCT_SEARCH),
+             lambda: _legacy_products(products, barcode).order_by('name')),
+            ('clientes · nombre', lambda: ranked(customers, 'jose perez', CUSTOMER_SEARCH, 'name'),
+             lambda: _legacy_customers(customers, 'José').filter(name__icontains='Pérez').order_by('name')),
+            ('ventas · cliente', lambda: search_queryset(sales, 'munoz', SALE_SEARCH).order_by('-created_at', '-number'),
+             lambda: _legacy_sales(sales, 'Muñoz').order_by('-created_at', '-number')),
+        )
+        for label, current, legacy in cases:
+            self._measure(label, current, legacy, runs)
+
+    def _measure(self, label, current, legacy, runs):
+        results = {}
+        for strategy, build in (('trigram', current), ('icontains', legacy)):
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                list(build()[:50])
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            results[strategy] = (
+                statistics.median(timings),
+                timings[min(int(len(timings) * 0.95), len(timings) - 1)],
+            )
+        self.stdout.write(self.style.SUCCESS(f'✅ {label}'))
+        for strategy, (median, p95) in results.items():
+            self.stdout.write(f'   {strategy:<9} mediana {median:.2f} ms · p95 {p95:.2f} ms')
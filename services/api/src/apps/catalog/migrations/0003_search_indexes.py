@@ -0,0 +1,22 @@
+# Generated by Django 5.0.14 on 2026-10-16 23:49
+
+from django.db import migrations, models
+
+from common.search import search_function_operation, search_index_operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0014_menu_qr_plans_pro_module'),
+        ('catalog', '0002_productcategory_product_category_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['business', 'barcode'], name='catalog_pro_busines_037c52_idx'),
+        ),
+        search_function_operation(),
+        search_index_operations('catalog_product', ['name', 'sku', 'barcode']),
+    ]
@@ -54,6 +54,7 @@ class Product(models.Model):
     indexes = [
       models.Index(fields=['business', 'name']),
       models.Index(fields=['business', 'sku']),
+      models.Index(fields=['business', 'barcode']),
       models.Index(fields=['business', 'category']),
     ]
 
@@ -0,0 +1,137 @@
+"""
+Cache de escaneos del POS: código (barcode o SKU) → ficha compacta del producto.
+
+Cada entrada guarda el sello del código con el que se armó; una escritura
+sobre el producto o su stock rota el sello de sus códigos (ahora y al
+confirmar la transacción), así una lectura que cargó la fila vieja en paralelo
+nace vencida. Las cargas masivas (importador) rotan la generación del negocio
+entera. También se cachean los códigos inexistentes, con un TTL corto.
+"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Product
+
+SCAN_CACHE_PREFIX = 'catalog-scan'
+SCAN_CACHE_TTL = getattr(settings, 'CATALOG_SCAN_CACHE_TTL_SECONDS', 60 * 60)
+SCAN_MISS_TTL = getattr(settings, 'CATALOG_SCAN_MISS_TTL_SECONDS', 60)
+
+
+def normalize_code(code) -> str:
+  return str(code or '').strip()
+
+
+def product_codes(product) -> set:
+  return {code for code in (normalize_code(product.barcode), normalize_code(product.sku)) if code}
+
+
+def _generation_key(business_id) -> str:
+  return f'{SCAN_CACHE_PREFIX}:gen:{business_id}'
+
+
+def _stamp_key(business_id, generation: str, code: str) -> str:
+  return f'{SCAN_CACHE_PREFIX}:stamp:{business_id}:{generation}:{code}'
+
+
+def _entry_key(business_id, generation: str, code: str) -> str:
+  return f'{SCAN_CACHE_PREFIX}:entry:{business_id}:{generation}:{code}'
+
+
+def _current(key: str) -> str:
+  value = cache.get(key)
+  if value is None:
+    value = uuid.uuid4().hex
+    if not cache.add(key, value, timeout=None):
+      value = cache.get(key) or value
+  return value
+
+
+def scan_record(product: Product) -> dict:
+  stock = getattr(product, 'stock_level', None)
+  return {
+    'id': str(product.pk),
+    'name': product.name,
+    'sku': product.sku,
+    'barcode': product.barcode,
+    'price': str(product.price),
+    'stock': str(stock.quantity) if stock is not None else '0',
+  }
+
+
+def load_scan_record(business_id, code: str) -> Optional[dict]:
+  """Busca el producto activo por código exacto; el barcode gana sobre el SKU."""
+  products = list(
+    Product.objects.filter(business_id=business_id, is_active=True)
+    .filter(Q(barcode=code) | Q(sku=code))
+    .select_related('stock_level')
+    .order_by('name')[:2]
+  )
+  if not products:
+    return None
+  products.sort(key=lambda product: product.barcode != code)
+  return scan_record(products[0])
+
+
+def lookup_product_code(business_id, code) -> Optional[dict]:
+  """Ficha del producto para `code`, desde el cache o la base."""
+  code = normalize_code(code)
+  if not code:
+    return None
+  generation = _current(_generation_key(business_id))
+  entry_key = _entry_key(business_id, generation, code)
+  stamp_key = _stamp_key(business_id, generation, code)
+  values = cache.get_many([entry_key, stamp_key])
+  entry, stamp = values.get(entry_key), values.get(stamp_key)
+  if entry is not None and stamp is not None and entry['stamp'] == stamp:
+    return entry['record']
+
+  # El sello se lee antes de ir a la base: si una escritura lo rota en el
+  # medio, la entrada queda vencida.
+  stamp = stamp or _current(stamp_key)
+  record = load_scan_record(business_id, code)
+  cache.set(entry_key, {'stamp': stamp, 'record': record}, SCAN_CACHE_TTL if record else SCAN_MISS_TTL)
+  return record
+
+
+def _rotate_codes(business_id, codes) -> None:
+  generation = cache.get(_generation_key(business_id))
+  if generation is None:
+    return
+  cache.set_many({_stamp_key(business_id, generation, code): uuid.uuid4().hex for code in codes}, timeout=None)
+
+
+def forget_product_codes(business_id, codes: Iterable[str]) -> None:
+  """Invalida los escaneos de esos códigos (ahora y al confirmar la transacción)."""
+  codes = {normalize_code(code) for code in codes if normalize_code(code)}
+  if business_id is None or not codes:
+    return
+  _rotate_codes(business_id, codes)
+  transaction.on_commit(lambda: _rotate_codes(business_id, codes))
+
+
+def forget_products(products: Iterable[Product]) -> None:
+  codes_by_business = {}
+  for product in products:
+    codes_by_business.setdefault(product.business_id, set()).update(product_codes(product))
+  for business_id, codes in codes_by_business.items():
+    forget_product_codes(business_id, codes)
+
+
+def _rotate_generation(business_id) -> None:
+  cache.set(_generation_key(business_id), uuid.uuid4().hex, timeout=None)
+
+
+def bump_scan_cache(business_id) -> None:
+  """Invalida todos los escaneos del negocio (cargas masivas)."""
+  if business_id is None:
+    return
+  _rotate_generation(business_id)
+  transaction.on_commit(lambda: _rotate_generation(business_id))
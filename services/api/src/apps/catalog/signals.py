@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Product
+from .scan_cache import forget_product_codes, product_codes
+
+
+@receiver(pre_save, sender=Product)
+def remember_previous_codes(sender, instance, **kwargs):
+  previous = Product.objects.filter(pk=instance.pk).values('barcode', 'sku').first() if instance.pk else None
+  instance._scan_previous_codes = {code for code in (previous or {}).values() if code}
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_scans(sender, instance, **kwargs):
+  codes = product_codes(instance) | getattr(instance, '_scan_previous_codes', set())
+  forget_product_codes(instance.business_id, codes)
@@ -0,0 +1,79 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Membership
+from apps.business.models import Business, Subscription
+from apps.catalog.models import Product
+from apps.catalog.scan_cache import bump_scan_cache, lookup_product_code
+from apps.inventory.services import register_stock_movement
+
+
+class ProductScanCacheTests(TestCase):
+  def setUp(self):
+    cache.clear()
+    self.business = Business.objects.create(name='Kiosco')
+    self.product = Product.objects.create(business=self.business, name='Alfajor', sku='ALF-1', barcode='7791234', price=Decimal('500'))
+
+  def test_second_scan_is_served_from_cache(self):
+    record = lookup_product_code(self.business.id, '7791234')
+    self.assertEqual(record['name'], 'Alfajor')
+    self.assertEqual(record['stock'], '0')
+    self.assertEqual(lookup_product_code(self.business.id, 'ALF-1')['id'], str(self.product.pk))
+    with self.assertNumQueries(0):
+      self.assertEqual(lookup_product_code(self.business.id, '7791234'), record)
+      self.assertEqual(lookup_product_code(self.business.id, 'ALF-1'), record)
+
+  def test_product_and_stock_writes_invalidate_their_codes(self):
+    lookup_product_code(self.business.id, '7791234')
+    self.product.price = Decimal('650')
+    self.product.save()
+    self.assertEqual(lookup_product_code(self.business.id, '7791234')['price'], '650.00')
+
+    register_stock_movement(business=self.business, product=self.product, movement_type='IN', quantity=Decimal('12'))
+    self.assertEqual(lookup_product_code(self.business.id, '7791234')['stock'], '12.00')
+
+    self.product.barcode = '7790000'
+    self.product.save()
+    self.assertIsNone(lookup_product_code(self.business.id, '7791234'))
+    self.assertEqual(lookup_product_code(self.business.id, '7790000')['name'], 'Alfajor')
+
+  def test_unknown_code_is_cached_until_a_product_takes_it(self):
+    self.assertIsNone(lookup_product_code(self.business.id, '999'))
+    with self.assertNumQueries(0):
+      self.assertIsNone(lookup_product_code(self.business.id, '999'))
+    Product.objects.create(business=self.business, name='Chicle', barcode='999')
+    self.assertEqual(lookup_product_code(self.business.id, '999')['name'], 'Chicle')
+
+  def test_bulk_changes_rotate_the_business_generation(self):
+    lookup_product_code(self.business.id, 'ALF-1')
+    Product.objects.filter(pk=self.product.pk).update(is_active=False)
+    bump_scan_cache(self.business.id)
+    self.assertIsNone(lookup_product_code(self.business.id, 'ALF-1'))
+
+
+class ProductScanApiTests(APITestCase):
+  def setUp(self):
+    cache.clear()
+    self.user = get_user_model().objects.create_user(username='cajero', email='cajero@example.com', password='pass1234')
+    self.business = Business.objects.create(name='Mercado')
+    Subscription.objects.create(business=self.business, plan='starter', status='active')
+    Membership.objects.create(user=self.user, business=self.business, role='owner')
+    self.client.force_authenticate(user=self.user)
+    self.client.cookies['bid'] = str(self.business.id)
+    self.url = reverse('catalog:product-scan')
+    Product.objects.create(business=self.business, name='Gaseosa', sku='GAS-1', barcode='7790001', price=Decimal('900'))
+
+  def test_scan_returns_compact_record(self):
+    response = self.client.get(self.url, {'code': '7790001'})
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(set(response.json()), {'id', 'name', 'sku', 'barcode', 'price', 'stock'})
+    self.assertEqual(response.json()['price'], '900.00')
+
+  def test_unknown_or_missing_code(self):
+    self.assertEqual(self.client.get(self.url, {'code': '000'}).status_code, 404)
+    self.assertEqual(self.client.get(self.url).status_code, 400)
@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Membership
+from apps.business.models import Business, Subscription
+from apps.catalog.models import Product
+from apps.customers.models import Customer
+from common.search import CUSTOMER_SEARCH, normalize_text, search_queryset
+
+
+class ProductSearchApiTests(APITestCase):
+  def setUp(self):
+    self.user = get_user_model().objects.create_user(username='search', email='search@example.com', password='pass1234')
+    self.business = Business.objects.create(name='Almacén')
+    Subscription.objects.create(business=self.business, plan='starter', status='active')
+    Membership.objects.create(user=self.user, business=self.business, role='owner')
+    self.client.force_authenticate(user=self.user)
+    self.client.cookies['bid'] = str(self.business.id)
+    self.url = reverse('catalog:product-list')
+
+    self.leche = Product.objects.create(business=self.business, name='Leche entera', sku='LE-1', barcode='7790001')
+    self.cafe = Product.objects.create(business=self.business, name='Café con leche', sku='CA-1', barcode='7790002')
+    Product.objects.create(business=self.business, name='Yerba mate', sku='YE-1', barcode='77900021')
+
+  def _names(self, **params):
+    response = self.client.get(self.url, params)
+    self.assertEqual(response.status_code, 200)
+    return [row['name'] for row in response.json()]
+
+  def test_every_word_must_match_some_field(self):
+    self.assertEqual(self._names(search='leche con'), ['Café con leche'])
+    self.assertEqual(self._names(search='leche ca-1'), ['Café con leche'])
+
+  def test_exact_barcode_returns_only_the_scanned_product(self):
+    self.assertEqual(self._names(search='7790002'), ['Café con leche'])
+    self.assertEqual(len(self._names(search='77900')), 3)
+
+  def test_search_orders_by_relevance_unless_ordering_is_given(self):
+    self.assertEqual(self._names(search='leche'), ['Leche entera', 'Café con leche'])
+    self.assertEqual(self._names(search='leche', ordering='-name'), ['Leche entera', 'Café con leche'])
+    self.assertEqual(self._names(search='leche', ordering='name'), ['Café con leche', 'Leche entera'])
+
+
+class SearchServiceTests(TestCase):
+  def test_normalize_text_strips_spanish_accents(self):
+    self.assertEqual(normalize_text('Ñandú Pérez ÁLVAREZ'), 'nandu perez alvarez')
+
+  def test_customer_document_fast_path(self):
+    business = Business.objects.create(name='Clientes')
+    match = Customer.objects.create(business=business, name='Ana', doc_number='20123456')
+    Customer.objects.create(business=business, name='Beto', doc_number='201234567')
+    queryset = Customer.objects.filter(business=business)
+
+    self.assertEqual(list(search_queryset(queryset, '20123456', CUSTOMER_SEARCH)), [match])
+    self.assertEqual(search_queryset(queryset, '2012345', CUSTOMER_SEARCH).count(), 2)
@@ -5,6 +5,7 @@ from .views import (
 	ProductCategoryListCreateView,
 	ProductDetailView,
 	ProductListCreateView,
+	ProductScanView,
 )
 
 app_name = 'catalog'
@@ -13,5 +14,6 @@ urlpatterns = [
 	path('categories/', ProductCategoryListCreateView.as_view(), name='category-list'),
 	path('categories/<uuid:pk>/', ProductCategoryDetailView.as_view(), name='category-detail'),
 	path('products/', ProductListCreateView.as_view(), name='product-list'),
+	path('products/scan/', ProductScanView.as_view(), name='product-scan'),
 	path('products/<uuid:pk>/', ProductDetailView.as_view(), name='product-detail'),
 ]
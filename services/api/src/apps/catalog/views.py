@@ -2,9 +2,13 @@ from django.db import models
 from django.db.models import Q, F, Count
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from apps.accounts.permissions import HasBusinessMembership, HasPermission
+from common.search import PRODUCT_SEARCH, SEARCH_RANK_FIELD, search_queryset
 from .models import Product, ProductCategory
+from .scan_cache import lookup_product_code
 from .serializers import ProductSerializer, ProductCategorySerializer
 
 
@@ -87,16 +91,14 @@ class ProductListCreateView(generics.ListCreateAPIView):
 			else:
 				queryset = queryset.filter(category_id=category_id)
 
-		search = self.request.query_params.get('search')
-		if search:
-			queryset = queryset.filter(
-				Q(name__icontains=search)
-				| Q(sku__icontains=search)
-				| Q(barcode__icontains=search)
-			)
+		search = (self.request.query_params.get('search') or '').strip()
+		ordering = self.request.query_params.get('ordering')
+		queryset = search_queryset(queryset, search, PRODUCT_SEARCH, rank=bool(search) and not ordering)
+		if search and not ordering:
+			return queryset.order_by(f'-{SEARCH_RANK_FIELD}', 'name')
 
 		# Ordering
-		ordering = self.request.query_params.get('ordering', 'name')
+		ordering = ordering or 'name'
 		valid_orderings = ['name', '-name', 'category__name', '-category__name', 'price', '-price', 'created_at', '-created_at']
 		if ordering in valid_orderings:
 			# Handle null categories in ordering (put them at the end)
@@ -133,3 +135,18 @@ class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
 	def perform_destroy(self, instance):
 		instance.is_active = False
 		instance.save(update_fields=['is_active', 'updated_at'])
+
+
+class ProductScanView(APIView):
+	"""GET /api/v1/catalog/products/scan/?code=<barcode|sku> — lookup exacto para el POS."""
+	permission_classes = [IsAuthenticated, HasBusinessMembership, HasPermission]
+	required_permission = 'view_products'
+
+	def get(self, request):
+		code = (request.query_params.get('code') or '').strip()
+		if not code:
+			return Response({'detail': 'Indicá el código a buscar.'}, status=400)
+		record = lookup_product_code(request.business.id, code)
+		if record is None:
+			return Response({'detail': 'No encontramos un producto con ese código.'}, status=404)
+		return Response(record)
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+from common.search import search_index_operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_search_indexes'),
+        ('customers', '0004_rename_customers_business_doc_number_idx_customers_c_busines_5cf7ba_idx_and_more'),
+    ]
+
+    operations = [
+        search_index_operations('customers_customer', ['name', 'doc_number', 'email', 'phone', 'note']),
+    ]
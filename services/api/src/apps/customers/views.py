@@ -1,8 +1,6 @@
 from django.db.models import Count
 from django.shortcuts import get_object_or_404
 from rest_framework import generics
-from rest_framework.filters import SearchFilter
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import IsAuthenticated
 
 from apps.accounts.permissions import HasBusinessMembership, HasPermission, HasEntitlement
@@ -10,11 +8,13 @@ from apps.sales.models import Quote, Sale
 from apps.sales.quote_serializers import QuoteListSerializer
 from apps.sales.serializers import SaleListSerializer
 from apps.sales.views import _annotate_payments_totals
+from common.pagination import KeysetPagination
+from common.search import CUSTOMER_SEARCH, TrigramSearchFilter
 from .models import Customer
 from .serializers import CustomerSerializer
 
 
-class CustomerPagination(LimitOffsetPagination):
+class CustomerPagination(KeysetPagination):
 	default_limit = 25
 	max_limit = 100
 	limit_query_param = 'limit'
@@ -30,8 +30,8 @@ class CustomerListCreateView(generics.ListCreateAPIView):
     'POST': ('manage_customers', 'create_sales'),
   }
   pagination_class = CustomerPagination
-  filter_backends = [SearchFilter]
-  search_fields = ['name', 'doc_number', 'email', 'phone', 'note']
+  filter_backends = [TrigramSearchFilter]
+  search_spec = CUSTOMER_SEARCH
 
   def get_queryset(self):
     business = getattr(self.request, 'business')
@@ -75,6 +75,7 @@ class CustomerSalesView(generics.ListAPIView):
   required_entitlement = 'gestion.customers'
   permission_map = {'GET': 'view_sales'}
   pagination_class = CustomerPagination
+  keyset_ordering = ('-created_at', '-number')
 
   def get_queryset(self):
     business = getattr(self.request, 'business')
@@ -95,6 +96,7 @@ class CustomerQuotesView(generics.ListAPIView):
   required_entitlement = 'gestion.customers'
   permission_map = {'GET': 'view_quotes'}
   pagination_class = CustomerPagination
+  keyset_ordering = ('-created_at', '-number')
 
   def get_queryset(self):
     business = getattr(self.request, 'business')
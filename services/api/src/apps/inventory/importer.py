@@ -1,19 +1,31 @@
 from __future__ import annotations
 
+import codecs
+import csv
+import itertools
 from decimal import Decimal, InvalidOperation
-from typing import Any, Iterable, List
+from typing import Any, Callable, Iterable, Iterator, List, Optional
 
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower, Trim
+from django.utils import timezone
 from openpyxl import load_workbook
 
 from apps.business.models import Business
 from apps.catalog.models import Product
-from .models import InventoryImportJob
-from .services import ensure_stock_record, register_stock_movement
+from apps.catalog.scan_cache import bump_scan_cache
+from .models import InventoryImportJob, ProductStock
+from .services import StockLine, register_stock_movements
+from .valuation import refresh_stock_valuations
 
-MAX_ROWS = 2000
+MAX_ROWS = 100_000
+CHUNK_SIZE = 500
 PREVIEW_LIMIT = 200
+MAX_STORED_ERROR_ROWS = 500
+SUPPORTED_EXTENSIONS = ('.xlsx', '.csv')
+CSV_DELIMITERS = ',;\t'
 HEADER_ALIASES = {
 		'nombre': 'name',
 		'producto': 'name',
@@ -36,34 +48,141 @@ HEADER_ALIASES = {
 REQUIRED_FIELDS = {'name'}
 SUPPORTED_FIELDS = {'name', 'sku', 'barcode', 'price', 'cost', 'stock', 'stock_min', 'note'}
 DEFAULT_NOTE = 'Importación de stock (.xlsx)'
+PRODUCT_TEXT_FIELDS = ['name', 'sku', 'barcode']
+PRODUCT_DECIMAL_FIELDS = ['price', 'cost', 'stock_min']
 
 
 class InventoryImportError(Exception):
 	"""Error amigable para el importador de inventario."""
 
 
-def parse_inventory_import(file_obj, *, business: Business) -> tuple[list[dict[str, Any]], dict[str, int]]:
+def iter_import_rows(file_obj, *, filename: str) -> Iterator[tuple]:
+	"""
+	Itera las filas del archivo como tuplas de valores, sin cargarlo entero:
+	los .xlsx se abren en modo read-only y los .csv se leen línea a línea.
+	"""
 	file_obj.seek(0)
+	if (filename or '').lower().endswith('.csv'):
+		return _iter_csv_rows(file_obj)
+	return _iter_xlsx_rows(file_obj)
+
+
+def _iter_xlsx_rows(file_obj) -> Iterator[tuple]:
 	try:
-		workbook = load_workbook(filename=file_obj, data_only=True)
+		workbook = load_workbook(filename=file_obj, read_only=True, data_only=True)
 	except Exception as exc:  # pragma: no cover - openpyxl lanza varias subclases
 		raise InventoryImportError('No pudimos leer el archivo. Asegurate de que sea un .xlsx válido.') from exc
+	try:
+		yield from workbook.active.iter_rows(values_only=True)
+	finally:
+		workbook.close()
+
+
+def _iter_csv_rows(file_obj) -> Iterator[tuple]:
+	lines = codecs.getreader('utf-8-sig')(file_obj, errors='replace')
+	first_line = next(iter(lines), '')
+	if not first_line.strip():
+		return
+	try:
+		dialect = csv.Sniffer().sniff(first_line, delimiters=CSV_DELIMITERS)
+	except csv.Error:
+		dialect = csv.excel
+	for values in csv.reader(itertools.chain([first_line], lines), dialect):
+		yield tuple(values)
+
 
-	sheet = workbook.active
-	header_row = next(sheet.iter_rows(min_row=1, max_row=1, values_only=True), None)
-	if not header_row:
+def _read_header(rows: Iterator[tuple]) -> dict[int, str]:
+	header_row = next(rows, None)
+	if not header_row or not any(_has_value(value) for value in header_row):
 		raise InventoryImportError('El archivo está vacío. Descargá la plantilla más reciente e intentá de nuevo.')
 
 	header_map = _build_header_map(header_row)
 	if not all(field in header_map.values() for field in REQUIRED_FIELDS):
 		raise InventoryImportError('La plantilla debe incluir la columna "Nombre".')
+	return header_map
 
-	products = Product.objects.filter(business=business)
-	sku_lookup = {p.sku.lower(): p for p in products if p.sku}
-	name_lookup = {p.name.strip().lower(): p for p in products}
-	seen_new_skus: set[str] = set()
 
-	rows: list[dict[str, Any]] = []
+def _iter_chunks(rows: Iterator[tuple], header_map: dict[int, str], *, chunk_size: int, summary: dict | None = None):
+	"""
+	Agrupa filas no vacías en bloques de `chunk_size` (con su número de línea).
+	Corta en MAX_ROWS; si después queda alguna fila con datos marca
+	`summary['truncated']`.
+	"""
+	chunk: list[tuple[int, dict[str, Any]]] = []
+	processed = 0
+	for line_number, values in enumerate(rows, start=2):
+		normalized_row = _normalize_row(values, header_map)
+		if not any(_has_value(value) for value in normalized_row.values()):
+			continue
+		if processed >= MAX_ROWS:
+			if summary is not None:
+				summary['truncated'] = True
+			break
+		processed += 1
+		chunk.append((line_number, normalized_row))
+		if len(chunk) >= chunk_size:
+			yield chunk
+			chunk = []
+	if chunk:
+		yield chunk
+
+
+def _lookup_products(business: Business, chunk: list[tuple[int, dict[str, Any]]]) -> tuple[dict[str, Product], dict[str, Product]]:
+	"""Trae solo los productos cuyo SKU o nombre aparece en el bloque."""
+	skus = {_clean_string(row.get('sku')).lower() for _, row in chunk if _clean_string(row.get('sku'))}
+	names = {_clean_string(row.get('name')).lower() for _, row in chunk if _clean_string(row.get('name'))}
+	products = (
+		Product.objects.filter(business=business)
+		.annotate(sku_key=Lower('sku'), name_key=Lower(Trim('name')))
+		.filter(Q(sku_key__in=skus) | Q(name_key__in=names))
+	)
+	sku_lookup: dict[str, Product] = {}
+	name_lookup: dict[str, Product] = {}
+	for product in products:
+		if product.sku:
+			sku_lookup[product.sku_key] = product
+		name_lookup[product.name_key] = product
+	return sku_lookup, name_lookup
+
+
+def _iter_built_chunks(rows: Iterator[tuple], header_map: dict[int, str], *, business: Business, chunk_size: int, summary: dict | None = None):
+	"""Valida el archivo bloque a bloque; produce listas de (fila, estado, producto)."""
+	seen_new_skus: set[str] = set()
+	for chunk in _iter_chunks(rows, header_map, chunk_size=chunk_size, summary=summary):
+		sku_lookup, name_lookup = _lookup_products(business, chunk)
+		built = []
+		for line_number, normalized_row in chunk:
+			result_row, status = _build_row(
+				normalized_row,
+				line_number=line_number,
+				sku_lookup=sku_lookup,
+				name_lookup=name_lookup,
+				seen_new_skus=seen_new_skus,
+			)
+			product = None
+			if result_row['product_id']:
+				product = sku_lookup.get((result_row['sku'] or '').lower()) or name_lookup.get(result_row['name'].lower())
+			built.append((result_row, status, product))
+		yield built
+
+
+def parse_inventory_import(
+	file_obj,
+	*,
+	business: Business,
+	filename: str = '',
+	chunk_size: int = CHUNK_SIZE,
+) -> tuple[list[dict[str, Any]], dict[str, int]]:
+	"""
+	Valida el archivo completo en streaming y devuelve (filas guardadas, resumen).
+	Solo se conservan las primeras PREVIEW_LIMIT filas y hasta
+	MAX_STORED_ERROR_ROWS filas con error; el archivo se vuelve a leer al aplicar.
+	"""
+	rows = iter_import_rows(file_obj, filename=filename or getattr(file_obj, 'name', ''))
+	header_map = _read_header(rows)
+
+	stored_rows: list[dict[str, Any]] = []
+	stored_errors = 0
 	summary = {
 		'total_rows': 0,
 		'create_count': 0,
@@ -74,117 +193,194 @@ def parse_inventory_import(file_obj, *, business: Business) -> tuple[list[dict[s
 		'error_count': 0,
 	}
 
-	processed = 0
-	for line_number, values in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
-		if processed >= MAX_ROWS:
-			break
-		normalized_row = _normalize_row(values, header_map)
-		if not any(_has_value(value) for value in normalized_row.values()):
-			continue
-		processed += 1
-		summary['total_rows'] += 1
-
-		result_row, status = _build_row(
-			normalized_row,
-			line_number=line_number,
-			sku_lookup=sku_lookup,
-			name_lookup=name_lookup,
-			seen_new_skus=seen_new_skus,
-		)
-		rows.append(result_row)
-
-		if status == 'error':
-			summary['error_count'] += 1
-		elif status == 'warning':
-			summary['warning_count'] += 1
-
-		if status != 'error':
-			if result_row['action'] == 'create':
-				summary['create_count'] += 1
-			else:
-				summary['update_count'] += 1
-			if result_row['stock_action'] == 'adjust':
-				summary['adjust_count'] += 1
+	for built in _iter_built_chunks(rows, header_map, business=business, chunk_size=chunk_size, summary=summary):
+		for result_row, status, _ in built:
+			summary['total_rows'] += 1
+			if status == 'error':
+				summary['error_count'] += 1
+			elif status == 'warning':
+				summary['warning_count'] += 1
+
+			if status != 'error':
+				if result_row['action'] == 'create':
+					summary['create_count'] += 1
+				else:
+					summary['update_count'] += 1
+				if result_row['stock_action'] == 'adjust':
+					summary['adjust_count'] += 1
+				else:
+					summary['skip_count'] += 1
 			else:
-				summary['skip_count'] += 1
-		else:
-			if result_row['stock_action'] == 'skip':
-				summary['skip_count'] += 1
+				if result_row['stock_action'] == 'skip':
+					summary['skip_count'] += 1
+
+			if len(stored_rows) < PREVIEW_LIMIT:
+				stored_rows.append(result_row)
+			elif status == 'error' and stored_errors < MAX_STORED_ERROR_ROWS:
+				stored_rows.append(result_row)
+			if status == 'error':
+				stored_errors += 1
 
 	if summary['total_rows'] == 0:
 		raise InventoryImportError('No encontramos filas con datos. Revisá que la hoja tenga información desde la fila 2 en adelante.')
 
-	return rows, summary
-
+	return stored_rows, summary
+
+
+def _iter_apply_chunks(job: InventoryImportJob, *, business: Business, chunk_size: int):
+	"""Bloques de (payload, producto) a aplicar, desde el archivo original o desde job.rows."""
+	if job.source_file:
+		with job.source_file.open('rb') as source:
+			rows = iter_import_rows(source, filename=job.source_file.name)
+			header_map = _read_header(rows)
+			for built in _iter_built_chunks(rows, header_map, business=business, chunk_size=chunk_size):
+				yield [(row['payload'], product) for row, status, product in built if status != 'error']
+		return
+
+	# Importaciones previas al streaming: las filas completas quedaron en job.rows.
+	valid_rows = [row for row in job.rows if row.get('status') != 'error']
+	for offset in range(0, len(valid_rows), chunk_size):
+		chunk = valid_rows[offset:offset + chunk_size]
+		product_ids = [row['product_id'] for row in chunk if row.get('product_id')]
+		products = Product.objects.in_bulk(product_ids) if product_ids else {}
+		by_id = {str(pk): product for pk, product in products.items() if product.business_id == business.id}
+		yield [(row.get('payload') or {}, by_id.get(row.get('product_id') or '')) for row in chunk]
+
+
+def _apply_chunk(entries: list[tuple[dict[str, Any], Product | None]], *, business: Business, created_by) -> dict[str, int]:
+	counts = {'created': 0, 'updated': 0, 'adjusted': 0, 'skipped': 0}
+	new_products: dict[str, Product] = {}
+	to_create: list[Product] = []
+	changed: dict[Any, Product] = {}
+	changed_fields: set[str] = set()
+	stock_lines: list[StockLine] = []
+
+	for payload, product in entries:
+		if product is None:
+			key = (payload.get('sku') or '').lower() or (payload.get('name') or '').strip().lower()
+			product = new_products.get(key)
+			if product is None:
+				product = _build_product(payload, business)
+				new_products[key] = product
+				to_create.append(product)
+				counts['created'] += 1
+			else:
+				_apply_payload(product, payload)
+				counts['updated'] += 1
+		else:
+			fields = _apply_payload(product, payload)
+			if fields:
+				changed[product.pk] = product
+				changed_fields.update(fields)
+			counts['updated'] += 1
+
+		stock_value = _to_decimal(payload.get('stock'))
+		if stock_value is not None:
+			stock_lines.append(
+				StockLine(
+					product=product,
+					movement_type='ADJUST',
+					quantity=stock_value,
+					note=payload.get('note') or DEFAULT_NOTE,
+				)
+			)
+			counts['adjusted'] += 1
+		else:
+			counts['skipped'] += 1
 
-def apply_inventory_import(job: InventoryImportJob, *, business: Business, user) -> InventoryImportJob:
+	if to_create:
+		Product.objects.bulk_create(to_create)
+		ProductStock.objects.bulk_create(
+			[ProductStock(business=business, product=product, quantity=Decimal('0')) for product in to_create],
+			ignore_conflicts=True,
+		)
+	if changed:
+		now = timezone.now()
+		for product in changed.values():
+			product.updated_at = now
+		Product.objects.bulk_update(list(changed.values()), sorted(changed_fields) + ['updated_at'])
+	if to_create or changed:
+		bump_scan_cache(business.id)
+	register_stock_movements(business=business, lines=stock_lines, created_by=created_by)
+	# Los bulk no disparan signals: se refresca la valorización de lo que no pasó por un movimiento.
+	adjusted = {line.product.pk for line in stock_lines}
+	pending = {product.pk for product in to_create} | set(changed)
+	refresh_stock_valuations(business.id, pending - adjusted)
+	return counts
+
+
+def apply_inventory_import(
+	job: InventoryImportJob,
+	*,
+	business: Business,
+	user,
+	chunk_size: int = CHUNK_SIZE,
+	on_progress: Optional[Callable[[int, int], None]] = None,
+) -> InventoryImportJob:
+	"""
+	Aplica la importación por bloques: cada bloque corre en su propio
+	transaction.atomic() (savepoint si ya hay una transacción abierta) y al
+	terminarlo se publica el avance en job.processed_rows. `on_progress`
+	recibe (procesadas, total) tras cada bloque.
+	"""
 	if job.business_id != business.id:
 		raise InventoryImportError('No encontramos esta importación en tu negocio actual.')
 	if job.summary and job.summary.get('error_count'):
 		raise InventoryImportError('Corregí los errores del archivo antes de aplicar la importación.')
 
-	created = updated = adjusted = skipped = 0
-	invalid_rows = 0
-	cache_by_id: dict[str, Product] = {}
+	totals = {'created': 0, 'updated': 0, 'adjusted': 0, 'skipped': 0}
+	processed = 0
+	total_rows = (job.summary or {}).get('total_rows', 0)
+	created_by = user if getattr(user, 'is_authenticated', False) else None
+
+	job.status = InventoryImportJob.Status.PROCESSING
+	job.processed_rows = 0
+	job.save(update_fields=['status', 'processed_rows', 'updated_at'])
 
 	try:
-		with transaction.atomic():
-			job.status = InventoryImportJob.Status.PROCESSING
-			job.save(update_fields=['status', 'updated_at'])
-
-			for row in job.rows:
-				if row.get('status') == 'error':
-					invalid_rows += 1
-					continue
-
-				payload = row.get('payload') or {}
-				product = _resolve_product(row, business, cache_by_id)
-				if product is None:
-					product = _create_product(payload, business)
-					cache_by_id[str(product.id)] = product
-					created += 1
-				else:
-					_update_product(product, payload)
-					updated += 1
-
-				stock_value = _to_decimal(payload.get('stock'))
-				if stock_value is not None:
-					register_stock_movement(
-						business=business,
-						product=product,
-						movement_type='ADJUST',
-						quantity=stock_value,
-						note=payload.get('note') or DEFAULT_NOTE,
-						created_by=user if getattr(user, 'is_authenticated', False) else None,
-					)
-					adjusted += 1
-				else:
-					skipped += 1
-
-			job.status = InventoryImportJob.Status.DONE
-			job.created_count = created
-			job.updated_count = updated
-			job.adjusted_count = adjusted
-			job.skipped_count = skipped
-			job.error_count = job.summary.get('error_count', invalid_rows) if job.summary else invalid_rows
-			job.warning_count = job.summary.get('warning_count', 0) if job.summary else 0
-			job.save(update_fields=[
-				'status',
-				'created_count',
-				'updated_count',
-				'adjusted_count',
-				'skipped_count',
-				'error_count',
-				'warning_count',
-				'updated_at',
-			])
+		for entries in _iter_apply_chunks(job, business=business, chunk_size=chunk_size):
+			with transaction.atomic():
+				counts = _apply_chunk(entries, business=business, created_by=created_by)
+			for key, value in counts.items():
+				totals[key] += value
+			processed += len(entries)
+			InventoryImportJob.objects.filter(pk=job.pk).update(
+				processed_rows=processed,
+				created_count=totals['created'],
+				updated_count=totals['updated'],
+				adjusted_count=totals['adjusted'],
+				skipped_count=totals['skipped'],
+				updated_at=timezone.now(),
+			)
+			if on_progress is not None:
+				on_progress(processed, total_rows)
+
+		job.status = InventoryImportJob.Status.DONE
+		job.processed_rows = processed
+		job.created_count = totals['created']
+		job.updated_count = totals['updated']
+		job.adjusted_count = totals['adjusted']
+		job.skipped_count = totals['skipped']
+		job.error_count = job.summary.get('error_count', 0) if job.summary else 0
+		job.warning_count = job.summary.get('warning_count', 0) if job.summary else 0
+		job.save(update_fields=[
+			'status',
+			'processed_rows',
+			'created_count',
+			'updated_count',
+			'adjusted_count',
+			'skipped_count',
+			'error_count',
+			'warning_count',
+			'updated_at',
+		])
 	except (InventoryImportError, ValidationError) as exc:
-		_mark_job_as_failed(job, str(exc))
+		_mark_job_as_failed(job, str(exc), processed=processed)
 		if isinstance(exc, InventoryImportError):
 			raise
 		raise InventoryImportError(str(exc)) from exc
 	except Exception as exc:  # pragma: no cover - fallback defensivo
-		_mark_job_as_failed(job, 'Error inesperado al aplicar la importación.')
+		_mark_job_as_failed(job, 'Error inesperado al aplicar la importación.', processed=processed)
 		raise InventoryImportError('Ocurrió un error inesperado al aplicar la importación.') from exc
 
 	return job
@@ -309,24 +505,10 @@ def _build_row(
 	return row, status
 
 
-def _resolve_product(row: dict[str, Any], business: Business, cache_by_id: dict[str, Product]):
-	product_id = row.get('product_id')
-	if not product_id:
-		return None
-	if product_id in cache_by_id:
-		return cache_by_id[product_id]
-	try:
-		product = Product.objects.get(pk=product_id, business=business)
-	except Product.DoesNotExist:
-		return None
-	cache_by_id[product_id] = product
-	return product
-
-
-def _create_product(payload: dict[str, Any], business: Business) -> Product:
+def _build_product(payload: dict[str, Any], business: Business) -> Product:
 	if not payload.get('name'):
 		raise InventoryImportError('No podemos crear un producto sin nombre.')
-	product = Product.objects.create(
+	return Product(
 		business=business,
 		name=payload.get('name'),
 		sku=payload.get('sku') or '',
@@ -335,27 +517,24 @@ def _create_product(payload: dict[str, Any], business: Business) -> Product:
 		cost=_to_decimal(payload.get('cost')) or Decimal('0'),
 		stock_min=_to_decimal(payload.get('stock_min')) or Decimal('0'),
 	)
-	ensure_stock_record(business, product)
-	return product
 
 
-def _update_product(product: Product, payload: dict[str, Any]) -> None:
+def _apply_payload(product: Product, payload: dict[str, Any]) -> List[str]:
+	"""Copia al producto los valores informados y devuelve los campos que cambiaron."""
 	updates: List[str] = []
-	for field in ['name', 'sku', 'barcode']:
+	for field in PRODUCT_TEXT_FIELDS:
 		value = payload.get(field)
 		if value is not None and value != getattr(product, field):
 			setattr(product, field, value)
 			updates.append(field)
 
-	for field in ['price', 'cost', 'stock_min']:
+	for field in PRODUCT_DECIMAL_FIELDS:
 		raw_value = payload.get(field)
 		decimal_value = _to_decimal(raw_value)
 		if decimal_value is not None and decimal_value != getattr(product, field):
 			setattr(product, field, decimal_value)
 			updates.append(field)
-
-	if updates:
-		product.save(update_fields=updates + ['updated_at'])
+	return updates
 
 
 def _parse_decimal(value: Any, *, field_label: str) -> tuple[Decimal | None, str | None]:
@@ -411,9 +590,12 @@ def _has_value(value: Any) -> bool:
 	return True
 
 
-def _mark_job_as_failed(job: InventoryImportJob, message: str) -> None:
+def _mark_job_as_failed(job: InventoryImportJob, message: str, *, processed: int = 0) -> None:
 	errors = list(job.errors or [])
 	errors.append(message)
+	if processed:
+		errors.append(f'Se aplicaron {processed} filas antes del error.')
 	job.status = InventoryImportJob.Status.FAILED
 	job.errors = errors
-	job.save(update_fields=['status', 'errors', 'updated_at'])
+	job.processed_rows = processed
+	job.save(update_fields=['status', 'errors', 'processed_rows', 'updated_at'])
@@ -0,0 +1,34 @@
+"""Handlers de trabajos en segundo plano de inventario (ver `apps.jobs.registry`)."""
+
+from __future__ import annotations
+
+from apps.jobs.registry import JobContext, JobError, register_job
+from .importer import InventoryImportError, apply_inventory_import
+from .models import InventoryImportJob
+
+
+# Un solo intento: cada bloque confirma sus movimientos de stock, reintentar los duplicaría.
+@register_job('inventory_import_apply', permission='manage_stock', max_attempts=1)
+def run_inventory_import_apply(ctx: JobContext) -> dict:
+	import_job = InventoryImportJob.objects.filter(pk=ctx.params.get('import_id'), business=ctx.business).first()
+	if import_job is None:
+		raise JobError('No encontramos esta importación en tu negocio actual.')
+	if import_job.status == InventoryImportJob.Status.DONE:
+		return {'import_id': str(import_job.pk), 'processed_rows': import_job.processed_rows}
+	try:
+		apply_inventory_import(
+			import_job,
+			business=ctx.business,
+			user=ctx.user,
+			on_progress=ctx.set_progress,
+		)
+	except InventoryImportError as exc:
+		raise JobError(str(exc)) from exc
+	return {
+		'import_id': str(import_job.pk),
+		'processed_rows': import_job.processed_rows,
+		'created': import_job.created_count,
+		'updated': import_job.updated_count,
+		'adjusted': import_job.adjusted_count,
+		'skipped': import_job.skipped_count,
+	}
@@ -0,0 +1,42 @@
+"""
+Management command para reconstruir la valorización materializada.
+
+Recalcula desde ProductStock y Product las filas de StockValuation y los
+totales de InventoryValuation. Sirve para materializar negocios de antemano
+(si no, se materializan en la primera consulta) o para corregir diferencias.
+
+Uso:
+    python manage.py rebuild_inventory_valuation [--business <id>] [--all]
+
+Sin argumentos reconstruye los negocios ya materializados; con --all, todos
+los negocios que tienen stock.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.inventory.models import InventoryValuation, ProductStock
+from apps.inventory.valuation import rebuild_inventory_valuation
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye la valorización de inventario materializada'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, help='Reconstruye solo el business indicado')
+        parser.add_argument('--all', action='store_true', help='Incluye los negocios todavía no materializados')
+
+    def handle(self, *args, **options):
+        if options.get('business'):
+            business_ids = [options['business']]
+        elif options['all']:
+            business_ids = ProductStock.objects.values_list('business_id', flat=True).distinct().order_by('business_id')
+        else:
+            business_ids = InventoryValuation.objects.values_list('business_id', flat=True).order_by('business_id')
+
+        rebuilt = 0
+        for business_id in list(business_ids):
+            header = rebuild_inventory_valuation(business_id)
+            rebuilt += 1
+            self.stdout.write(
+                f'Negocio {business_id}: {header.items_count} productos · valor de venta {header.total_sale_value}'
+            )
+        self.stdout.write(self.style.SUCCESS(f'✅ Valorizaciones reconstruidas: {rebuilt}'))
@@ -0,0 +1,36 @@
+"""
+Management command para guardar la foto diaria de la valorización.
+
+Copia los totales de cada InventoryValuation a InventoryValuationDay (una fila
+por negocio y día; si ya existe se reemplaza). Lo mismo hace la tarea de
+Celery `inventory.snapshot_valuation`, que el servicio beat corre todos los
+días a las 23:55 (CELERY_BEAT_SCHEDULE). Sin beat, programarlo con cron:
+
+    55 23 * * * python manage.py snapshot_inventory_valuation
+
+Uso:
+    python manage.py snapshot_inventory_valuation [--day YYYY-MM-DD] [--business <id>]
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.inventory.valuation import snapshot_inventory_valuations
+
+
+class Command(BaseCommand):
+    help = 'Guarda la foto diaria de la valorización de inventario'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--day', help='Día de la foto (default: hoy)')
+        parser.add_argument('--business', type=int, help='Limita al business indicado')
+
+    def handle(self, *args, **options):
+        day = None
+        if options.get('day'):
+            try:
+                day = date.fromisoformat(options['day'])
+            except ValueError as exc:
+                raise CommandError('--day debe tener formato YYYY-MM-DD.') from exc
+        saved = snapshot_inventory_valuations(day, options.get('business'))
+        self.stdout.write(self.style.SUCCESS(f'✅ Fotos guardadas: {saved}'))
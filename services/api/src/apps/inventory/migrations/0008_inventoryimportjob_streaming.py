@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-16 23:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_stockreplenishment_occurred_at_datefield'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventoryimportjob',
+            name='processed_rows',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='inventoryimportjob',
+            name='source_file',
+            field=models.FileField(blank=True, upload_to='inventory_imports/'),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.0.14 on 2026-10-17 00:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0014_menu_qr_plans_pro_module'),
+        ('catalog', '0003_search_indexes'),
+        ('inventory', '0008_inventoryimportjob_streaming'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryValuation',
+            fields=[
+                ('business', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='inventory_valuation', serialize=False, to='business.business')),
+                ('items_count', models.IntegerField(default=0)),
+                ('total_sale_value', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('total_cost_value', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('total_potential_profit', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='InventoryValuationDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('items_count', models.IntegerField(default=0)),
+                ('total_sale_value', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('total_cost_value', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('total_potential_profit', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_valuation_days', to='business.business')),
+            ],
+            options={
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockValuation',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='valuation', serialize=False, to='catalog.product')),
+                ('name', models.CharField(max_length=255)),
+                ('sku', models.CharField(blank=True, max_length=64)),
+                ('is_active', models.BooleanField(default=True)),
+                ('quantity', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('price', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('cost', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('stock_min', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('sale_value', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('cost_value', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('potential_profit', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('margin_pct', models.DecimalField(blank=True, decimal_places=4, max_digits=10, null=True)),
+                ('status', models.CharField(choices=[('ok', 'OK'), ('low', 'Bajo'), ('out', 'Sin stock')], default='ok', max_length=8)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_valuations', to='business.business')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='inventoryvaluationday',
+            constraint=models.UniqueConstraint(fields=('business', 'day'), name='inventory_valuation_day_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='stockvaluation',
+            index=models.Index(fields=['business', '-sale_value', 'name', 'product'], name='stock_val_sale_value_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockvaluation',
+            index=models.Index(fields=['business', '-potential_profit', 'name', 'product'], name='stock_val_profit_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockvaluation',
+            index=models.Index(fields=['business', '-quantity', 'name', 'product'], name='stock_val_quantity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockvaluation',
+            index=models.Index(fields=['business', 'name', 'product'], name='stock_val_name_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.0.14 on 2026-10-17 01:02
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def fill_status_counters(apps, schema_editor):
+    """Los negocios ya materializados cuentan sus filas activas por estado."""
+    InventoryValuation = apps.get_model('inventory', 'InventoryValuation')
+    StockValuation = apps.get_model('inventory', 'StockValuation')
+    counts = (
+        StockValuation.objects.filter(is_active=True)
+        .values('business_id')
+        .annotate(
+            ok=Count('pk', filter=Q(status='ok')),
+            low=Count('pk', filter=Q(status='low')),
+            out=Count('pk', filter=Q(status='out')),
+        )
+    )
+    for row in counts:
+        InventoryValuation.objects.filter(business_id=row['business_id']).update(
+            ok_count=row['ok'],
+            low_count=row['low'],
+            out_count=row['out'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0014_menu_qr_plans_pro_module'),
+        ('catalog', '0003_search_indexes'),
+        ('inventory', '0009_stock_valuation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventoryvaluation',
+            name='low_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='inventoryvaluation',
+            name='ok_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='inventoryvaluation',
+            name='out_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='stockvaluation',
+            index=models.Index(condition=models.Q(('is_active', True), ('status__in', ['low', 'out'])), fields=['business', 'status', 'name', 'product'], name='stock_val_alert_idx'),
+        ),
+        migrations.RunPython(fill_status_counters, migrations.RunPython.noop),
+    ]
@@ -121,6 +121,94 @@ class ProductStock(models.Model):
     return f"{self.product_id} · {self.quantity}"
 
 
+class StockValuation(models.Model):
+  """Valorización materializada de un producto con stock (ver `apps.inventory.valuation`)."""
+
+  class Status(models.TextChoices):
+    OK = 'ok', 'OK'
+    LOW = 'low', 'Bajo'
+    OUT = 'out', 'Sin stock'
+
+  product = models.OneToOneField('catalog.Product', related_name='valuation', on_delete=models.CASCADE, primary_key=True)
+  business = models.ForeignKey('business.Business', related_name='stock_valuations', on_delete=models.CASCADE)
+  name = models.CharField(max_length=255)
+  sku = models.CharField(max_length=64, blank=True)
+  is_active = models.BooleanField(default=True)
+  quantity = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+  price = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+  cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+  stock_min = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+  sale_value = models.DecimalField(max_digits=24, decimal_places=4, default=0)
+  cost_value = models.DecimalField(max_digits=24, decimal_places=4, default=0)
+  potential_profit = models.DecimalField(max_digits=24, decimal_places=4, default=0)
+  margin_pct = models.DecimalField(max_digits=10, decimal_places=4, null=True, blank=True)
+  status = models.CharField(max_length=8, choices=Status.choices, default=Status.OK)
+  updated_at = models.DateTimeField(auto_now=True)
+
+  class Meta:
+    # Un índice por orden del listado, con el desempate del cursor (name, product).
+    indexes = [
+      models.Index(fields=['business', '-sale_value', 'name', 'product'], name='stock_val_sale_value_idx'),
+      models.Index(fields=['business', '-potential_profit', 'name', 'product'], name='stock_val_profit_idx'),
+      models.Index(fields=['business', '-quantity', 'name', 'product'], name='stock_val_quantity_idx'),
+      models.Index(fields=['business', 'name', 'product'], name='stock_val_name_idx'),
+      # Alertas de stock: solo las filas activas en bajo/sin stock, que suelen ser pocas.
+      models.Index(
+        fields=['business', 'status', 'name', 'product'],
+        name='stock_val_alert_idx',
+        condition=models.Q(is_active=True, status__in=['low', 'out']),
+      ),
+    ]
+
+  def __str__(self) -> str:
+    return f"{self.name} · {self.sale_value}"
+
+
+class InventoryValuation(models.Model):
+  """Totales de la valorización de un negocio, mantenidos por diferencia en cada refresco."""
+
+  business = models.OneToOneField(
+    'business.Business',
+    related_name='inventory_valuation',
+    on_delete=models.CASCADE,
+    primary_key=True,
+  )
+  # Productos activos con registro de stock, en total y por estado.
+  items_count = models.IntegerField(default=0)
+  ok_count = models.IntegerField(default=0)
+  low_count = models.IntegerField(default=0)
+  out_count = models.IntegerField(default=0)
+  # Solo stock positivo de productos activos, como los totales del reporte.
+  total_sale_value = models.DecimalField(max_digits=24, decimal_places=4, default=0)
+  total_cost_value = models.DecimalField(max_digits=24, decimal_places=4, default=0)
+  total_potential_profit = models.DecimalField(max_digits=24, decimal_places=4, default=0)
+  updated_at = models.DateTimeField(auto_now=True)
+
+  def __str__(self) -> str:
+    return f"Valorización {self.business_id} · {self.total_sale_value}"
+
+
+class InventoryValuationDay(models.Model):
+  """Foto diaria de `InventoryValuation` para ver la valorización en el tiempo."""
+
+  business = models.ForeignKey('business.Business', related_name='inventory_valuation_days', on_delete=models.CASCADE)
+  day = models.DateField()
+  items_count = models.IntegerField(default=0)
+  total_sale_value = models.DecimalField(max_digits=24, decimal_places=4, default=0)
+  total_cost_value = models.DecimalField(max_digits=24, decimal_places=4, default=0)
+  total_potential_profit = models.DecimalField(max_digits=24, decimal_places=4, default=0)
+  created_at = models.DateTimeField(auto_now_add=True)
+
+  class Meta:
+    ordering = ['-day']
+    constraints = [
+      models.UniqueConstraint(fields=['business', 'day'], name='inventory_valuation_day_unique'),
+    ]
+
+  def __str__(self) -> str:
+    return f"Valorización {self.business_id} · {self.day:%Y-%m-%d}"
+
+
 class InventoryImportJob(models.Model):
   class Status(models.TextChoices):
     PENDING = 'pending', 'Pendiente'
@@ -133,8 +221,12 @@ class InventoryImportJob(models.Model):
   created_by = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='inventory_imports', on_delete=models.SET_NULL, null=True)
   filename = models.CharField(max_length=255)
   status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+  # Archivo original: se vuelve a leer en streaming al aplicar la importación.
+  source_file = models.FileField(upload_to='inventory_imports/', blank=True)
+  # Solo la vista previa (primeras filas) y las filas con error.
   rows = models.JSONField(default=list, blank=True)
   summary = models.JSONField(default=dict, blank=True)
+  processed_rows = models.PositiveIntegerField(default=0)
   created_count = models.PositiveIntegerField(default=0)
   updated_count = models.PositiveIntegerField(default=0)
   adjusted_count = models.PositiveIntegerField(default=0)
@@ -260,6 +260,7 @@ class InventoryImportJobSerializer(serializers.ModelSerializer):
       'filename',
       'status',
       'summary',
+      'processed_rows',
       'created_count',
       'updated_count',
       'adjusted_count',
@@ -362,6 +363,7 @@ class InventoryImportJobSerializer(serializers.ModelSerializer):
       'filename',
       'status',
       'summary',
+      'processed_rows',
       'created_count',
       'updated_count',
       'adjusted_count',
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from decimal import Decimal
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
 
 from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.utils import timezone
 
 from apps.catalog.models import Product
+from apps.catalog.scan_cache import forget_products
 from apps.business.models import Business
 from .models import ProductStock, StockMovement, StockReplenishment
+from .valuation import refresh_stock_valuations
 
 
 def ensure_stock_record(business: Business, product: Product) -> ProductStock:
@@ -23,7 +26,128 @@ def ensure_stock_record(business: Business, product: Product) -> ProductStock:
   return stock
 
 
+@dataclass
+class StockLine:
+  """Una línea de movimiento de stock para `register_stock_movements`."""
+  product: Product
+  movement_type: str
+  quantity: Decimal
+  note: str = ''
+  reason: str = ''
+  metadata: Dict[str, Any] | None = None
+  allow_negative_stock: bool = False
+  unit_cost: Decimal | None = None
+  replenishment: StockReplenishment | None = None
+
+
+class StockLineError(ValidationError):
+  """ValidationError que indica qué línea del lote la provocó."""
+
+  def __init__(self, message, *, line: StockLine):
+    super().__init__(message)
+    self.line = line
+
+
+def lock_stock_records(business: Business, products: Iterable[Product]) -> Dict[Any, ProductStock]:
+  """
+  Bloquea los ProductStock de los productos en un único SELECT ... FOR UPDATE,
+  ordenado por product_id para que dos lotes concurrentes no se crucen
+  (deadlock). Crea los registros faltantes en cantidad cero.
+  """
+  product_ids = sorted({product.pk for product in products}, key=str)
+  if not product_ids:
+    return {}
+  ProductStock.objects.bulk_create(
+    [ProductStock(business=business, product_id=product_id, quantity=Decimal('0')) for product_id in product_ids],
+    ignore_conflicts=True,
+  )
+  queryset = ProductStock.objects.filter(business=business, product_id__in=product_ids).order_by('product_id')
+  if transaction.get_connection().in_atomic_block:
+    queryset = queryset.select_for_update()
+  return {stock.product_id: stock for stock in queryset}
+
+
+def _validate_line(business: Business, line: StockLine) -> Decimal:
+  if line.product.business_id != business.id:
+    raise StockLineError('Producto fuera del negocio actual.', line=line)
+  normalized_qty = Decimal(line.quantity)
+  movement_enum = StockMovement.MovementType
+  if line.movement_type == movement_enum.ADJUST:
+    if normalized_qty < 0:
+      raise StockLineError('La cantidad debe ser mayor o igual a cero para un ajuste.', line=line)
+  else:
+    if normalized_qty <= 0:
+      raise StockLineError('La cantidad debe ser mayor a cero.', line=line)
+
+  if line.movement_type not in movement_enum.values:
+    raise StockLineError('Tipo de movimiento invalido.', line=line)
+  return normalized_qty
+
+
 @transaction.atomic
+def register_stock_movements(
+  *,
+  business: Business,
+  lines: Sequence[StockLine],
+  created_by=None,
+  stocks: Dict[Any, ProductStock] | None = None,
+) -> Tuple[List[StockMovement], Dict[Any, ProductStock]]:
+  """
+  Aplica un lote de movimientos de stock: bloquea todos los ProductStock
+  afectados de una vez, valida cada línea en orden (varias líneas del mismo
+  producto se acumulan), actualiza las cantidades con un bulk_update y crea los
+  StockMovement con un bulk_create; al final refresca la valorización de los
+  productos tocados. `stocks` permite reutilizar registros ya bloqueados con
+  `lock_stock_records` en la misma transacción.
+  """
+  if not lines:
+    return [], stocks or {}
+
+  normalized = [(line, _validate_line(business, line)) for line in lines]
+  if stocks is None or any(line.product.pk not in stocks for line in lines):
+    stocks = lock_stock_records(business, [line.product for line in lines])
+
+  movement_enum = StockMovement.MovementType
+  movements: List[StockMovement] = []
+  for line, normalized_qty in normalized:
+    stock = stocks[line.product.pk]
+    if line.movement_type == movement_enum.ADJUST:
+      new_quantity = normalized_qty
+    elif line.movement_type == movement_enum.IN:
+      new_quantity = stock.quantity + normalized_qty
+    else:
+      new_quantity = stock.quantity - normalized_qty
+
+    if new_quantity < 0 and not line.allow_negative_stock:
+      raise StockLineError('Stock insuficiente para realizar la operacion solicitada.', line=line)
+
+    stock.quantity = new_quantity
+    movements.append(
+      StockMovement(
+        business=business,
+        product=line.product,
+        movement_type=line.movement_type,
+        quantity=normalized_qty,
+        note=line.note,
+        reason=line.reason,
+        metadata=line.metadata or {},
+        unit_cost=line.unit_cost,
+        replenishment=line.replenishment,
+        created_by=created_by,
+      )
+    )
+
+  touched = {line.product.pk: stocks[line.product.pk] for line in lines}
+  now = timezone.now()
+  for stock in touched.values():
+    stock.updated_at = now
+  ProductStock.objects.bulk_update(list(touched.values()), ['quantity', 'updated_at'])
+  StockMovement.objects.bulk_create(movements)
+  refresh_stock_valuations(business.id, touched.keys())
+  forget_products({line.product.pk: line.product for line in lines}.values())
+  return movements, stocks
+
+
 def register_stock_movement(
   *,
   business: Business,
@@ -36,47 +160,17 @@ def register_stock_movement(
   metadata: Dict[str, Any] | None = None,
   allow_negative_stock: bool = False,
 ) -> Tuple[StockMovement, ProductStock]:
-  if product.business_id != business.id:
-    raise ValidationError('Producto fuera del negocio actual.')
-
-  stock = ensure_stock_record(business, product)
-  normalized_qty = Decimal(quantity)
-  movement_enum = StockMovement.MovementType
-  if movement_type == movement_enum.ADJUST:
-    if normalized_qty < 0:
-      raise ValidationError('La cantidad debe ser mayor o igual a cero para un ajuste.')
-  else:
-    if normalized_qty <= 0:
-      raise ValidationError('La cantidad debe ser mayor a cero.')
-
-  if movement_type not in movement_enum.values:
-    raise ValidationError('Tipo de movimiento invalido.')
-
-  if movement_type == movement_enum.ADJUST:
-    new_quantity = normalized_qty
-  elif movement_type == movement_enum.IN:
-    new_quantity = stock.quantity + normalized_qty
-  else:
-    new_quantity = stock.quantity - normalized_qty
-
-  if new_quantity < 0 and not allow_negative_stock:
-    raise ValidationError('Stock insuficiente para realizar la operacion solicitada.')
-
-  metadata_payload: Dict[str, Any] = metadata or {}
-  stock.quantity = new_quantity
-  stock.save(update_fields=['quantity', 'updated_at'])
-
-  movement = StockMovement.objects.create(
-    business=business,
+  line = StockLine(
     product=product,
     movement_type=movement_type,
-    quantity=normalized_qty,
+    quantity=quantity,
     note=note,
     reason=reason,
-    metadata=metadata_payload,
-    created_by=created_by,
+    metadata=metadata,
+    allow_negative_stock=allow_negative_stock,
   )
-  return movement, stock
+  movements, stocks = register_stock_movements(business=business, lines=[line], created_by=created_by)
+  return movements[0], stocks[product.pk]
 
 
 @transaction.atomic
@@ -177,19 +271,22 @@ def create_stock_replenishment(
   )
 
   # Create stock movements (IN) for each item
-  for item in validated_items:
-    movement, _ = register_stock_movement(
-      business=business,
-      product=item['product'],
-      movement_type=StockMovement.MovementType.IN,
-      quantity=item['quantity'],
-      note=f'Reposición — {supplier_name}',
-      created_by=created_by,
-      reason='replenishment',
-    )
-    movement.unit_cost = item['unit_cost']
-    movement.replenishment = replenishment
-    movement.save(update_fields=['unit_cost', 'replenishment'])
+  register_stock_movements(
+    business=business,
+    lines=[
+      StockLine(
+        product=item['product'],
+        movement_type=StockMovement.MovementType.IN,
+        quantity=item['quantity'],
+        note=f'Reposición — {supplier_name}',
+        reason='replenishment',
+        unit_cost=item['unit_cost'],
+        replenishment=replenishment,
+      )
+      for item in validated_items
+    ],
+    created_by=created_by,
+  )
 
   # Build description
   invoice_part = f' ({invoice_number})' if invoice_number else ''
@@ -274,10 +371,12 @@ def void_stock_replenishment(
     return replenishment
 
   # Void the linked transaction
+  # save() en lugar de update(): los signals de tesorería ajustan el saldo de la cuenta.
   if replenishment.transaction_id:
-    Transaction.objects.filter(pk=replenishment.transaction_id).update(
-      status=Transaction.Status.VOIDED
-    )
+    txn = Transaction.objects.filter(pk=replenishment.transaction_id).first()
+    if txn is not None and txn.status != Transaction.Status.VOIDED:
+      txn.status = Transaction.Status.VOIDED
+      txn.save(update_fields=['status'])
 
   # Create compensatory OUT movements
   in_movements = (
@@ -286,28 +385,31 @@ def void_stock_replenishment(
     .select_related('product')
   )
 
-  for movement in in_movements:
-    # Idempotent: skip if compensatory already exists
-    already_reversed = StockMovement.objects.filter(
+  # Idempotent: skip products whose compensatory movement already exists
+  reversed_product_ids = set(
+    StockMovement.objects.filter(
       replenishment=replenishment,
       movement_type=StockMovement.MovementType.OUT,
       reason='replenishment_void',
-      product=movement.product,
-    ).exists()
-
-    if not already_reversed:
-      comp, _ = register_stock_movement(
-        business=replenishment.business,
+    ).values_list('product_id', flat=True)
+  )
+  register_stock_movements(
+    business=replenishment.business,
+    lines=[
+      StockLine(
         product=movement.product,
         movement_type=StockMovement.MovementType.OUT,
         quantity=movement.quantity,
         note=f'Anulación de reposición — {reason}',
-        created_by=voided_by,
         reason='replenishment_void',
         allow_negative_stock=True,
+        replenishment=replenishment,
       )
-      comp.replenishment = replenishment
-      comp.save(update_fields=['replenishment'])
+      for movement in in_movements
+      if movement.product_id not in reversed_product_ids
+    ],
+    created_by=voided_by,
+  )
 
   # Mark replenishment voided
   replenishment.status = StockReplenishment.Status.VOIDED
@@ -322,71 +424,3 @@ def void_stock_replenishment(
   ).exclude(status=Expense.Status.CANCELLED).update(status=Expense.Status.CANCELLED)
 
   return replenishment
-
-
-
-def ensure_stock_record(business: Business, product: Product) -> ProductStock:
-  stock, _ = ProductStock.objects.get_or_create(
-    business=business,
-    product=product,
-    defaults={'quantity': Decimal('0')},
-  )
-  if transaction.get_connection().in_atomic_block:
-    stock = ProductStock.objects.select_for_update().get(pk=stock.pk)
-  return stock
-
-
-@transaction.atomic
-def register_stock_movement(
-  *,
-  business: Business,
-  product: Product,
-  movement_type: str,
-  quantity: Decimal,
-  note: str = '',
-  created_by=None,
-  reason: str = '',
-  metadata: Dict[str, Any] | None = None,
-  allow_negative_stock: bool = False,
-) -> Tuple[StockMovement, ProductStock]:
-  if product.business_id != business.id:
-    raise ValidationError('Producto fuera del negocio actual.')
-
-  stock = ensure_stock_record(business, product)
-  normalized_qty = Decimal(quantity)
-  movement_enum = StockMovement.MovementType
-  if movement_type == movement_enum.ADJUST:
-    if normalized_qty < 0:
-      raise ValidationError('La cantidad debe ser mayor o igual a cero para un ajuste.')
-  else:
-    if normalized_qty <= 0:
-      raise ValidationError('La cantidad debe ser mayor a cero.')
-
-  if movement_type not in movement_enum.values:
-    raise ValidationError('Tipo de movimiento invalido.')
-
-  if movement_type == movement_enum.ADJUST:
-    new_quantity = normalized_qty
-  elif movement_type == movement_enum.IN:
-    new_quantity = stock.quantity + normalized_qty
-  else:
-    new_quantity = stock.quantity - normalized_qty
-
-  if new_quantity < 0 and not allow_negative_stock:
-    raise ValidationError('Stock insuficiente para realizar la operacion solicitada.')
-
-  metadata_payload: Dict[str, Any] = metadata or {}
-  stock.quantity = new_quantity
-  stock.save(update_fields=['quantity', 'updated_at'])
-
-  movement = StockMovement.objects.create(
-    business=business,
-    product=product,
-    movement_type=movement_type,
-    quantity=normalized_qty,
-    note=note,
-    reason=reason,
-    metadata=metadata_payload,
-    created_by=created_by,
-  )
-  return movement, stock
@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.catalog.models import Product
+from apps.catalog.scan_cache import forget_product_codes
+from .models import ProductStock
+from .valuation import forget_stock_valuation, refresh_stock_valuations
+
+VALUATION_PRODUCT_FIELDS = {'name', 'sku', 'price', 'cost', 'stock_min', 'is_active'}
+
+
+@receiver(post_save, sender=ProductStock)
+@receiver(post_delete, sender=ProductStock)
+def invalidate_stock_scans(sender, instance, **kwargs):
+  codes = Product.objects.filter(pk=instance.product_id).values_list('barcode', 'sku').first()
+  forget_product_codes(instance.business_id, codes or ())
+
+
+@receiver(post_save, sender=ProductStock)
+@receiver(post_delete, sender=ProductStock)
+def refresh_stock_valuation(sender, instance, **kwargs):
+  refresh_stock_valuations(instance.business_id, [instance.product_id])
+
+
+@receiver(post_save, sender=Product)
+def refresh_product_valuation(sender, instance, created, update_fields=None, **kwargs):
+  if created or (update_fields is not None and not VALUATION_PRODUCT_FIELDS.intersection(update_fields)):
+    return
+  refresh_stock_valuations(instance.business_id, [instance.pk])
+
+
+@receiver(pre_delete, sender=Product)
+def forget_product_valuation(sender, instance, **kwargs):
+  forget_stock_valuation(instance.business_id, instance.pk)
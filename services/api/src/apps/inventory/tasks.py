@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .valuation import snapshot_inventory_valuations
+
+
+@shared_task(name='inventory.snapshot_valuation', acks_late=True)
+def snapshot_inventory_valuation_task() -> int:
+  return snapshot_inventory_valuations()
@@ -0,0 +1,107 @@
+"""
+Streaming inventory import tests.
+Run with: python manage.py test apps.inventory.tests.test_inventory_import
+"""
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from openpyxl import Workbook
+
+from apps.business.models import Business
+from apps.catalog.models import Product
+from apps.inventory.importer import apply_inventory_import, parse_inventory_import
+from apps.inventory.models import InventoryImportJob, ProductStock, StockMovement
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class InventoryImportStreamingTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.business = Business.objects.create(name='Import Biz')
+        self.existing = Product.objects.create(business=self.business, name='Yerba', sku='YER-1', price=Decimal('10'))
+        Product.objects.create(business=Business.objects.create(name='Otro'), name='Yerba', sku='YER-1')
+
+    def _create_job(self, upload):
+        rows, summary = parse_inventory_import(upload, business=self.business, filename=upload.name, chunk_size=2)
+        job = InventoryImportJob.objects.create(
+            business=self.business,
+            filename=upload.name,
+            source_file=upload,
+            rows=rows,
+            summary=summary,
+        )
+        return job, summary
+
+    def test_csv_import_is_applied_in_chunks(self):
+        content = (
+            'Nombre;SKU;Precio;Stock\n'
+            'Yerba;yer-1;12.50;8\n'
+            'Azucar;AZ-1;5;3\n'
+            'Cafe;CAF-1;7;\n'
+            'Te;;4;2\n'
+        )
+        upload = SimpleUploadedFile('stock.csv', content.encode('utf-8'), content_type='text/csv')
+        job, summary = self._create_job(upload)
+
+        self.assertEqual(summary['total_rows'], 4)
+        self.assertEqual(summary['create_count'], 3)
+        self.assertEqual(summary['update_count'], 1)
+        self.assertEqual(summary['adjust_count'], 3)
+
+        apply_inventory_import(job, business=self.business, user=None, chunk_size=2)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, InventoryImportJob.Status.DONE)
+        self.assertEqual(job.processed_rows, 4)
+        self.assertEqual((job.created_count, job.updated_count, job.adjusted_count), (3, 1, 3))
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.price, Decimal('12.50'))
+        self.assertEqual(ProductStock.objects.get(product=self.existing).quantity, Decimal('8'))
+        cafe = Product.objects.get(business=self.business, sku='CAF-1')
+        self.assertEqual(ProductStock.objects.get(product=cafe).quantity, Decimal('0'))
+        self.assertEqual(StockMovement.objects.filter(business=self.business).count(), 3)
+
+    def test_xlsx_errors_block_apply(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['Nombre', 'SKU', 'Stock'])
+        sheet.append(['Harina', 'HAR-1', 5])
+        sheet.append(['Harina 000', 'HAR-1', 'abc'])
+        buffer = BytesIO()
+        workbook.save(buffer)
+        upload = SimpleUploadedFile('stock.xlsx', buffer.getvalue())
+        job, summary = self._create_job(upload)
+
+        self.assertEqual(summary['error_count'], 1)
+        self.assertEqual(job.rows[1]['status'], 'error')
+        with self.assertRaises(Exception):
+            apply_inventory_import(job, business=self.business, user=None)
+        self.assertFalse(Product.objects.filter(business=self.business, sku='HAR-1').exists())
+
+    def test_truncated_only_when_rows_with_data_are_left_out(self):
+        header = 'Nombre;SKU;Stock\n'
+        full = header + 'Harina;HAR-1;5\nAzucar;AZ-1;3\n;;\n;;\n'
+        over = full + 'Sal;SAL-1;2\n'
+        with mock.patch('apps.inventory.importer.MAX_ROWS', 2):
+            _, summary = parse_inventory_import(
+                SimpleUploadedFile('full.csv', full.encode('utf-8')), business=self.business, filename='full.csv'
+            )
+            self.assertEqual(summary['total_rows'], 2)
+            self.assertNotIn('truncated', summary)
+
+            _, summary = parse_inventory_import(
+                SimpleUploadedFile('over.csv', over.encode('utf-8')), business=self.business, filename='over.csv'
+            )
+            self.assertEqual(summary['total_rows'], 2)
+            self.assertTrue(summary['truncated'])
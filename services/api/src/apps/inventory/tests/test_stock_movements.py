@@ -0,0 +1,53 @@
+"""
+Batch stock movement tests.
+Run with: python manage.py test apps.inventory.tests.test_stock_movements
+"""
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from apps.business.models import Business
+from apps.catalog.models import Product
+from apps.inventory.models import ProductStock, StockMovement
+from apps.inventory.services import StockLine, StockLineError, register_stock_movements
+
+
+def make_product(business, name):
+    return Product.objects.create(business=business, name=name, sku=name[:10], price=Decimal('100'))
+
+
+class RegisterStockMovementsTest(TestCase):
+    def setUp(self):
+        self.business = Business.objects.create(name='Stock Biz')
+        self.flour = make_product(self.business, 'Harina')
+        self.sugar = make_product(self.business, 'Azucar')
+        ProductStock.objects.create(business=self.business, product=self.flour, quantity=Decimal('10'))
+
+    def test_applies_lines_in_order_with_bulk_writes(self):
+        lines = [
+            StockLine(product=self.flour, movement_type=StockMovement.MovementType.OUT, quantity=Decimal('3')),
+            StockLine(product=self.sugar, movement_type=StockMovement.MovementType.IN, quantity=Decimal('5')),
+            StockLine(product=self.flour, movement_type=StockMovement.MovementType.OUT, quantity=Decimal('2')),
+        ]
+        # insert faltantes + lock + bulk_update + bulk_create + lock de la valorización (+ savepoint)
+        with self.assertNumQueries(7):
+            movements, _ = register_stock_movements(business=self.business, lines=lines)
+
+        self.assertEqual(len(movements), 3)
+        self.assertEqual(ProductStock.objects.get(product=self.flour).quantity, Decimal('5'))
+        self.assertEqual(ProductStock.objects.get(product=self.sugar).quantity, Decimal('5'))
+        self.assertEqual(StockMovement.objects.filter(business=self.business).count(), 3)
+
+    def test_insufficient_stock_rolls_back_whole_batch(self):
+        lines = [
+            StockLine(product=self.sugar, movement_type=StockMovement.MovementType.IN, quantity=Decimal('1')),
+            StockLine(product=self.flour, movement_type=StockMovement.MovementType.OUT, quantity=Decimal('11')),
+        ]
+        with self.assertRaises(StockLineError) as ctx:
+            register_stock_movements(business=self.business, lines=lines)
+
+        self.assertIs(ctx.exception.line, lines[1])
+        self.assertIsInstance(ctx.exception, ValidationError)
+        self.assertEqual(ProductStock.objects.get(product=self.flour).quantity, Decimal('10'))
+        self.assertFalse(StockMovement.objects.exists())
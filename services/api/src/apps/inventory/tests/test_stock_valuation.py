@@ -0,0 +1,190 @@
+"""
+Materialized inventory valuation tests.
+Run with: python manage.py test apps.inventory.tests.test_stock_valuation
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Membership
+from apps.business.models import Business, Subscription
+from apps.catalog.models import Product
+from apps.inventory.models import InventoryValuation, InventoryValuationDay, ProductStock, StockMovement, StockValuation
+from apps.inventory.services import StockLine, register_stock_movements
+from apps.inventory.tasks import snapshot_inventory_valuation_task
+from apps.inventory.valuation import ensure_inventory_valuation, rebuild_inventory_valuation, snapshot_inventory_valuations
+
+
+def header_totals(business):
+    header = InventoryValuation.objects.get(business=business)
+    return (
+        header.items_count,
+        header.total_sale_value,
+        header.total_cost_value,
+        header.total_potential_profit,
+    )
+
+
+class StockValuationTest(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='valuation-owner', email='val@example.com', password='pass')
+        self.business = Business.objects.create(name='Valuation Biz')
+        Subscription.objects.create(business=self.business, plan='pro', status='active')
+        Membership.objects.create(user=self.user, business=self.business, role='owner')
+        self.client.force_authenticate(user=self.user)
+        self.client.cookies['bid'] = str(self.business.id)
+        self.products = {}
+        for name, quantity, price in (('Harina', '10', '100'), ('Azucar', '0', '50'), ('Yerba', '3', '400')):
+            product = Product.objects.create(
+                business=self.business, name=name, sku=name[:3].upper(), price=Decimal(price), cost=Decimal('20'),
+                stock_min=Decimal('5'),
+            )
+            ProductStock.objects.create(business=self.business, product=product, quantity=Decimal(quantity))
+            self.products[name] = product
+        ensure_inventory_valuation(self.business.id)
+
+    def assert_matches_rebuild(self):
+        incremental = header_totals(self.business), self.status_counts()
+        rows = list(StockValuation.objects.filter(business=self.business).order_by('name').values())
+        rebuild_inventory_valuation(self.business.id)
+        self.assertEqual(incremental, (header_totals(self.business), self.status_counts()))
+        rebuilt = list(StockValuation.objects.filter(business=self.business).order_by('name').values())
+        for row in rows + rebuilt:
+            row.pop('updated_at')
+        self.assertEqual(rows, rebuilt)
+
+    def status_counts(self):
+        header = InventoryValuation.objects.get(business=self.business)
+        return header.ok_count, header.low_count, header.out_count
+
+    def test_materialization_totals(self):
+        self.assertEqual(
+            header_totals(self.business),
+            (3, Decimal('2200'), Decimal('260'), Decimal('1940')),
+        )
+        row = StockValuation.objects.get(product=self.products['Yerba'])
+        self.assertEqual(row.status, StockValuation.Status.LOW)
+        self.assertEqual(row.margin_pct, Decimal('0.95'))
+
+    def test_stock_movements_refresh_incrementally(self):
+        register_stock_movements(business=self.business, lines=[
+            StockLine(product=self.products['Harina'], movement_type=StockMovement.MovementType.OUT, quantity=Decimal('4')),
+            StockLine(product=self.products['Azucar'], movement_type=StockMovement.MovementType.IN, quantity=Decimal('8')),
+        ])
+
+        self.assertEqual(header_totals(self.business)[1], Decimal('600') + Decimal('400') + Decimal('1200'))
+        self.assertEqual(StockValuation.objects.get(product=self.products['Azucar']).status, StockValuation.Status.OK)
+        self.assert_matches_rebuild()
+
+    def test_product_changes_refresh_incrementally(self):
+        harina = self.products['Harina']
+        harina.price = Decimal('150')
+        harina.stock_min = Decimal('20')
+        harina.save()
+        yerba = self.products['Yerba']
+        yerba.is_active = False
+        yerba.save(update_fields=['is_active'])
+        self.products['Azucar'].delete()
+
+        row = StockValuation.objects.get(product=harina)
+        self.assertEqual((row.sale_value, row.status), (Decimal('1500'), StockValuation.Status.LOW))
+        self.assertEqual(header_totals(self.business)[:2], (1, Decimal('1500')))
+        self.assert_matches_rebuild()
+
+    def test_view_reads_header_totals_and_pages_with_cursor(self):
+        url = reverse('inventory:inventory-valuation')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['totals']['items_count'], 3)
+        self.assertEqual(Decimal(response.data['totals']['total_sale_value']), Decimal('2200'))
+        self.assertEqual([item['name'] for item in response.data['items']], ['Yerba', 'Harina', 'Azucar'])
+        self.assertNotIn('next', response.data)
+
+        names = []
+        params = {'pagination': 'cursor', 'limit': 2}
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['totals']['items_count'], 3)
+            names += [item['name'] for item in response.data['items']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(names, ['Yerba', 'Harina', 'Azucar'])
+
+        response = self.client.get(url, {'status': 'low'})
+        self.assertEqual(response.data['totals']['items_count'], 1)
+        self.assertEqual(Decimal(response.data['totals']['total_sale_value']), Decimal('1200'))
+
+    def test_ok_filter_uses_the_persisted_status(self):
+        azucar = self.products['Azucar']
+        azucar.stock_min = Decimal('0')
+        azucar.save()
+
+        response = self.client.get(reverse('inventory:inventory-valuation'), {'status': 'ok'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['name'] for item in response.data['items']], ['Harina'])
+
+    def test_daily_snapshots_and_history(self):
+        snapshot_inventory_valuations(timezone.localdate())
+        register_stock_movements(business=self.business, lines=[
+            StockLine(product=self.products['Harina'], movement_type=StockMovement.MovementType.ADJUST, quantity=Decimal('0')),
+        ])
+        snapshot_inventory_valuations(timezone.localdate())
+
+        self.assertEqual(InventoryValuationDay.objects.filter(business=self.business).count(), 1)
+        response = self.client.get(reverse('inventory:inventory-valuation-history'), {'days': 7})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['days']), 1)
+        self.assertEqual(Decimal(response.data['days'][0]['total_sale_value']), Decimal('1200'))
+        self.assertEqual(Decimal(response.data['current']['total_sale_value']), Decimal('1200'))
+
+    def test_daily_snapshot_is_scheduled(self):
+        entry = settings.CELERY_BEAT_SCHEDULE['inventory-snapshot-valuation']
+        self.assertEqual(entry['task'], snapshot_inventory_valuation_task.name)
+        self.assertEqual((entry['schedule'].hour, entry['schedule'].minute), ({23}, {55}))
+
+    def test_status_counters_follow_movements_and_stock_min(self):
+        self.assertEqual(self.status_counts(), (1, 1, 1))
+
+        register_stock_movements(business=self.business, lines=[
+            StockLine(product=self.products['Harina'], movement_type=StockMovement.MovementType.OUT, quantity=Decimal('10')),
+        ])
+        yerba = self.products['Yerba']
+        yerba.stock_min = Decimal('2')
+        yerba.save(update_fields=['stock_min'])
+
+        self.assertEqual(self.status_counts(), (1, 0, 2))
+        self.assert_matches_rebuild()
+
+        response = self.client.get(reverse('inventory:inventory-summary'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            (response.data['total_products'], response.data['healthy_products'], response.data['low_stock'], response.data['out_of_stock']),
+            (3, 1, 0, 2),
+        )
+
+    def test_alert_lists_use_the_persisted_status(self):
+        response = self.client.get(reverse('inventory:low-stock'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(row['product']['name'], row['status']) for row in response.data], [('Yerba', 'low')])
+
+        response = self.client.get(reverse('inventory:out-of-stock'))
+        self.assertEqual([row['product']['name'] for row in response.data], ['Azucar'])
+
+        response = self.client.get('/api/v1/reports/stock/alerts/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['out_of_stock_count'], response.data['low_stock_count']), (1, 1))
+        self.assertEqual([(item['name'], item['status']) for item in response.data['items']], [('Azucar', 'OUT'), ('Yerba', 'LOW')])
+
+    def test_stock_alerts_rebuild_only_missing_headers(self):
+        InventoryValuation.objects.filter(business=self.business).delete()
+
+        response = self.client.get('/api/v1/reports/stock/alerts/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['out_of_stock_count'], 1)
+        self.assertEqual(self.status_counts(), (1, 1, 1))
@@ -0,0 +1,57 @@
+"""
+Inventory valuation export tests.
+Run with: python manage.py test apps.inventory.tests.test_valuation_export
+"""
+import csv
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Membership
+from apps.business.models import Business, Subscription
+from apps.catalog.models import Product
+from apps.inventory.models import ProductStock
+
+
+class InventoryValuationExportTest(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='stock-owner', email='stock@example.com', password='pass')
+        self.business = Business.objects.create(name='Stock Biz')
+        Subscription.objects.create(business=self.business, plan='pro', status='active')
+        self.membership = Membership.objects.create(user=self.user, business=self.business, role='owner')
+        self.client.force_authenticate(user=self.user)
+        self.client.cookies['bid'] = str(self.business.id)
+        for name, quantity, price in (('Harina', '10', '100'), ('Azucar', '0', '50'), ('Yerba', '3', '400')):
+            product = Product.objects.create(
+                business=self.business, name=name, sku=name[:3].upper(), price=Decimal(price), cost=Decimal('20')
+            )
+            ProductStock.objects.create(business=self.business, product=product, quantity=Decimal(quantity))
+
+    def _rows(self, params=None):
+        response = self.client.get(reverse('inventory:inventory-valuation-export'), params or {})
+        self.assertEqual(response.status_code, 200, getattr(response, 'data', None))
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        return list(csv.reader(StringIO(content)))
+
+    def test_export_matches_the_valuation_order_and_filters(self):
+        rows = self._rows({'only_in_stock': 'true'})
+
+        self.assertEqual(rows[0][:3], ['Producto', 'SKU', 'Activo'])
+        self.assertIn('Valor de costo', rows[0])
+        json_names = [item['name'] for item in self.client.get(
+            reverse('inventory:inventory-valuation'), {'only_in_stock': 'true'}
+        ).data['items']]
+        self.assertEqual([row[0] for row in rows[1:]], json_names)
+        self.assertEqual([row[0] for row in rows[1:]], ['Yerba', 'Harina'])
+        self.assertEqual(Decimal(rows[1][7]), Decimal('1200'))
+
+    def test_export_requires_export_permission(self):
+        self.membership.role = 'staff'
+        self.membership.save()
+
+        response = self.client.get(reverse('inventory:inventory-valuation-export'))
+
+        self.assertEqual(response.status_code, 403)
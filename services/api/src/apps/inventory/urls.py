@@ -7,6 +7,8 @@ from .views import (
 	InventoryImportUploadView,
 	InventoryRecentMovementsView,
 	InventorySummaryView,
+	InventoryValuationExportView,
+	InventoryValuationHistoryView,
 	InventoryValuationView,
 	LowStockAlertView,
 	OutOfStockAlertView,
@@ -29,6 +31,8 @@ urlpatterns = [
 	path('movements/<uuid:pk>/', StockMovementDetailView.as_view(), name='movement-detail'),
 	path('summary/', InventorySummaryView.as_view(), name='inventory-summary'),
 	path('valuation/', InventoryValuationView.as_view(), name='inventory-valuation'),
+	path('valuation/export/', InventoryValuationExportView.as_view(), name='inventory-valuation-export'),
+	path('valuation/history/', InventoryValuationHistoryView.as_view(), name='inventory-valuation-history'),
 	path('imports/', InventoryImportUploadView.as_view(), name='inventory-import-upload'),
 	path('imports/<uuid:import_id>/', InventoryImportDetailView.as_view(), name='inventory-import-detail'),
 	path('imports/<uuid:import_id>/preview/', InventoryImportPreviewView.as_view(), name='inventory-import-preview'),
@@ -0,0 +1,247 @@
+"""Valorización de inventario materializada.
+
+`StockValuation` guarda, por producto con registro de stock, la cantidad, los
+precios y los valores calculados (valor de venta, de costo, ganancia
+potencial, margen y estado), y `InventoryValuation` los totales del negocio y
+los contadores de productos activos por estado (ok/bajo/sin stock). El
+reporte lee de ahí: filtra y ordena por columnas propias (con índices por
+cada orden del listado) y, sin filtros, toma los totales del encabezado. El
+resumen de inventario y las alertas de stock usan los contadores y el índice
+parcial de las filas en bajo/sin stock.
+
+`refresh_stock_valuations` recalcula las filas de los productos tocados y
+aplica al encabezado solo la diferencia con lo que había. Lo llaman
+`register_stock_movements` (cantidades), los signals de `Product` y
+`ProductStock` (precio, costo, stock mínimo, alta y baja) y el importador.
+Un negocio se materializa la primera vez que se consulta su valorización
+(`ensure_inventory_valuation`); hasta entonces refrescar cuesta una consulta.
+
+El encabezado se bloquea al empezar cada refresco, así que los refrescos de un
+mismo negocio se aplican de a uno y las diferencias no se pisan. El orden de
+locks es stock → encabezado, el mismo que usa un movimiento de stock.
+
+`snapshot_inventory_valuations` copia los encabezados a `InventoryValuationDay`
+una vez por día: la tarea `inventory.snapshot_valuation` corre a las 23:55
+desde `CELERY_BEAT_SCHEDULE`; el comando `snapshot_inventory_valuation` sirve
+para completar días a mano.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import InventoryValuation, InventoryValuationDay, ProductStock, StockValuation
+
+ZERO = Decimal('0')
+MARGIN_PLACES = Decimal('0.0001')
+REBUILD_CHUNK_SIZE = 2000
+STATUS_COUNTERS = {
+  StockValuation.Status.OK: 'ok_count',
+  StockValuation.Status.LOW: 'low_count',
+  StockValuation.Status.OUT: 'out_count',
+}
+
+VALUE_FIELDS = [
+  'business',
+  'name',
+  'sku',
+  'is_active',
+  'quantity',
+  'price',
+  'cost',
+  'stock_min',
+  'sale_value',
+  'cost_value',
+  'potential_profit',
+  'margin_pct',
+  'status',
+  'updated_at',
+]
+
+
+@dataclass
+class ValuationTotals:
+  """Aporte de un conjunto de filas al encabezado; los campos son los de `InventoryValuation`."""
+
+  items_count: int = 0
+  ok_count: int = 0
+  low_count: int = 0
+  out_count: int = 0
+  total_sale_value: Decimal = ZERO
+  total_cost_value: Decimal = ZERO
+  total_potential_profit: Decimal = ZERO
+
+  def add(self, row: Optional[StockValuation], sign: int = 1) -> None:
+    """Suma (o resta) lo que `row` aporta a los totales del reporte."""
+    if row is None or not row.is_active:
+      return
+    self.items_count += sign
+    counter = STATUS_COUNTERS[row.status]
+    setattr(self, counter, getattr(self, counter) + sign)
+    if row.quantity > 0:
+      self.total_sale_value += sign * row.sale_value
+      self.total_cost_value += sign * row.cost_value
+      self.total_potential_profit += sign * row.potential_profit
+
+  def as_dict(self) -> dict:
+    return {field.name: getattr(self, field.name) for field in fields(self)}
+
+  def is_zero(self) -> bool:
+    return not any(self.as_dict().values())
+
+
+def stock_status(quantity: Decimal, stock_min: Decimal) -> str:
+  if quantity <= 0:
+    return StockValuation.Status.OUT
+  if quantity < stock_min:
+    return StockValuation.Status.LOW
+  return StockValuation.Status.OK
+
+
+def valuation_row(stock: ProductStock, now=None) -> StockValuation:
+  product = stock.product
+  quantity = stock.quantity
+  margin = None
+  if product.price > 0:
+    margin = ((product.price - product.cost) / product.price).quantize(MARGIN_PLACES)
+  return StockValuation(
+    product_id=product.pk,
+    business_id=stock.business_id,
+    name=product.name,
+    sku=product.sku,
+    is_active=product.is_active,
+    quantity=quantity,
+    price=product.price,
+    cost=product.cost,
+    stock_min=product.stock_min,
+    sale_value=quantity * product.price,
+    cost_value=quantity * product.cost,
+    potential_profit=quantity * (product.price - product.cost),
+    margin_pct=margin,
+    status=stock_status(quantity, product.stock_min),
+    updated_at=now or timezone.now(),
+  )
+
+
+def _save_rows(rows: List[StockValuation]) -> None:
+  if rows:
+    StockValuation.objects.bulk_create(
+      rows,
+      update_conflicts=True,
+      unique_fields=['product'],
+      update_fields=VALUE_FIELDS,
+    )
+
+
+def _apply_delta(business_id, delta: ValuationTotals) -> None:
+  changes = {name: F(name) + value for name, value in delta.as_dict().items() if value}
+  if changes:
+    InventoryValuation.objects.filter(business_id=business_id).update(**changes)
+
+
+def refresh_stock_valuations(business_id, product_ids: Iterable) -> None:
+  """Recalcula la valorización de `product_ids` y ajusta los totales del negocio."""
+  product_ids = sorted(set(product_ids), key=str)
+  if not product_ids:
+    return
+  # Sin savepoint: quien llama (un movimiento de stock) ya corre en su transacción.
+  with transaction.atomic(savepoint=False):
+    # Toma el lock del encabezado; si el negocio no está materializado no hay nada que mantener.
+    if not InventoryValuation.objects.filter(business_id=business_id).update(updated_at=timezone.now()):
+      return
+    previous = {row.product_id: row for row in StockValuation.objects.filter(product_id__in=product_ids)}
+    now = timezone.now()
+    rows = [
+      valuation_row(stock, now)
+      for stock in ProductStock.objects.select_related('product').filter(business_id=business_id, product_id__in=product_ids)
+    ]
+    delta = ValuationTotals()
+    for row in rows:
+      delta.add(row)
+      delta.add(previous.pop(row.product_id, None), -1)
+    for row in previous.values():
+      delta.add(row, -1)
+
+    _save_rows(rows)
+    if previous:
+      StockValuation.objects.filter(product_id__in=list(previous)).delete()
+    _apply_delta(business_id, delta)
+
+
+def forget_stock_valuation(business_id, product_id) -> None:
+  """Descuenta de los totales un producto que se borra (su fila se va en cascada)."""
+  with transaction.atomic(savepoint=False):
+    if not InventoryValuation.objects.filter(business_id=business_id).update(updated_at=timezone.now()):
+      return
+    row = StockValuation.objects.filter(product_id=product_id).first()
+    delta = ValuationTotals()
+    delta.add(row, -1)
+    if row is not None:
+      row.delete()
+    _apply_delta(business_id, delta)
+
+
+@transaction.atomic
+def rebuild_inventory_valuation(business_id) -> InventoryValuation:
+  """Reconstruye desde cero las filas y los totales de un negocio."""
+  header, _ = InventoryValuation.objects.get_or_create(business_id=business_id)
+  header = InventoryValuation.objects.select_for_update().get(pk=header.pk)
+  StockValuation.objects.filter(business_id=business_id).delete()
+
+  totals = ValuationTotals()
+  now = timezone.now()
+  batch: List[StockValuation] = []
+  stocks = ProductStock.objects.select_related('product').filter(business_id=business_id).order_by('product_id')
+  for stock in stocks.iterator(chunk_size=REBUILD_CHUNK_SIZE):
+    row = valuation_row(stock, now)
+    totals.add(row)
+    batch.append(row)
+    if len(batch) >= REBUILD_CHUNK_SIZE:
+      _save_rows(batch)
+      batch = []
+  _save_rows(batch)
+
+  for name, value in totals.as_dict().items():
+    setattr(header, name, value)
+  header.save()
+  return header
+
+
+def ensure_inventory_valuation(business_id) -> InventoryValuation:
+  header = InventoryValuation.objects.filter(business_id=business_id).first()
+  if header is None:
+    header = rebuild_inventory_valuation(business_id)
+  return header
+
+
+def snapshot_inventory_valuations(day: Optional[date] = None, business_id=None) -> int:
+  """Guarda (o reemplaza) la foto del día de cada negocio materializado."""
+  day = day or timezone.localdate()
+  headers = InventoryValuation.objects.all()
+  if business_id is not None:
+    headers = headers.filter(business_id=business_id)
+  rows = [
+    InventoryValuationDay(
+      business_id=header.business_id,
+      day=day,
+      items_count=header.items_count,
+      total_sale_value=header.total_sale_value,
+      total_cost_value=header.total_cost_value,
+      total_potential_profit=header.total_potential_profit,
+    )
+    for header in headers
+  ]
+  InventoryValuationDay.objects.bulk_create(
+    rows,
+    update_conflicts=True,
+    unique_fields=['business', 'day'],
+    update_fields=['items_count', 'total_sale_value', 'total_cost_value', 'total_potential_profit'],
+  )
+  return len(rows)
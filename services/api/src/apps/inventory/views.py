@@ -1,18 +1,10 @@
+from datetime import timedelta
 from decimal import Decimal
 
-from django.db.models import (
-	Case,
-	CharField,
-	DecimalField,
-	ExpressionWrapper,
-	F,
-	Q,
-	Sum,
-	Value,
-	When,
-)
+from django.db.models import F, Q, Sum
 from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser
@@ -21,13 +13,28 @@ from rest_framework.views import APIView
 
 from apps.accounts.access import resolve_business_context, resolve_request_membership
 from apps.accounts.permissions import HasBusinessMembership, HasPermission, request_has_permission
+from apps.jobs.models import Job
+from apps.jobs.services import enqueue_job
+from apps.jobs.views import idempotency_key_from, job_accepted_response, prefers_async
+from common.exports import ExportColumn, export_response, export_rows
+from common.pagination import KeysetPagination
+from common.search import PRODUCT_SEARCH, SEARCH_RANK_FIELD, search_queryset
 from .importer import (
+	SUPPORTED_EXTENSIONS,
 	InventoryImportError,
 	apply_inventory_import,
 	parse_inventory_import,
 	serialize_preview_rows,
 )
-from .models import InventoryImportJob, ProductStock, StockMovement, StockReplenishment
+from .models import (
+	InventoryImportJob,
+	InventoryValuation,
+	InventoryValuationDay,
+	ProductStock,
+	StockMovement,
+	StockReplenishment,
+	StockValuation,
+)
 from .serializers import (
     InventoryImportJobSerializer,
 	ProductStockSerializer,
@@ -37,6 +44,9 @@ from .serializers import (
 	StockReplenishmentDetailSerializer,
 	StockReplenishmentListSerializer,
 )
+from .valuation import ensure_inventory_valuation
+
+PRODUCT_STOCK_SEARCH = PRODUCT_SEARCH.prefixed('product__')
 
 
 def _resolve_limit(raw_value: str | None, default: int = 5, maximum: int = 50) -> int:
@@ -76,13 +86,9 @@ class ProductStockListView(generics.ListAPIView):
 			else:
 				queryset = queryset.filter(product__category_id=category_id)
 
-		search = self.request.query_params.get('search')
-		if search:
-			queryset = queryset.filter(
-				Q(product__name__icontains=search)
-				| Q(product__sku__icontains=search)
-				| Q(product__barcode__icontains=search)
-			)
+		search = (self.request.query_params.get('search') or '').strip()
+		ranked = bool(search) and not self.request.query_params.get('ordering')
+		queryset = search_queryset(queryset, search, PRODUCT_STOCK_SEARCH, rank=ranked)
 
 		status_filter = self.request.query_params.get('status')
 		if status_filter == 'low':
@@ -95,7 +101,9 @@ class ProductStockListView(generics.ListAPIView):
 		# Ordering
 		ordering = self.request.query_params.get('ordering', 'product__name')
 		valid_orderings = ['product__name', '-product__name', 'product__category__name', '-product__category__name', 'quantity', '-quantity']
-		if ordering in valid_orderings:
+		if ranked:
+			queryset = queryset.order_by(f'-{SEARCH_RANK_FIELD}', 'product__name')
+		elif ordering in valid_orderings:
 			queryset = queryset.order_by(ordering)
 		else:
 			queryset = queryset.order_by('product__name')
@@ -103,13 +111,21 @@ class ProductStockListView(generics.ListAPIView):
 		return queryset
 
 
+class StockMovementPagination(KeysetPagination):
+	# Sin cursor se mantiene la lista sin paginar con tope de `limit` filas.
+	offset_fallback = False
+	default_limit = 100
+	max_limit = 200
+
+
 class StockMovementListCreateView(generics.ListCreateAPIView):
 	permission_classes = [IsAuthenticated, HasBusinessMembership, HasPermission]
 	permission_map = {
 		'GET': 'view_stock',
 		'POST': 'manage_stock',
 	}
-	pagination_class = None
+	pagination_class = StockMovementPagination
+	keyset_ordering = ('-created_at', '-id')
 
 	def get_queryset(self):
 		business = getattr(self.request, 'business')
@@ -117,6 +133,8 @@ class StockMovementListCreateView(generics.ListCreateAPIView):
 		product_id = self.request.query_params.get('product_id')
 		if product_id:
 			queryset = queryset.filter(product_id=product_id)
+		if self.paginator.cursor_requested(self.request, self):
+			return queryset
 		limit = _resolve_limit(self.request.query_params.get('limit'), default=100, maximum=200)
 		return queryset.order_by('-created_at')[:limit]
 
@@ -141,13 +159,14 @@ class InventorySummaryView(APIView):
 	required_permission = 'view_stock'
 
 	def get(self, request):
+		# Contadores por estado mantenidos en cada refresco de la valorización.
 		business = getattr(request, 'business')
-		queryset = ProductStock.objects.select_related('product').filter(business=business, product__is_active=True)
-		total_products = queryset.count()
-		low_stock = queryset.filter(quantity__lt=F('product__stock_min'), quantity__gt=0).count()
-		out_of_stock = queryset.filter(quantity__lte=0).count()
+		valuation = ensure_inventory_valuation(business.id)
+		total_products = valuation.items_count
+		low_stock = valuation.low_count
+		out_of_stock = valuation.out_count
 
-		healthy_products = max(total_products - low_stock - out_of_stock, 0)
+		healthy_products = valuation.ok_count
 		healthy_ratio = (healthy_products / total_products) if total_products else None
 		low_ratio = (low_stock / total_products) if total_products else None
 		out_ratio = (out_of_stock / total_products) if total_products else None
@@ -174,20 +193,19 @@ class LowStockAlertView(generics.ListAPIView):
 	maximum_limit = 50
 
 	def get_queryset(self):
+		# El estado persistido en StockValuation resuelve el filtro con su índice parcial (stock_val_alert_idx).
 		business = getattr(self.request, 'business')
+		ensure_inventory_valuation(business.id)
 		queryset = ProductStock.objects.select_related('product').filter(
 			business=business,
-			product__is_active=True,
+			product__valuation__is_active=True,
+			product__valuation__status=self.status_filter,
 		)
-		if self.status_filter == 'low':
-			queryset = queryset.filter(quantity__lt=F('product__stock_min'), quantity__gt=0)
-		elif self.status_filter == 'out':
-			queryset = queryset.filter(quantity__lte=0)
 		ordering = self.request.query_params.get('ordering')
 		if ordering == 'qty':
-			queryset = queryset.order_by('quantity', 'product__name')
+			queryset = queryset.order_by('quantity', 'product__valuation__name')
 		else:
-			queryset = queryset.order_by('product__name')
+			queryset = queryset.order_by('product__valuation__name')
 		limit = _resolve_limit(self.request.query_params.get('limit'), default=5, maximum=self.maximum_limit)
 		return queryset[:limit]
 
@@ -208,168 +226,229 @@ class InventoryRecentMovementsView(generics.ListAPIView):
 		return StockMovement.objects.select_related('product').filter(business=business).order_by('-created_at')[:limit]
 
 
+VALUATION_COST_FIELDS = ('cost', 'cost_value', 'potential_profit', 'margin_pct')
+# Cada orden termina en (name, product_id) para que el cursor sea estable; ver los índices de StockValuation.
+VALUATION_ORDERINGS = {
+	'sale_value_desc': ('-sale_value', 'name', 'product_id'),
+	'profit_desc': ('-potential_profit', 'name', 'product_id'),
+	'qty_desc': ('-quantity', 'name', 'product_id'),
+	'name_asc': ('name', 'product_id'),
+}
+VALUATION_HISTORY_DAYS = 30
+
+
+def _resolve_valuation_membership(request):
+	membership = resolve_request_membership(request)
+	if membership is None:
+		return None, Response({'detail': 'No encontramos un negocio asociado al usuario.'}, status=403)
+	context = resolve_business_context(request, membership)
+	features = context.get('features', {})
+	if not (features.get('inventory') and features.get('products')):
+		return None, Response({'detail': 'Tu plan no incluye inventario y productos habilitados.'}, status=403)
+	return membership, None
+
+
+def _valuation_is_filtered(request) -> bool:
+	"""True si la consulta pide algo distinto del listado por defecto (productos activos, sin filtros)."""
+	params = request.query_params
+	return (
+		params.get('active') not in (None, '', 'true')
+		or bool((params.get('q') or '').strip())
+		or params.get('status') in ('low', 'out', 'ok')
+		or params.get('only_in_stock') == 'true'
+	)
+
+
+def _valuation_queryset(request, business):
+	"""Valorización materializada del negocio con los filtros del reporte."""
+	ensure_inventory_valuation(business.id)
+	queryset = StockValuation.objects.filter(business=business)
+
+	active_param = request.query_params.get('active')
+	if active_param == 'false':
+		queryset = queryset.filter(is_active=False)
+	elif active_param in (None, '', 'true'):
+		queryset = queryset.filter(is_active=True)
+
+	queryset = search_queryset(queryset, request.query_params.get('q'), PRODUCT_STOCK_SEARCH)
+
+	status_filter = request.query_params.get('status')
+	if status_filter in StockValuation.Status.values:
+		queryset = queryset.filter(status=status_filter)
+
+	if request.query_params.get('only_in_stock') == 'true':
+		queryset = queryset.filter(quantity__gt=0)
+	return queryset
+
+
+def _valuation_ordering(request, can_view_costs: bool):
+	sort_param = request.query_params.get('sort') or 'sale_value_desc'
+	if sort_param == 'profit_desc' and not can_view_costs:
+		sort_param = 'sale_value_desc'
+	return VALUATION_ORDERINGS.get(sort_param, VALUATION_ORDERINGS['sale_value_desc'])
+
+
+def _valuation_item(row: StockValuation, can_view_costs: bool) -> dict:
+	item = {
+		'product_id': row.product_id,
+		'name': row.name,
+		'sku': row.sku,
+		'is_active': row.is_active,
+		'qty': row.quantity,
+		'price': row.price,
+		'sale_value': row.sale_value,
+		'stock_min': row.stock_min,
+		'status': row.status,
+	}
+	if can_view_costs:
+		item.update({field: getattr(row, field) for field in VALUATION_COST_FIELDS})
+	return item
+
+
+class InventoryValuationPagination(KeysetPagination):
+	# Sin cursor se mantiene la lista completa de `items` como antes.
+	offset_fallback = False
+	default_limit = 100
+	max_limit = 500
+
+
 class InventoryValuationView(APIView):
+	"""
+	Valorización de inventario leída de `StockValuation`. Sin filtros, los
+	totales salen del encabezado del negocio (`InventoryValuation`); con
+	filtros se suman las filas filtradas. `?pagination=cursor` pagina `items`
+	por cursor en el orden pedido.
+	"""
+
 	permission_classes = [IsAuthenticated, HasBusinessMembership, HasPermission]
 	required_permission = 'view_stock'
 
 	def get(self, request):
-		membership = resolve_request_membership(request)
-		if membership is None:
-			return Response({'detail': 'No encontramos un negocio asociado al usuario.'}, status=403)
-
-		context = resolve_business_context(request, membership)
-		features = context.get('features', {})
-		if not (features.get('inventory') and features.get('products')):
-			return Response({'detail': 'Tu plan no incluye inventario y productos habilitados.'}, status=403)
+		membership, error_response = _resolve_valuation_membership(request)
+		if error_response:
+			return error_response
 
-		can_view_costs = request_has_permission(request, 'manage_products')
 		business = membership.business
-		queryset = ProductStock.objects.select_related('product').filter(business=business)
-
-		active_param = request.query_params.get('active')
-		if active_param == 'false':
-			queryset = queryset.filter(product__is_active=False)
-		elif active_param in (None, '', 'true'):
-			queryset = queryset.filter(product__is_active=True)
-
-		search = request.query_params.get('q')
-		if search:
-			queryset = queryset.filter(
-				Q(product__name__icontains=search)
-				| Q(product__sku__icontains=search)
-				| Q(product__barcode__icontains=search)
+		can_view_costs = request_has_permission(request, 'manage_products')
+		queryset = _valuation_queryset(request, business)
+		self.keyset_ordering = _valuation_ordering(request, can_view_costs)
+		paginator = InventoryValuationPagination()
+		page = paginator.paginate_queryset(queryset, request, self)
+		rows = page if page is not None else queryset.order_by(*self.keyset_ordering)
+		items = [_valuation_item(row, can_view_costs) for row in rows]
+
+		if _valuation_is_filtered(request):
+			totals = queryset.filter(quantity__gt=0).aggregate(
+				total_sale_value=Coalesce(Sum('sale_value'), Decimal('0')),
+				total_cost_value=Coalesce(Sum('cost_value'), Decimal('0')),
+				total_potential_profit=Coalesce(Sum('potential_profit'), Decimal('0')),
 			)
+			totals['items_count'] = len(items) if page is None else queryset.count()
+		else:
+			header = InventoryValuation.objects.get(business=business)
+			totals = {
+				'total_sale_value': header.total_sale_value,
+				'total_cost_value': header.total_cost_value,
+				'total_potential_profit': header.total_potential_profit,
+				'items_count': header.items_count,
+			}
+		if not can_view_costs:
+			totals['total_cost_value'] = None
+			totals['total_potential_profit'] = None
+
+		data = {
+			'totals': {
+				'total_cost_value': totals['total_cost_value'],
+				'total_sale_value': totals['total_sale_value'],
+				'total_potential_profit': totals['total_potential_profit'],
+				'items_count': totals['items_count'],
+			},
+			'items': items,
+		}
+		if page is not None:
+			data['next'] = paginator.get_next_link()
+			data['previous'] = paginator.get_previous_link()
+		return Response(data)
 
-		status_filter = request.query_params.get('status')
-		if status_filter == 'low':
-			queryset = queryset.filter(quantity__lt=F('product__stock_min'), quantity__gt=0)
-		elif status_filter == 'out':
-			queryset = queryset.filter(quantity__lte=0)
-		elif status_filter == 'ok':
-			queryset = queryset.filter(quantity__gte=F('product__stock_min'))
-
-		if request.query_params.get('only_in_stock') == 'true':
-			queryset = queryset.filter(quantity__gt=0)
 
-		sale_value_expr = ExpressionWrapper(
-			F('quantity') * F('product__price'),
-			output_field=DecimalField(max_digits=24, decimal_places=2),
-		)
-		cost_value_expr = ExpressionWrapper(
-			F('quantity') * F('product__cost'),
-			output_field=DecimalField(max_digits=24, decimal_places=2),
-		)
-		profit_expr = ExpressionWrapper(
-			F('quantity') * (F('product__price') - F('product__cost')),
-			output_field=DecimalField(max_digits=24, decimal_places=2),
-		)
-		margin_expr = Case(
-			When(
-				product__price__gt=0,
-				then=ExpressionWrapper(
-					(F('product__price') - F('product__cost')) / F('product__price'),
-					output_field=DecimalField(max_digits=10, decimal_places=4),
-				),
-			),
-			default=Value(None),
-			output_field=DecimalField(max_digits=10, decimal_places=4),
-		)
-		status_expr = Case(
-			When(quantity__lte=0, then=Value('out')),
-			When(quantity__lt=F('product__stock_min'), then=Value('low')),
-			default=Value('ok'),
-			output_field=CharField(max_length=8),
-		)
+class InventoryValuationHistoryView(APIView):
+	"""Fotos diarias de la valorización (`?days=`, por defecto 30) y los totales actuales."""
 
-		annotated_queryset = queryset.annotate(
-			price=F('product__price'),
-			cost=F('product__cost'),
-			stock_min=F('product__stock_min'),
-			sale_value=sale_value_expr,
-			cost_value=cost_value_expr,
-			potential_profit=profit_expr,
-			margin_pct=margin_expr,
-			status=status_expr,
-		)
+	permission_classes = [IsAuthenticated, HasBusinessMembership, HasPermission]
+	required_permission = 'view_stock'
 
-		sort_param = request.query_params.get('sort') or 'sale_value_desc'
-		sort_map = {
-			'profit_desc': '-potential_profit' if can_view_costs else '-sale_value',
-			'sale_value_desc': '-sale_value',
-			'qty_desc': '-quantity',
-			'name_asc': 'product__name',
-		}
-		ordering = sort_map.get(sort_param, '-sale_value')
-		ordered_queryset = annotated_queryset.order_by(ordering, 'product__name')
-
-		items_count = ordered_queryset.count()
-		values_queryset = ordered_queryset.values(
-			'product_id',
-			'product__name',
-			'product__sku',
-			'product__is_active',
-			'quantity',
-			'price',
-			'sale_value',
-			'stock_min',
-			'status',
-			'cost',
-			'cost_value',
-			'potential_profit',
-			'margin_pct',
-		)
+	def get(self, request):
+		membership, error_response = _resolve_valuation_membership(request)
+		if error_response:
+			return error_response
 
-		items = []
-		for row in values_queryset:
-			item = {
-				'product_id': row['product_id'],
-				'name': row['product__name'],
-				'sku': row['product__sku'],
-				'is_active': row['product__is_active'],
-				'qty': row['quantity'],
-				'price': row['price'],
-				'sale_value': row['sale_value'],
-				'stock_min': row['stock_min'],
-				'status': row['status'],
+		business = membership.business
+		can_view_costs = request_has_permission(request, 'manage_products')
+		days = _resolve_limit(request.query_params.get('days'), default=VALUATION_HISTORY_DAYS, maximum=366)
+		since = timezone.localdate() - timedelta(days=days - 1)
+
+		def serialize(row):
+			return {
+				'items_count': row.items_count,
+				'total_sale_value': row.total_sale_value,
+				'total_cost_value': row.total_cost_value if can_view_costs else None,
+				'total_potential_profit': row.total_potential_profit if can_view_costs else None,
 			}
-			if can_view_costs:
-				item.update(
-					{
-						'cost': row['cost'],
-						'cost_value': row['cost_value'],
-						'potential_profit': row['potential_profit'],
-						'margin_pct': row['margin_pct'],
-					}
-				)
-			items.append(item)
-
-		positive_queryset = annotated_queryset.filter(quantity__gt=0)
-		total_sale_value = positive_queryset.aggregate(
-			total=Coalesce(Sum(sale_value_expr), Decimal('0'))
-		)['total']
-		total_cost_value = None
-		total_potential_profit = None
-		if can_view_costs:
-			aggregates = positive_queryset.aggregate(
-				total_cost=Coalesce(Sum(cost_value_expr), Decimal('0')),
-				total_profit=Coalesce(Sum(profit_expr), Decimal('0')),
-			)
-			total_cost_value = aggregates['total_cost']
-			total_potential_profit = aggregates['total_profit']
 
+		header = ensure_inventory_valuation(business.id)
+		snapshots = InventoryValuationDay.objects.filter(business=business, day__gte=since).order_by('day')
 		return Response(
 			{
-				'totals': {
-					'total_cost_value': total_cost_value,
-					'total_sale_value': total_sale_value,
-					'total_potential_profit': total_potential_profit,
-					'items_count': items_count,
-				},
-				'items': items,
+				'current': {**serialize(header), 'updated_at': header.updated_at},
+				'days': [{'day': row.day, **serialize(row)} for row in snapshots],
 			}
 		)
 
 
+VALUATION_STATUS_LABELS = dict(StockValuation.Status.choices)
+
+
+class InventoryValuationExportView(APIView):
+	"""Valorización de inventario en CSV/XLSX, con los mismos filtros y orden que el JSON."""
+
+	permission_classes = [IsAuthenticated, HasBusinessMembership, HasPermission]
+	required_permission = 'export_reports'
+
+	def get(self, request):
+		if not request_has_permission(request, 'view_stock'):
+			return Response({'detail': HasPermission.message}, status=403)
+		membership, error_response = _resolve_valuation_membership(request)
+		if error_response:
+			return error_response
+
+		can_view_costs = request_has_permission(request, 'manage_products')
+		columns = [
+			ExportColumn('Producto', lambda row: row.name),
+			ExportColumn('SKU', lambda row: row.sku),
+			ExportColumn('Activo', lambda row: row.is_active),
+			ExportColumn('Cantidad', lambda row: row.quantity),
+			ExportColumn('Stock mínimo', lambda row: row.stock_min),
+			ExportColumn('Estado', lambda row: VALUATION_STATUS_LABELS.get(row.status, row.status)),
+			ExportColumn('Precio', lambda row: row.price),
+			ExportColumn('Valor de venta', lambda row: row.sale_value),
+		]
+		if can_view_costs:
+			columns += [
+				ExportColumn('Costo', lambda row: row.cost),
+				ExportColumn('Valor de costo', lambda row: row.cost_value),
+				ExportColumn('Ganancia potencial', lambda row: row.potential_profit),
+				ExportColumn('Margen', lambda row: row.margin_pct),
+			]
+		queryset = _valuation_queryset(request, membership.business)
+		return export_response(
+			request,
+			columns=columns,
+			rows=export_rows(queryset.order_by(*_valuation_ordering(request, can_view_costs))),
+			filename='valorizacion-inventario',
+			title='Valorización',
+		)
+
+
 class InventoryImportUploadView(APIView):
 	permission_classes = [IsAuthenticated, HasBusinessMembership, HasPermission]
 	required_permission = 'manage_stock'
@@ -382,12 +461,12 @@ class InventoryImportUploadView(APIView):
 
 		upload = request.FILES.get('file')
 		if upload is None:
-			return Response({'detail': 'Debes adjuntar un archivo .xlsx.'}, status=400)
-		if not (upload.name or '').lower().endswith('.xlsx'):
-			return Response({'detail': 'El archivo debe tener formato .xlsx.'}, status=400)
+			return Response({'detail': 'Debes adjuntar un archivo .xlsx o .csv.'}, status=400)
+		if not (upload.name or '').lower().endswith(SUPPORTED_EXTENSIONS):
+			return Response({'detail': 'El archivo debe tener formato .xlsx o .csv.'}, status=400)
 
 		try:
-			rows, summary = parse_inventory_import(upload, business=membership.business)
+			rows, summary = parse_inventory_import(upload, business=membership.business, filename=upload.name)
 		except InventoryImportError as exc:
 			return Response({'detail': str(exc)}, status=400)
 
@@ -395,6 +474,7 @@ class InventoryImportUploadView(APIView):
 			business=membership.business,
 			created_by=request.user if getattr(request.user, 'is_authenticated', False) else None,
 			filename=upload.name or 'importar-stock.xlsx',
+			source_file=upload,
 			rows=rows,
 			summary=summary,
 			error_count=summary.get('error_count', 0),
@@ -443,6 +523,27 @@ class InventoryImportApplyView(APIView):
 		if job.status == InventoryImportJob.Status.DONE:
 			serializer = InventoryImportJobSerializer(job)
 			return Response(serializer.data)
+		if prefers_async(request):
+			background = (
+				Job.objects
+				.filter(
+					business=membership.business,
+					kind='inventory_import_apply',
+					params__import_id=str(job.pk),
+					status__in=[Job.Status.PENDING, Job.Status.RUNNING],
+				)
+				.first()
+			)
+			created = False
+			if background is None:
+				background, created = enqueue_job(
+					business=membership.business,
+					kind='inventory_import_apply',
+					user=request.user,
+					params={'import_id': str(job.pk)},
+					idempotency_key=idempotency_key_from(request),
+				)
+			return job_accepted_response(request, background, created)
 		try:
 			apply_inventory_import(job, business=membership.business, user=request.user)
 		except InventoryImportError as exc:
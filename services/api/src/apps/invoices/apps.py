@@ -5,3 +5,6 @@ class InvoicesConfig(AppConfig):
   default_auto_field = 'django.db.models.BigAutoField'
   name = 'apps.invoices'
   verbose_name = 'Invoices'
+
+  def ready(self):
+    import apps.invoices.signals  # noqa: F401
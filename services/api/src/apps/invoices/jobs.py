@@ -0,0 +1,50 @@
+"""Handlers de trabajos en segundo plano de facturación (ver `apps.jobs.registry`)."""
+
+from __future__ import annotations
+
+from apps.business.services import get_business_document_config
+from apps.jobs.registry import JobContext, JobError, register_job
+from .models import Invoice
+from .pdf import render_invoice_pdf
+from .pdf_cache import PDF_CONTENT_TYPE, invoice_document_pdf
+from .pdf_export import DocumentExport, export_documents, filter_period
+
+
+@register_job('invoice_pdf', permission='view_invoices')
+def run_invoice_pdf(ctx: JobContext) -> dict:
+  invoice = (
+    Invoice.objects.select_related('sale', 'sale__customer', 'business')
+    .filter(pk=ctx.params.get('invoice_id'), business=ctx.business)
+    .first()
+  )
+  if invoice is None:
+    raise JobError('No encontramos la factura.')
+  missing_fields = get_business_document_config(ctx.business).get_missing_issuer_fields()
+  if missing_fields:
+    raise JobError('El perfil fiscal del negocio está incompleto. Completá los datos requeridos para generar el PDF.')
+  filename = f'factura-{invoice.full_number}.pdf'
+  ctx.save_artifact(filename, invoice_document_pdf(invoice).content(), PDF_CONTENT_TYPE)
+  return {'invoice_id': str(invoice.pk), 'filename': filename}
+
+
+INVOICE_EXPORT = DocumentExport(
+  name='facturas',
+  document_pdf=invoice_document_pdf,
+  filename=lambda invoice: f'factura-{invoice.full_number}.pdf',
+  render=render_invoice_pdf,
+)
+
+
+@register_job('invoice_pdf_export', permission='view_invoices')
+def run_invoice_pdf_export(ctx: JobContext) -> dict:
+  if get_business_document_config(ctx.business).get_missing_issuer_fields():
+    raise JobError('El perfil fiscal del negocio está incompleto. Completá los datos requeridos para generar el PDF.')
+  queryset = filter_period(
+    Invoice.objects.filter(business=ctx.business)
+    .select_related('sale', 'sale__customer', 'business')
+    .prefetch_related('sale__items')
+    .order_by('issued_at', 'number'),
+    'issued_at',
+    ctx.params,
+  )
+  return export_documents(ctx, INVOICE_EXPORT, queryset, ctx.params.get('format'))
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-17 00:08
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0014_menu_qr_plans_pro_module'),
+        ('invoices', '0005_alter_documentseries_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenderedDocument',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('document_type', models.CharField(choices=[('invoice', 'Factura'), ('quote', 'Presupuesto'), ('receipt', 'Recibo'), ('credit_note', 'Nota de Crédito'), ('debit_note', 'Nota de Débito'), ('delivery_note', 'Remito')], max_length=32)),
+                ('document_id', models.UUIDField()),
+                ('cache_key', models.CharField(max_length=64, unique=True)),
+                ('file', models.FileField(upload_to='documents/rendered/')),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rendered_documents', to='business.business')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['document_type', 'document_id'], name='rendered_doc_lookup_idx')],
+            },
+        ),
+    ]
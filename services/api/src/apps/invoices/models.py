@@ -171,3 +171,29 @@ class Invoice(models.Model):
 
   def __str__(self) -> str:  # pragma: no cover - repr utility
     return f"Factura {self.full_number}"
+
+
+class RenderedDocument(models.Model):
+  """PDF ya renderizado de un documento (factura, presupuesto).
+
+  `cache_key` es el hash de (tipo, id, versión del documento, versión del
+  branding/perfil fiscal) y da nombre al archivo: si cambia cualquiera de las
+  partes, la clave es otra y se vuelve a renderizar (ver `apps.invoices.pdf_cache`).
+  """
+
+  id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+  business = models.ForeignKey('business.Business', related_name='rendered_documents', on_delete=models.CASCADE)
+  document_type = models.CharField(max_length=32, choices=DocumentSeries.DocumentType.choices)
+  document_id = models.UUIDField()
+  cache_key = models.CharField(max_length=64, unique=True)
+  file = models.FileField(upload_to='documents/rendered/')
+  size = models.PositiveIntegerField(default=0)
+  created_at = models.DateTimeField(auto_now_add=True)
+
+  class Meta:
+    indexes = [
+      models.Index(fields=['document_type', 'document_id'], name='rendered_doc_lookup_idx'),
+    ]
+
+  def __str__(self) -> str:  # pragma: no cover - repr utility
+    return f"{self.document_type} {self.document_id} · {self.cache_key[:12]}"
@@ -14,11 +14,14 @@ para no romper el PDF si falta algún dato opcional.
 from __future__ import annotations
 
 import logging
+import os
+from functools import lru_cache
 from io import BytesIO
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
 from reportlab.pdfgen import canvas
 from reportlab.platypus import Table, TableStyle
 
@@ -34,6 +37,12 @@ LOGO_HEADER_MAX_H = 28 * mm
 LOGO_HEADER_MAX_W = 60 * mm
 
 
+@lru_cache(maxsize=32)
+def _logo_reader(file_path: str, mtime_ns: int) -> ImageReader:
+    """Logo decodificado una sola vez por proceso (se renueva si cambia el archivo)."""
+    return ImageReader(file_path)
+
+
 def _draw_logo(pdf: canvas.Canvas, image_field, x: float, y_top: float) -> float:
     """
     Intenta renderizar el logo header en el canvas y devuelve la altura ocupada.
@@ -56,9 +65,7 @@ def _draw_logo(pdf: canvas.Canvas, image_field, x: float, y_top: float) -> float
             return 0.0
 
         file_path = image_field.path  # puede lanzar SuspiciousFileOperation si vacío
-
-        from reportlab.lib.utils import ImageReader
-        img_reader = ImageReader(file_path)
+        img_reader = _logo_reader(file_path, os.stat(file_path).st_mtime_ns)
         img_w, img_h = img_reader.getSize()
 
         scale_w = LOGO_HEADER_MAX_W / img_w
@@ -67,7 +74,7 @@ def _draw_logo(pdf: canvas.Canvas, image_field, x: float, y_top: float) -> float
         draw_w = img_w * scale
         draw_h = img_h * scale
 
-        pdf.drawImage(file_path, x, y_top - draw_h,
+        pdf.drawImage(img_reader, x, y_top - draw_h,
                       width=draw_w, height=draw_h,
                       preserveAspectRatio=True, mask='auto')
         return draw_h
@@ -77,7 +84,7 @@ def _draw_logo(pdf: canvas.Canvas, image_field, x: float, y_top: float) -> float
         return 0.0
 
 
-def render_invoice_pdf(invoice: Invoice) -> bytes:
+def render_invoice_pdf(invoice: Invoice, config=None) -> bytes:
     """
     Genera los bytes PDF de una factura usando los datos fiscales / branding del negocio.
 
@@ -86,13 +93,23 @@ def render_invoice_pdf(invoice: Invoice) -> bytes:
     """
     buffer = BytesIO()
     pdf = canvas.Canvas(buffer, pagesize=A4)
+    draw_invoice_page(pdf, invoice, config)
+    pdf.save()
+    return buffer.getvalue()
+
+
+def draw_invoice_page(pdf: canvas.Canvas, invoice: Invoice, config=None) -> None:
+    """
+    Dibuja la factura en una página de `pdf` (termina con showPage).
+    `config` permite reusar la configuración del negocio entre varias facturas.
+    """
     width, height = A4
 
     margin = 18 * mm
     current_y = height - margin
 
     # ── Config centralizada ──────────────────────────────────────────────
-    config = get_business_document_config(invoice.business)
+    config = config or get_business_document_config(invoice.business)
     issuer = config.get_issuer_data()
     branding = config.get_invoice_branding()
 
@@ -273,5 +290,3 @@ def render_invoice_pdf(invoice: Invoice) -> bytes:
     pdf.setFillColor(colors.black)
 
     pdf.showPage()
-    pdf.save()
-    return buffer.getvalue()
@@ -0,0 +1,213 @@
+"""
+Cache de PDFs renderizados (facturas y presupuestos).
+
+Cada PDF queda como un `RenderedDocument` cuyo archivo se nombra con la clave:
+sha256 de (tipo, id, versión del documento, versión del branding).
+
+- Versión de la factura: su `updated_at` (una factura emitida no cambia).
+- Versión del presupuesto: hash de los campos del presupuesto, su cliente y
+  sus ítems (ver `apps.sales.quote_pdf.quote_document_pdf`).
+- Versión del branding: `updated_at` de BusinessBranding y del perfil fiscal,
+  en una sola consulta.
+
+Si cambia cualquiera de las partes la clave es otra y se vuelve a renderizar;
+las señales además borran los archivos que quedaron viejos. La clave es el
+ETag de la descarga (`common.downloads.cached_file_response`).
+
+Las facturas se pre-renderizan al emitirse, en segundo plano.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+
+from apps.business.models import Business
+from apps.business.services import get_business_document_config
+from apps.jobs.services import jobs_run_inline
+from .models import DocumentSeries, Invoice, RenderedDocument
+from .pdf import render_invoice_pdf
+
+logger = logging.getLogger(__name__)
+
+PDF_CONTENT_TYPE = 'application/pdf'
+
+
+def branding_version(business_id) -> str:
+  row = (
+    Business.objects.filter(pk=business_id)
+    .values_list('branding__updated_at', 'billing_profile__updated_at')
+    .first()
+  )
+  return '|'.join(value.isoformat() if value else '-' for value in (row or ()))
+
+
+def instance_fingerprint(*instances) -> str:
+  """Hash de los campos concretos de `instances` (None cuenta como vacío)."""
+  digest = hashlib.sha256()
+  for instance in instances:
+    if instance is None:
+      digest.update(b'\x1e')
+      continue
+    for field in instance._meta.concrete_fields:
+      digest.update(f'{getattr(instance, field.attname)!s}\x1f'.encode('utf-8'))
+    digest.update(b'\x1e')
+  return digest.hexdigest()
+
+
+@dataclass
+class DocumentPDF:
+  business_id: Any
+  document_type: str
+  document_id: Any
+  version: str
+  render: Callable[[], bytes]
+  # Versión del branding ya calculada (exportaciones: una consulta para todo el lote).
+  branding: Optional[str] = None
+  # Documento de origen: las exportaciones lo renderizan en otro proceso (`apps.invoices.pdf_pool`).
+  source: Any = None
+
+  @cached_property
+  def cache_key(self) -> str:
+    branding = self.branding if self.branding is not None else branding_version(self.business_id)
+    raw = '\x1f'.join([self.document_type, str(self.document_id), self.version, branding])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+  def rendered(self) -> RenderedDocument:
+    """El PDF cacheado para esta versión; lo renderiza si todavía no existe."""
+    existing = RenderedDocument.objects.filter(cache_key=self.cache_key).first()
+    if existing is not None:
+      return existing
+    return self.store(self.render())
+
+  def store(self, content: bytes) -> RenderedDocument:
+    """Guarda `content` como el PDF de esta versión y borra los de versiones anteriores."""
+    rendered = RenderedDocument(
+      business_id=self.business_id,
+      document_type=self.document_type,
+      document_id=self.document_id,
+      cache_key=self.cache_key,
+      size=len(content),
+    )
+    rendered.file.save(f'{self.cache_key}.pdf', ContentFile(content), save=False)
+    try:
+      with transaction.atomic():
+        rendered.save()
+    except IntegrityError:
+      # Otro proceso renderizó la misma versión en paralelo: queda la suya.
+      rendered.file.delete(save=False)
+      existing = RenderedDocument.objects.filter(cache_key=self.cache_key).first()
+      if existing is None:
+        raise
+      return existing
+
+    _delete_rendered(
+      RenderedDocument.objects.filter(document_type=self.document_type, document_id=self.document_id)
+      .exclude(pk=rendered.pk)
+    )
+    return rendered
+
+  def content(self) -> bytes:
+    rendered = self.rendered()
+    with rendered.file.open('rb') as handle:
+      return handle.read()
+
+
+def rendered_documents(
+  documents: Sequence[DocumentPDF],
+  render_many: Optional[Callable[[List[DocumentPDF]], Iterable[bytes]]] = None,
+) -> List[RenderedDocument]:
+  """
+  `DocumentPDF.rendered()` para un lote: los ya cacheados salen de una sola
+  consulta. `render_many` renderiza de una vez los que faltan (mismo orden).
+  """
+  cached = RenderedDocument.objects.in_bulk([document.cache_key for document in documents], field_name='cache_key')
+  missing = [document for document in documents if document.cache_key not in cached]
+  if render_many is not None and missing:
+    for document, content in zip(missing, render_many(missing)):
+      cached[document.cache_key] = document.store(content)
+  return [cached.get(document.cache_key) or document.rendered() for document in documents]
+
+
+def _delete_rendered(queryset) -> None:
+  rows = list(queryset.only('pk', 'file'))
+  if not rows:
+    return
+  names = [row.file.name for row in rows if row.file]
+  RenderedDocument.objects.filter(pk__in=[row.pk for row in rows]).delete()
+  storage = RenderedDocument._meta.get_field('file').storage
+
+  def delete_files():
+    for name in names:
+      storage.delete(name)
+
+  transaction.on_commit(delete_files)
+
+
+def forget_documents(document_type: str, document_ids: Iterable) -> None:
+  _delete_rendered(RenderedDocument.objects.filter(document_type=document_type, document_id__in=list(document_ids)))
+
+
+def forget_business_documents(business_id) -> None:
+  if business_id is None:
+    return
+  _delete_rendered(RenderedDocument.objects.filter(business_id=business_id))
+
+
+# Facturas ------------------------------------------------------------------
+
+def invoice_document_pdf(invoice: Invoice, config=None, branding: Optional[str] = None) -> DocumentPDF:
+  return DocumentPDF(
+    business_id=invoice.business_id,
+    document_type=DocumentSeries.DocumentType.INVOICE,
+    document_id=invoice.pk,
+    version=invoice.updated_at.isoformat(),
+    render=lambda: render_invoice_pdf(invoice, config),
+    branding=branding,
+    source=invoice,
+  )
+
+
+def prerender_invoice_pdf(invoice_id) -> bool:
+  """Deja cacheado el PDF de la factura. Es best-effort: un error solo se registra."""
+  invoice = (
+    Invoice.objects.select_related('sale', 'sale__customer', 'business')
+    .filter(pk=invoice_id)
+    .first()
+  )
+  if invoice is None:
+    return False
+  if get_business_document_config(invoice.business).get_missing_issuer_fields():
+    return False
+  try:
+    invoice_document_pdf(invoice).rendered()
+  except Exception:
+    logger.exception('No se pudo pre-renderizar el PDF de la factura pk=%s', invoice_id)
+    return False
+  return True
+
+
+def schedule_invoice_prerender(invoice: Invoice) -> None:
+  """Pre-renderiza el PDF de una factura recién emitida al confirmar la transacción."""
+  invoice_id = str(invoice.pk)
+  if jobs_run_inline():
+    transaction.on_commit(lambda: prerender_invoice_pdf(invoice_id))
+    return
+  transaction.on_commit(lambda: _delay_prerender(invoice_id))
+
+
+def _delay_prerender(invoice_id: str) -> None:
+  # Best-effort: la factura ya está confirmada; si el broker no responde, el PDF
+  # se renderiza en la primera descarga.
+  from .tasks import prerender_invoice_pdf_task
+
+  try:
+    prerender_invoice_pdf_task.delay(invoice_id)
+  except Exception:
+    logger.exception('No se pudo encolar el pre-renderizado del PDF de la factura pk=%s', invoice_id)
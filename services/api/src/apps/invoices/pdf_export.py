@@ -0,0 +1,139 @@
+"""
+Exportación masiva de facturas o presupuestos: un ZIP o un único PDF.
+
+Los documentos se recorren por lotes (`iterator(chunk_size=...)`) y el
+resultado se arma en un archivo temporal, nunca entero en memoria:
+
+- Cada PDF sale del cache de renderizados (`apps.invoices.pdf_cache`), con
+  una consulta por lote; los que faltan se renderizan (en un pool de procesos,
+  ver `apps.invoices.pdf_pool`) y quedan cacheados para la descarga individual.
+- ZIP: un archivo por documento, copiado del cache.
+- PDF único: las páginas de cada documento se agregan al archivo de salida a
+  medida que se renderizan (`apps.invoices.pdf_merge.PDFConcatenator`).
+
+La configuración del negocio (perfil fiscal y branding) se carga una sola vez
+por exportación y el logo decodificado se reusa entre documentos
+(`apps.invoices.pdf._logo_reader`). El avance se publica en el Job por cada
+documento.
+"""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+from django.conf import settings
+
+from apps.business.services import get_business_document_config
+from apps.jobs.registry import JobContext, JobError
+from .pdf_cache import PDF_CONTENT_TYPE, DocumentPDF, branding_version, rendered_documents
+from .pdf_merge import PDFConcatenator
+from .pdf_pool import RenderPool, can_fork_workers
+
+EXPORT_FORMAT_ZIP = 'zip'
+EXPORT_FORMAT_PDF = 'pdf'
+EXPORT_FORMATS = (EXPORT_FORMAT_ZIP, EXPORT_FORMAT_PDF)
+EXPORT_CHUNK_SIZE = 100
+MAX_EXPORT_DOCUMENTS = 5000
+
+
+@dataclass(frozen=True)
+class DocumentExport:
+  name: str
+  # (documento, config, versión del branding) → DocumentPDF cacheable
+  document_pdf: Callable[[Any, Any, str], DocumentPDF]
+  filename: Callable[[Any], str]
+  # (documento, config) → bytes del PDF; función de módulo, corre en los procesos del pool
+  render: Callable[[Any, Any], bytes]
+
+
+def filter_period(queryset, field: str, params: dict):
+  """Aplica `date_from` / `date_to` (ISO) y `status` de los parámetros del job."""
+  if params.get('date_from'):
+    queryset = queryset.filter(**{f'{field}__date__gte': params['date_from']})
+  if params.get('date_to'):
+    queryset = queryset.filter(**{f'{field}__date__lte': params['date_to']})
+  if params.get('status'):
+    queryset = queryset.filter(status=params['status'])
+  return queryset
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[List]:
+  iterator = iter(iterable)
+  while True:
+    chunk = list(islice(iterator, size))
+    if not chunk:
+      return
+    yield chunk
+
+
+@contextmanager
+def _render_pool(config) -> Iterator[Optional[RenderPool]]:
+  workers = getattr(settings, 'PDF_EXPORT_WORKERS', 1)
+  if workers <= 1 or not can_fork_workers():
+    yield None
+    return
+  # Los procesos del pool no consultan la base: perfil fiscal y branding van ya cargados.
+  config.get_issuer_data()
+  config.get_invoice_branding()
+  with RenderPool(workers, config) as pool:
+    yield pool
+
+
+def _rendered(ctx: JobContext, export: DocumentExport, documents, total, config, pool) -> Iterator:
+  """(documento, RenderedDocument) en orden; publica el avance por cada documento."""
+  branding = branding_version(ctx.business.pk)
+
+  def render_many(missing: List[DocumentPDF]) -> List[bytes]:
+    return pool.render(export.render, [pdf.source for pdf in missing])
+
+  done = 0
+  for chunk in _chunks(documents, EXPORT_CHUNK_SIZE):
+    pdfs = [export.document_pdf(document, config, branding) for document in chunk]
+    for document, rendered in zip(chunk, rendered_documents(pdfs, render_many if pool else None)):
+      yield document, rendered
+      done += 1
+      ctx.set_progress(done, total)
+
+
+def _write_zip(ctx, export: DocumentExport, documents, total, output, config, pool) -> None:
+  # Los PDFs ya vienen comprimidos: se guardan sin volver a comprimir.
+  with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as archive:
+    for document, rendered in _rendered(ctx, export, documents, total, config, pool):
+      with rendered.file.open('rb') as source, archive.open(export.filename(document), 'w') as target:
+        shutil.copyfileobj(source, target)
+
+
+def _write_merged(ctx, export: DocumentExport, documents, total, output, config, pool) -> None:
+  merged = PDFConcatenator(output)
+  for _, rendered in _rendered(ctx, export, documents, total, config, pool):
+    with rendered.file.open('rb') as source:
+      merged.append(source.read())
+  merged.close()
+
+
+def export_documents(ctx: JobContext, export: DocumentExport, queryset, export_format: str) -> dict:
+  total = queryset.count()
+  if total == 0:
+    raise JobError('No hay documentos para exportar con esos filtros.')
+  if total > MAX_EXPORT_DOCUMENTS:
+    raise JobError(f'La exportación supera el máximo de {MAX_EXPORT_DOCUMENTS} documentos. Acotá el período.')
+
+  config = get_business_document_config(ctx.business)
+  ctx.set_progress(0, total)
+  documents = queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+  with tempfile.TemporaryFile() as output, _render_pool(config) as pool:
+    if export_format == EXPORT_FORMAT_PDF:
+      filename, content_type = f'{export.name}.pdf', PDF_CONTENT_TYPE
+      _write_merged(ctx, export, documents, total, output, config, pool)
+    else:
+      filename, content_type = f'{export.name}.zip', 'application/zip'
+      _write_zip(ctx, export, documents, total, output, config, pool)
+    output.seek(0)
+    ctx.save_artifact(filename, output, content_type)
+  return {'documents': total, 'format': export_format, 'filename': filename}
@@ -0,0 +1,181 @@
+"""
+Concatenación incremental de PDFs generados con ReportLab.
+
+`PDFConcatenator` escribe en un archivo de salida las páginas de cada PDF a
+medida que llega, así una exportación de miles de documentos no necesita
+tenerlos todos en memoria ni en un único canvas: en memoria quedan solo los
+offsets de la tabla xref, los ids de las páginas y un hash por objeto copiado.
+
+Cada PDF se lee por su tabla xref clásica (la que escribe ReportLab, sin
+object streams ni xref streams). Se copian solo los objetos alcanzables desde
+sus páginas, renumerados; el árbol de páginas, el catálogo y el /Info de cada
+documento se reemplazan por los del PDF final. Los objetos idénticos (fuentes,
+el logo del negocio) se escriben una sola vez y se comparten.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import BinaryIO, Dict, List, Set, Tuple
+
+PDF_HEADER = b'%PDF-1.4\n%\x93\x8c\x8b\x9e\n'
+
+_REFERENCE = re.compile(rb'(?<![\d.])(\d+)\s+\d+\s+R\b')
+_OBJECT_HEADER = re.compile(rb'\s*(\d+)\s+\d+\s+obj\b')
+_STREAM_START = re.compile(rb'>>\s*stream\r?\n')
+_STARTXREF = re.compile(rb'startxref\s+(\d+)\s+%%EOF\s*$')
+_XREF_SECTION = re.compile(rb'(\d+)\s+(\d+)\s*$')
+_ROOT = re.compile(rb'/Root\s+(\d+)\s+\d+\s+R\b')
+_PAGES = re.compile(rb'/Pages\s+(\d+)\s+\d+\s+R\b')
+_TYPE = re.compile(rb'/Type\s*/(\w+)')
+_KIDS = re.compile(rb'/Kids\s*\[([^\]]*)\]')
+
+
+class _SourcePDF:
+  """Un PDF de entrada: offsets de sus objetos y la numeración nueva de los ya copiados."""
+
+  def __init__(self, data: bytes):
+    match = _STARTXREF.search(data[-64:])
+    if match is None:
+      raise ValueError('El PDF no termina con startxref.')
+    xref_start = int(match.group(1))
+    self.data = data
+    self.offsets = self._read_xref(xref_start)
+    # Fin de cada objeto: el offset del siguiente (o el comienzo de la xref).
+    ordered = sorted(self.offsets.items(), key=lambda item: item[1])
+    self.ends = {
+      number: (ordered[index + 1][1] if index + 1 < len(ordered) else xref_start)
+      for index, (number, _) in enumerate(ordered)
+    }
+    root = _ROOT.search(data, xref_start)
+    if root is None:
+      raise ValueError('El trailer del PDF no tiene /Root.')
+    self.root = int(root.group(1))
+    self.mapping: Dict[int, int] = {}
+    self.pending: Set[int] = set()
+
+  def _read_xref(self, start: int) -> Dict[int, int]:
+    lines = self.data[start:].splitlines()
+    if not lines or lines[0].strip() != b'xref':
+      raise ValueError('El PDF no tiene una tabla xref clásica.')
+    offsets: Dict[int, int] = {}
+    index = 1
+    while index < len(lines) and not lines[index].startswith(b'trailer'):
+      section = _XREF_SECTION.match(lines[index].strip())
+      if section is None:
+        raise ValueError('Tabla xref inválida.')
+      first, count = int(section.group(1)), int(section.group(2))
+      for number, entry in enumerate(lines[index + 1:index + 1 + count], start=first):
+        offset, _, kind = entry.split()[:3]
+        if kind == b'n':
+          offsets[number] = int(offset)
+      index += 1 + count
+    return offsets
+
+  def object(self, number: int) -> Tuple[bytes, bytes]:
+    """(diccionario o valor, resto desde `stream` o `endobj`) del objeto `number`."""
+    body = self.data[self.offsets[number]:self.ends[number]]
+    header = _OBJECT_HEADER.match(body)
+    if header is None:
+      raise ValueError(f'Objeto {number} inválido.')
+    body = body[header.end():].rstrip()
+    stream = _STREAM_START.search(body)
+    if stream is not None:
+      split = stream.start() + 2
+      return body[:split].strip(), b'\n' + body[split:].lstrip() + b'\n'
+    return body[:body.rindex(b'endobj')].strip(), b'\nendobj\n'
+
+
+class PDFConcatenator:
+  """Escribe en `output` un único PDF con las páginas de cada `append`, en orden."""
+
+  def __init__(self, output: BinaryIO):
+    self.output = output
+    self.position = 0
+    self.offsets: Dict[int, int] = {}
+    self.next_number = 1
+    self.pages_number = self._allocate()
+    self.catalog_number = self._allocate()
+    self.kids: List[int] = []
+    self.shared: Dict[bytes, int] = {}
+    self._write(PDF_HEADER)
+
+  def append(self, data: bytes) -> None:
+    """Agrega todas las páginas del PDF `data` al final."""
+    source = _SourcePDF(data)
+    catalog, _ = source.object(source.root)
+    pages = _PAGES.search(catalog)
+    if pages is None:
+      raise ValueError('El catálogo del PDF no tiene /Pages.')
+    self._append_pages(source, int(pages.group(1)))
+
+  def close(self) -> None:
+    """Escribe el árbol de páginas, el catálogo, la xref y el trailer."""
+    kids = ' '.join(f'{kid} 0 R' for kid in self.kids)
+    self._write_object(
+      self.pages_number, f'<< /Type /Pages /Count {len(self.kids)} /Kids [ {kids} ] >>'.encode(), b'\nendobj\n'
+    )
+    self._write_object(
+      self.catalog_number, f'<< /Type /Catalog /Pages {self.pages_number} 0 R >>'.encode(), b'\nendobj\n'
+    )
+    xref_start = self.position
+    size = self.next_number
+    entries = [b'xref\n', f'0 {size}\n'.encode(), b'0000000000 65535 f \n']
+    entries += [f'{self.offsets[number]:010d} 00000 n \n'.encode() for number in range(1, size)]
+    entries.append(
+      f'trailer\n<< /Root {self.catalog_number} 0 R /Size {size} >>\nstartxref\n{xref_start}\n%%EOF\n'.encode()
+    )
+    self._write(b''.join(entries))
+
+  def _append_pages(self, source: _SourcePDF, number: int) -> None:
+    head, _ = source.object(number)
+    kind = _TYPE.search(head)
+    if kind is not None and kind.group(1) == b'Pages':
+      # El nodo se reemplaza por el árbol de páginas del PDF final (el /Parent de cada página apunta ahí).
+      source.mapping[number] = self.pages_number
+      kids = _KIDS.search(head)
+      for kid in _REFERENCE.finditer(kids.group(1) if kids else b''):
+        self._append_pages(source, int(kid.group(1)))
+      return
+    self.kids.append(self._copy(source, number, share=False))
+
+  def _copy(self, source: _SourcePDF, number: int, share: bool = True) -> int:
+    """Copia el objeto `number` (y lo que referencia) y devuelve su número en el PDF final."""
+    mapped = source.mapping.get(number)
+    if mapped is not None:
+      return mapped
+    if number in source.pending:
+      # Referencia circular: el objeto se numera ya y no se comparte.
+      source.mapping[number] = self._allocate()
+      return source.mapping[number]
+
+    source.pending.add(number)
+    head, rest = source.object(number)
+    head = _REFERENCE.sub(lambda match: b'%d 0 R' % self._copy(source, int(match.group(1))), head)
+    source.pending.discard(number)
+
+    mapped = source.mapping.get(number)
+    if mapped is None:
+      key = hashlib.sha256(head + rest).digest() if share else None
+      if key is not None and key in self.shared:
+        source.mapping[number] = self.shared[key]
+        return self.shared[key]
+      mapped = source.mapping[number] = self._allocate()
+      if key is not None:
+        self.shared[key] = mapped
+    self._write_object(mapped, head, rest)
+    return mapped
+
+  def _allocate(self) -> int:
+    number = self.next_number
+    self.next_number += 1
+    return number
+
+  def _write_object(self, number: int, head: bytes, rest: bytes) -> None:
+    self.offsets[number] = self.position
+    self._write(b'%d 0 obj\n' % number + head + rest)
+
+  def _write(self, data: bytes) -> None:
+    self.output.write(data)
+    self.position += len(data)
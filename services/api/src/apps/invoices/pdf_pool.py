@@ -0,0 +1,67 @@
+"""
+Renderizado de PDFs en procesos aparte (exportaciones masivas).
+
+Dibujar con ReportLab es CPU puro, así que un lote de documentos sin cachear se
+reparte entre varios procesos (`PDF_EXPORT_WORKERS`). El proceso padre hace
+todas las consultas: los documentos llegan a los hijos ya cargados (con sus
+ítems prefetcheados) y la configuración del negocio, con el perfil fiscal y el
+branding leídos, se les pasa una sola vez al arrancar.
+
+Los hijos se crean con `spawn`, no con `fork`: no heredan las conexiones a la
+base del padre. Por eso este módulo no importa Django al cargarse; el hijo lo
+importa antes de `django.setup()`.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Sequence
+
+_config = None
+
+
+def _initialize(config_state: bytes) -> None:
+  import django
+
+  django.setup()
+  global _config
+  _config = pickle.loads(config_state)
+
+
+def _render(render: Callable[[Any, Any], bytes], document) -> bytes:
+  return render(document, _config)
+
+
+def can_fork_workers() -> bool:
+  """Un proceso daemon (p. ej. un pool de multiprocessing) no puede tener hijos."""
+  return not multiprocessing.current_process().daemon
+
+
+class RenderPool:
+  """Pool de procesos que renderiza con `render(documento, config)`, una función de módulo."""
+
+  def __init__(self, workers: int, config):
+    self.workers = workers
+    # Los procesos se crean a demanda: si todo el lote estaba cacheado no arranca ninguno.
+    self.executor = ProcessPoolExecutor(
+      max_workers=workers,
+      mp_context=multiprocessing.get_context('spawn'),
+      initializer=_initialize,
+      initargs=(pickle.dumps(config),),
+    )
+
+  def render(self, render: Callable[[Any, Any], bytes], documents: Sequence) -> List[bytes]:
+    """Los PDFs de `documents`, en el mismo orden."""
+    chunksize = max(1, len(documents) // (self.workers * 4))
+    return list(self.executor.map(_render, [render] * len(documents), documents, chunksize=chunksize))
+
+  def close(self) -> None:
+    self.executor.shutdown()
+
+  def __enter__(self) -> 'RenderPool':
+    return self
+
+  def __exit__(self, *exc_info) -> None:
+    self.close()
@@ -12,6 +12,8 @@ from rest_framework import serializers
 from apps.sales.models import Sale
 from apps.sales.serializers import SaleItemSerializer
 from .models import Invoice, InvoiceSeries, DocumentSeries
+from .pdf_cache import schedule_invoice_prerender
+from .pdf_export import EXPORT_FORMAT_ZIP, EXPORT_FORMATS
 
 
 @dataclass
@@ -239,7 +241,39 @@ class InvoiceIssueSerializer(serializers.Serializer):
       series.next_number = number + 1
       series.save(update_fields=['next_number', 'updated_at'])
 
+    schedule_invoice_prerender(invoice)
     return invoice
 
   def to_representation(self, instance):
     return InvoiceDetailSerializer(instance, context=self.context).data
+
+
+class DocumentPDFExportSerializer(serializers.Serializer):
+  """Filtros de la exportación masiva de PDFs (facturas o presupuestos)."""
+
+  format = serializers.ChoiceField(choices=EXPORT_FORMATS, default=EXPORT_FORMAT_ZIP)
+  date_from = serializers.DateField(required=False)
+  date_to = serializers.DateField(required=False)
+  status = serializers.CharField(required=False, allow_blank=True)
+
+  def __init__(self, *args, status_choices=(), **kwargs):
+    super().__init__(*args, **kwargs)
+    self.status_choices = set(status_choices)
+
+  def validate_status(self, value: str) -> str:
+    if value and value not in self.status_choices:
+      raise serializers.ValidationError('Estado inválido.')
+    return value
+
+  def validate(self, attrs):
+    date_from, date_to = attrs.get('date_from'), attrs.get('date_to')
+    if date_from and date_to and date_from > date_to:
+      raise serializers.ValidationError({'date_to': 'La fecha hasta no puede ser anterior a la fecha desde.'})
+    return attrs
+
+  def job_params(self) -> dict:
+    return {
+      key: value.isoformat() if hasattr(value, 'isoformat') else value
+      for key, value in self.validated_data.items()
+      if value not in (None, '')
+    }
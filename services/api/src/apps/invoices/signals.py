@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.business.models import BusinessBillingProfile, BusinessBranding
+from .pdf_cache import forget_business_documents
+
+
+@receiver(post_save, sender=BusinessBranding)
+@receiver(post_delete, sender=BusinessBranding)
+@receiver(post_save, sender=BusinessBillingProfile)
+@receiver(post_delete, sender=BusinessBillingProfile)
+def forget_rendered_documents(sender, instance, **kwargs):
+  """Logo, color o datos fiscales nuevos: los PDFs cacheados del negocio ya no sirven."""
+  if kwargs.get('raw'):
+    return
+  forget_business_documents(instance.business_id)
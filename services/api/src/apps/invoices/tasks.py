@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .pdf_cache import prerender_invoice_pdf
+
+
+@shared_task(name='invoices.prerender_pdf', acks_late=True)
+def prerender_invoice_pdf_task(invoice_id: str) -> bool:
+  return prerender_invoice_pdf(invoice_id)
@@ -0,0 +1,158 @@
+"""
+Tests del cache de PDFs renderizados (facturas y presupuestos).
+
+Cubre:
+- Segunda descarga sin re-renderizar, 304 con If-None-Match y rangos (206/416)
+- Cambio de branding → otra versión y se borra el PDF viejo
+- Presupuesto editado → otra versión
+- Pre-renderizado al emitir
+"""
+from __future__ import annotations
+
+import shutil
+import tempfile
+import uuid
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Membership
+from apps.business.models import Business, BusinessBillingProfile, BusinessBranding, Subscription
+from apps.invoices.models import Invoice, InvoiceSeries, RenderedDocument
+from apps.invoices.pdf_cache import schedule_invoice_prerender
+from apps.invoices.tasks import prerender_invoice_pdf_task
+from apps.sales.models import Quote, QuoteItem, Sale
+from apps.sales.quote_services import recalc_quote_totals
+
+MEDIA_ROOT = tempfile.mkdtemp()
+User = get_user_model()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, JOBS_RUN_INLINE=True)
+class RenderedPDFCacheTests(APITestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='pdf-cache', email='cache@test.com', password='testpass123')
+        self.business = Business.objects.create(name='Cache Biz')
+        Subscription.objects.create(business=self.business, plan='pro', status='active')
+        Membership.objects.create(user=self.user, business=self.business, role='manager')
+        self.client.force_authenticate(user=self.user)
+        self.client.cookies['bid'] = str(self.business.id)
+
+        profile, _ = BusinessBillingProfile.objects.get_or_create(business=self.business)
+        profile.legal_name = 'Cache S.A.'
+        profile.tax_id = '30-11111111-1'
+        profile.fiscal_address = 'Florida 100'
+        profile.commercial_address = 'Florida 100'
+        profile.save()
+
+        sale = Sale.objects.create(
+            business=self.business, number=1, subtotal=Decimal('100.00'), discount=Decimal('0'), total=Decimal('100.00')
+        )
+        series = InvoiceSeries.objects.create(business=self.business, code='X', next_number=2)
+        self.invoice = Invoice.objects.create(
+            id=uuid.uuid4(),
+            business=self.business,
+            sale=sale,
+            series=series,
+            number=1,
+            full_number='X-00000001',
+            subtotal='100.00',
+            discount='0.00',
+            total='100.00',
+        )
+        self.invoice_url = reverse('invoices:invoice-pdf', args=[self.invoice.pk])
+
+    def test_second_download_is_served_from_cache(self):
+        with mock.patch('apps.invoices.pdf_cache.render_invoice_pdf', return_value=b'%PDF-fake') as render:
+            first = self.client.get(self.invoice_url)
+            second = self.client.get(self.invoice_url)
+
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, b'%PDF-fake')
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertIn('Last-Modified', second)
+        self.assertEqual(RenderedDocument.objects.filter(document_id=self.invoice.pk).count(), 1)
+
+        not_modified = self.client.get(self.invoice_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified['ETag'], first['ETag'])
+
+    def test_range_requests(self):
+        response = self.client.get(self.invoice_url, HTTP_RANGE='bytes=0-3')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response.content, b'%PDF')
+        size = RenderedDocument.objects.get(document_id=self.invoice.pk).size
+        self.assertEqual(response['Content-Range'], f'bytes 0-3/{size}')
+
+        stale = self.client.get(self.invoice_url, HTTP_RANGE='bytes=0-3', HTTP_IF_RANGE='"otro"')
+        self.assertEqual(stale.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(stale.content), size)
+
+        outside = self.client.get(self.invoice_url, HTTP_RANGE=f'bytes={size}-')
+        self.assertEqual(outside.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(outside['Content-Range'], f'bytes */{size}')
+
+    def test_branding_change_renders_a_new_version(self):
+        first = self.client.get(self.invoice_url)
+        branding, _ = BusinessBranding.objects.get_or_create(business=self.business)
+        branding.accent_color = '#0066cc'
+        branding.save()
+        self.assertFalse(RenderedDocument.objects.filter(document_id=self.invoice.pk).exists())
+
+        second = self.client.get(self.invoice_url)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(first['ETag'], second['ETag'])
+        self.assertEqual(RenderedDocument.objects.filter(document_id=self.invoice.pk).count(), 1)
+
+    def test_quote_changes_invalidate_the_cached_pdf(self):
+        quote = Quote.objects.create(business=self.business, number='P-000001', customer_name='Ana')
+        item = QuoteItem.objects.create(
+            quote=quote, name_snapshot='Servicio', quantity=Decimal('1'), unit_price=Decimal('50'), total_line=Decimal('0')
+        )
+        recalc_quote_totals(quote)
+        url = reverse('sales:quote-pdf', args=[quote.pk])
+
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertTrue(first.content.startswith(b'%PDF'))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        item.quantity = Decimal('3')
+        item.save()
+        recalc_quote_totals(quote)
+
+        second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(first['ETag'], second['ETag'])
+        self.assertEqual(RenderedDocument.objects.filter(document_id=quote.pk).count(), 1)
+
+    def test_issued_invoice_is_prerendered_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule_invoice_prerender(self.invoice)
+        self.assertTrue(RenderedDocument.objects.filter(document_id=self.invoice.pk).exists())
+
+        with mock.patch('apps.invoices.pdf_cache.render_invoice_pdf') as render:
+            response = self.client.get(self.invoice_url)
+        render.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(JOBS_RUN_INLINE=False, CELERY_TASK_ALWAYS_EAGER=False)
+    def test_broker_errors_do_not_fail_the_committed_invoice(self):
+        with mock.patch.object(prerender_invoice_pdf_task, 'delay', side_effect=ConnectionError) as delay:
+            with self.assertLogs('apps.invoices.pdf_cache', level='ERROR'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    schedule_invoice_prerender(self.invoice)
+        delay.assert_called_once_with(str(self.invoice.pk))
+        self.assertFalse(RenderedDocument.objects.filter(document_id=self.invoice.pk).exists())
@@ -10,9 +10,12 @@ Cubre:
 from __future__ import annotations
 
 import io
+import shutil
+import tempfile
 import uuid
 
 from django.contrib.auth import get_user_model
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -22,6 +25,7 @@ from apps.business.models import Business, BusinessBillingProfile, BusinessBrand
 from apps.invoices.models import Invoice, InvoiceSeries
 from apps.sales.models import Sale, SaleItem
 
+MEDIA_ROOT = tempfile.mkdtemp()
 User = get_user_model()
 
 
@@ -36,9 +40,15 @@ def _make_minimal_png() -> bytes:
     return base64.b64decode(_1x1_red_png_b64)
 
 
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
 class InvoicePDFEndpointTests(APITestCase):
     """Tests del endpoint GET /api/v1/invoices/<pk>/pdf/"""
 
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
     def setUp(self):
         self.user = User.objects.create_user(
             username='manager_test',
@@ -0,0 +1,191 @@
+"""
+Tests de la exportación masiva de PDFs (POST /api/v1/invoices/pdf-export/ y
+POST /api/v1/sales/quotes/pdf-export/).
+
+Cubre:
+- ZIP con una factura por archivo, filtrado por período, con avance y cache
+- Renderizado de los PDFs que faltan en un pool de procesos
+- PDF único con una página por factura, armado documento por documento
+- ZIP de presupuestos
+- Validación de filtros y exportación vacía
+"""
+from __future__ import annotations
+
+import io
+import re
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Membership
+from apps.business.models import Business, BusinessBillingProfile, Subscription
+from apps.invoices.models import Invoice, InvoiceSeries, RenderedDocument
+from apps.jobs.models import Job
+from apps.jobs.registry import JobContext
+from apps.sales.models import Quote, QuoteItem, Sale, SaleItem
+from apps.sales.quote_pdf import build_quote_pdf
+
+MEDIA_ROOT = tempfile.mkdtemp()
+User = get_user_model()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, JOBS_RUN_INLINE=True)
+class DocumentPDFExportTests(APITestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='export-pdf', email='export@test.com', password='testpass123')
+        self.business = Business.objects.create(name='Export Biz')
+        Subscription.objects.create(business=self.business, plan='pro', status='active')
+        Membership.objects.create(user=self.user, business=self.business, role='manager')
+        self.client.force_authenticate(user=self.user)
+        self.client.cookies['bid'] = str(self.business.id)
+
+        profile, _ = BusinessBillingProfile.objects.get_or_create(business=self.business)
+        profile.legal_name = 'Export S.A.'
+        profile.tax_id = '30-22222222-2'
+        profile.fiscal_address = 'Corrientes 500'
+        profile.commercial_address = 'Corrientes 500'
+        profile.save()
+
+        self.series = InvoiceSeries.objects.create(business=self.business, code='X', next_number=1)
+        march = timezone.make_aware(datetime(2026, 3, 10, 12, 0))
+        april = timezone.make_aware(datetime(2026, 4, 2, 12, 0))
+        self.march_invoices = [self._make_invoice(number, march) for number in (1, 2, 3)]
+        self._make_invoice(4, april)
+
+    def _make_invoice(self, number: int, issued_at) -> Invoice:
+        sale = Sale.objects.create(
+            business=self.business, number=number, subtotal=Decimal('50.00'), discount=Decimal('0'), total=Decimal('50.00')
+        )
+        SaleItem.objects.create(
+            sale=sale, product_name_snapshot='Producto', quantity=Decimal('1'), unit_price=Decimal('50.00'),
+            line_total=Decimal('50.00'),
+        )
+        return Invoice.objects.create(
+            business=self.business,
+            sale=sale,
+            series=self.series,
+            number=number,
+            full_number=f'X-{number:08d}',
+            issued_at=issued_at,
+            subtotal=Decimal('50.00'),
+            discount=Decimal('0'),
+            total=Decimal('50.00'),
+        )
+
+    def _export(self, url_name: str, payload: dict) -> Job:
+        response = self.client.post(reverse(url_name), payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED, response.data)
+        return Job.objects.get(pk=response.data['id'])
+
+    def _download(self, job: Job) -> bytes:
+        response = self.client.get(reverse('jobs:job-download', kwargs={'pk': job.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content)
+
+    def test_zip_export_contains_one_pdf_per_invoice_of_the_period(self):
+        job = self._export('invoices:invoice-pdf-export', {'date_from': '2026-03-01', 'date_to': '2026-03-31'})
+
+        self.assertEqual(job.status, Job.Status.SUCCEEDED, job.error)
+        self.assertEqual((job.progress_done, job.progress_total), (3, 3))
+        self.assertEqual(job.result['documents'], 3)
+        with zipfile.ZipFile(io.BytesIO(self._download(job))) as archive:
+            names = sorted(archive.namelist())
+            self.assertEqual(names, ['factura-X-00000001.pdf', 'factura-X-00000002.pdf', 'factura-X-00000003.pdf'])
+            self.assertTrue(archive.read(names[0]).startswith(b'%PDF'))
+        # Los PDFs quedan cacheados para la descarga individual.
+        self.assertEqual(
+            RenderedDocument.objects.filter(document_id__in=[invoice.pk for invoice in self.march_invoices]).count(), 3
+        )
+
+    def test_merged_pdf_has_a_page_per_invoice(self):
+        with mock.patch.object(JobContext, 'set_progress', autospec=True, side_effect=JobContext.set_progress) as progress:
+            job = self._export('invoices:invoice-pdf-export', {'format': 'pdf'})
+
+        self.assertEqual(job.status, Job.Status.SUCCEEDED, job.error)
+        self.assertEqual(job.artifact_content_type, 'application/pdf')
+        content = self._download(job)
+        self.assertTrue(content.startswith(b'%PDF'))
+        self.assertEqual(len(re.findall(rb'/Type /Page\b', content)), 4)
+        self.assertIn(b'/Count 4', content)
+        # Cada factura se renderiza sola (queda cacheada) y el avance sigue a cada documento.
+        self.assertEqual(RenderedDocument.objects.filter(business=self.business).count(), 4)
+        self.assertEqual([call.args[1:] for call in progress.call_args_list], [(0, 4), (1, 4), (2, 4), (3, 4), (4, 4)])
+
+    def test_merged_quotes_keep_every_page(self):
+        for number in (1, 2):
+            quote = Quote.objects.create(business=self.business, number=f'P-{number:06d}', customer_name='Ana')
+            for line in range(60 * number):
+                QuoteItem.objects.create(
+                    quote=quote, name_snapshot=f'Servicio {line}', quantity=Decimal('1'), unit_price=Decimal('10'),
+                    total_line=Decimal('10'),
+                )
+        pages = [
+            len(re.findall(rb'/Type /Page\b', build_quote_pdf(quote)))
+            for quote in Quote.objects.order_by('number')
+        ]
+
+        job = self._export('sales:quote-pdf-export', {'format': 'pdf'})
+
+        self.assertEqual(job.status, Job.Status.SUCCEEDED, job.error)
+        content = self._download(job)
+        self.assertGreater(sum(pages), 2)
+        self.assertEqual(len(re.findall(rb'/Type /Page\b', content)), sum(pages))
+        self.assertTrue(content.rstrip().endswith(b'%%EOF'))
+
+    @override_settings(PDF_EXPORT_WORKERS=2)
+    def test_missing_pdfs_are_rendered_in_a_process_pool(self):
+        # Renderizar en el proceso del job haría fallar la exportación.
+        with mock.patch('apps.invoices.pdf_cache.render_invoice_pdf', side_effect=AssertionError):
+            job = self._export('invoices:invoice-pdf-export', {'date_from': '2026-03-01', 'date_to': '2026-03-31'})
+
+        self.assertEqual(job.status, Job.Status.SUCCEEDED, job.error)
+        with zipfile.ZipFile(io.BytesIO(self._download(job))) as archive:
+            for name in archive.namelist():
+                self.assertEqual(len(re.findall(rb'/Type /Page\b', archive.read(name))), 1)
+        self.assertEqual(
+            RenderedDocument.objects.filter(document_id__in=[invoice.pk for invoice in self.march_invoices]).count(), 3
+        )
+
+    def test_quote_zip_export(self):
+        for number in (1, 2):
+            quote = Quote.objects.create(business=self.business, number=f'P-{number:06d}', customer_name='Ana')
+            QuoteItem.objects.create(
+                quote=quote, name_snapshot='Servicio', quantity=Decimal('1'), unit_price=Decimal('10'),
+                total_line=Decimal('10'),
+            )
+
+        job = self._export('sales:quote-pdf-export', {'status': 'draft'})
+
+        self.assertEqual(job.status, Job.Status.SUCCEEDED, job.error)
+        with zipfile.ZipFile(io.BytesIO(self._download(job))) as archive:
+            self.assertEqual(sorted(archive.namelist()), ['Presupuesto_P-000001.pdf', 'Presupuesto_P-000002.pdf'])
+
+    def test_invalid_filters_and_empty_exports(self):
+        response = self.client.post(
+            reverse('invoices:invoice-pdf-export'), {'date_from': '2026-04-01', 'date_to': '2026-03-01'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('date_to', response.data)
+
+        response = self.client.post(reverse('invoices:invoice-pdf-export'), {'status': 'pagada'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        job = self._export('invoices:invoice-pdf-export', {'date_from': '2025-01-01', 'date_to': '2025-01-31'})
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertIn('No hay documentos', job.error)
@@ -4,6 +4,7 @@ from .views import (
   InvoiceDetailView,
   InvoiceIssueView,
   InvoiceListView,
+  InvoicePDFExportView,
   InvoicePDFView,
   InvoiceSeriesListView,
   DocumentSeriesListCreateView,
@@ -17,6 +18,7 @@ urlpatterns = [
   path('', InvoiceListView.as_view(), name='invoice-list'),
   path('series/', InvoiceSeriesListView.as_view(), name='invoice-series'),
   path('issue/', InvoiceIssueView.as_view(), name='invoice-issue'),
+  path('pdf-export/', InvoicePDFExportView.as_view(), name='invoice-pdf-export'),
   path('<uuid:pk>/', InvoiceDetailView.as_view(), name='invoice-detail'),
   path('<uuid:pk>/pdf/', InvoicePDFView.as_view(), name='invoice-pdf'),
   # Document series (nuevo sistema unificado)
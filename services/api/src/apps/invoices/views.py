@@ -3,7 +3,6 @@ from __future__ import annotations
 import logging
 from datetime import datetime
 
-from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
 from rest_framework import generics, status
@@ -17,9 +16,13 @@ from apps.accounts.permissions import HasBusinessMembership, HasPermission, HasE
 from apps.accounts.rbac import permissions_for_service
 from apps.business.scope import resolve_scope_ids
 from apps.business.services import get_business_document_config
+from apps.jobs.services import enqueue_job
+from apps.jobs.views import idempotency_key_from, job_accepted_response, prefers_async
+from common.downloads import cached_file_response
 from .models import Invoice, InvoiceSeries, DocumentSeries
-from .pdf import render_invoice_pdf
+from .pdf_cache import PDF_CONTENT_TYPE, invoice_document_pdf
 from .serializers import (
+  DocumentPDFExportSerializer,
   InvoiceDetailSerializer,
   InvoiceIssueSerializer,
   InvoiceListSerializer,
@@ -150,8 +153,18 @@ class InvoicePDFView(APIView):
         status=status.HTTP_422_UNPROCESSABLE_ENTITY,
       )
 
+    if prefers_async(request):
+      job, created = enqueue_job(
+        business=business,
+        kind='invoice_pdf',
+        user=request.user,
+        params={'invoice_id': str(invoice.pk)},
+        idempotency_key=idempotency_key_from(request),
+      )
+      return job_accepted_response(request, job, created)
+
     try:
-      pdf_bytes = render_invoice_pdf(invoice)
+      rendered = invoice_document_pdf(invoice).rendered()
     except Exception:
       logger.exception('Error inesperado al generar PDF de factura pk=%s', pk)
       return Response(
@@ -159,9 +172,35 @@ class InvoicePDFView(APIView):
         status=status.HTTP_500_INTERNAL_SERVER_ERROR,
       )
 
-    response = HttpResponse(pdf_bytes, content_type='application/pdf')
-    response['Content-Disposition'] = f'inline; filename="factura-{invoice.full_number}.pdf"'
-    return response
+    return cached_file_response(
+      request,
+      rendered.file,
+      etag=rendered.cache_key,
+      last_modified=rendered.created_at,
+      size=rendered.size,
+      content_type=PDF_CONTENT_TYPE,
+      filename=f'factura-{invoice.full_number}.pdf',
+    )
+
+
+class InvoicePDFExportView(APIView):
+  """Exporta en segundo plano los PDFs de las facturas filtradas (ZIP o un único PDF)."""
+  permission_classes = [IsAuthenticated, HasBusinessMembership, HasEntitlement, HasPermission]
+  required_entitlement = 'gestion.invoices'
+  required_permission = 'view_invoices'
+
+  def post(self, request):
+    business = getattr(request, 'business')
+    serializer = DocumentPDFExportSerializer(data=request.data, status_choices=Invoice.Status.values)
+    serializer.is_valid(raise_exception=True)
+    job, created = enqueue_job(
+      business=business,
+      kind='invoice_pdf_export',
+      user=request.user,
+      params=serializer.job_params(),
+      idempotency_key=idempotency_key_from(request),
+    )
+    return job_accepted_response(request, job, created)
 
 
 class DocumentSeriesListCreateView(APIView):
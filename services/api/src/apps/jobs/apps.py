@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+  default_auto_field = 'django.db.models.BigAutoField'
+  name = 'apps.jobs'
+
+  def ready(self):
+    # Cada app declara sus handlers en su propio módulo `jobs.py`.
+    autodiscover_modules('jobs')
@@ -0,0 +1,61 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+
+
+class Job(models.Model):
+  """Trabajo en segundo plano (importación, exportación, PDF, reporte).
+
+  El handler se elige por `kind` (ver `apps.jobs.registry`); el resultado
+  descargable queda en `artifact` y el resumen JSON en `result`.
+  """
+
+  class Status(models.TextChoices):
+    PENDING = 'pending', 'Pendiente'
+    RUNNING = 'running', 'En ejecución'
+    SUCCEEDED = 'succeeded', 'Completado'
+    FAILED = 'failed', 'Fallido'
+
+  id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+  business = models.ForeignKey('business.Business', related_name='jobs', on_delete=models.CASCADE)
+  created_by = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='jobs', on_delete=models.SET_NULL, null=True, blank=True)
+  kind = models.CharField(max_length=64)
+  status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+  params = models.JSONField(default=dict, blank=True)
+  input_file = models.FileField(upload_to='jobs/inputs/', blank=True)
+  idempotency_key = models.CharField(max_length=128, blank=True)
+  progress_done = models.PositiveIntegerField(default=0)
+  progress_total = models.PositiveIntegerField(null=True, blank=True)
+  result = models.JSONField(default=dict, blank=True)
+  artifact = models.FileField(upload_to='jobs/artifacts/', blank=True)
+  artifact_name = models.CharField(max_length=255, blank=True)
+  artifact_content_type = models.CharField(max_length=100, blank=True)
+  error = models.TextField(blank=True)
+  attempts = models.PositiveSmallIntegerField(default=0)
+  max_attempts = models.PositiveSmallIntegerField(default=3)
+  created_at = models.DateTimeField(auto_now_add=True)
+  updated_at = models.DateTimeField(auto_now=True)
+  started_at = models.DateTimeField(null=True, blank=True)
+  finished_at = models.DateTimeField(null=True, blank=True)
+
+  class Meta:
+    ordering = ['-created_at']
+    indexes = [
+      models.Index(fields=['business', 'created_at']),
+    ]
+    constraints = [
+      models.UniqueConstraint(
+        fields=['business', 'kind', 'idempotency_key'],
+        condition=~Q(idempotency_key=''),
+        name='jobs_job_idempotency_key_unique',
+      ),
+    ]
+
+  def __str__(self) -> str:  # pragma: no cover
+    return f"{self.kind} · {self.business_id} · {self.status}"
+
+  @property
+  def is_finished(self) -> bool:
+    return self.status in {self.Status.SUCCEEDED, self.Status.FAILED}
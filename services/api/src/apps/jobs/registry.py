@@ -0,0 +1,98 @@
+"""Registro de handlers de trabajos en segundo plano.
+
+Un handler es una función que recibe un `JobContext` y devuelve un dict
+serializable (queda en `Job.result`). Se registra con `@register_job(kind)`
+desde el módulo `jobs.py` de cada app, que `JobsConfig.ready` autodescubre.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from django.core.files.base import ContentFile, File
+from django.utils import timezone
+
+
+class JobError(Exception):
+  """Error definitivo: el trabajo falla sin reintentos y el mensaje se muestra al usuario."""
+
+
+class RetryableJobError(Exception):
+  """Error transitorio: el trabajo se reintenta mientras queden intentos."""
+
+
+@dataclass(frozen=True)
+class JobHandler:
+  kind: str
+  func: Callable[['JobContext'], Optional[dict]]
+  # Permiso requerido para consultar o descargar el trabajo (además de la membership).
+  permission: Optional[str] = None
+  max_attempts: int = 3
+
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+def register_job(kind: str, *, permission: Optional[str] = None, max_attempts: int = 3):
+  def decorator(func):
+    _handlers[kind] = JobHandler(kind=kind, func=func, permission=permission, max_attempts=max_attempts)
+    return func
+  return decorator
+
+
+def get_job_handler(kind: str) -> JobHandler:
+  try:
+    return _handlers[kind]
+  except KeyError:
+    raise JobError(f'Tipo de trabajo desconocido: {kind}.') from None
+
+
+def registered_job_kinds() -> list[str]:
+  return sorted(_handlers)
+
+
+class JobContext:
+  """Lo que un handler ve del trabajo: parámetros, negocio, avance y artefacto."""
+
+  def __init__(self, job):
+    self.job = job
+
+  @property
+  def business(self):
+    return self.job.business
+
+  @property
+  def user(self):
+    return self.job.created_by
+
+  @property
+  def params(self) -> dict:
+    return self.job.params or {}
+
+  @property
+  def input_file(self):
+    return self.job.input_file if self.job.input_file else None
+
+  def set_progress(self, done: int, total: Optional[int] = None) -> None:
+    from .models import Job
+
+    self.job.progress_done = done
+    if total is not None:
+      self.job.progress_total = total
+    # update() directo: el avance se publica aunque el handler corra dentro de una transacción larga.
+    Job.objects.filter(pk=self.job.pk).update(
+      progress_done=done,
+      progress_total=self.job.progress_total,
+      updated_at=timezone.now(),
+    )
+
+  def save_artifact(self, filename: str, content, content_type: str) -> None:
+    """`content` son bytes o un archivo abierto (exportaciones grandes armadas en disco)."""
+    if self.job.artifact:
+      self.job.artifact.delete(save=False)
+    data = ContentFile(content) if isinstance(content, bytes) else File(content)
+    self.job.artifact.save(f'{self.job.pk}-{filename}', data, save=False)
+    self.job.artifact_name = filename
+    self.job.artifact_content_type = content_type
+    self.job.save(update_fields=['artifact', 'artifact_name', 'artifact_content_type', 'updated_at'])
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from django.urls import reverse
+from rest_framework import serializers
+
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+  progress = serializers.SerializerMethodField()
+  download_url = serializers.SerializerMethodField()
+
+  class Meta:
+    model = Job
+    fields = [
+      'id',
+      'kind',
+      'status',
+      'progress',
+      'result',
+      'error',
+      'attempts',
+      'max_attempts',
+      'artifact_name',
+      'download_url',
+      'created_at',
+      'started_at',
+      'finished_at',
+    ]
+    read_only_fields = fields
+
+  def get_progress(self, obj: Job):
+    return {'done': obj.progress_done, 'total': obj.progress_total}
+
+  def get_download_url(self, obj: Job):
+    if obj.status != Job.Status.SUCCEEDED or not obj.artifact:
+      return None
+    url = reverse('jobs:job-download', kwargs={'pk': obj.pk})
+    request = self.context.get('request')
+    return request.build_absolute_uri(url) if request else url
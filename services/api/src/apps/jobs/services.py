@@ -0,0 +1,169 @@
+"""Alta y ejecución de trabajos en segundo plano.
+
+`enqueue_job` crea el Job (idempotente por `idempotency_key`) y lo despacha a
+Celery al confirmar la transacción. Con `JOBS_RUN_INLINE` o
+`CELERY_TASK_ALWAYS_EAGER` activos se ejecuta en el mismo proceso, que es lo
+que usan los tests y los entornos sin worker.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+from .registry import JobContext, JobError, RetryableJobError, get_job_handler
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_DELAY_SECONDS = 5
+
+
+class JobRetry(Exception):
+  """Señal interna: el intento falló y el trabajo quedó pendiente de reintento."""
+
+  def __init__(self, countdown: int):
+    super().__init__(countdown)
+    self.countdown = countdown
+
+
+def jobs_run_inline() -> bool:
+  return bool(getattr(settings, 'JOBS_RUN_INLINE', False) or getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False))
+
+
+def _stale_after() -> timedelta:
+  return timedelta(seconds=getattr(settings, 'JOBS_STALE_AFTER_SECONDS', 60 * 60))
+
+
+def enqueue_job(
+  *,
+  business,
+  kind: str,
+  user=None,
+  params: Optional[dict] = None,
+  input_file=None,
+  idempotency_key: str = '',
+) -> Tuple[Job, bool]:
+  """Crea y despacha un trabajo. Devuelve (job, created).
+
+  Si ya existe un trabajo del mismo tipo con la misma clave de idempotencia en
+  el negocio, se devuelve ese sin volver a ejecutarlo.
+  """
+  handler = get_job_handler(kind)
+  idempotency_key = (idempotency_key or '').strip()[:128]
+  if idempotency_key:
+    existing = Job.objects.filter(business=business, kind=kind, idempotency_key=idempotency_key).first()
+    if existing is not None:
+      return existing, False
+
+  job = Job(
+    business=business,
+    kind=kind,
+    created_by=user if getattr(user, 'is_authenticated', False) else None,
+    params=params or {},
+    idempotency_key=idempotency_key,
+    max_attempts=handler.max_attempts,
+  )
+  if input_file is not None:
+    job.input_file.save(getattr(input_file, 'name', '') or 'input', input_file, save=False)
+  try:
+    with transaction.atomic():
+      job.save()
+  except IntegrityError:
+    # Dos requests con la misma clave en paralelo: gana el primero.
+    if job.input_file:
+      job.input_file.delete(save=False)
+    existing = Job.objects.filter(business=business, kind=kind, idempotency_key=idempotency_key).first()
+    if existing is None:
+      raise
+    return existing, False
+
+  dispatch_job(job)
+  if jobs_run_inline():
+    job.refresh_from_db()
+  return job, True
+
+
+def dispatch_job(job: Job) -> None:
+  if jobs_run_inline():
+    run_job_inline(job.pk)
+    return
+  from .tasks import run_job_task
+
+  job_id = str(job.pk)
+  transaction.on_commit(lambda: run_job_task.delay(job_id))
+
+
+def run_job_inline(job_id) -> Job:
+  """Ejecuta el trabajo en el proceso actual, agotando los reintentos sin esperas."""
+  while True:
+    try:
+      return run_job(job_id)
+    except JobRetry:
+      continue
+
+
+def _claim(job_id) -> bool:
+  now = timezone.now()
+  claimable = Q(status=Job.Status.PENDING) | Q(status=Job.Status.RUNNING, started_at__lt=now - _stale_after())
+  return bool(
+    Job.objects.filter(claimable, pk=job_id).update(
+      status=Job.Status.RUNNING,
+      started_at=now,
+      attempts=F('attempts') + 1,
+      updated_at=now,
+    )
+  )
+
+
+def _finish(job: Job, status: str, *, error: str = '', result: Optional[dict] = None) -> None:
+  job.status = status
+  job.error = error
+  job.finished_at = timezone.now()
+  update_fields = ['status', 'error', 'finished_at', 'updated_at']
+  if result is not None:
+    job.result = result
+    update_fields.append('result')
+  if status == Job.Status.SUCCEEDED and job.progress_total is not None:
+    job.progress_done = job.progress_total
+    update_fields.append('progress_done')
+  job.save(update_fields=update_fields)
+
+
+def run_job(job_id) -> Job:
+  """Ejecuta un intento del trabajo.
+
+  Es seguro ante entregas duplicadas: solo corre si logra tomar el trabajo
+  (pendiente, o en ejecución hace más de `JOBS_STALE_AFTER_SECONDS`). Lanza
+  `JobRetry` cuando el intento falló y quedan reintentos.
+  """
+  if not _claim(job_id):
+    return Job.objects.get(pk=job_id)
+
+  job = Job.objects.select_related('business', 'created_by').get(pk=job_id)
+  try:
+    handler = get_job_handler(job.kind)
+    result = handler.func(JobContext(job)) or {}
+  except JobError as exc:
+    _finish(job, Job.Status.FAILED, error=str(exc))
+    return job
+  except Exception as exc:
+    if not isinstance(exc, RetryableJobError):
+      logger.exception('Error inesperado en el trabajo %s (%s), intento %s', job.pk, job.kind, job.attempts)
+    if job.attempts < job.max_attempts:
+      job.status = Job.Status.PENDING
+      job.error = str(exc) if isinstance(exc, RetryableJobError) else ''
+      job.save(update_fields=['status', 'error', 'updated_at'])
+      raise JobRetry(RETRY_BASE_DELAY_SECONDS * 2 ** (job.attempts - 1)) from exc
+    message = str(exc) if isinstance(exc, RetryableJobError) else 'Ocurrió un error inesperado al procesar el trabajo.'
+    _finish(job, Job.Status.FAILED, error=message)
+    return job
+
+  _finish(job, Job.Status.SUCCEEDED, result=result)
+  return job
@@ -0,0 +1,11 @@
+from celery import shared_task
+
+from .services import JobRetry, run_job
+
+
+@shared_task(bind=True, name='jobs.run_job', acks_late=True, max_retries=None)
+def run_job_task(self, job_id: str) -> None:
+  try:
+    run_job(job_id)
+  except JobRetry as exc:
+    raise self.retry(countdown=exc.countdown)
@@ -0,0 +1,111 @@
+import shutil
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Membership
+from apps.business.models import Business, BusinessPlan, Subscription
+from apps.jobs.models import Job
+from apps.jobs.registry import JobError, RetryableJobError, register_job
+from apps.jobs.services import enqueue_job
+from apps.menu.models import MenuCategory, MenuItem
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+_flaky_calls = {'count': 0}
+
+
+@register_job('test_flaky')
+def _flaky_handler(ctx):
+  _flaky_calls['count'] += 1
+  if _flaky_calls['count'] == 1:
+    raise RetryableJobError('Servicio no disponible.')
+  ctx.set_progress(3, 3)
+  return {'ok': True}
+
+
+@register_job('test_invalid')
+def _invalid_handler(ctx):
+  raise JobError('Parámetros inválidos.')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, JOBS_RUN_INLINE=True)
+class JobRunnerTests(APITestCase):
+  @classmethod
+  def tearDownClass(cls):
+    super().tearDownClass()
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+  def setUp(self):
+    _flaky_calls['count'] = 0
+    self.business = Business.objects.create(name='Jobs Biz', default_service='restaurante')
+    Subscription.objects.create(business=self.business, plan=BusinessPlan.PLUS, status='active')
+    self.owner = get_user_model().objects.create_user(username='jobs-owner', email='owner@jobs.com', password='pass')
+    Membership.objects.create(user=self.owner, business=self.business, role='owner')
+    category = MenuCategory.objects.create(business=self.business, name='Bebidas', description='', position=1)
+    MenuItem.objects.create(business=self.business, category=category, name='Limonada', price=Decimal('80.00'))
+
+  def _authenticate(self, user):
+    self.client.force_authenticate(user)
+    self.client.cookies['bid'] = str(self.business.id)
+
+  def test_async_menu_export_produces_downloadable_artifact(self):
+    self._authenticate(self.owner)
+    response = self.client.get(reverse('menu:export'), HTTP_PREFER='respond-async')
+
+    self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+    self.assertEqual(response.data['status'], Job.Status.SUCCEEDED)
+    self.assertIn(str(response.data['id']), response['Location'])
+
+    detail = self.client.get(reverse('jobs:job-detail', kwargs={'pk': response.data['id']}))
+    self.assertEqual(detail.status_code, status.HTTP_200_OK)
+    self.assertIsNotNone(detail.data['download_url'])
+
+    download = self.client.get(reverse('jobs:job-download', kwargs={'pk': response.data['id']}))
+    self.assertEqual(download.status_code, status.HTTP_200_OK)
+    self.assertTrue(b''.join(download.streaming_content).startswith(b'PK'))
+
+  def test_idempotency_key_returns_existing_job(self):
+    self._authenticate(self.owner)
+    url = reverse('menu:export')
+    first = self.client.get(url, HTTP_PREFER='respond-async', HTTP_IDEMPOTENCY_KEY='export-1')
+    second = self.client.get(url, HTTP_PREFER='respond-async', HTTP_IDEMPOTENCY_KEY='export-1')
+
+    self.assertEqual(second.status_code, status.HTTP_200_OK)
+    self.assertEqual(first.data['id'], second.data['id'])
+    self.assertEqual(Job.objects.filter(kind='menu_export').count(), 1)
+
+  def test_without_prefer_header_stays_synchronous(self):
+    self._authenticate(self.owner)
+    response = self.client.get(reverse('menu:export'))
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertFalse(Job.objects.exists())
+
+  def test_retryable_error_is_retried(self):
+    job, created = enqueue_job(business=self.business, kind='test_flaky', user=self.owner)
+    self.assertTrue(created)
+    self.assertEqual(job.status, Job.Status.SUCCEEDED)
+    self.assertEqual(job.attempts, 2)
+    self.assertEqual((job.progress_done, job.progress_total), (3, 3))
+    self.assertEqual(job.result, {'ok': True})
+
+  def test_job_error_fails_without_retry(self):
+    job, _ = enqueue_job(business=self.business, kind='test_invalid', user=self.owner)
+    self.assertEqual(job.status, Job.Status.FAILED)
+    self.assertEqual(job.attempts, 1)
+    self.assertEqual(job.error, 'Parámetros inválidos.')
+
+  def test_other_members_without_permission_cannot_see_job(self):
+    job, _ = enqueue_job(business=self.business, kind='menu_export', user=self.owner)
+    cashier = get_user_model().objects.create_user(username='jobs-cashier', email='cashier@jobs.com', password='pass')
+    Membership.objects.create(user=cashier, business=self.business, role='cashier')
+    self._authenticate(cashier)
+
+    response = self.client.get(reverse('jobs:job-detail', kwargs={'pk': job.pk}))
+    self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    self.assertEqual(self.client.get(reverse('jobs:job-list')).data, [])
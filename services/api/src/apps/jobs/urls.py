@@ -0,0 +1,11 @@
+from django.urls import path
+
+from .views import JobDetailView, JobDownloadView, JobListView
+
+app_name = 'jobs'
+
+urlpatterns = [
+  path('', JobListView.as_view(), name='job-list'),
+  path('<uuid:pk>/', JobDetailView.as_view(), name='job-detail'),
+  path('<uuid:pk>/download/', JobDownloadView.as_view(), name='job-download'),
+]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.accounts.permissions import HasBusinessMembership, request_has_permission
+from .models import Job
+from .registry import JobError, get_job_handler
+from .serializers import JobSerializer
+
+JOB_LIST_LIMIT = 50
+
+
+def prefers_async(request) -> bool:
+  """El cliente pidió procesamiento en segundo plano con `Prefer: respond-async`."""
+  prefer = request.headers.get('Prefer', '')
+  return any(token.strip().lower() == 'respond-async' for token in prefer.split(','))
+
+
+def idempotency_key_from(request) -> str:
+  return (request.headers.get('Idempotency-Key') or '').strip()
+
+
+def job_accepted_response(request, job: Job, created: bool = True) -> Response:
+  """202 con el trabajo y su URL de seguimiento (200 si una repetición encontró uno ya terminado)."""
+  data = JobSerializer(job, context={'request': request}).data
+  code = status.HTTP_200_OK if not created and job.is_finished else status.HTTP_202_ACCEPTED
+  response = Response(data, status=code)
+  response['Location'] = request.build_absolute_uri(reverse('jobs:job-detail', kwargs={'pk': job.pk}))
+  return response
+
+
+def _can_access(request, job: Job) -> bool:
+  if job.created_by_id is not None and job.created_by_id == request.user.id:
+    return True
+  try:
+    handler = get_job_handler(job.kind)
+  except JobError:
+    return False
+  return bool(handler.permission) and request_has_permission(request, handler.permission)
+
+
+def _get_job(request, pk) -> Job:
+  job = get_object_or_404(Job, pk=pk, business=getattr(request, 'business'))
+  if not _can_access(request, job):
+    # Mismo 404 que un id inexistente: no revelamos trabajos ajenos.
+    raise Http404
+  return job
+
+
+class JobListView(generics.GenericAPIView):
+  permission_classes = [IsAuthenticated, HasBusinessMembership]
+  serializer_class = JobSerializer
+
+  def get(self, request):
+    business = getattr(request, 'business')
+    queryset = Job.objects.filter(business=business, created_by=request.user)
+    kind = request.query_params.get('kind')
+    if kind:
+      queryset = queryset.filter(kind=kind)
+    job_status = request.query_params.get('status')
+    if job_status:
+      queryset = queryset.filter(status=job_status)
+    serializer = self.get_serializer(queryset[:JOB_LIST_LIMIT], many=True)
+    return Response(serializer.data)
+
+
+class JobDetailView(APIView):
+  permission_classes = [IsAuthenticated, HasBusinessMembership]
+
+  def get(self, request, pk):
+    job = _get_job(request, pk)
+    return Response(JobSerializer(job, context={'request': request}).data)
+
+
+class JobDownloadView(APIView):
+  permission_classes = [IsAuthenticated, HasBusinessMembership]
+
+  def get(self, request, pk):
+    job = _get_job(request, pk)
+    if job.status != Job.Status.SUCCEEDED:
+      return Response(
+        {'detail': 'El trabajo todavía no terminó.', 'status': job.status},
+        status=status.HTTP_409_CONFLICT,
+      )
+    if not job.artifact:
+      return Response({'detail': 'Este trabajo no genera un archivo descargable.'}, status=status.HTTP_404_NOT_FOUND)
+    return FileResponse(
+      job.artifact.open('rb'),
+      as_attachment=True,
+      filename=job.artifact_name or 'archivo',
+      content_type=job.artifact_content_type or 'application/octet-stream',
+    )
@@ -5,3 +5,6 @@ class MenuConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.menu'
     verbose_name = 'Carta'
+
+    def ready(self):
+        import apps.menu.signals  # noqa: F401
@@ -0,0 +1,30 @@
+"""Handlers de trabajos en segundo plano de la carta (ver `apps.jobs.registry`)."""
+
+from __future__ import annotations
+
+from django.utils import timezone
+
+from apps.jobs.registry import JobContext, JobError, register_job
+from .importer import MenuImportError, apply_menu_import, export_menu_to_workbook
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+@register_job('menu_import', permission='import_menu', max_attempts=1)
+def run_menu_import(ctx: JobContext) -> dict:
+    # Un solo intento: la importación no es idempotente si falla a mitad de camino.
+    if ctx.input_file is None:
+        raise JobError('El trabajo no tiene un archivo para importar.')
+    with ctx.input_file.open('rb') as file_obj:
+        try:
+            return apply_menu_import(file_obj, business=ctx.business)
+        except MenuImportError as exc:
+            raise JobError(str(exc)) from exc
+
+
+@register_job('menu_export', permission='export_menu')
+def run_menu_export(ctx: JobContext) -> dict:
+    content = export_menu_to_workbook(business=ctx.business)
+    filename = f"carta-{timezone.now().strftime('%Y%m%d-%H%M%S')}.xlsx"
+    ctx.save_artifact(filename, content, XLSX_CONTENT_TYPE)
+    return {'filename': filename}
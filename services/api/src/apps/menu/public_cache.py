@@ -0,0 +1,103 @@
+"""
+Cache del payload público de la carta (PublicMenuBySlugView).
+
+Cada negocio tiene un sello de versión de contenido en el cache. Cualquier
+escritura sobre el menú, su branding, engagement, configuración pública o la
+suscripción lo rota (ver `apps.menu.signals`), y las entradas cacheadas por
+slug solo se sirven mientras su sello coincida con el vigente. Así un scan en
+caliente no toca la base de datos.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import uuid
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+PUBLIC_MENU_CACHE_PREFIX = 'menu-public'
+PUBLIC_MENU_CACHE_TTL = getattr(settings, 'PUBLIC_MENU_CACHE_TTL_SECONDS', 60 * 60)
+PUBLIC_MENU_MAX_AGE = getattr(settings, 'PUBLIC_MENU_MAX_AGE_SECONDS', 30)
+PUBLIC_MENU_SHARED_MAX_AGE = getattr(settings, 'PUBLIC_MENU_SHARED_MAX_AGE_SECONDS', 60)
+PUBLIC_MENU_STALE_WHILE_REVALIDATE = getattr(settings, 'PUBLIC_MENU_STALE_WHILE_REVALIDATE_SECONDS', 300)
+
+
+def _version_key(business_id) -> str:
+    return f'{PUBLIC_MENU_CACHE_PREFIX}:ver:{business_id}'
+
+
+def _payload_key(slug: str, host: str) -> str:
+    # El host forma parte de la clave porque las URLs de imágenes son absolutas.
+    return f'{PUBLIC_MENU_CACHE_PREFIX}:payload:{slug}:{host}'
+
+
+def menu_content_version(business_id) -> str:
+    key = _version_key(business_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key) or version
+    return version
+
+
+def _rotate(business_id) -> None:
+    cache.set(_version_key(business_id), uuid.uuid4().hex, timeout=None)
+
+
+def bump_menu_content_version(business_id) -> None:
+    """Invalida el payload público del negocio (ahora y al confirmar la transacción)."""
+    if business_id is None:
+        return
+    _rotate(business_id)
+    transaction.on_commit(lambda: _rotate(business_id))
+
+
+def compute_etag(payload) -> str:
+    body = json.dumps(payload, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'))
+    return '"%s"' % hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+def get_cached_public_menu(slug: str, host: str) -> Optional[Tuple[dict, str]]:
+    """Devuelve (payload, etag) si hay una entrada vigente para el slug."""
+    entry = cache.get(_payload_key(slug, host))
+    if entry is None:
+        return None
+    current = cache.get(_version_key(entry['business_id']))
+    if current is None or current != entry['version']:
+        return None
+    return entry['payload'], entry['etag']
+
+
+def store_public_menu(slug: str, host: str, business_id, version: str, payload) -> Tuple[dict, str]:
+    """
+    Guarda el payload con el sello `version`, que debe leerse antes de
+    construirlo: si hubo una escritura en el medio, la entrada nace vieja.
+    """
+    payload = json.loads(json.dumps(payload, cls=DjangoJSONEncoder))
+    etag = compute_etag(payload)
+    cache.set(
+        _payload_key(slug, host),
+        {'business_id': business_id, 'version': version, 'payload': payload, 'etag': etag},
+        PUBLIC_MENU_CACHE_TTL,
+    )
+    return payload, etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates
+
+
+def public_cache_control() -> str:
+    return (
+        f'public, max-age={PUBLIC_MENU_MAX_AGE}, s-maxage={PUBLIC_MENU_SHARED_MAX_AGE}, '
+        f'stale-while-revalidate={PUBLIC_MENU_STALE_WHILE_REVALIDATE}'
+    )
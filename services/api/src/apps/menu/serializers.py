@@ -262,8 +262,11 @@ class PublicMenuCategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description', 'position', 'items']
 
     def get_items(self, obj):
-        # We show all items to indicate availability status
-        items = obj.items.all().order_by('position', 'name')
+        # We show all items to indicate availability status.
+        # `items_by_category` viene armado en memoria por la vista pública;
+        # sin él, .all() respeta el orden del modelo y un eventual prefetch.
+        items_by_category = self.context.get('items_by_category')
+        items = items_by_category.get(obj.id, []) if items_by_category is not None else obj.items.all()
         return PublicMenuItemSerializer(
             items,
             many=True,
@@ -515,8 +518,11 @@ class PublicMenuLayoutBlockCategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description', 'items']
 
     def get_items(self, obj):
-        # .all() hits the prefetch cache set in PublicMenuBySlugView
-        items = obj.category.items.all()
+        items_by_category = self.context.get('items_by_category')
+        if items_by_category is not None:
+            items = items_by_category.get(obj.category_id, [])
+        else:
+            items = obj.category.items.all()
         return PublicMenuItemSerializer(items, many=True, context=self.context).data
 
 
@@ -532,13 +538,14 @@ class PublicMenuLayoutBlockSerializer(serializers.ModelSerializer):
         ]
 
     def get_categories(self, obj):
-        block_cats = (
-            obj.block_categories
-            .select_related('category')
-            .prefetch_related('category__items')
-            .order_by('position', 'category__name')
-        )
-        # Filter: only active categories with at least one item
+        # `block_categories` (context) trae los vínculos de todos los bloques
+        # resueltos en una sola consulta; sin él se usa la relación (y su prefetch).
+        links_by_block = self.context.get('block_categories')
+        if links_by_block is not None:
+            block_cats = links_by_block.get(obj.id, [])
+        else:
+            block_cats = obj.block_categories.all()
+        # Filter: only active categories
         active = [bc for bc in block_cats if bc.category.is_active]
         return PublicMenuLayoutBlockCategorySerializer(
             active, many=True, context=self.context
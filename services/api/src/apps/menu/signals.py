@@ -0,0 +1,57 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.business.models import Business, Subscription, SubscriptionAddon
+from .models import (
+    MenuBrandingSettings,
+    MenuCategory,
+    MenuEngagementSettings,
+    MenuItem,
+    MenuLayoutBlock,
+    MenuLayoutBlockCategory,
+    PublicMenuConfig,
+)
+from .public_cache import bump_menu_content_version
+
+
+BUSINESS_SCOPED_MODELS = (
+    MenuItem,
+    MenuCategory,
+    MenuLayoutBlock,
+    MenuBrandingSettings,
+    MenuEngagementSettings,
+    PublicMenuConfig,
+    Subscription,
+)
+
+
+def _invalidate_business_menu(sender, instance, **kwargs):
+    bump_menu_content_version(instance.business_id)
+
+
+for _model in BUSINESS_SCOPED_MODELS:
+    post_save.connect(_invalidate_business_menu, sender=_model, dispatch_uid=f'menu-public-save-{_model.__name__}')
+    post_delete.connect(_invalidate_business_menu, sender=_model, dispatch_uid=f'menu-public-delete-{_model.__name__}')
+
+
+@receiver(post_save, sender=MenuLayoutBlockCategory)
+@receiver(post_delete, sender=MenuLayoutBlockCategory)
+def invalidate_block_category_menu(sender, instance, **kwargs):
+    business_id = (
+        MenuLayoutBlock.objects.filter(pk=instance.block_id).values_list('business_id', flat=True).first()
+    )
+    bump_menu_content_version(business_id)
+
+
+@receiver(post_save, sender=SubscriptionAddon)
+@receiver(post_delete, sender=SubscriptionAddon)
+def invalidate_addon_menu(sender, instance, **kwargs):
+    business_id = (
+        Subscription.objects.filter(pk=instance.subscription_id).values_list('business_id', flat=True).first()
+    )
+    bump_menu_content_version(business_id)
+
+
+@receiver(post_save, sender=Business)
+def invalidate_business_name_menu(sender, instance, **kwargs):
+    bump_menu_content_version(instance.pk)
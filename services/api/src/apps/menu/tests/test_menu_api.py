@@ -4,6 +4,7 @@ from decimal import Decimal
 from io import BytesIO
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
 from openpyxl import Workbook
@@ -12,7 +13,7 @@ from rest_framework.test import APITestCase
 
 from apps.accounts.models import Membership
 from apps.business.models import Business, BusinessPlan, Subscription
-from apps.menu.models import MenuCategory, MenuItem
+from apps.menu.models import MenuCategory, MenuItem, PublicMenuConfig
 
 
 class MenuAPITests(APITestCase):
@@ -106,3 +107,31 @@ class MenuAPITests(APITestCase):
       response['Content-Type'], 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
     )
     self.assertIn('attachment; filename="carta-', response['Content-Disposition'])
+
+  def test_public_menu_is_cached_with_etag(self):
+    cache.clear()
+    business = self._create_business()
+    PublicMenuConfig.objects.create(business=business, slug='casa-central', brand_name='Casa', enabled=True)
+    category = MenuCategory.objects.create(business=business, name='Bebidas', description='', position=1)
+    item = MenuItem.objects.create(business=business, category=category, name='Limonada', price=Decimal('80.00'))
+    url = reverse('menu:public-by-slug', args=['casa-central'])
+
+    first = self.client.get(url)
+    self.assertEqual(first.status_code, status.HTTP_200_OK)
+    etag = first['ETag']
+    self.assertIn('s-maxage=', first['Cache-Control'])
+
+    with self.assertNumQueries(0):
+      cached = self.client.get(url)
+    self.assertEqual(cached['ETag'], etag)
+    self.assertEqual(cached.data['categories'][0]['items'][0]['name'], 'Limonada')
+
+    not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+    self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    item.name = 'Limonada con menta'
+    item.save()
+    updated = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+    self.assertEqual(updated.status_code, status.HTTP_200_OK)
+    self.assertNotEqual(updated['ETag'], etag)
+    self.assertEqual(updated.data['categories'][0]['items'][0]['name'], 'Limonada con menta')
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.business.models import Business, BusinessPlan, Subscription
+from apps.menu.models import MenuCategory, MenuItem, MenuLayoutBlock, MenuLayoutBlockCategory, PublicMenuConfig
+from common.query_budget import QUERY_BUDGET_ROWS, query_budget
+
+
+class PublicMenuQueryBudgetTests(APITestCase):
+  def setUp(self):
+    cache.clear()
+    self.business = Business.objects.create(name='Casa Budget', default_service='restaurante')
+    Subscription.objects.create(business=self.business, plan=BusinessPlan.PLUS, status='active')
+    PublicMenuConfig.objects.create(business=self.business, slug='casa-budget', brand_name='Casa', enabled=True)
+    block = MenuLayoutBlock.objects.create(business=self.business, title='Todo', position=1)
+    for index in range(QUERY_BUDGET_ROWS):
+      category = MenuCategory.objects.create(business=self.business, name=f'Categoría {index}', position=index)
+      MenuLayoutBlockCategory.objects.create(block=block, category=category, position=index)
+      for position in range(QUERY_BUDGET_ROWS):
+        MenuItem.objects.create(
+          business=self.business,
+          category=category,
+          name=f'Plato {index}-{position}',
+          price=Decimal('100.00'),
+          position=position,
+        )
+    MenuLayoutBlock.objects.create(business=self.business, title='Vacío', position=2)
+
+  def test_public_menu_by_slug_stays_within_budget(self):
+    with query_budget('menu.public_by_slug'):
+      response = self.client.get(reverse('menu:public-by-slug', args=['casa-budget']))
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(len(response.data['categories']), QUERY_BUDGET_ROWS)
+    self.assertEqual(
+      [item['name'] for item in response.data['categories'][0]['items']],
+      [f'Plato 0-{position}' for position in range(QUERY_BUDGET_ROWS)],
+    )
+    blocks = response.data['layout_blocks']
+    self.assertEqual([block['title'] for block in blocks], ['Todo', 'Vacío'])
+    self.assertEqual(len(blocks[0]['categories']), QUERY_BUDGET_ROWS)
+    self.assertEqual(len(blocks[0]['categories'][2]['items']), QUERY_BUDGET_ROWS)
+    self.assertEqual(blocks[1]['categories'], [])
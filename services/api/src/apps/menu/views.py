@@ -25,8 +25,18 @@ from rest_framework.views import APIView
 
 from apps.accounts.permissions import HasBusinessMembership, HasPermission
 from apps.billing.permissions import CheckFeatureAccess
+from apps.jobs.services import enqueue_job
+from apps.jobs.views import idempotency_key_from, job_accepted_response, prefers_async
 from apps.business.service_policy import require_service
 from .importer import MenuImportError, apply_menu_import, export_menu_to_workbook
+from .public_cache import (
+    bump_menu_content_version,
+    etag_matches,
+    get_cached_public_menu,
+    menu_content_version,
+    public_cache_control,
+    store_public_menu,
+)
 from .qr_entitlements import resolve_menu_qr_flags, get_subscription_for_business
 from .models import (
     MenuBrandingSettings,
@@ -259,6 +269,8 @@ class MenuLayoutBlockReorderView(APIView):
             MenuLayoutBlock.objects.filter(pk=item['id'], business=business).update(
                 position=item['position']
             )
+        # .update() no dispara signals: invalidar la carta pública a mano.
+        bump_menu_content_version(business.id)
         return Response({'detail': 'Reordenado correctamente.'})
 
 
@@ -297,6 +309,15 @@ class MenuImportView(APIView):
         serializer.is_valid(raise_exception=True)
         file_obj = serializer.validated_data['file']
         business = getattr(request, 'business')
+        if prefers_async(request):
+            job, created = enqueue_job(
+                business=business,
+                kind='menu_import',
+                user=request.user,
+                input_file=file_obj,
+                idempotency_key=idempotency_key_from(request),
+            )
+            return job_accepted_response(request, job, created)
         try:
             result = apply_menu_import(file_obj, business=business)
         except MenuImportError as exc:
@@ -350,6 +371,14 @@ class MenuExportView(APIView):
 
     def get(self, request):
         business = getattr(request, 'business')
+        if prefers_async(request):
+            job, created = enqueue_job(
+                business=business,
+                kind='menu_export',
+                user=request.user,
+                idempotency_key=idempotency_key_from(request),
+            )
+            return job_accepted_response(request, job, created)
         content = export_menu_to_workbook(business=business)
         filename = f"carta-{timezone.now().strftime('%Y%m%d-%H%M%S')}.xlsx"
         response = HttpResponse(
@@ -396,66 +425,101 @@ class PublicMenuBySlugView(APIView):
     permission_classes = []
 
     def get(self, request, slug):
-        config = get_object_or_404(
-            PublicMenuConfig.objects.select_related('business'),
-            slug=slug,
-            enabled=True,
-        )
-        branding = ensure_menu_branding(config.business)
-        items_qs = (
-            MenuItem.objects.filter(business=config.business)
-            .order_by('position', 'name')
-        )
-        categories = (
-            MenuCategory.objects.filter(business=config.business, is_active=True)
-            .prefetch_related(Prefetch('items', queryset=items_qs))
-            .order_by('position', 'name')
-        )
+        host = request.get_host()
+        cached = get_cached_public_menu(slug, host)
+        if cached is None:
+            config = get_object_or_404(
+                PublicMenuConfig.objects.select_related('business'),
+                slug=slug,
+                enabled=True,
+            )
+            # ensure_menu_branding puede crear el registro (y rotar la versión):
+            # se resuelve antes de leer el sello para no guardar una entrada vieja.
+            branding = ensure_menu_branding(config.business)
+            version = menu_content_version(config.business_id)
+            payload = _build_public_menu_payload(config, branding, request)
+            cached = store_public_menu(slug, host, config.business_id, version, payload)
+        payload, etag = cached
+
+        if etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(payload)
+        response['ETag'] = etag
+        response['Cache-Control'] = public_cache_control()
+        response['Vary'] = 'Accept'
+        return response
 
-        menu_data = PublicMenuCategorySerializer(
-            categories, many=True, context={'request': request}
-        ).data
-        branding_data = MenuBrandingSettingsSerializer(branding, context={'request': request}).data
-        config_data = PublicMenuConfigSerializer(config).data
 
-        # Layout blocks (template-driven)
-        layout_blocks_qs = (
-            MenuLayoutBlock.objects.filter(business=config.business)
-            .prefetch_related(
-                Prefetch(
-                    'block_categories',
-                    queryset=MenuLayoutBlockCategory.objects.select_related('category')
-                    .prefetch_related(
-                        Prefetch(
-                            'category__items',
-                            queryset=items_qs,
-                        )
-                    )
-                    .order_by('position', 'category__name'),
-                )
-            )
-            .order_by('position', 'title')
-        )
-        layout_blocks_data = PublicMenuLayoutBlockSerializer(
-            layout_blocks_qs, many=True, context={'request': request}
-        ).data
+def _load_public_menu_tree(business) -> dict:
+    """
+    Carga la carta pública con tres consultas planas (categorías activas,
+    ítems y vínculos bloque → categoría) más la de los bloques, y arma el
+    árbol en memoria. Los vínculos reutilizan las mismas instancias de
+    categoría, así los ítems no se vuelven a pedir por bloque.
+    """
+    categories = list(
+        MenuCategory.objects.filter(business=business, is_active=True).order_by('position', 'name')
+    )
+    categories_by_id = {category.id: category for category in categories}
+
+    items_by_category: dict = {category.id: [] for category in categories}
+    items_qs = (
+        MenuItem.objects.filter(business=business, category_id__in=categories_by_id)
+        .order_by('position', 'name')
+    )
+    for item in items_qs:
+        items_by_category[item.category_id].append(item)
+
+    block_categories: dict = {}
+    links_qs = (
+        MenuLayoutBlockCategory.objects.filter(block__business=business, category_id__in=categories_by_id)
+        .order_by('position', 'category__name')
+    )
+    for link in links_qs:
+        link.category = categories_by_id[link.category_id]
+        block_categories.setdefault(link.block_id, []).append(link)
+
+    blocks = list(MenuLayoutBlock.objects.filter(business=business).order_by('position', 'title'))
+    return {
+        'categories': categories,
+        'items_by_category': items_by_category,
+        'block_categories': block_categories,
+        'blocks': blocks,
+    }
 
-        # Build safe public engagement data
-        engagement = _build_public_engagement(config.business, request)
 
-        return Response({
-            'business': {
-                'id': config.business_id,
-                'name': config.business.name,
-            },
-            'slug': config.slug,
-            'public_url': build_public_menu_url(config.slug),
-            'config': config_data,
-            'branding': branding_data,
-            'categories': menu_data,
-            'layout_blocks': layout_blocks_data,
-            'engagement': engagement,
-        })
+def _build_public_menu_payload(config, branding, request) -> dict:
+    tree = _load_public_menu_tree(config.business)
+    context = {
+        'request': request,
+        'items_by_category': tree['items_by_category'],
+        'block_categories': tree['block_categories'],
+    }
+
+    menu_data = PublicMenuCategorySerializer(tree['categories'], many=True, context=context).data
+    branding_data = MenuBrandingSettingsSerializer(branding, context={'request': request}).data
+    config_data = PublicMenuConfigSerializer(config).data
+
+    # Layout blocks (template-driven)
+    layout_blocks_data = PublicMenuLayoutBlockSerializer(tree['blocks'], many=True, context=context).data
+
+    # Build safe public engagement data
+    engagement = _build_public_engagement(config.business, request)
+
+    return {
+        'business': {
+            'id': config.business_id,
+            'name': config.business.name,
+        },
+        'slug': config.slug,
+        'public_url': build_public_menu_url(config.slug),
+        'config': config_data,
+        'branding': branding_data,
+        'categories': menu_data,
+        'layout_blocks': layout_blocks_data,
+        'engagement': engagement,
+    }
 
 
 class PublicMenuResolveView(APIView):
@@ -0,0 +1,80 @@
+"""
+Eventos del tablero de cocina publicados por negocio (ver `common.pubsub`).
+
+Los signals de Order/OrderItem publican deltas al confirmar la transacción;
+`KitchenStreamView` los entrega por SSE. Tipos de evento:
+- `snapshot`: tablero completo (al conectar o si se perdió historial).
+- `order.updated`: la orden completa, cuando está enviada a cocina.
+- `order.removed`: la orden salió del tablero (pagada, cancelada, reabierta).
+- `item.updated` / `item.removed`: cambios de un ítem.
+"""
+import logging
+
+from django.db import transaction
+
+from common.pubsub import get_pubsub
+from .models import Order, OrderItem
+from .serializers_kitchen import KitchenItemSerializer, KitchenOrderSerializer
+
+logger = logging.getLogger(__name__)
+
+KITCHEN_ACTIVE_STATUSES = [
+    OrderItem.KitchenStatus.PENDING,
+    OrderItem.KitchenStatus.IN_PROGRESS,
+    OrderItem.KitchenStatus.READY,
+]
+
+
+def kitchen_channel(business_id) -> str:
+    return f'kitchen:{business_id}'
+
+
+def kitchen_board_queryset(business, *, include_done=False):
+    statuses = list(KITCHEN_ACTIVE_STATUSES)
+    if include_done:
+        statuses.append(OrderItem.KitchenStatus.DONE)
+    return (
+        Order.objects.filter(
+            business=business,
+            status=Order.Status.SENT,
+            items__kitchen_status__in=statuses,
+        )
+        .distinct()
+        .prefetch_related('items')
+        .order_by('opened_at')
+    )
+
+
+def publish_kitchen_event(business_id, event: str, data: dict) -> None:
+    # Un corte del backend no debe romper el flujo de órdenes: las pantallas
+    # se resincronizan con el snapshot al reconectar.
+    try:
+        get_pubsub().publish(kitchen_channel(business_id), event, data)
+    except Exception:
+        logger.exception('No se pudo publicar el evento de cocina %s (business %s)', event, business_id)
+
+
+def _publish_order(business_id, order_id) -> None:
+    order = Order.objects.filter(pk=order_id).prefetch_related('items').first()
+    if order is None:
+        return
+    if order.status == Order.Status.SENT:
+        publish_kitchen_event(business_id, 'order.updated', {'order': KitchenOrderSerializer(order).data})
+    else:
+        publish_kitchen_event(business_id, 'order.removed', {'id': order.pk, 'status': order.status})
+
+
+def order_changed(order: Order) -> None:
+    """Publica el estado final de la orden al confirmar la transacción."""
+    business_id, order_id = order.business_id, order.pk
+    transaction.on_commit(lambda: _publish_order(business_id, order_id))
+
+
+def item_changed(item: OrderItem, business_id) -> None:
+    data = {'order_id': item.order_id, 'item': KitchenItemSerializer(item).data}
+    transaction.on_commit(lambda: publish_kitchen_event(business_id, 'item.updated', data))
+
+
+def item_removed(item: OrderItem, business_id) -> None:
+    data = {'order_id': item.order_id, 'id': item.pk}
+    transaction.on_commit(lambda: publish_kitchen_event(business_id, 'item.removed', data))
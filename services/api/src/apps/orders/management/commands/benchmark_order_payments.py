@@ -0,0 +1,200 @@
+"""
+Benchmark de concurrencia del cobro de órdenes (POST /orders/<id>/pay/).
+
+Lanza N hilos que cobran órdenes en paralelo con un pago dividido (efectivo +
+débito) sobre la sesión de caja abierta del negocio, y mide throughput,
+latencia del cobro, espera del lock de la orden y errores (deadlocks,
+timeouts de lock). Dos escenarios:
+
+- distinct: cada cobro es sobre su propia orden, con los mismos productos
+  (compiten por el stock, el número de venta y la sesión de caja).
+- same: todos los hilos cobran la misma orden (compiten por su fila).
+
+Cada cobro corre en su propia transacción y se revierte al final, así que no
+deja ventas, pagos ni movimientos de stock. El escenario `same` crea una orden
+compartida y la borra al terminar (consume un número de orden).
+
+Uso:
+    python manage.py benchmark_order_payments --business <id> [--workers 16] [--payments 50] [--products 3] [--hold-ms 0]
+
+Ejemplos:
+    python manage.py benchmark_order_payments --business 1
+    python manage.py benchmark_order_payments --business 1 --scenario same --workers 32
+"""
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, connections, transaction
+from rest_framework.exceptions import APIException
+
+from apps.business.models import Business
+from apps.cash.models import Payment
+from apps.cash.services import get_active_session
+from apps.catalog.models import Product
+from apps.orders.models import Order, OrderItem
+from apps.orders.payments import lock_order_for_payment, pay_order
+from apps.sales.sequences import next_order_number
+
+SCENARIOS = ('distinct', 'same')
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _create_order(business, products):
+    order = Order.objects.create(
+        business=business,
+        number=next_order_number(business),
+        status=Order.Status.SENT,
+        total_amount=sum((product.price for product in products), Decimal('0')),
+    )
+    OrderItem.objects.bulk_create([
+        OrderItem(
+            order=order,
+            product=product,
+            name=product.name,
+            quantity=Decimal('1'),
+            unit_price=product.price,
+            total_price=product.price,
+        )
+        for product in products
+    ])
+    return order
+
+
+def _split(total):
+    cash = (total / 2).quantize(Decimal('0.01'))
+    return [
+        {'method': Payment.Method.CASH, 'amount': cash},
+        {'method': Payment.Method.DEBIT, 'amount': total - cash},
+    ]
+
+
+def _pay(business, session, products, shared_order_id, hold_seconds):
+    """Simula un cobro: bloquea la orden, la cobra, trabaja y revierte."""
+    wait = elapsed = 0.0
+    error = None
+    try:
+        with transaction.atomic():
+            order_id = shared_order_id or _create_order(business, products).pk
+            started = time.perf_counter()
+            order = lock_order_for_payment(business).get(pk=order_id)
+            wait = time.perf_counter() - started
+            pay_order(order, business=business, session=session, payments=_split(order.total_amount))
+            elapsed = time.perf_counter() - started
+            if hold_seconds:
+                time.sleep(hold_seconds)
+            raise _Rollback()
+    except _Rollback:
+        pass
+    except (DatabaseError, APIException) as exc:
+        error = exc
+    return wait, elapsed, error
+
+
+def _percentile(values, ratio):
+    return values[min(int(len(values) * ratio), len(values) - 1)] if values else 0.0
+
+
+class Command(BaseCommand):
+    help = 'Mide throughput y contención del cobro de órdenes bajo cobros concurrentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, required=True, help='ID del business')
+        parser.add_argument('--workers', type=int, default=16, help='Hilos concurrentes (default: 16)')
+        parser.add_argument('--payments', type=int, default=50, help='Cobros por hilo (default: 50)')
+        parser.add_argument('--products', type=int, default=3, help='Productos por orden (default: 3)')
+        parser.add_argument(
+            '--hold-ms',
+            type=int,
+            default=0,
+            help='Milisegundos de trabajo simulado después del cobro, con los locks tomados (default: 0)',
+        )
+        parser.add_argument(
+            '--scenario',
+            choices=SCENARIOS + ('both',),
+            default='both',
+            help='Escenario a medir (default: both)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('El benchmark requiere PostgreSQL (SQLite serializa todas las escrituras).')
+        try:
+            business = Business.objects.get(pk=options['business'])
+        except Business.DoesNotExist:
+            raise CommandError(f'Business con ID {options["business"]} no encontrado')
+
+        session = get_active_session(business)
+        if session is None:
+            raise CommandError('El negocio necesita una sesión de caja abierta.')
+        products = list(
+            Product.objects.filter(business=business, is_active=True, price__gt=0).order_by('pk')[:max(options['products'], 1)]
+        )
+        if not products:
+            raise CommandError('El negocio no tiene productos activos con precio.')
+
+        workers = max(options['workers'], 1)
+        payments = max(options['payments'], 1)
+        hold_seconds = max(options['hold_ms'], 0) / 1000
+        scenarios = SCENARIOS if options['scenario'] == 'both' else (options['scenario'],)
+
+        self.stdout.write(
+            f'Negocio: {business.name} (ID: {business.id}) · {workers} hilos × {payments} cobros · '
+            f'{len(products)} productos por orden · hold {options["hold_ms"]} ms'
+        )
+        for scenario in scenarios:
+            shared_order = _create_order(business, products) if scenario == 'same' else None
+            try:
+                self._run(scenario, business, session, products, shared_order, workers, payments, hold_seconds)
+            finally:
+                if shared_order is not None:
+                    shared_order.delete()
+
+    def _run(self, scenario, business, session, products, shared_order, workers, payments, hold_seconds):
+        waits = []
+        durations = []
+        errors = []
+        lock = threading.Lock()
+        shared_order_id = shared_order.pk if shared_order else None
+
+        def worker():
+            try:
+                for _ in range(payments):
+                    wait, elapsed, error = _pay(business, session, products, shared_order_id, hold_seconds)
+                    with lock:
+                        if error is not None:
+                            errors.append(error)
+                        else:
+                            waits.append(wait)
+                            durations.append(elapsed)
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(worker) for _ in range(workers)]:
+                future.result()
+        elapsed = time.perf_counter() - started
+
+        total = len(durations)
+        waits_ms = sorted(value * 1000 for value in waits)
+        durations_ms = sorted(value * 1000 for value in durations)
+        self.stdout.write(self.style.SUCCESS(f'✅ {scenario}'))
+        self.stdout.write(f'   Cobros: {total} en {elapsed:.2f}s ({total / elapsed:.1f}/s)')
+        self.stdout.write(
+            f'   Latencia: media {statistics.mean(durations_ms) if durations_ms else 0:.2f} ms · '
+            f'p95 {_percentile(durations_ms, 0.95):.2f} ms · máx {durations_ms[-1] if durations_ms else 0:.2f} ms'
+        )
+        self.stdout.write(
+            f'   Lock de la orden: media {statistics.mean(waits_ms) if waits_ms else 0:.2f} ms · '
+            f'p95 {_percentile(waits_ms, 0.95):.2f} ms'
+        )
+        if errors:
+            kinds = sorted({type(error).__name__ for error in errors})
+            self.stdout.write(self.style.WARNING(f'   Errores: {len(errors)} ({", ".join(kinds)})'))
@@ -0,0 +1,135 @@
+"""
+Cobro de una orden (POST /api/v1/orders/<id>/pay/).
+
+Los locks se toman siempre en el mismo orden, así dos cobros concurrentes no
+se cruzan entre sí ni con el checkout de ventas ni con la carga masiva
+(`apps.sales.bulk`):
+
+1. la fila de la orden (`lock_order_for_payment`);
+2. la venta ya existente de la orden, o, si hay que crearla, los ProductStock
+   ordenados por producto y después el contador de números de venta (el
+   orden global de `apps.sales.sequences`);
+3. la sesión de caja, al final: los pagos se insertan con un solo INSERT y sus
+   totales se aplican con un único UPDATE por sesión
+   (`apps.cash.services.create_payments`).
+
+Cobros de órdenes distintas solo comparten la fila de la sesión de caja, que
+queda bloqueada el menor tiempo posible. La orden bloqueada se reusa para la
+respuesta, sin volver a leerla.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Sequence
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework import serializers
+
+from apps.cash.models import CashSession, Payment
+from apps.cash.services import create_payments
+from apps.sales.models import Sale
+from .models import Order
+from .rules import ConflictError
+from .serializers import OrderCreateSaleSerializer
+
+ZERO = Decimal('0')
+TWO_PLACES = Decimal('0.01')
+
+
+def lock_order_for_payment(business):
+  """Queryset de órdenes del negocio con la fila de la orden bloqueada."""
+  return (
+    Order.objects.select_for_update(of=('self',))
+    .filter(business=business)
+    .select_related('sale')
+    .prefetch_related('items__product', 'sale__payments')
+  )
+
+
+def resolve_sale_payment_method(payments: Sequence[dict]) -> str:
+  methods = {entry.get('method') for entry in payments if entry.get('method')}
+  if not methods:
+    return Sale.PaymentMethod.CASH
+  if len(methods) == 1:
+    method = next(iter(methods))
+    if method == Payment.Method.CASH:
+      return Sale.PaymentMethod.CASH
+    if method == Payment.Method.TRANSFER:
+      return Sale.PaymentMethod.TRANSFER
+    if method in {Payment.Method.DEBIT, Payment.Method.CREDIT}:
+      return Sale.PaymentMethod.CARD
+  return Sale.PaymentMethod.OTHER
+
+
+def _locked_sale(order: Order, *, business, request) -> Sale:
+  if order.sale_id is None:
+    bootstrap = OrderCreateSaleSerializer(
+      data={'payment_method': Sale.PaymentMethod.CASH, 'discount': '0', 'notes': order.note},
+      context={'order': order, 'business': business, 'request': request},
+    )
+    bootstrap.is_valid(raise_exception=True)
+    return bootstrap.save()
+
+  sale = order.sale
+  # Otro endpoint pudo tocar la venta antes del lock: el total se relee bloqueado.
+  sale.total = Sale.objects.select_for_update().filter(pk=sale.pk).values_list('total', flat=True).first()
+  return sale
+
+
+def pay_order(
+  order: Order,
+  *,
+  business,
+  session: CashSession,
+  payments: Sequence[dict],
+  user=None,
+  request=None,
+) -> Order:
+  """Cobra el saldo de `order` (bloqueada con `lock_order_for_payment`) y la marca pagada."""
+  with transaction.atomic():
+    sale = _locked_sale(order, business=business, request=request)
+    sale_total = Decimal(sale.total or ZERO)
+    paid_total = sale.payments.aggregate(total=Sum('amount'))['total'] or ZERO
+    balance = (sale_total - paid_total).quantize(TWO_PLACES)
+    if balance <= ZERO:
+      raise ConflictError('La venta ya está saldada.')
+
+    incoming_total = sum((payment['amount'] for payment in payments), ZERO).quantize(TWO_PLACES)
+    if incoming_total != balance:
+      raise serializers.ValidationError(
+        {'payments': f'Los pagos deben cubrir el saldo pendiente (${balance}).'}
+      )
+
+    sale.cash_session = session
+    sale.payment_method = resolve_sale_payment_method(payments)
+    sale.save(update_fields=['cash_session', 'payment_method', 'updated_at'])
+
+    order.status = Order.Status.PAID
+    order.total_amount = sale_total
+    order.closed_at = timezone.now()
+    update_fields = ['status', 'total_amount', 'closed_at', 'updated_at']
+    if user is not None:
+      order.updated_by = user
+      update_fields.append('updated_by')
+    order.save(update_fields=update_fields)
+
+    create_payments([
+      Payment(
+        business_id=sale.business_id,
+        sale=sale,
+        session=session,
+        method=payment['method'],
+        amount=payment['amount'],
+        reference=payment.get('reference') or '',
+        created_by=user,
+      )
+      for payment in payments
+    ])
+
+  # Los pagos prefetcheados antes del cobro ya no están completos.
+  getattr(sale, '_prefetched_objects_cache', {}).pop('payments', None)
+  order.sale = sale
+  return order
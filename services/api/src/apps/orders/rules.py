@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 from decimal import Decimal
+
+from rest_framework import exceptions, status
+
 from apps.sales.models import Sale
 
 from .models import Order
@@ -8,6 +11,12 @@ from .models import Order
 LOCKED_ORDER_MESSAGE = 'Order is already paid and cannot be modified.'
 
 
+class ConflictError(exceptions.APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'No pudimos completar la operación.'
+    default_code = 'conflict'
+
+
 def _iter_payments(sale: Sale | None):
     if sale is None:
         return []
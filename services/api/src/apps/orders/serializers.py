@@ -15,9 +15,10 @@ from apps.cash.models import CashSession, Payment
 from apps.catalog.models import Product
 from apps.customers.models import Customer
 from apps.inventory.models import StockMovement
-from apps.inventory.services import ensure_stock_record, register_stock_movement
+from apps.inventory.services import StockLine, ensure_stock_record, lock_stock_records, register_stock_movements
 from apps.menu.models import MenuItem
 from apps.sales.models import Sale, SaleItem
+from apps.sales.sequences import next_order_number, next_sale_number
 from apps.resto.services import ensure_table_available
 from .models import Order, OrderDraft, OrderDraftItem, OrderItem
 from .rules import LOCKED_ORDER_MESSAGE, is_order_editable, is_order_paid
@@ -520,17 +521,6 @@ class OrderStartSerializer(serializers.Serializer):
     self.context['validated_order'] = order
     return value
 
-  def _next_order_number(self, business) -> int:
-    last_number = (
-      Order.objects.select_for_update()
-      .filter(business=business)
-      .order_by('-number')
-      .values_list('number', flat=True)
-      .first()
-      or 0
-    )
-    return last_number + 1
-
   def save(self, **kwargs):
     business = self.context['business']
     table = self.context['validated_table']
@@ -543,10 +533,9 @@ class OrderStartSerializer(serializers.Serializer):
       'note': self.validated_data.get('note', ''),
     }
     if order is None:
-      number = self._next_order_number(business)
       order = Order.objects.create(
         business=business,
-        number=number,
+        number=next_order_number(business),
         status=Order.Status.OPEN,
         table=table,
         table_name=table.name,
@@ -924,19 +913,12 @@ class OrderCreateSerializer(serializers.Serializer):
     created_by = getattr(request, 'user', None) if request else None
     table = validated_data.pop('table', None)
 
-    last_number = (
-      Order.objects.select_for_update()
-      .filter(business=business)
-      .order_by('-number')
-      .values_list('number', flat=True)
-      .first()
-    ) or 0
     raw_table_name = (validated_data.get('table_name') or '').strip()
     if table and not raw_table_name:
       raw_table_name = table.name
     order = Order.objects.create(
       business=business,
-      number=last_number + 1,
+      number=next_order_number(business),
       channel=validated_data.get('channel', Order.Channel.DINE_IN),
       table=table,
       table_name=raw_table_name,
@@ -1015,36 +997,42 @@ class OrderSaleMixin(serializers.Serializer):
       requested_qty=f"{requested}",
     )
 
-  def _register_stock(self, *, order: Order, item: OrderItem, user, allow_without_stock: bool):
-    product = item.product
-    if product is None:
+  def _register_stock(self, *, order: Order, items: list[OrderItem], user, allow_without_stock: bool):
+    stocked_items = [item for item in items if item.product is not None]
+    if not stocked_items:
       return
-    stock_record = ensure_stock_record(order.business, product)
-    available_quantity = stock_record.quantity
-    quantity = item.quantity
-    will_be_negative = (available_quantity - quantity) < 0
-    movement_kwargs: dict = {}
-    if will_be_negative and not allow_without_stock:
-      raise self._out_of_stock_error(product=product, available=available_quantity, requested=quantity)
-    if will_be_negative and allow_without_stock:
-      movement_kwargs = {
-        'reason': 'SALE_ALLOW_NO_STOCK',
-        'metadata': {
+    stocks = lock_stock_records(order.business, [item.product for item in stocked_items])
+    available_by_product = {product_id: stock.quantity for product_id, stock in stocks.items()}
+    lines: list[StockLine] = []
+    for item in stocked_items:
+      product = item.product
+      available_quantity = available_by_product[product.pk]
+      quantity = item.quantity
+      will_be_negative = (available_quantity - quantity) < 0
+      if will_be_negative and not allow_without_stock:
+        raise self._out_of_stock_error(product=product, available=available_quantity, requested=quantity)
+      available_by_product[product.pk] = available_quantity - quantity
+      line = StockLine(
+        product=product,
+        movement_type=StockMovement.MovementType.OUT,
+        quantity=quantity,
+        note=f'Orden #{order.number}',
+      )
+      if will_be_negative and allow_without_stock:
+        line.reason = 'SALE_ALLOW_NO_STOCK'
+        line.metadata = {
           'allowed_without_stock': True,
           'product_id': str(product.id),
           'available_stock': f"{available_quantity}",
           'requested_qty': f"{quantity}",
-        },
-        'allow_negative_stock': True,
-      }
-    register_stock_movement(
+        }
+        line.allow_negative_stock = True
+      lines.append(line)
+    register_stock_movements(
       business=order.business,
-      product=product,
-      movement_type=StockMovement.MovementType.OUT,
-      quantity=quantity,
-      note=f'Orden #{order.number}',
+      lines=lines,
       created_by=user if getattr(user, 'is_authenticated', False) else None,
-      **movement_kwargs,
+      stocks=stocks,
     )
 
   def _ensure_items(self, order: Order) -> list[OrderItem]:
@@ -1103,19 +1091,12 @@ class OrderSaleMixin(serializers.Serializer):
     normalized_notes = (notes or order.note or '').strip()
 
     with transaction.atomic():
-      last_number = (
-        Sale.objects.select_for_update()
-        .filter(business=business)
-        .order_by('-number')
-        .values_list('number', flat=True)
-        .first()
-        or 0
-      )
-
+      # Stock antes que el número de venta (orden de locks de `apps.sales.sequences`).
+      self._register_stock(order=order, items=items, user=user, allow_without_stock=allow_without_stock)
       sale = Sale.objects.create(
         business=business,
         customer=customer,
-        number=last_number + 1,
+        number=next_sale_number(business),
         status=Sale.Status.COMPLETED,
         payment_method=payment_method or Sale.PaymentMethod.CASH,
         notes=normalized_notes,
@@ -1135,8 +1116,6 @@ class OrderSaleMixin(serializers.Serializer):
             line_total=item.total_price,
           )
         )
-        self._register_stock(order=order, item=item, user=user, allow_without_stock=allow_without_stock)
-
       SaleItem.objects.bulk_create(sale_items)
       sale.subtotal = subtotal
       sale.discount = discount
@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .kitchen_events import item_changed, item_removed, order_changed
+from .models import Order, OrderItem
+
+# Guardados que no cambian nada visible en cocina (p. ej. recalculate_totals).
+_IGNORED_ORDER_FIELDS = frozenset({'total_amount', 'updated_at', 'updated_by'})
+
+
+def _item_business_id(item: OrderItem):
+    order = item.order if OrderItem.order.is_cached(item) else None
+    if order is not None:
+        return order.business_id
+    return Order.objects.filter(pk=item.order_id).values_list('business_id', flat=True).first()
+
+
+@receiver(post_save, sender=Order)
+def publish_order_change(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or instance.status == Order.Status.DRAFT:
+        return
+    if update_fields is not None and set(update_fields) <= _IGNORED_ORDER_FIELDS:
+        return
+    order_changed(instance)
+
+
+@receiver(post_save, sender=OrderItem)
+def publish_item_change(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    business_id = _item_business_id(instance)
+    if business_id is not None:
+        item_changed(instance, business_id)
+
+
+@receiver(post_delete, sender=OrderItem)
+def publish_item_removal(sender, instance, **kwargs):
+    business_id = _item_business_id(instance)
+    if business_id is not None:
+        item_removed(instance, business_id)
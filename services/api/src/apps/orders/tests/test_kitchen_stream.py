@@ -0,0 +1,82 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Membership
+from apps.business.models import Business, BusinessPlan, Subscription
+from apps.orders.kitchen_events import kitchen_channel
+from apps.orders.models import Order, OrderItem
+from common.pubsub import get_pubsub
+
+
+@override_settings(PUBSUB_BACKEND='local', KITCHEN_STREAM_MAX_SECONDS=0)
+class KitchenStreamTests(APITestCase):
+  def setUp(self):
+    get_pubsub().reset()
+    self.user = get_user_model().objects.create_user(username='chef', email='chef@example.com', password='pass1234')
+    self.business = Business.objects.create(name='Cocina', default_service='restaurante')
+    Subscription.objects.create(business=self.business, plan=BusinessPlan.PLUS, status='active')
+    Membership.objects.create(user=self.user, business=self.business, role='owner')
+    self.client.force_authenticate(user=self.user)
+    self.client.cookies['bid'] = str(self.business.id)
+    self.channel = kitchen_channel(self.business.id)
+
+  def _sent_order(self):
+    with self.captureOnCommitCallbacks(execute=True):
+      order = Order.objects.create(business=self.business, number=1, status=Order.Status.SENT)
+      item = OrderItem.objects.create(order=order, name='Milanesa', quantity=Decimal('1'))
+    return order, item
+
+  def _read(self, response):
+    return b''.join(response.streaming_content).decode()
+
+  def test_item_status_change_publishes_delta_without_touching_order(self):
+    order, item = self._sent_order()
+    cursor = get_pubsub().latest_id(self.channel)
+    updated_at = Order.objects.get(pk=order.pk).updated_at
+
+    with self.captureOnCommitCallbacks(execute=True):
+      response = self.client.patch(
+        reverse('orders:kitchen-item-status', kwargs={'pk': item.pk}),
+        {'kitchen_status': OrderItem.KitchenStatus.READY},
+        format='json',
+      )
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    events = get_pubsub().read(self.channel, cursor, timeout=0)
+    self.assertEqual([event.event for event in events], ['item.updated'])
+    self.assertEqual(events[0].data['item']['kitchen_status'], OrderItem.KitchenStatus.READY)
+    self.assertEqual(Order.objects.get(pk=order.pk).updated_at, updated_at)
+
+  def test_stream_sends_snapshot_then_resumes_from_last_event_id(self):
+    order, item = self._sent_order()
+
+    body = self._read(self.client.get(reverse('orders:kitchen-stream'), HTTP_ACCEPT='text/event-stream'))
+    self.assertIn('event: snapshot', body)
+    self.assertIn(str(order.pk), body)
+
+    cursor = get_pubsub().latest_id(self.channel)
+    with self.captureOnCommitCallbacks(execute=True):
+      item.kitchen_status = OrderItem.KitchenStatus.IN_PROGRESS
+      item.save()
+
+    with override_settings(KITCHEN_STREAM_MAX_SECONDS=1):
+      response = self.client.get(reverse('orders:kitchen-stream'), HTTP_LAST_EVENT_ID=cursor)
+      body = self._read(response)
+    self.assertEqual(response['Content-Type'], 'text/event-stream')
+    self.assertNotIn('event: snapshot', body)
+    self.assertIn('event: item.updated', body)
+    self.assertIn(OrderItem.KitchenStatus.IN_PROGRESS, body)
+
+  def test_paid_order_is_removed_from_board(self):
+    order, _ = self._sent_order()
+    cursor = get_pubsub().latest_id(self.channel)
+    with self.captureOnCommitCallbacks(execute=True):
+      order.status = Order.Status.PAID
+      order.save()
+    events = get_pubsub().read(self.channel, cursor, timeout=0)
+    self.assertEqual([event.event for event in events], ['order.removed'])
@@ -0,0 +1,109 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Membership
+from apps.business.models import Business, BusinessPlan, CommercialSettings, Subscription
+from apps.cash.models import CashSession, Payment
+from apps.cash.services import compute_session_totals, diff_session_totals
+from apps.catalog.models import Product
+from apps.inventory.models import ProductStock
+from apps.orders.models import Order, OrderItem
+from apps.sales.models import Sale
+
+
+class OrderPaymentTests(APITestCase):
+  def setUp(self):
+    self.user = get_user_model().objects.create_user(username='cobros', email='cobros@example.com', password='pass1234')
+    self.business = Business.objects.create(name='Cobros Corp', default_service='restaurante')
+    Subscription.objects.create(business=self.business, plan=BusinessPlan.PLUS, status='active')
+    settings = CommercialSettings.objects.for_business(self.business)
+    settings.block_sales_if_no_open_cash_session = False
+    settings.save()
+    Membership.objects.create(user=self.user, business=self.business, role='cashier')
+    self.client.force_authenticate(user=self.user)
+    self.client.cookies['bid'] = str(self.business.id)
+    self.session = CashSession.objects.create(
+      business=self.business, opened_by=self.user, opening_cash_amount=Decimal('0')
+    )
+
+  def _order(self, number: int, *products: Product) -> Order:
+    order = Order.objects.create(business=self.business, number=number, total_amount=Decimal('0'))
+    total = Decimal('0')
+    for product in products:
+      OrderItem.objects.create(
+        order=order, product=product, name=product.name, quantity=Decimal('1'),
+        unit_price=product.price, total_price=product.price,
+      )
+      total += product.price
+    order.total_amount = total
+    order.save(update_fields=['total_amount'])
+    return order
+
+  def _product(self, sku: str, price: str) -> Product:
+    product = Product.objects.create(business=self.business, name=f'Producto {sku}', sku=sku, price=Decimal(price))
+    ProductStock.objects.create(business=self.business, product=product, quantity=Decimal('5'))
+    return product
+
+  def _pay(self, order: Order, *payments):
+    return self.client.post(
+      reverse('orders:order-pay', args=[order.id]),
+      {
+        'cash_session_id': str(self.session.id),
+        'payments': [{'method': method, 'amount': amount} for method, amount in payments],
+      },
+      format='json',
+    )
+
+  def test_split_payment_creates_sale_payments_and_session_totals(self):
+    burger, soda = self._product('HB-1', '120.00'), self._product('SD-1', '30.00')
+    order = self._order(1, soda, burger)
+
+    response = self._pay(order, (Payment.Method.CASH, '100.00'), (Payment.Method.DEBIT, '50.00'))
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+    self.assertTrue(response.data['is_paid'])
+    self.assertEqual(response.data['sale_total'], '150.00')
+    self.assertEqual(len(response.data['items']), 2)
+    order.refresh_from_db()
+    self.assertEqual(order.status, Order.Status.PAID)
+    self.assertEqual(order.sale.cash_session_id, self.session.id)
+    self.assertEqual(order.sale.payment_method, Sale.PaymentMethod.OTHER)
+    self.assertEqual(order.sale.payments.count(), 2)
+    self.assertEqual(
+      ProductStock.objects.filter(business=self.business).order_by('product__sku').values_list('quantity', flat=True)[0],
+      Decimal('4'),
+    )
+
+    self.assertEqual(diff_session_totals(self.session), [])
+    totals = compute_session_totals(self.session)
+    self.assertEqual(totals['payments_total'], Decimal('150.00'))
+    self.assertEqual(totals['cash_payments_total'], Decimal('100.00'))
+    self.assertEqual(totals['sales_count'], 1)
+    self.assertEqual(totals['pending_sales_count'], 0)
+
+  def test_pays_remaining_balance_of_an_existing_sale(self):
+    order = self._order(2, self._product('PZ-1', '200.00'))
+    self.client.post(reverse('orders:order-create-sale', args=[order.id]), {'payment_method': 'cash'}, format='json')
+    order.refresh_from_db()
+    Payment.objects.create(
+      business=self.business, sale=order.sale, session=self.session, method=Payment.Method.CASH, amount=Decimal('80.00')
+    )
+
+    rejected = self._pay(order, (Payment.Method.CASH, '200.00'))
+    self.assertEqual(rejected.status_code, status.HTTP_400_BAD_REQUEST)
+    self.assertEqual(order.sale.payments.count(), 1)
+
+    response = self._pay(order, (Payment.Method.TRANSFER, '120.00'))
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+    self.assertEqual(order.sale.payments.count(), 2)
+    self.assertEqual(diff_session_totals(self.session), [])
+    totals = compute_session_totals(self.session)
+    self.assertEqual(totals['payments_total'], Decimal('200.00'))
+    self.assertEqual(totals['sales_count'], 1)
+    self.assertEqual(totals['pending_sales_total'], Decimal('0'))
+    self.assertEqual(self._pay(order, (Payment.Method.CASH, '1.00')).status_code, status.HTTP_409_CONFLICT)
@@ -0,0 +1,55 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Membership
+from apps.business.models import Business, BusinessPlan, Subscription
+from apps.cash.models import CashSession, Payment
+from apps.orders.models import Order, OrderItem
+from apps.sales.models import Sale
+from common.query_budget import QUERY_BUDGET_ROWS, query_budget
+
+
+class OrderListQueryBudgetTests(APITestCase):
+  def setUp(self):
+    self.user = get_user_model().objects.create_user(username='budget-orders', email='budget-orders@example.com', password='pass1234')
+    self.business = Business.objects.create(name='Resto Budget', default_service='restaurante')
+    Subscription.objects.create(business=self.business, plan=BusinessPlan.PLUS, status='active')
+    Membership.objects.create(user=self.user, business=self.business, role='owner')
+    self.client.force_authenticate(self.user)
+    self.client.cookies['bid'] = str(self.business.id)
+    session = CashSession.objects.create(business=self.business, opened_by=self.user)
+    for number in range(1, QUERY_BUDGET_ROWS + 1):
+      sale = Sale.objects.create(business=self.business, number=number, total=Decimal('200.00'), cash_session=session)
+      Payment.objects.create(
+        business=self.business,
+        sale=sale,
+        session=session,
+        method=Payment.Method.CASH,
+        amount=Decimal('200.00'),
+      )
+      order = Order.objects.create(
+        business=self.business,
+        number=number,
+        status=Order.Status.PAID,
+        sale=sale,
+        total_amount=Decimal('200.00'),
+      )
+      for index in range(2):
+        OrderItem.objects.create(
+          order=order,
+          name=f'Plato {index}',
+          quantity=Decimal('1'),
+          unit_price=Decimal('100.00'),
+          total_price=Decimal('100.00'),
+        )
+
+  def test_order_list_stays_within_budget(self):
+    with query_budget('orders.list'):
+      response = self.client.get(reverse('orders:order-list'))
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(len(response.data), QUERY_BUDGET_ROWS)
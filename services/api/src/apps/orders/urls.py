@@ -23,13 +23,15 @@ from .views import (
 from .views_kitchen import (
     KitchenBoardView,
     KitchenItemStatusView,
-    KitchenOrderBulkUpdateView
+    KitchenOrderBulkUpdateView,
+    KitchenStreamView,
 )
 
 app_name = 'orders'
 
 urlpatterns = [
     path('kitchen/board/', KitchenBoardView.as_view(), name='kitchen-board'),
+    path('kitchen/stream/', KitchenStreamView.as_view(), name='kitchen-stream'),
     path('kitchen/items/<uuid:pk>/', KitchenItemStatusView.as_view(), name='kitchen-item-status'),
     path('kitchen/orders/<uuid:pk>/bulk/', KitchenOrderBulkUpdateView.as_view(), name='kitchen-order-bulk'),
 
@@ -16,8 +16,10 @@ from apps.cash.services import get_active_session
 from apps.invoices.serializers import InvoiceDetailSerializer, InvoiceIssueSerializer
 from apps.sales.models import Sale
 from apps.sales.serializers import SaleDetailSerializer
+from common.pagination import KeysetPagination
 from .models import Order, OrderDraft, OrderDraftItem, OrderItem
-from .rules import LOCKED_ORDER_MESSAGE, is_order_editable, is_order_paid
+from .payments import lock_order_for_payment, pay_order
+from .rules import LOCKED_ORDER_MESSAGE, ConflictError, is_order_editable, is_order_paid
 from .serializers import (
 	OrderCloseSerializer,
 	OrderCreateSaleSerializer,
@@ -43,12 +45,6 @@ ZERO = Decimal('0')
 TWO_PLACES = Decimal('0.01')
 
 
-class ConflictError(exceptions.APIException):
-	status_code = status.HTTP_409_CONFLICT
-	default_detail = 'No pudimos completar la operación.'
-	default_code = 'conflict'
-
-
 class OrderDraftListCreateView(generics.ListCreateAPIView):
 	permission_classes = [IsAuthenticated, HasBusinessMembership, HasPermission]
 	permission_map = {
@@ -308,13 +304,21 @@ class OrderItemDetailView(APIView):
 		return Response(OrderSerializer(order, context={'request': request, 'business': business}).data)
 
 
+class OrderListPagination(KeysetPagination):
+	# Sin cursor se mantiene la lista sin paginar con tope de `limit` filas.
+	offset_fallback = False
+	default_limit = 100
+	max_limit = 200
+
+
 class OrderListCreateView(generics.ListCreateAPIView):
 	permission_classes = [IsAuthenticated, HasBusinessMembership, HasPermission]
 	permission_map = {
 		'GET': 'view_orders',
 		'POST': 'create_orders',
 	}
-	pagination_class = None
+	pagination_class = OrderListPagination
+	keyset_ordering = ('-opened_at', '-number')
 
 	def get_queryset(self):
 		business = getattr(self.request, 'business')
@@ -340,6 +344,8 @@ class OrderListCreateView(generics.ListCreateAPIView):
 					| Q(note__icontains=search)
 				)
 
+		if self.paginator.cursor_requested(self.request, self):
+			return queryset
 		try:
 			limit = int(self.request.query_params.get('limit', '100'))
 		except ValueError:
@@ -555,21 +561,6 @@ def build_checkout_payload(*, order: Order, business, request):
 	}
 
 
-def resolve_sale_payment_method(payments: list[dict]) -> str:
-	methods = {entry.get('method') for entry in payments if entry.get('method')}
-	if not methods:
-		return Sale.PaymentMethod.CASH
-	if len(methods) == 1:
-		method = next(iter(methods))
-		if method == Payment.Method.CASH:
-			return Sale.PaymentMethod.CASH
-		if method == Payment.Method.TRANSFER:
-			return Sale.PaymentMethod.TRANSFER
-		if method in {Payment.Method.DEBIT, Payment.Method.CREDIT}:
-			return Sale.PaymentMethod.CARD
-	return Sale.PaymentMethod.OTHER
-
-
 class OrderCheckoutView(APIView):
 	permission_classes = [IsAuthenticated, HasBusinessMembership, HasPermission]
 	required_permission = 'close_orders'
@@ -621,13 +612,7 @@ class OrderPayView(APIView):
 	def post(self, request, pk: str):
 		business = getattr(request, 'business')
 		with transaction.atomic():
-			order = get_object_or_404(
-				Order.objects.select_for_update(of=('self',))
-				.filter(business=business)
-				.select_related('sale')
-				.prefetch_related('items__product', 'sale__payments'),
-				pk=pk,
-			)
+			order = get_object_or_404(lock_order_for_payment(business), pk=pk)
 			if is_order_paid(order):
 				raise ConflictError(LOCKED_ORDER_MESSAGE)
 			if order.status == Order.Status.CANCELLED:
@@ -636,56 +621,16 @@ class OrderPayView(APIView):
 			payload_serializer = OrderPaySerializer(data=request.data)
 			payload_serializer.is_valid(raise_exception=True)
 			session = self._resolve_session(business=business, session_id=payload_serializer.validated_data.get('cash_session_id'))
-			payments_payload = payload_serializer.validated_data['payments']
-			if order.sale_id is None:
-				bootstrap = OrderCreateSaleSerializer(
-					data={'payment_method': Sale.PaymentMethod.CASH, 'discount': '0', 'notes': order.note},
-					context={'order': order, 'business': business, 'request': request},
-				)
-				bootstrap.is_valid(raise_exception=True)
-				sale = bootstrap.save()
-			else:
-				sale = order.sale
-
-			sale_total = Decimal(sale.total or ZERO)
-			aggregate = sale.payments.aggregate(total=Sum('amount'))
-			paid_total = aggregate.get('total') or ZERO
-			balance = (sale_total - paid_total).quantize(TWO_PLACES)
-			if balance <= ZERO:
-				raise ConflictError('La venta ya está saldada.')
-
-			incoming_total = sum((payment['amount'] for payment in payments_payload), ZERO).quantize(TWO_PLACES)
-			if incoming_total != balance:
-				raise serializers.ValidationError(
-					{'payments': f'Los pagos deben cubrir el saldo pendiente (${_decimal_str(balance)}).'}
-				)
-
 			user = request.user if request.user.is_authenticated else None
-			for payment in payments_payload:
-				Payment.objects.create(
-					business=sale.business,
-					sale=sale,
-					session=session,
-					method=payment['method'],
-					amount=payment['amount'],
-					reference=payment.get('reference') or '',
-					created_by=user,
-				)
-
-			sale.cash_session = session
-			sale.payment_method = resolve_sale_payment_method(payments_payload)
-			sale.save(update_fields=['cash_session', 'payment_method', 'updated_at'])
-
-			order.status = Order.Status.PAID
-			order.total_amount = sale_total
-			order.closed_at = timezone.now()
-			update_fields = ['status', 'total_amount', 'closed_at', 'updated_at']
-			if user is not None:
-				order.updated_by = user
-				update_fields.append('updated_by')
-			order.save(update_fields=update_fields)
+			order = pay_order(
+				order,
+				business=business,
+				session=session,
+				payments=payload_serializer.validated_data['payments'],
+				user=user,
+				request=request,
+			)
 
-		order = Order.objects.filter(pk=order.pk).select_related('sale').prefetch_related('items').first() or order
 		return Response(OrderSerializer(order, context={'request': request, 'business': business}).data)
 
 	@staticmethod
@@ -1,15 +1,45 @@
+import itertools
+import json
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 
 from apps.accounts.permissions import HasBusinessMembership, HasPermission
+from common.pubsub import Event, aiter_sse, format_sse, get_pubsub, iter_sse
+from .kitchen_events import kitchen_board_queryset, kitchen_channel
 from .models import Order, OrderItem
 from .serializers_kitchen import KitchenOrderSerializer, KitchenItemSerializer
 
 
+STREAM_RETRY_MS = 3000
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Acepta `Accept: text/event-stream` (EventSource); los errores salen como JSON."""
+    media_type = 'text/event-stream'
+    format = 'sse'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, cls=DjangoJSONEncoder).encode('utf-8')
+
+
+async def _prepend_async(head, tail):
+    for chunk in head:
+        yield chunk
+    async for chunk in tail:
+        yield chunk
+
+
 class KitchenBoardView(generics.ListAPIView):
     serializer_class = KitchenOrderSerializer
     permission_classes = [IsAuthenticated, HasBusinessMembership, HasPermission]
@@ -21,26 +51,61 @@ class KitchenBoardView(generics.ListAPIView):
     def get_queryset(self):
         business = getattr(self.request, 'business')
         updated_after = self.request.query_params.get('updated_after')
-
-        kitchen_active_statuses = [
-            OrderItem.KitchenStatus.PENDING,
-            OrderItem.KitchenStatus.IN_PROGRESS,
-            OrderItem.KitchenStatus.READY,
-        ]
-
-        if self.request.query_params.get('include_done') == 'true':
-             kitchen_active_statuses.append(OrderItem.KitchenStatus.DONE)
-
-        queryset = Order.objects.filter(
-            business=business,
-            status=Order.Status.SENT,
-            items__kitchen_status__in=kitchen_active_statuses
-        ).distinct()
-
+        queryset = kitchen_board_queryset(
+            business,
+            include_done=self.request.query_params.get('include_done') == 'true',
+        )
         if updated_after:
-            queryset = queryset.filter(updated_at__gt=updated_after)
+            # Los cambios de ítems ya no tocan order.updated_at.
+            queryset = queryset.filter(
+                Q(updated_at__gt=updated_after) | Q(items__last_kitchen_update_at__gt=updated_after)
+            )
+        return queryset
+
+
+class KitchenStreamView(APIView):
+    """
+    Stream SSE del tablero de cocina. Al conectar envía un `snapshot` y luego
+    los deltas del negocio; con `Last-Event-ID` (o ?last_event_id=) reanuda
+    desde ese evento. El stream se cierra cada KITCHEN_STREAM_MAX_SECONDS y
+    EventSource reconecta solo.
+
+    Bajo ASGI el stream es asíncrono; bajo WSGI cada conexión ocupa un hilo
+    del worker durante hasta KITCHEN_STREAM_MAX_SECONDS, así que la cantidad
+    de pantallas abiertas queda limitada por los hilos disponibles.
+    """
+    permission_classes = [IsAuthenticated, HasBusinessMembership, HasPermission]
+    permission_map = {
+        'GET': 'view_kitchen_board',
+    }
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
 
-        return queryset.prefetch_related('items').order_by('opened_at')
+    def get(self, request):
+        business = getattr(request, 'business')
+        pubsub = get_pubsub()
+        channel = kitchen_channel(business.id)
+        last_id = request.headers.get('Last-Event-ID') or request.query_params.get('last_event_id')
+
+        head = ['retry: %d\n\n' % STREAM_RETRY_MS]
+        if not last_id or pubsub.has_gap(channel, last_id):
+            # El cursor se lee antes del snapshot: lo publicado mientras tanto se reenvía.
+            last_id = pubsub.latest_id(channel)
+            orders = KitchenOrderSerializer(kitchen_board_queryset(business), many=True).data
+            head.append(format_sse(Event(last_id, 'snapshot', {'orders': orders})))
+
+        options = {
+            'keepalive': getattr(settings, 'KITCHEN_STREAM_KEEPALIVE_SECONDS', 15),
+            'max_seconds': getattr(settings, 'KITCHEN_STREAM_MAX_SECONDS', 300),
+        }
+        if isinstance(request._request, ASGIRequest):
+            stream = _prepend_async(head, aiter_sse(pubsub, channel, last_id, **options))
+        else:
+            stream = itertools.chain(head, iter_sse(pubsub, channel, last_id, **options))
+
+        response = StreamingHttpResponse(stream, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
 
 
 class KitchenItemStatusView(APIView):
@@ -74,10 +139,6 @@ class KitchenItemStatusView(APIView):
 
         item.kitchen_status = new_status
         item.save()
-        
-        # Touch order to ensure polling picks up the change
-        # Even if we return the item, the board view needs to see order updated if we filter by order.updated_at
-        item.order.save(update_fields=['updated_at'])
 
         return Response(KitchenItemSerializer(item).data)
 
@@ -109,7 +170,5 @@ class KitchenOrderBulkUpdateView(APIView):
             if new_status == OrderItem.KitchenStatus.DONE and not item.kitchen_done_at:
                 item.kitchen_done_at = now
             item.save()
-        
-        order.save(update_fields=['updated_at'])
-        
+
         return Response(KitchenOrderSerializer(order).data)
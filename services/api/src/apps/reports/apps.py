@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ReportsConfig(AppConfig):
   default_auto_field = 'django.db.models.BigAutoField'
   name = 'apps.reports'
+
+  def ready(self):
+    import apps.reports.signals  # noqa: F401
@@ -0,0 +1,131 @@
+"""Reportes consolidados de una casa matriz y sus sucursales (`scope=children|selected`).
+
+En lugar de un único escaneo con `business__in=[...]`, cada sucursal calcula
+su parcial por separado (días cerrados desde los rollups, bordes y hoy sobre
+filas crudas) y los parciales se combinan: sumas, conteos y el top de
+productos sobre los totales ya combinados. Así la respuesta trae además el
+desglose por sucursal sin consultas extra.
+
+Los parciales corren en paralelo en un pool de hilos acotado por
+`REPORTS_FANOUT_WORKERS`: cada hilo usa su propia conexión a la base y la
+cierra al terminar, así que un reporte nunca abre más de esa cantidad de
+conexiones extra. Dentro de una transacción (las conexiones de otros hilos no
+verían sus cambios) o con SQLite se calculan en serie.
+"""
+
+from __future__ import annotations
+
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Sequence, TypeVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+ZERO = Decimal('0')
+REPORTS_FANOUT_WORKERS = getattr(settings, 'REPORTS_FANOUT_WORKERS', 4)
+
+T = TypeVar('T')
+
+
+def _can_fan_out() -> bool:
+  connection = connections[DEFAULT_DB_ALIAS]
+  return connection.vendor != 'sqlite' and not connection.in_atomic_block
+
+
+def fan_out(business_ids: Sequence[int], compute: Callable[[int], T]) -> Dict[int, T]:
+  """`compute(business_id)` para cada negocio, en paralelo cuando se puede."""
+  ids = list(dict.fromkeys(business_ids))
+  workers = min(REPORTS_FANOUT_WORKERS, len(ids))
+  if workers <= 1 or not _can_fan_out():
+    return {business_id: compute(business_id) for business_id in ids}
+
+  def run(business_id):
+    try:
+      return compute(business_id)
+    finally:
+      connections.close_all()
+
+  with ThreadPoolExecutor(max_workers=workers) as executor:
+    return dict(zip(ids, executor.map(run, ids)))
+
+
+def merge_rows(*row_sets, keys: Iterable[str], totals: Iterable[str]) -> List[Dict[str, object]]:
+  """Suma `totals` de las filas que comparten los valores de `keys`."""
+  keys = tuple(keys)
+  totals = tuple(totals)
+  merged: Dict[tuple, Dict[str, object]] = {}
+  for rows in row_sets:
+    for row in rows:
+      key = tuple(row[name] for name in keys)
+      target = merged.get(key)
+      if target is None:
+        merged[key] = dict(row)
+        continue
+      for name in totals:
+        target[name] = (target[name] or 0) + (row[name] or 0)
+  return list(merged.values())
+
+
+def top_rows(rows: Iterable[Dict[str, Any]], limit: int, key: Callable[[Dict[str, Any]], Any]) -> List[Dict[str, Any]]:
+  """Las `limit` primeras filas según `key` (ascendente) sin ordenar la lista entera."""
+  return heapq.nsmallest(limit, rows, key=key)
+
+
+@dataclass
+class SummaryPartial:
+  """Agregados del resumen de ventas de uno o más negocios, sin formatear."""
+
+  sales_count: int = 0
+  gross: Decimal = ZERO
+  net: Decimal = ZERO
+  discounts: Decimal = ZERO
+  units: Decimal = ZERO
+  cancellations: int = 0
+  # inicio del período → [neto, cantidad de ventas]
+  series: Dict[date, List] = field(default_factory=dict)
+  # medio de pago → amount_total / payments_count / sales_count
+  payments: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+  # nombre del producto → total_quantity / total_amount
+  products: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+  def add_period(self, period: date, net, count) -> None:
+    bucket = self.series.setdefault(period, [ZERO, 0])
+    bucket[0] += net or ZERO
+    bucket[1] += count or 0
+
+  def add_payments(self, method: str, **totals) -> None:
+    _add_totals(self.payments, method, totals)
+
+  def add_product(self, name: str, **totals) -> None:
+    _add_totals(self.products, name, totals)
+
+  @classmethod
+  def combine(cls, partials: Iterable['SummaryPartial']) -> 'SummaryPartial':
+    combined = cls()
+    for partial in partials:
+      combined.sales_count += partial.sales_count
+      combined.gross += partial.gross
+      combined.net += partial.net
+      combined.discounts += partial.discounts
+      combined.units += partial.units
+      combined.cancellations += partial.cancellations
+      for period, (net, count) in partial.series.items():
+        combined.add_period(period, net, count)
+      for method, totals in partial.payments.items():
+        combined.add_payments(method, **totals)
+      for name, totals in partial.products.items():
+        combined.add_product(name, **totals)
+    return combined
+
+
+def _add_totals(groups: Dict[Any, Dict[str, Any]], key, totals: Dict[str, Any]) -> None:
+  target = groups.get(key)
+  if target is None:
+    groups[key] = dict(totals)
+    return
+  for name, value in totals.items():
+    target[name] = (target.get(name) or 0) + (value or 0)
@@ -0,0 +1 @@
+# Custom Django management commands
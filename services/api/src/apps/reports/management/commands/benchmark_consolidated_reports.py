@@ -0,0 +1,177 @@
+"""
+Benchmark de los reportes consolidados de casa matriz (`scope=children`).
+
+Crea una casa matriz con N sucursales y D días de ventas por sucursal
+(bulk_create), reconstruye sus rollups diarios y mide resumen, productos y
+top de productos consolidados calculando los parciales por sucursal en serie
+(un hilo) y en paralelo (`--workers` hilos): latencia media, p95 y consultas
+por request.
+
+El fan-out en paralelo necesita que las otras conexiones vean los datos, así
+que el benchmark requiere PostgreSQL y commitea el dataset; al terminar borra
+la casa matriz, las sucursales y el usuario creados (las ventas y los rollups
+se van en cascada).
+
+Uso:
+    python manage.py benchmark_consolidated_reports [--branches 20] [--days 365] [--sales-per-day 20] [--workers 4] [--requests 10]
+"""
+import statistics
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.accounts.models import Membership
+from apps.business.models import Business, Subscription
+from apps.reports import consolidation
+from apps.reports.rollups import rebuild_daily_rollups, rollup_timezone
+from apps.reports.views import ReportProductsView, ReportSummaryView, TopProductsLeaderboardView
+from apps.sales.models import Sale, SaleItem
+
+User = get_user_model()
+
+PRODUCTS = [(f'Producto {index + 1}', Decimal(100 + index * 25)) for index in range(30)]
+REPORTS = (
+    ('resumen', ReportSummaryView, '/api/v1/reports/summary/'),
+    ('productos', ReportProductsView, '/api/v1/reports/products/'),
+    ('top productos', TopProductsLeaderboardView, '/api/v1/reports/products/top/'),
+)
+
+
+def _create_business(name, parent=None):
+    business = Business.objects.create(name=name, parent=parent, default_service='gestion')
+    Subscription.objects.create(business=business, plan='pro', status='active')
+    return business
+
+
+def _seed_sales(business, first_day, days, sales_per_day, offset):
+    """Ventas de `days` días desde `first_day`, con 3 ítems cada una."""
+    tzinfo = rollup_timezone()
+    sales = []
+    items = []
+    for day_index in range(days):
+        for sale_index in range(sales_per_day):
+            number = day_index * sales_per_day + sale_index + 1
+            lines = [PRODUCTS[(number + offset + step * 7) % len(PRODUCTS)] for step in range(3)]
+            total = sum((price for _, price in lines), Decimal('0'))
+            sale = Sale(
+                business=business,
+                number=number,
+                status=Sale.Status.COMPLETED,
+                payment_method=Sale.PaymentMethod.CASH if number % 3 else Sale.PaymentMethod.CARD,
+                subtotal=total,
+                total=total,
+            )
+            sales.append(sale)
+            items.extend(
+                SaleItem(sale=sale, product_name_snapshot=name, quantity=Decimal('1'), unit_price=price, line_total=price)
+                for name, price in lines
+            )
+    Sale.objects.bulk_create(sales, batch_size=2000)
+    SaleItem.objects.bulk_create(items, batch_size=5000)
+
+    # `created_at` es auto_now_add: se fecha cada día con un UPDATE por rango de números.
+    for day_index in range(days):
+        day = first_day + timedelta(days=day_index)
+        created_at = timezone.make_aware(
+            datetime.combine(day, datetime.min.time()) + timedelta(hours=12),
+            tzinfo,
+        )
+        Sale.objects.filter(
+            business=business,
+            number__gt=day_index * sales_per_day,
+            number__lte=(day_index + 1) * sales_per_day,
+        ).update(created_at=created_at, updated_at=created_at)
+
+
+def _percentile(values, ratio):
+    return values[min(int(len(values) * ratio), len(values) - 1)] if values else 0.0
+
+
+class Command(BaseCommand):
+    help = 'Mide los reportes consolidados de una casa matriz con N sucursales, en serie y en paralelo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--branches', type=int, default=20, help='Sucursales de la casa matriz (default: 20)')
+        parser.add_argument('--days', type=int, default=365, help='Días de ventas por sucursal (default: 365)')
+        parser.add_argument('--sales-per-day', type=int, default=20, help='Ventas por día y sucursal (default: 20)')
+        parser.add_argument('--workers', type=int, default=4, help='Hilos del fan-out en paralelo (default: 4)')
+        parser.add_argument('--requests', type=int, default=10, help='Requests por medición (default: 10)')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('El benchmark requiere PostgreSQL (con SQLite los parciales se calculan en serie).')
+        branches = max(options['branches'], 1)
+        days = max(options['days'], 1)
+        sales_per_day = max(options['sales_per_day'], 1)
+        workers = max(options['workers'], 1)
+        requests = max(options['requests'], 1)
+
+        label = time.monotonic_ns()
+        user = User.objects.create_user(username=f'bench-consolidated-{label}', email=f'bench-consolidated-{label}@example.com')
+        hq = None
+        try:
+            last_day = timezone.localdate(timezone=rollup_timezone()) - timedelta(days=1)
+            first_day = last_day - timedelta(days=days - 1)
+            started = time.perf_counter()
+            with transaction.atomic():
+                hq = _create_business(f'Bench Casa Central {label}')
+                Membership.objects.create(user=user, business=hq, role='owner')
+                businesses = [hq] + [
+                    _create_business(f'Bench Sucursal {index + 1} {label}', parent=hq) for index in range(branches)
+                ]
+                for offset, business in enumerate(businesses):
+                    _seed_sales(business, first_day, days, sales_per_day, offset)
+            for business in businesses:
+                rebuild_daily_rollups(business.id, first_day, last_day)
+            self.stdout.write(
+                f'Dataset: {branches} sucursales + casa matriz · {days} días · {sales_per_day} ventas por día · '
+                f'{len(businesses) * days * sales_per_day} ventas en {time.perf_counter() - started:.1f}s'
+            )
+
+            params = {'from': first_day.isoformat(), 'to': last_day.isoformat(), 'scope': 'children'}
+            for name, view_class, path in REPORTS:
+                self.stdout.write(self.style.SUCCESS(f'✅ {name}'))
+                for mode, pool_size in (('serie', 1), (f'paralelo ({workers} hilos)', workers)):
+                    self._measure(view_class, path, params, user, hq, mode, pool_size, requests)
+        finally:
+            if hq is not None:
+                Business.objects.filter(parent=hq).delete()
+                hq.delete()
+            user.delete()
+
+    def _measure(self, view_class, path, params, user, hq, mode, pool_size, requests):
+        view = view_class.as_view()
+        factory = APIRequestFactory()
+
+        def call():
+            request = factory.get(path, params, HTTP_X_BUSINESS_ID=str(hq.id))
+            force_authenticate(request, user=user)
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = view(request)
+                elapsed = time.perf_counter() - started
+            if response.status_code != 200:
+                raise CommandError(f'{view_class.__name__} respondió {response.status_code}')
+            return elapsed * 1000, len(queries)
+
+        previous = consolidation.REPORTS_FANOUT_WORKERS
+        consolidation.REPORTS_FANOUT_WORKERS = pool_size
+        try:
+            call()  # calienta imports y conexiones
+            samples = [call() for _ in range(requests)]
+        finally:
+            consolidation.REPORTS_FANOUT_WORKERS = previous
+        durations = sorted(duration for duration, _ in samples)
+        # En paralelo las consultas de los hilos no pasan por la conexión capturada.
+        queries = max(count for _, count in samples)
+        self.stdout.write(
+            f'   {mode}: media {statistics.mean(durations):.2f} ms · p95 {_percentile(durations, 0.95):.2f} ms · '
+            f'{queries} consultas en la conexión del request'
+        )
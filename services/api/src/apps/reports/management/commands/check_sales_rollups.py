@@ -0,0 +1,57 @@
+"""
+Management command para verificar los rollups diarios contra las ventas crudas.
+
+Uso:
+    python manage.py check_sales_rollups [--business <id>] [--from YYYY-MM-DD] [--to YYYY-MM-DD] [--fix]
+
+Sale con código 1 si encuentra diferencias y no se pasó --fix.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.reports.rollups import diff_daily_rollups, rebuild_daily_rollups
+
+from .rebuild_sales_rollups import parse_day, resolve_businesses, resolve_range
+
+
+class Command(BaseCommand):
+    help = 'Compara los rollups diarios con las filas crudas y reporta diferencias'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, help='ID del business (default: todos)')
+        parser.add_argument('--from', dest='date_from', help='Primer día a verificar (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', help='Último día a verificar (YYYY-MM-DD)')
+        parser.add_argument('--fix', action='store_true', help='Reconstruye los días con diferencias')
+
+    def handle(self, *args, **options):
+        first_day = parse_day(options.get('date_from'))
+        last_day = parse_day(options.get('date_to'))
+        fix = options.get('fix', False)
+
+        mismatched_days = 0
+        for business in resolve_businesses(options.get('business')):
+            start, end = resolve_range(business, first_day, last_day)
+            if start is None:
+                continue
+            mismatches = diff_daily_rollups(business.id, start, end)
+            if not mismatches:
+                continue
+            days = sorted({row['day'] for row in mismatches})
+            mismatched_days += len(days)
+            for row in mismatches:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"#{business.id} {row['day']} {row['table']} {row['key']}: "
+                        f"esperado={row['expected']} guardado={row['stored']}"
+                    )
+                )
+            if fix:
+                for day in days:
+                    rebuild_daily_rollups(business.id, day, day)
+
+        if not mismatched_days:
+            self.stdout.write(self.style.SUCCESS('✅ Rollups consistentes con las ventas'))
+            return
+        if fix:
+            self.stdout.write(self.style.SUCCESS(f'✅ {mismatched_days} días reconstruidos'))
+            return
+        raise CommandError(f'{mismatched_days} días con diferencias (usar --fix para reconstruirlos)')
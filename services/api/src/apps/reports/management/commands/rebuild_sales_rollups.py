@@ -0,0 +1,72 @@
+"""
+Management command para reconstruir los rollups diarios de ventas.
+
+Uso:
+    python manage.py rebuild_sales_rollups [--business <id>] [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+
+Sin --from recorre desde la primera venta del negocio; sin --to llega hasta ayer.
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from apps.business.models import Business
+from apps.reports.rollups import local_day, rebuild_daily_rollups, rollup_timezone
+from apps.sales.models import Sale
+
+
+def parse_day(value):
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'Fecha inválida: {value} (usar YYYY-MM-DD)')
+
+
+def resolve_businesses(business_id):
+    queryset = Business.objects.order_by('id')
+    if business_id is not None:
+        queryset = queryset.filter(id=business_id)
+        if not queryset.exists():
+            raise CommandError(f'Business con ID {business_id} no encontrado')
+    return queryset
+
+
+def resolve_range(business, first_day, last_day):
+    if last_day is None:
+        last_day = timezone.localdate(timezone=rollup_timezone()) - timedelta(days=1)
+    if first_day is None:
+        first_sale = Sale.objects.filter(business=business).aggregate(first=Min('created_at'))['first']
+        if first_sale is None:
+            return None, None
+        first_day = local_day(first_sale)
+    if first_day > last_day:
+        return None, None
+    return first_day, last_day
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los rollups diarios de ventas, cobros y productos desde las filas crudas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, help='ID del business (default: todos)')
+        parser.add_argument('--from', dest='date_from', help='Primer día a reconstruir (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', help='Último día a reconstruir (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        first_day = parse_day(options.get('date_from'))
+        last_day = parse_day(options.get('date_to'))
+
+        total_days = 0
+        for business in resolve_businesses(options.get('business')):
+            start, end = resolve_range(business, first_day, last_day)
+            if start is None:
+                continue
+            processed = rebuild_daily_rollups(business.id, start, end)
+            total_days += processed
+            self.stdout.write(f'{business.name} (#{business.id}): {processed} días ({start} → {end})')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Rollups reconstruidos: {total_days} días'))
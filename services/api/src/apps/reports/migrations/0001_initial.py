@@ -0,0 +1,88 @@
+# Generated by Django 5.0.14 on 2026-10-16 22:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('business', '0014_menu_qr_plans_pro_module'),
+        ('catalog', '0002_productcategory_product_category_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyPaymentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('method', models.CharField(max_length=16)),
+                ('sale_status', models.CharField(max_length=16)),
+                ('sale_payment_method', models.CharField(max_length=16)),
+                ('amount_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('payments_count', models.PositiveIntegerField(default=0)),
+                ('sales_count', models.PositiveIntegerField(default=0)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment_rollups', to='business.business')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyProductRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(max_length=16)),
+                ('payment_method', models.CharField(max_length=16)),
+                ('product_name', models.CharField(max_length=255)),
+                ('quantity_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('amount_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('sales_count', models.PositiveIntegerField(default=0)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_rollups', to='business.business')),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_rollups', to='catalog.product')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyRollupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('built_at', models.DateTimeField(blank=True, null=True)),
+                ('dirty_at', models.DateTimeField(blank=True, null=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollup_states', to='business.business')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(max_length=16)),
+                ('payment_method', models.CharField(max_length=16)),
+                ('sales_count', models.PositiveIntegerField(default=0)),
+                ('gross_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('net_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('discount_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('units_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cancelled_count', models.PositiveIntegerField(default=0)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to='business.business')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailypaymentrollup',
+            constraint=models.UniqueConstraint(fields=('business', 'day', 'method', 'sale_status', 'sale_payment_method'), name='reports_payment_rollup_unique_key'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyproductrollup',
+            index=models.Index(fields=['business', 'day'], name='reports_dai_busines_578c88_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrollupstate',
+            constraint=models.UniqueConstraint(fields=('business', 'day'), name='reports_rollup_state_unique_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailysalesrollup',
+            constraint=models.UniqueConstraint(fields=('business', 'day', 'status', 'payment_method'), name='reports_sales_rollup_unique_key'),
+        ),
+    ]
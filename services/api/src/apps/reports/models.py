@@ -0,0 +1,107 @@
+from django.db import models
+
+
+class DailySalesRollup(models.Model):
+  """Totales diarios de ventas por negocio, estado y medio de pago (día local)."""
+
+  business = models.ForeignKey('business.Business', related_name='sales_rollups', on_delete=models.CASCADE)
+  day = models.DateField()
+  status = models.CharField(max_length=16)
+  payment_method = models.CharField(max_length=16)
+  sales_count = models.PositiveIntegerField(default=0)
+  gross_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+  net_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+  discount_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+  units_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+  # Ventas anuladas cuyo cancelled_at cae en este día (independiente de created_at).
+  cancelled_count = models.PositiveIntegerField(default=0)
+
+  class Meta:
+    constraints = [
+      models.UniqueConstraint(
+        fields=['business', 'day', 'status', 'payment_method'],
+        name='reports_sales_rollup_unique_key',
+      ),
+    ]
+
+  def __str__(self) -> str:  # pragma: no cover
+    return f"{self.business_id} · {self.day} · {self.status}/{self.payment_method}"
+
+
+class DailyPaymentRollup(models.Model):
+  """Cobros diarios por medio de pago, con el estado y medio de la venta asociada."""
+
+  business = models.ForeignKey('business.Business', related_name='payment_rollups', on_delete=models.CASCADE)
+  day = models.DateField()
+  method = models.CharField(max_length=16)
+  sale_status = models.CharField(max_length=16)
+  sale_payment_method = models.CharField(max_length=16)
+  amount_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+  payments_count = models.PositiveIntegerField(default=0)
+  sales_count = models.PositiveIntegerField(default=0)
+
+  class Meta:
+    constraints = [
+      models.UniqueConstraint(
+        fields=['business', 'day', 'method', 'sale_status', 'sale_payment_method'],
+        name='reports_payment_rollup_unique_key',
+      ),
+    ]
+
+  def __str__(self) -> str:  # pragma: no cover
+    return f"{self.business_id} · {self.day} · {self.method}"
+
+
+class DailyProductRollup(models.Model):
+  """Unidades e importe vendidos por producto y día."""
+
+  business = models.ForeignKey('business.Business', related_name='product_rollups', on_delete=models.CASCADE)
+  day = models.DateField()
+  status = models.CharField(max_length=16)
+  payment_method = models.CharField(max_length=16)
+  product = models.ForeignKey(
+    'catalog.Product',
+    related_name='daily_rollups',
+    null=True,
+    blank=True,
+    on_delete=models.SET_NULL,
+  )
+  product_name = models.CharField(max_length=255)
+  quantity_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+  amount_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+  sales_count = models.PositiveIntegerField(default=0)
+
+  class Meta:
+    indexes = [
+      models.Index(fields=['business', 'day']),
+    ]
+
+  def __str__(self) -> str:  # pragma: no cover
+    return f"{self.business_id} · {self.day} · {self.product_name}"
+
+
+class DailyRollupState(models.Model):
+  """Marca de frescura de los rollups de un negocio para un día local.
+
+  Un día es válido cuando `built_at` es posterior a `dirty_at`; los días sin
+  registro todavía no fueron materializados y se reconstruyen al leerlos.
+  """
+
+  business = models.ForeignKey('business.Business', related_name='rollup_states', on_delete=models.CASCADE)
+  day = models.DateField()
+  built_at = models.DateTimeField(null=True, blank=True)
+  dirty_at = models.DateTimeField(null=True, blank=True)
+
+  class Meta:
+    constraints = [
+      models.UniqueConstraint(fields=['business', 'day'], name='reports_rollup_state_unique_day'),
+    ]
+
+  def __str__(self) -> str:  # pragma: no cover
+    return f"{self.business_id} · {self.day}"
+
+  @property
+  def is_fresh(self) -> bool:
+    if self.built_at is None:
+      return False
+    return self.dirty_at is None or self.built_at > self.dirty_at
@@ -0,0 +1,494 @@
+"""Rollups diarios de ventas, cobros y productos para los reportes.
+
+Los días cerrados (anteriores a hoy en la zona horaria del negocio) se leen de
+tablas pre-agregadas; hoy y los bordes parciales de un rango se siguen
+calculando sobre las filas crudas. Las escrituras sobre `Sale`, `SaleItem` y
+`Payment` marcan el día afectado como sucio y la próxima lectura lo
+reconstruye, por lo que el camino de checkout solo paga un UPDATE indexado.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from apps.cash.models import Payment
+from apps.sales.models import Sale, SaleItem
+from .models import DailyPaymentRollup, DailyProductRollup, DailyRollupState, DailySalesRollup
+
+
+ZERO = Decimal('0')
+REBUILD_CHUNK_DAYS = 31
+
+SALES_FIELDS = ('sales_count', 'gross_total', 'net_total', 'discount_total', 'units_total', 'cancelled_count')
+PAYMENT_FIELDS = ('amount_total', 'payments_count', 'sales_count')
+PRODUCT_FIELDS = ('quantity_total', 'amount_total', 'sales_count')
+
+
+def rollup_timezone():
+  return timezone.get_default_timezone()
+
+
+def local_day(value: Optional[datetime]) -> Optional[date]:
+  if value is None:
+    return None
+  return timezone.localtime(value, rollup_timezone()).date()
+
+
+def _day_bounds(first_day: date, last_day: date) -> Tuple[datetime, datetime]:
+  tzinfo = rollup_timezone()
+  start = datetime.combine(first_day, time.min, tzinfo=tzinfo)
+  end = datetime.combine(last_day + timedelta(days=1), time.min, tzinfo=tzinfo)
+  return start, end
+
+
+def _iter_days(first_day: date, last_day: date) -> Iterable[date]:
+  current = first_day
+  while current <= last_day:
+    yield current
+    current += timedelta(days=1)
+
+
+@dataclass
+class RollupPlan:
+  """Particiona un rango en días cerrados (rollup) y ventanas crudas."""
+
+  first_day: Optional[date] = None
+  last_day: Optional[date] = None
+  raw_windows: List[Tuple[datetime, datetime, bool]] = field(default_factory=list)
+
+  @property
+  def uses_rollup(self) -> bool:
+    return self.first_day is not None
+
+  def raw_filter(self, field_name: str) -> Optional[Q]:
+    if not self.raw_windows:
+      return None
+    filters = Q()
+    for start, end, end_inclusive in self.raw_windows:
+      end_lookup = 'lte' if end_inclusive else 'lt'
+      filters |= Q(**{f'{field_name}__gte': start, f'{field_name}__{end_lookup}': end})
+    return filters
+
+  def rollup_filter(self, business_ids: Sequence[int]) -> Dict[str, Any]:
+    return {
+      'business__in': business_ids,
+      'day__gte': self.first_day,
+      'day__lte': self.last_day,
+    }
+
+
+def plan_rollup_window(start: datetime, end: datetime, tzinfo, *, enabled: bool = True) -> RollupPlan:
+  """Decide qué parte de [start, end] puede responderse desde los rollups.
+
+  Solo se usan días completos y ya cerrados; si la zona horaria del reporte no
+  coincide con la de los rollups se cae al escaneo crudo completo.
+  """
+  whole_range = RollupPlan(raw_windows=[(start, end, True)])
+  rollup_tz = rollup_timezone()
+  if not enabled or getattr(tzinfo, 'key', None) != getattr(rollup_tz, 'key', None):
+    return whole_range
+
+  start_local = start.astimezone(rollup_tz)
+  end_local = end.astimezone(rollup_tz)
+  first_day = start_local.date()
+  if start_local.time() != time.min:
+    first_day += timedelta(days=1)
+  last_day = end_local.date()
+  if end_local.time() != time.max:
+    last_day -= timedelta(days=1)
+  yesterday = timezone.localdate(timezone=rollup_tz) - timedelta(days=1)
+  last_day = min(last_day, yesterday)
+  if first_day > last_day:
+    return whole_range
+
+  rollup_start, rollup_end = _day_bounds(first_day, last_day)
+  windows: List[Tuple[datetime, datetime, bool]] = []
+  if start < rollup_start:
+    windows.append((start, rollup_start, False))
+  if end >= rollup_end:
+    windows.append((rollup_end, end, True))
+  return RollupPlan(first_day=first_day, last_day=last_day, raw_windows=windows)
+
+
+# ---------------------------------------------------------------------------
+# Materialización
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class RollupSnapshot:
+  sales: Dict[Tuple, Dict[str, Any]] = field(default_factory=dict)
+  payments: Dict[Tuple, Dict[str, Any]] = field(default_factory=dict)
+  products: Dict[Tuple, Dict[str, Any]] = field(default_factory=dict)
+
+
+def _sales_bucket(snapshot: RollupSnapshot, key: Tuple) -> Dict[str, Any]:
+  bucket = snapshot.sales.get(key)
+  if bucket is None:
+    bucket = {
+      'sales_count': 0,
+      'gross_total': ZERO,
+      'net_total': ZERO,
+      'discount_total': ZERO,
+      'units_total': ZERO,
+      'cancelled_count': 0,
+    }
+    snapshot.sales[key] = bucket
+  return bucket
+
+
+def compute_daily_rollups(business_id: int, first_day: date, last_day: date) -> RollupSnapshot:
+  """Agrega las filas crudas de [first_day, last_day] en la forma de los rollups."""
+  tzinfo = rollup_timezone()
+  start, end = _day_bounds(first_day, last_day)
+  snapshot = RollupSnapshot()
+
+  sale_rows = (
+    Sale.objects.filter(business_id=business_id, created_at__gte=start, created_at__lt=end)
+    .annotate(day=TruncDate('created_at', tzinfo=tzinfo))
+    .values('day', 'status', 'payment_method')
+    .annotate(
+      sales_count=Count('id'),
+      gross_total=Coalesce(Sum('subtotal'), ZERO),
+      net_total=Coalesce(Sum('total'), ZERO),
+      discount_total=Coalesce(Sum('discount'), ZERO),
+    )
+    .order_by()
+  )
+  for row in sale_rows:
+    bucket = _sales_bucket(snapshot, (row['day'], row['status'], row['payment_method']))
+    bucket['sales_count'] = row['sales_count']
+    bucket['gross_total'] = row['gross_total']
+    bucket['net_total'] = row['net_total']
+    bucket['discount_total'] = row['discount_total']
+
+  items_queryset = SaleItem.objects.filter(
+    sale__business_id=business_id,
+    sale__created_at__gte=start,
+    sale__created_at__lt=end,
+  ).annotate(day=TruncDate('sale__created_at', tzinfo=tzinfo))
+
+  unit_rows = (
+    items_queryset.values('day', 'sale__status', 'sale__payment_method')
+    .annotate(units_total=Coalesce(Sum('quantity'), ZERO))
+    .order_by()
+  )
+  for row in unit_rows:
+    bucket = _sales_bucket(snapshot, (row['day'], row['sale__status'], row['sale__payment_method']))
+    bucket['units_total'] = row['units_total']
+
+  cancelled_rows = (
+    Sale.objects.filter(
+      business_id=business_id,
+      status=Sale.Status.CANCELLED,
+      cancelled_at__gte=start,
+      cancelled_at__lt=end,
+    )
+    .annotate(day=TruncDate('cancelled_at', tzinfo=tzinfo))
+    .values('day', 'payment_method')
+    .annotate(cancelled_count=Count('id'))
+    .order_by()
+  )
+  for row in cancelled_rows:
+    bucket = _sales_bucket(snapshot, (row['day'], Sale.Status.CANCELLED.value, row['payment_method']))
+    bucket['cancelled_count'] = row['cancelled_count']
+
+  payment_rows = (
+    Payment.objects.filter(business_id=business_id, created_at__gte=start, created_at__lt=end)
+    .annotate(day=TruncDate('created_at', tzinfo=tzinfo))
+    .values('day', 'method', 'sale__status', 'sale__payment_method')
+    .annotate(
+      amount_total=Coalesce(Sum('amount'), ZERO),
+      payments_count=Count('id'),
+      sales_count=Count('sale', distinct=True),
+    )
+    .order_by()
+  )
+  for row in payment_rows:
+    key = (row['day'], row['method'], row['sale__status'], row['sale__payment_method'])
+    snapshot.payments[key] = {name: row[name] for name in PAYMENT_FIELDS}
+
+  product_rows = (
+    items_queryset.values('day', 'sale__status', 'sale__payment_method', 'product_id', 'product_name_snapshot')
+    .annotate(
+      quantity_total=Coalesce(Sum('quantity'), ZERO),
+      amount_total=Coalesce(Sum('line_total'), ZERO),
+      sales_count=Count('sale', distinct=True),
+    )
+    .order_by()
+  )
+  for row in product_rows:
+    key = (
+      row['day'],
+      row['sale__status'],
+      row['sale__payment_method'],
+      row['product_id'],
+      row['product_name_snapshot'],
+    )
+    snapshot.products[key] = {name: row[name] for name in PRODUCT_FIELDS}
+
+  return snapshot
+
+
+def load_daily_rollups(business_id: int, first_day: date, last_day: date) -> RollupSnapshot:
+  """Lee los rollups persistidos con la misma forma que `compute_daily_rollups`."""
+  day_filter = {'business_id': business_id, 'day__gte': first_day, 'day__lte': last_day}
+  snapshot = RollupSnapshot()
+  for row in DailySalesRollup.objects.filter(**day_filter).values('day', 'status', 'payment_method', *SALES_FIELDS):
+    snapshot.sales[(row['day'], row['status'], row['payment_method'])] = {name: row[name] for name in SALES_FIELDS}
+  for row in DailyPaymentRollup.objects.filter(**day_filter).values(
+    'day', 'method', 'sale_status', 'sale_payment_method', *PAYMENT_FIELDS
+  ):
+    key = (row['day'], row['method'], row['sale_status'], row['sale_payment_method'])
+    snapshot.payments[key] = {name: row[name] for name in PAYMENT_FIELDS}
+  for row in DailyProductRollup.objects.filter(**day_filter).values(
+    'day', 'status', 'payment_method', 'product_id', 'product_name', *PRODUCT_FIELDS
+  ):
+    key = (row['day'], row['status'], row['payment_method'], row['product_id'], row['product_name'])
+    snapshot.products[key] = {name: row[name] for name in PRODUCT_FIELDS}
+  return snapshot
+
+
+@transaction.atomic
+def _rebuild_chunk(business_id: int, first_day: date, last_day: date) -> None:
+  day_filter = {'business_id': business_id, 'day__gte': first_day, 'day__lte': last_day}
+  DailyRollupState.objects.bulk_create(
+    [DailyRollupState(business_id=business_id, day=day) for day in _iter_days(first_day, last_day)],
+    ignore_conflicts=True,
+  )
+  # Serializa reconstrucciones concurrentes del mismo tramo (orden fijo por día).
+  list(DailyRollupState.objects.select_for_update().filter(**day_filter).order_by('day').values_list('pk', flat=True))
+  built_at = timezone.now()
+  snapshot = compute_daily_rollups(business_id, first_day, last_day)
+
+  DailySalesRollup.objects.filter(**day_filter).delete()
+  DailyPaymentRollup.objects.filter(**day_filter).delete()
+  DailyProductRollup.objects.filter(**day_filter).delete()
+
+  DailySalesRollup.objects.bulk_create(
+    [
+      DailySalesRollup(business_id=business_id, day=day, status=status, payment_method=method, **values)
+      for (day, status, method), values in snapshot.sales.items()
+    ]
+  )
+  DailyPaymentRollup.objects.bulk_create(
+    [
+      DailyPaymentRollup(
+        business_id=business_id,
+        day=day,
+        method=method,
+        sale_status=sale_status,
+        sale_payment_method=sale_method,
+        **values,
+      )
+      for (day, method, sale_status, sale_method), values in snapshot.payments.items()
+    ]
+  )
+  DailyProductRollup.objects.bulk_create(
+    [
+      DailyProductRollup(
+        business_id=business_id,
+        day=day,
+        status=status,
+        payment_method=method,
+        product_id=product_id,
+        product_name=product_name or '',
+        **values,
+      )
+      for (day, status, method, product_id, product_name), values in snapshot.products.items()
+    ]
+  )
+  DailyRollupState.objects.filter(**day_filter).update(built_at=built_at)
+
+
+def rebuild_daily_rollups(business_id: int, first_day: date, last_day: date) -> int:
+  """Reconstruye los rollups del rango en tramos acotados. Devuelve los días procesados."""
+  processed = 0
+  chunk_start = first_day
+  while chunk_start <= last_day:
+    chunk_end = min(chunk_start + timedelta(days=REBUILD_CHUNK_DAYS - 1), last_day)
+    _rebuild_chunk(business_id, chunk_start, chunk_end)
+    processed += (chunk_end - chunk_start).days + 1
+    chunk_start = chunk_end + timedelta(days=1)
+  return processed
+
+
+def ensure_daily_rollups(business_ids: Sequence[int], first_day: date, last_day: date) -> None:
+  """Reconstruye los días del rango que faltan o quedaron sucios."""
+  fresh_days: Dict[int, set] = defaultdict(set)
+  states = DailyRollupState.objects.filter(
+    business_id__in=business_ids,
+    day__gte=first_day,
+    day__lte=last_day,
+  ).values_list('business_id', 'day', 'built_at', 'dirty_at')
+  for business_id, day, built_at, dirty_at in states:
+    if built_at is not None and (dirty_at is None or built_at > dirty_at):
+      fresh_days[business_id].add(day)
+
+  expected_days = (last_day - first_day).days + 1
+  for business_id in business_ids:
+    fresh = fresh_days[business_id]
+    if len(fresh) == expected_days:
+      continue
+    stale = [day for day in _iter_days(first_day, last_day) if day not in fresh]
+    rebuild_daily_rollups(business_id, stale[0], stale[-1])
+
+
+def mark_rollup_days_dirty(business_id: int, days: Iterable[date]) -> int:
+  """Invalida los días ya materializados; los no materializados se construyen al leerlos."""
+  days = [day for day in days if day is not None]
+  if not business_id or not days:
+    return 0
+  return DailyRollupState.objects.filter(business_id=business_id, day__in=days).update(dirty_at=timezone.now())
+
+
+def _is_empty(values: Dict[str, Any]) -> bool:
+  return all(not value for value in values.values())
+
+
+def diff_daily_rollups(business_id: int, first_day: date, last_day: date) -> List[Dict[str, Any]]:
+  """Compara los rollups vigentes contra las filas crudas.
+
+  Solo se revisan días materializados y frescos: los sucios o ausentes se
+  reconstruyen en la próxima lectura y no representan una deriva.
+  """
+  fresh_days = {
+    day
+    for day, built_at, dirty_at in DailyRollupState.objects.filter(
+      business_id=business_id,
+      day__gte=first_day,
+      day__lte=last_day,
+    ).values_list('day', 'built_at', 'dirty_at')
+    if built_at is not None and (dirty_at is None or built_at > dirty_at)
+  }
+  if not fresh_days:
+    return []
+
+  expected = compute_daily_rollups(business_id, first_day, last_day)
+  stored = load_daily_rollups(business_id, first_day, last_day)
+  mismatches: List[Dict[str, Any]] = []
+  for table in ('sales', 'payments', 'products'):
+    expected_rows = getattr(expected, table)
+    stored_rows = getattr(stored, table)
+    for key in set(expected_rows) | set(stored_rows):
+      if key[0] not in fresh_days:
+        continue
+      expected_values = expected_rows.get(key) or {}
+      stored_values = stored_rows.get(key) or {}
+      if expected_values == stored_values:
+        continue
+      if _is_empty(expected_values) and _is_empty(stored_values):
+        continue
+      mismatches.append(
+        {
+          'table': table,
+          'day': key[0],
+          'key': key[1:],
+          'expected': expected_values,
+          'stored': stored_values,
+        }
+      )
+  mismatches.sort(key=lambda row: (row['day'], row['table']))
+  return mismatches
+
+
+# ---------------------------------------------------------------------------
+# Lecturas
+# ---------------------------------------------------------------------------
+
+
+def _filter_status_and_method(queryset, statuses: Sequence[str], payment_methods: Sequence[str], *, prefix: str = ''):
+  if statuses:
+    queryset = queryset.filter(**{f'{prefix}status__in': statuses})
+  if payment_methods:
+    queryset = queryset.filter(**{f'{prefix}payment_method__in': payment_methods})
+  return queryset
+
+
+def rollup_sales_totals(business_ids, plan: RollupPlan, statuses, payment_methods) -> Dict[str, Any]:
+  queryset = _filter_status_and_method(
+    DailySalesRollup.objects.filter(**plan.rollup_filter(business_ids)),
+    statuses,
+    payment_methods,
+  )
+  totals = queryset.aggregate(
+    gross=Coalesce(Sum('gross_total'), ZERO),
+    net=Coalesce(Sum('net_total'), ZERO),
+    discounts=Coalesce(Sum('discount_total'), ZERO),
+    units=Coalesce(Sum('units_total'), ZERO),
+    count=Coalesce(Sum('sales_count'), 0),
+  )
+  return {key: value or (0 if key == 'count' else ZERO) for key, value in totals.items()}
+
+
+def rollup_cancellations_count(business_ids, plan: RollupPlan) -> int:
+  total = DailySalesRollup.objects.filter(**plan.rollup_filter(business_ids)).aggregate(
+    total=Coalesce(Sum('cancelled_count'), 0),
+  )['total']
+  return int(total or 0)
+
+
+def rollup_sales_by_day(business_ids, plan: RollupPlan, statuses, payment_methods) -> List[Dict[str, Any]]:
+  queryset = _filter_status_and_method(
+    DailySalesRollup.objects.filter(**plan.rollup_filter(business_ids)),
+    statuses,
+    payment_methods,
+  )
+  return list(
+    queryset.values('day')
+    .annotate(net=Coalesce(Sum('net_total'), ZERO), count=Coalesce(Sum('sales_count'), 0))
+    .filter(count__gt=0)
+    .order_by('day')
+  )
+
+
+def rollup_payment_breakdown(business_ids, plan: RollupPlan, statuses, sale_payment_methods) -> List[Dict[str, Any]]:
+  """Cobros por medio. `sales_count` suma ventas distintas por día."""
+  queryset = _filter_status_and_method(
+    DailyPaymentRollup.objects.filter(**plan.rollup_filter(business_ids)),
+    statuses,
+    sale_payment_methods,
+    prefix='sale_',
+  )
+  return list(
+    queryset.values('method')
+    .annotate(
+      amount_total=Coalesce(Sum('amount_total'), ZERO),
+      payments_count=Coalesce(Sum('payments_count'), 0),
+      sales_count=Coalesce(Sum('sales_count'), 0),
+    )
+    .order_by()
+  )
+
+
+def rollup_product_totals(
+  business_ids,
+  plan: RollupPlan,
+  statuses,
+  payment_methods,
+  *,
+  by_product: bool = True,
+) -> List[Dict[str, Any]]:
+  queryset = _filter_status_and_method(
+    DailyProductRollup.objects.filter(**plan.rollup_filter(business_ids)),
+    statuses,
+    payment_methods,
+  )
+  group_fields = ['product_id', 'product_name'] if by_product else ['product_name']
+  return list(
+    queryset.values(*group_fields)
+    .annotate(
+      total_quantity=Coalesce(Sum('quantity_total'), ZERO),
+      total_amount=Coalesce(Sum('amount_total'), ZERO),
+    )
+    .order_by()
+  )
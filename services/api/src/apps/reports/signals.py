@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.cash.models import Payment
+from apps.cash.signals import payments_bulk_created
+from apps.sales.models import Sale, SaleItem
+from apps.sales.signals import sales_bulk_created
+from .rollups import local_day, mark_rollup_days_dirty
+
+
+def _schedule_dirty(business_id, days) -> None:
+  days = {day for day in days if day is not None}
+  if not business_id or not days:
+    return
+  transaction.on_commit(lambda: mark_rollup_days_dirty(business_id, days))
+
+
+def _sale_days(sale: Sale) -> set:
+  return {local_day(sale.created_at), local_day(sale.cancelled_at)}
+
+
+@receiver(post_save, sender=Sale)
+def sale_saved(sender, instance: Sale, created, update_fields=None, raw=False, **kwargs):
+  if raw:
+    return
+  days = _sale_days(instance)
+  status_changed = update_fields is None or 'status' in update_fields
+  if not created and status_changed and instance.status == Sale.Status.CANCELLED:
+    # Los cobros quedan agrupados por el estado de la venta: sus días también cambian.
+    days.update(local_day(value) for value in instance.payments.values_list('created_at', flat=True))
+  _schedule_dirty(instance.business_id, days)
+
+
+@receiver(post_delete, sender=Sale)
+def sale_deleted(sender, instance: Sale, **kwargs):
+  _schedule_dirty(instance.business_id, _sale_days(instance))
+
+
+@receiver(sales_bulk_created)
+def sales_bulk_created_days(sender, business, sales, **kwargs):
+  _schedule_dirty(business.pk, set().union(*(_sale_days(sale) for sale in sales)))
+
+
+@receiver(post_save, sender=SaleItem)
+@receiver(post_delete, sender=SaleItem)
+def sale_item_changed(sender, instance: SaleItem, raw=False, **kwargs):
+  if raw:
+    return
+  sale_row = Sale.objects.filter(pk=instance.sale_id).values_list('business_id', 'created_at').first()
+  if sale_row is None:
+    return
+  business_id, created_at = sale_row
+  _schedule_dirty(business_id, {local_day(created_at)})
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def payment_changed(sender, instance: Payment, raw=False, **kwargs):
+  if raw:
+    return
+  _schedule_dirty(instance.business_id, {local_day(instance.created_at)})
+
+
+@receiver(payments_bulk_created)
+def payments_bulk_created_days(sender, payments, **kwargs):
+  days_by_business: dict = {}
+  for payment in payments:
+    days_by_business.setdefault(payment.business_id, set()).add(local_day(payment.created_at))
+  for business_id, days in days_by_business.items():
+    _schedule_dirty(business_id, days)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Membership
+from apps.business.models import Business, Subscription
+from apps.reports.consolidation import SummaryPartial, fan_out, merge_rows, top_rows
+from apps.sales.models import Sale, SaleItem
+
+
+class ConsolidationHelpersTests(SimpleTestCase):
+  def test_merge_rows_sums_totals_of_matching_keys(self):
+    merged = merge_rows(
+      [{'name': 'Café', 'units': Decimal('2'), 'amount': Decimal('10')}],
+      [{'name': 'Café', 'units': Decimal('1'), 'amount': None}, {'name': 'Torta', 'units': Decimal('1'), 'amount': Decimal('8')}],
+      keys=('name',),
+      totals=('units', 'amount'),
+    )
+
+    self.assertEqual(
+      merged,
+      [
+        {'name': 'Café', 'units': Decimal('3'), 'amount': Decimal('10')},
+        {'name': 'Torta', 'units': Decimal('1'), 'amount': Decimal('8')},
+      ],
+    )
+    self.assertEqual([row['name'] for row in top_rows(merged, 1, key=lambda row: -row['amount'])], ['Café'])
+
+  def test_fan_out_keeps_business_order_without_duplicates(self):
+    self.assertEqual(fan_out([3, 1, 3], lambda business_id: business_id * 10), {3: 30, 1: 10})
+
+  def test_summary_partials_combine(self):
+    first = SummaryPartial(sales_count=2, net=Decimal('30'), gross=Decimal('30'))
+    first.add_period(date(2024, 1, 1), Decimal('30'), 2)
+    first.add_payments('cash', amount_total=Decimal('30'), payments_count=2, sales_count=2)
+    second = SummaryPartial(sales_count=1, net=Decimal('5'), gross=Decimal('6'), discounts=Decimal('1'))
+    second.add_period(date(2024, 1, 1), Decimal('5'), 1)
+    second.add_payments('cash', amount_total=Decimal('5'), payments_count=1, sales_count=1)
+
+    combined = SummaryPartial.combine([first, second])
+
+    self.assertEqual(combined.sales_count, 3)
+    self.assertEqual(combined.net, Decimal('35'))
+    self.assertEqual(combined.discounts, Decimal('1'))
+    self.assertEqual(combined.series, {date(2024, 1, 1): [Decimal('35'), 3]})
+    self.assertEqual(combined.payments['cash'], {'amount_total': Decimal('35'), 'payments_count': 3, 'sales_count': 3})
+    # Los parciales no se modifican al combinarlos.
+    self.assertEqual(first.series, {date(2024, 1, 1): [Decimal('30'), 2]})
+
+
+class ConsolidatedReportsTests(APITestCase):
+  def setUp(self):
+    self.user = get_user_model().objects.create_user(
+      username='hq-owner',
+      email='hq-owner@example.com',
+      password='pass1234',
+    )
+    self.hq = self._create_business('Casa Central')
+    self.north = self._create_business('Sucursal Norte', parent=self.hq)
+    self.south = self._create_business('Sucursal Sur', parent=self.hq)
+    Membership.objects.create(user=self.user, business=self.hq, role='owner')
+    self.client.force_authenticate(user=self.user)
+    self.client.cookies['bid'] = str(self.hq.id)
+
+    yesterday = timezone.now() - timedelta(days=1)
+    self._create_sale(self.hq, [('Torta', '1', '150.00'), ('Café', '1', '100.00')], created_at=yesterday)
+    self._create_sale(self.north, [('Café', '2', '50.00')])
+    self._create_sale(self.south, [('Café', '1', '40.00')], created_at=yesterday)
+    self._create_sale(self.south, [('Medialuna', '3', '10.00')])
+
+  def _create_business(self, name: str, parent: Business | None = None) -> Business:
+    business = Business.objects.create(name=name, parent=parent)
+    Subscription.objects.create(business=business, plan='pro', status='active')
+    return business
+
+  def _create_sale(self, business: Business, items, created_at=None) -> Sale:
+    total = sum((Decimal(quantity) * Decimal(price) for _, quantity, price in items), Decimal('0'))
+    sale = Sale.objects.create(
+      business=business,
+      number=Sale.objects.filter(business=business).count() + 1,
+      status=Sale.Status.COMPLETED,
+      payment_method=Sale.PaymentMethod.CASH,
+      subtotal=total,
+      discount=Decimal('0.00'),
+      total=total,
+    )
+    for name, quantity, price in items:
+      SaleItem.objects.create(
+        sale=sale,
+        product=None,
+        product_name_snapshot=name,
+        quantity=Decimal(quantity),
+        unit_price=Decimal(price),
+        line_total=Decimal(quantity) * Decimal(price),
+      )
+    if created_at:
+      Sale.objects.filter(pk=sale.pk).update(created_at=created_at, updated_at=created_at)
+    return sale
+
+  def _params(self, **extra):
+    today = timezone.localdate()
+    return {'from': (today - timedelta(days=3)).isoformat(), 'to': today.isoformat(), 'scope': 'children', **extra}
+
+  def test_summary_adds_up_every_branch_and_returns_the_breakdown(self):
+    response = self.client.get('/api/v1/reports/summary/', self._params())
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(response.data['kpis']['sales_count'], 4)
+    self.assertEqual(response.data['kpis']['net_sales_total'], '420.00')
+    branches = {branch['name']: branch['kpis'] for branch in response.data['branches']}
+    self.assertEqual(set(branches), {'Casa Central', 'Sucursal Norte', 'Sucursal Sur'})
+    self.assertEqual(branches['Casa Central']['net_sales_total'], '250.00')
+    self.assertEqual(branches['Sucursal Norte']['net_sales_total'], '100.00')
+    self.assertEqual(branches['Sucursal Sur']['sales_count'], 2)
+    self.assertEqual(sum(kpis['sales_count'] for kpis in branches.values()), response.data['kpis']['sales_count'])
+
+  def test_current_scope_has_no_branch_breakdown(self):
+    response = self.client.get('/api/v1/reports/summary/', self._params(scope='current'))
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(response.data['kpis']['sales_count'], 1)
+    self.assertNotIn('branches', response.data)
+
+  def test_leaderboard_ranks_products_by_their_merged_totals(self):
+    # Torta lidera en la casa central, pero Café suma más entre todas las sucursales.
+    response = self.client.get('/api/v1/reports/products/top/', self._params(limit=1))
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual([item['name'] for item in response.data['items']], ['Café'])
+    self.assertEqual(response.data['items'][0]['amount_total'], '240.00')
+    branches = {branch['name']: branch['items'] for branch in response.data['branches']}
+    self.assertEqual([item['name'] for item in branches['Casa Central']], ['Torta'])
+
+  def test_products_report_merges_rows_across_branches(self):
+    response = self.client.get('/api/v1/reports/products/', self._params(ordering='-amount'))
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    rows = [(row['name'], row['quantity'], row['amount_total'], row['sales_count']) for row in response.data['results']]
+    self.assertEqual(
+      rows,
+      [
+        ('Café', '4.00', '240.00', 3),
+        ('Torta', '1.00', '150.00', 1),
+        ('Medialuna', '3.00', '30.00', 1),
+      ],
+    )
+    self.assertEqual(response.data['totals']['products_count'], 3)
+    self.assertEqual(response.data['totals']['gross_sales'], '420.00')
+    branches = {branch['name']: branch['totals'] for branch in response.data['branches']}
+    self.assertEqual(branches['Sucursal Sur']['products_count'], 2)
@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Membership
+from apps.business.models import Business, Subscription
+from apps.cash.models import CashMovement, CashRegister, CashSession, Payment
+from apps.customers.models import Customer
+from apps.sales.models import Sale, SaleItem
+from common.query_budget import QUERY_BUDGET_ROWS, query_budget
+
+
+class ReportsQueryBudgetTests(APITestCase):
+  def setUp(self):
+    self.user = get_user_model().objects.create_user(username='budget-reports', email='budget-reports@example.com', password='pass1234')
+    self.business = Business.objects.create(name='Reportes Budget')
+    Subscription.objects.create(business=self.business, plan='pro', status='active')
+    Membership.objects.create(user=self.user, business=self.business, role='manager')
+    self.client.force_authenticate(user=self.user)
+    self.client.cookies['bid'] = str(self.business.id)
+    self.today = timezone.localdate().isoformat()
+
+    for index in range(QUERY_BUDGET_ROWS):
+      register = CashRegister.objects.create(business=self.business, name=f'Caja {index}')
+      session = CashSession.objects.create(business=self.business, register=register, opened_by=self.user)
+      customer = Customer.objects.create(business=self.business, name=f'Cliente {index}')
+      sale = Sale.objects.create(
+        business=self.business,
+        number=index + 1,
+        customer=customer,
+        created_by=self.user,
+        total=Decimal('80.00'),
+        cash_session=session,
+      )
+      SaleItem.objects.create(
+        sale=sale,
+        product_name_snapshot='Producto',
+        quantity=Decimal('2'),
+        unit_price=Decimal('40.00'),
+        line_total=Decimal('80.00'),
+      )
+      for method in (Payment.Method.CASH, Payment.Method.DEBIT):
+        Payment.objects.create(
+          business=self.business,
+          sale=sale,
+          session=session,
+          method=method,
+          amount=Decimal('40.00'),
+        )
+      CashMovement.objects.create(
+        business=self.business,
+        session=session,
+        movement_type=CashMovement.MovementType.IN,
+        amount=Decimal('10.00'),
+      )
+
+  def test_sales_report_list_stays_within_budget(self):
+    with query_budget('reports.sales'):
+      response = self.client.get(reverse('reports:sales-list'), {'from': self.today, 'to': self.today})
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(len(response.data['results']), QUERY_BUDGET_ROWS)
+
+  def test_cash_closures_list_stays_within_budget(self):
+    with query_budget('reports.cash_closures'):
+      response = self.client.get(
+        reverse('reports:cash-closures'),
+        {'status': 'all', 'from': self.today, 'to': self.today},
+      )
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(len(response.data['results']), QUERY_BUDGET_ROWS)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import csv
+import gzip
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Membership
+from apps.business.models import Business, Subscription
+from apps.cash.models import CashRegister, CashSession, Payment
+from apps.sales.models import Sale, SaleItem
+
+
+class ReportExportTests(APITestCase):
+  def setUp(self):
+    self.user = get_user_model().objects.create_user(
+      username='export-user',
+      email='export@example.com',
+      password='pass1234',
+    )
+    self.business = Business.objects.create(name='Demo Exports')
+    Subscription.objects.create(business=self.business, plan='pro', status='active')
+    self.membership = Membership.objects.create(user=self.user, business=self.business, role='manager')
+    self.client.force_authenticate(user=self.user)
+    self.client.cookies['bid'] = str(self.business.id)
+    register = CashRegister.objects.create(business=self.business, name='Caja Principal')
+    self.session = CashSession.objects.create(business=self.business, register=register, opened_by=self.user)
+
+  def _create_sale(self, total: str, *, status_value: str = Sale.Status.COMPLETED, name: str = 'Café') -> Sale:
+    sale = Sale.objects.create(
+      business=self.business,
+      number=Sale.objects.filter(business=self.business).count() + 1,
+      status=status_value,
+      payment_method=Sale.PaymentMethod.CASH,
+      subtotal=Decimal(total),
+      total=Decimal(total),
+    )
+    SaleItem.objects.create(
+      sale=sale,
+      product_name_snapshot=name,
+      quantity=Decimal('1'),
+      unit_price=Decimal(total),
+      line_total=Decimal(total),
+    )
+    return sale
+
+  def _params(self, **extra):
+    today = timezone.localdate().isoformat()
+    return {'from': today, 'to': today, **extra}
+
+  def _csv_rows(self, response):
+    content = b''.join(response.streaming_content).decode('utf-8-sig')
+    return list(csv.reader(StringIO(content)))
+
+  def test_sales_export_streams_csv_with_the_report_filters(self):
+    self._create_sale('120.00')
+    self._create_sale('80.00')
+    self._create_sale('50.00', status_value=Sale.Status.CANCELLED)
+
+    response = self.client.get('/api/v1/reports/sales/export/', self._params(status='completed'))
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertTrue(response.streaming)
+    self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+    self.assertIn('ventas.csv', response['Content-Disposition'])
+    rows = self._csv_rows(response)
+    self.assertEqual(rows[0][:3], ['Número', 'Fecha', 'Estado'])
+    self.assertEqual([row[0] for row in rows[1:]], ['2', '1'])
+    self.assertEqual([row[9] for row in rows[1:]], ['80.00', '120.00'])
+
+  def test_payments_export_quotes_values_with_separators(self):
+    sale = self._create_sale('300.00')
+    Payment.objects.create(
+      business=self.business,
+      sale=sale,
+      session=self.session,
+      method=Payment.Method.TRANSFER,
+      amount=Decimal('300.00'),
+      reference='Banco, cuenta "A"',
+    )
+
+    response = self.client.get('/api/v1/reports/payments/export/', self._params())
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    rows = self._csv_rows(response)
+    self.assertEqual(len(rows), 2)
+    self.assertEqual(rows[1][1], '1')
+    self.assertEqual(rows[1][4:7], ['300.00', 'Banco, cuenta "A"', 'Caja Principal'])
+
+  def test_products_export_as_xlsx(self):
+    self._create_sale('100.00', name='Café')
+    self._create_sale('100.00', name='Café')
+    self._create_sale('50.00', name='Torta')
+
+    response = self.client.get('/api/v1/reports/products/export/', self._params(file_format='xlsx'))
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertIn('productos.xlsx', response['Content-Disposition'])
+    workbook = load_workbook(BytesIO(b''.join(response.streaming_content)), read_only=True)
+    rows = list(workbook.active.iter_rows(values_only=True))
+    self.assertEqual(rows[0], ('Producto', 'SKU', 'Cantidad', 'Monto', 'Ventas', 'Participación %'))
+    self.assertEqual([(row[0], Decimal(str(row[3])), row[4]) for row in rows[1:]], [
+      ('Café', Decimal('200'), 2),
+      ('Torta', Decimal('50'), 1),
+    ])
+
+  def test_gzip_export(self):
+    self._create_sale('100.00')
+
+    response = self.client.get('/api/v1/reports/sales/export/', self._params(gzip='true'))
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(response['Content-Type'], 'application/gzip')
+    self.assertIn('ventas.csv.gz', response['Content-Disposition'])
+    content = gzip.decompress(b''.join(response.streaming_content)).decode('utf-8-sig')
+    self.assertEqual(len(list(csv.reader(StringIO(content)))), 2)
+
+  def test_cash_closures_export_lists_closed_sessions(self):
+    CashSession.objects.filter(pk=self.session.pk).update(
+      status=CashSession.Status.CLOSED,
+      closed_at=timezone.now(),
+      closed_by=self.user,
+      closing_cash_counted=Decimal('90.00'),
+    )
+
+    response = self.client.get('/api/v1/reports/cash/closures/export/', self._params())
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    rows = self._csv_rows(response)
+    self.assertEqual(len(rows), 2)
+    self.assertEqual(rows[1][0], 'Caja Principal')
+    self.assertEqual(rows[1][8], '90.00')
+
+  def test_export_requires_export_permission_and_a_known_format(self):
+    response = self.client.get('/api/v1/reports/sales/export/', self._params(file_format='pdf'))
+    self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    self.membership.role = 'analyst'
+    self.membership.save()
+    self.assertEqual(self.client.get('/api/v1/reports/sales/').status_code, status.HTTP_200_OK)
+    response = self.client.get('/api/v1/reports/sales/export/', self._params())
+    self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
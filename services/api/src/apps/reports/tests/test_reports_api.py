@@ -2,9 +2,12 @@ from __future__ import annotations
 
 from decimal import Decimal
 from datetime import timedelta
+from io import StringIO
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -15,6 +18,7 @@ from apps.cash.models import CashMovement, CashRegister, CashSession, Payment
 from apps.cash.services import compute_session_totals
 from apps.catalog.models import Product
 from apps.inventory.models import ProductStock
+from apps.reports.models import DailyRollupState, DailySalesRollup
 from apps.sales.models import Sale, SaleItem
 
 
@@ -436,4 +440,83 @@ class ReportsAPITests(APITestCase):
     self.assertEqual(data['items'][0]['status'], 'OUT')
     snack_row = next(item for item in data['items'] if item['name'] == 'Snack mini')
     self.assertEqual(snack_row['status'], 'LOW')
-    self.assertEqual(snack_row['threshold'], expected_threshold)
\ No newline at end of file
+    self.assertEqual(snack_row['threshold'], expected_threshold)
+
+  def test_summary_reads_closed_days_from_rollups(self):
+    now = timezone.now()
+    session = self._create_session(self.business)
+    old_sale = self._create_sale(self.business, total=Decimal('300.00'), created_at=now - timedelta(days=2))
+    Payment.objects.create(
+      business=self.business,
+      sale=old_sale,
+      session=session,
+      method=Payment.Method.CASH,
+      amount=Decimal('300.00'),
+    )
+    Payment.objects.filter(sale=old_sale).update(created_at=now - timedelta(days=2))
+    self._create_sale(self.business, total=Decimal('200.00'))
+    params = {'from': (now.date() - timedelta(days=3)).isoformat(), 'to': now.date().isoformat()}
+
+    response = self.client.get('/api/v1/reports/summary/', params)
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertTrue(DailyRollupState.objects.filter(business=self.business).exists())
+    self.assertTrue(DailySalesRollup.objects.filter(business=self.business, sales_count=1).exists())
+    kpis = response.data['kpis']
+    self.assertEqual(kpis['sales_count'], 2)
+    self.assertEqual(kpis['net_sales_total'], '500.00')
+    self.assertEqual(len(response.data['series']), 2)
+    cash_row = next(row for row in response.data['payments_breakdown'] if row['method'] == Payment.Method.CASH)
+    self.assertEqual(cash_row['amount_total'], '300.00')
+
+  def test_rollup_day_is_rebuilt_after_cancellation(self):
+    now = timezone.now()
+    sale = self._create_sale(self.business, total=Decimal('150.00'), created_at=now - timedelta(days=1))
+    params = {'from': (now.date() - timedelta(days=2)).isoformat(), 'to': now.date().isoformat()}
+    first = self.client.get('/api/v1/reports/summary/', params)
+    self.assertEqual(first.data['kpis']['sales_count'], 1)
+
+    with self.captureOnCommitCallbacks(execute=True):
+      sale.status = Sale.Status.CANCELLED
+      sale.save(update_fields=['status', 'updated_at'])
+
+    second = self.client.get('/api/v1/reports/summary/', params)
+
+    self.assertEqual(second.data['kpis']['sales_count'], 0)
+    cancelled = self.client.get('/api/v1/reports/summary/', {**params, 'status': 'cancelled'})
+    self.assertEqual(cancelled.data['kpis']['sales_count'], 1)
+
+  def test_check_sales_rollups_reports_drift(self):
+    now = timezone.now()
+    self._create_sale(self.business, total=Decimal('80.00'), created_at=now - timedelta(days=1))
+    yesterday = (now - timedelta(days=1)).astimezone(timezone.get_default_timezone()).date()
+    call_command('rebuild_sales_rollups', business=self.business.id, stdout=StringIO())
+    DailySalesRollup.objects.filter(business=self.business).update(net_total=Decimal('1.00'))
+
+    with self.assertRaises(CommandError):
+      call_command('check_sales_rollups', business=self.business.id, stdout=StringIO())
+
+    call_command('check_sales_rollups', business=self.business.id, fix=True, stdout=StringIO())
+    rollup = DailySalesRollup.objects.get(business=self.business, day=yesterday)
+    self.assertEqual(rollup.net_total, Decimal('80.00'))
+
+  def test_payments_report_pages_by_cursor(self):
+    session = self._create_session(self.business)
+    sale = self._create_sale(self.business, total=Decimal('90.00'))
+    for method in (Payment.Method.CASH, Payment.Method.DEBIT, Payment.Method.CASH):
+      Payment.objects.create(business=self.business, sale=sale, session=session, method=method, amount=Decimal('30.00'))
+    today = timezone.localdate().isoformat()
+    params = {'from': today, 'to': today, 'limit': 2}
+
+    first = self.client.get('/api/v1/reports/payments/', {**params, 'pagination': 'cursor'})
+
+    self.assertEqual(first.status_code, status.HTTP_200_OK)
+    self.assertEqual({row['method'] for row in first.data['breakdown']}, {'cash', 'debit'})
+    self.assertIsNone(first.data['count'])
+    second = self.client.get(first.data['next'])
+    ids = [row['id'] for row in first.data['results'] + second.data['results']]
+    self.assertEqual(len(set(ids)), 3)
+    self.assertIsNone(second.data['next'])
+
+    offset = self.client.get('/api/v1/reports/payments/', params)
+    self.assertEqual(offset.data['count'], 3)
@@ -2,10 +2,14 @@ from django.urls import path
 
 from .views import (
 	CashClosureDetailView,
+	CashClosureExportView,
 	CashClosureListView,
+	PaymentsReportExportView,
 	PaymentsReportView,
+	ReportProductsExportView,
 	ReportProductsView,
 	ReportSalesDetailView,
+	ReportSalesExportView,
 	ReportSalesListView,
 	ReportSummaryView,
 	StockAlertsReportView,
@@ -17,11 +21,15 @@ app_name = 'reports'
 urlpatterns = [
 	path('summary/', ReportSummaryView.as_view(), name='summary'),
 	path('sales/', ReportSalesListView.as_view(), name='sales-list'),
+	path('sales/export/', ReportSalesExportView.as_view(), name='sales-export'),
 	path('sales/<uuid:pk>/', ReportSalesDetailView.as_view(), name='sales-detail'),
 	path('payments/', PaymentsReportView.as_view(), name='payments'),
+	path('payments/export/', PaymentsReportExportView.as_view(), name='payments-export'),
 	path('products/', ReportProductsView.as_view(), name='products'),
+	path('products/export/', ReportProductsExportView.as_view(), name='products-export'),
 	path('products/top/', TopProductsLeaderboardView.as_view(), name='products-top'),
 	path('stock/alerts/', StockAlertsReportView.as_view(), name='stock-alerts'),
 	path('cash/closures/', CashClosureListView.as_view(), name='cash-closures'),
+	path('cash/closures/export/', CashClosureExportView.as_view(), name='cash-closures-export'),
 	path('cash/closures/<uuid:pk>/', CashClosureDetailView.as_view(), name='cash-closure-detail'),
 ]
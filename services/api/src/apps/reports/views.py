@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone as dt_timezone
+from datetime import date, datetime, timedelta, timezone as dt_timezone
 from decimal import Decimal
 from typing import Dict, Iterable, List, Optional
 from uuid import UUID
@@ -27,18 +27,34 @@ from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import generics
 from rest_framework.exceptions import PermissionDenied, ValidationError
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.accounts.access import resolve_business_context, resolve_request_membership
-from apps.accounts.permissions import HasBusinessMembership, HasPermission, HasEntitlement
+from apps.accounts.permissions import HasBusinessMembership, HasPermission, HasEntitlement, request_has_permission
 from apps.cash.models import CashMovement, CashSession, Payment
-from apps.inventory.models import ProductStock
+from apps.inventory.models import InventoryValuation, StockValuation
+from apps.inventory.valuation import rebuild_inventory_valuation
 from apps.cash.services import compute_session_totals, get_session_sales_queryset
 from apps.sales.models import Sale, SaleItem
+from apps.business.models import Business
 from apps.business.scope import get_allowed_business_ids
+from common.exports import ExportColumn, export_response, export_rows
+from common.pagination import KeysetPagination
+from common.search import SALE_SEARCH, search_queryset
+
+from .consolidation import SummaryPartial, fan_out, merge_rows, top_rows
+from .rollups import (
+	RollupPlan,
+	ensure_daily_rollups,
+	plan_rollup_window,
+	rollup_cancellations_count,
+	rollup_payment_breakdown,
+	rollup_product_totals,
+	rollup_sales_by_day,
+	rollup_sales_totals,
+)
 
 from .serializers import (
 	CashClosureListSerializer,
@@ -256,27 +272,233 @@ def _annotate_payments_total(queryset):
 
 
 def _apply_sales_search(queryset, term: str):
-	if not term:
-		return queryset
-	filters = Q(customer__name__icontains=term) | Q(notes__icontains=term)
-	filters |= Q(customer__doc_number__icontains=term)
-	filters |= Q(customer__email__icontains=term)
-	filters |= Q(customer__phone__icontains=term)
-	if term.isdigit():
-		filters |= Q(number=int(term))
-	term_uuid = _parse_uuid(term)
-	if term_uuid:
-		filters |= Q(pk=term_uuid)
-	return queryset.filter(filters)
-
-
-class ReportsPagination(LimitOffsetPagination):
+	return search_queryset(queryset, term, SALE_SEARCH)
+
+
+def _plan_rollups(business_ids, date_range: DateRange, tzinfo: ZoneInfo, *, enabled: bool = True) -> RollupPlan:
+	plan = plan_rollup_window(date_range.start, date_range.end, tzinfo, enabled=enabled)
+	if plan.uses_rollup:
+		ensure_daily_rollups(business_ids, plan.first_day, plan.last_day)
+	return plan
+
+
+def _raw_window_queryset(queryset, plan: RollupPlan, field_name: str):
+	raw_filter = plan.raw_filter(field_name)
+	if raw_filter is None:
+		return queryset.none()
+	return queryset.filter(raw_filter)
+
+
+def _period_start(day: date, group_by: str) -> date:
+	if group_by == 'week':
+		return day - timedelta(days=day.weekday())
+	if group_by == 'month':
+		return day.replace(day=1)
+	return day
+
+
+def _merge_product_rows(items_queryset, rollup_rows) -> List[Dict[str, object]]:
+	raw_rows = items_queryset.values('product_id', 'product_name_snapshot').annotate(
+		total_quantity=Coalesce(Sum('quantity'), Decimal('0')),
+		total_amount=Coalesce(Sum('line_total'), Decimal('0')),
+	).order_by()
+	return merge_rows(
+		raw_rows,
+		[
+			{
+				'product_id': row['product_id'],
+				'product_name_snapshot': row['product_name'],
+				'total_quantity': row['total_quantity'],
+				'total_amount': row['total_amount'],
+			}
+			for row in rollup_rows
+		],
+		keys=('product_id', 'product_name_snapshot'),
+		totals=('total_quantity', 'total_amount'),
+	)
+
+
+def _sort_product_rows(rows: List[Dict[str, object]], metric: str) -> List[Dict[str, object]]:
+	primary = 'total_amount' if metric == 'amount' else 'total_quantity'
+	return sorted(
+		rows,
+		key=lambda row: (-row[primary], -row['total_amount'], row['product_name_snapshot'] or ''),
+	)
+
+
+class ReportsPagination(KeysetPagination):
 	default_limit = 25
 	max_limit = 100
 	limit_query_param = 'limit'
 	offset_query_param = 'offset'
 
 
+class ReportExportView(APIView):
+	"""Descarga CSV/XLSX de un reporte: `export_reports` más el permiso del reporte."""
+
+	permission_classes = [IsAuthenticated, HasBusinessMembership, HasEntitlement, HasPermission]
+	required_entitlement = 'gestion.reports'
+	required_permission = 'export_reports'
+	report_permission = ''
+
+	def check_permissions(self, request):
+		super().check_permissions(request)
+		if self.report_permission and not request_has_permission(request, self.report_permission):
+			self.permission_denied(request, message=HasPermission.message)
+
+
+def _user_label(user) -> str:
+	if user is None:
+		return ''
+	return user.get_full_name() or user.get_username()
+
+
+def _summary_partial(
+	business_ids,
+	plan: RollupPlan,
+	tzinfo: ZoneInfo,
+	group_by: str,
+	statuses: List[str],
+	sale_payment_methods: List[str],
+	user_id: Optional[UUID],
+) -> SummaryPartial:
+	partial = SummaryPartial()
+	sale_queryset = _raw_window_queryset(Sale.objects.filter(business__in=business_ids), plan, 'created_at')
+	sale_queryset = _apply_sale_filters(sale_queryset, statuses, sale_payment_methods, user_id)
+
+	aggregates = sale_queryset.aggregate(
+		gross=Coalesce(Sum('subtotal'), Decimal('0')),
+		net=Coalesce(Sum('total'), Decimal('0')),
+		discounts=Coalesce(Sum('discount'), Decimal('0')),
+		count=Count('id'),
+	)
+	partial.sales_count = int(aggregates['count'] or 0)
+	partial.gross = aggregates['gross'] or Decimal('0')
+	partial.net = aggregates['net'] or Decimal('0')
+	partial.discounts = aggregates['discounts'] or Decimal('0')
+
+	items_queryset = _raw_window_queryset(
+		SaleItem.objects.filter(sale__business__in=business_ids),
+		plan,
+		'sale__created_at',
+	)
+	if statuses:
+		items_queryset = items_queryset.filter(sale__status__in=statuses)
+	if sale_payment_methods:
+		items_queryset = items_queryset.filter(sale__payment_method__in=sale_payment_methods)
+	if user_id:
+		items_queryset = items_queryset.filter(sale__created_by__id=user_id)
+	partial.units = items_queryset.aggregate(total=Coalesce(Sum('quantity'), Decimal('0')))['total'] or Decimal('0')
+
+	partial.cancellations = _raw_window_queryset(
+		Sale.objects.filter(
+			business__in=business_ids,
+			status=Sale.Status.CANCELLED,
+			cancelled_at__isnull=False,
+		),
+		plan,
+		'cancelled_at',
+	).count()
+
+	if plan.uses_rollup:
+		rollup_totals = rollup_sales_totals(business_ids, plan, statuses, sale_payment_methods)
+		partial.sales_count += int(rollup_totals['count'])
+		partial.gross += rollup_totals['gross']
+		partial.net += rollup_totals['net']
+		partial.discounts += rollup_totals['discounts']
+		partial.units += rollup_totals['units']
+		partial.cancellations += rollup_cancellations_count(business_ids, plan)
+
+	trunc_map = {'day': TruncDay, 'week': TruncWeek, 'month': TruncMonth}
+	grouper = trunc_map[group_by]
+	series_rows = (
+		sale_queryset.annotate(period=grouper('created_at', tzinfo=tzinfo))
+		.values('period')
+		.annotate(gross=Coalesce(Sum('total'), Decimal('0')), count=Count('id'))
+		.order_by('period')
+	)
+	for row in series_rows:
+		period = row['period']
+		if period is None:
+			continue
+		partial.add_period(period.astimezone(tzinfo).date(), row['gross'], row['count'])
+	if plan.uses_rollup:
+		for row in rollup_sales_by_day(business_ids, plan, statuses, sale_payment_methods):
+			partial.add_period(_period_start(row['day'], group_by), row['net'], row['count'])
+
+	payment_queryset = _raw_window_queryset(Payment.objects.filter(business__in=business_ids), plan, 'created_at')
+	payment_queryset = _apply_payment_sale_filters(payment_queryset, statuses, sale_payment_methods)
+	if user_id:
+		payment_queryset = payment_queryset.filter(created_by__id=user_id)
+	breakdown_rows = list(
+		payment_queryset.values('method')
+		.annotate(
+			amount_total=Coalesce(Sum('amount'), Decimal('0')),
+			payments_count=Count('id'),
+			sales_count=Count('sale', distinct=True),
+		)
+		.order_by()
+	)
+	if plan.uses_rollup:
+		breakdown_rows += rollup_payment_breakdown(business_ids, plan, statuses, sale_payment_methods)
+	for row in breakdown_rows:
+		partial.add_payments(
+			row['method'],
+			amount_total=row['amount_total'],
+			payments_count=row['payments_count'],
+			sales_count=row['sales_count'],
+		)
+
+	product_rows = list(
+		items_queryset.values('product_name_snapshot')
+		.annotate(
+			total_quantity=Coalesce(Sum('quantity'), Decimal('0')),
+			total_amount=Coalesce(Sum('line_total'), Decimal('0')),
+		)
+		.order_by()
+	)
+	if plan.uses_rollup:
+		product_rows += [
+			{
+				'product_name_snapshot': row['product_name'],
+				'total_quantity': row['total_quantity'],
+				'total_amount': row['total_amount'],
+			}
+			for row in rollup_product_totals(business_ids, plan, statuses, sale_payment_methods, by_product=False)
+		]
+	for row in product_rows:
+		partial.add_product(
+			row['product_name_snapshot'],
+			total_quantity=row['total_quantity'],
+			total_amount=row['total_amount'],
+		)
+	return partial
+
+
+def _summary_kpis(partial: SummaryPartial) -> Dict[str, object]:
+	avg_ticket = Decimal('0')
+	if partial.sales_count:
+		avg_ticket = (partial.net / partial.sales_count).quantize(MONEY_PLACES)
+	return {
+		'gross_sales_total': _format_money(partial.gross),
+		'net_sales_total': _format_money(partial.net),
+		'discounts_total': _format_money(partial.discounts),
+		'sales_count': partial.sales_count,
+		'avg_ticket': _format_money(avg_ticket),
+		'units_sold': _format_decimal(partial.units),
+		'cancellations_count': partial.cancellations,
+	}
+
+
+def _branch_breakdown(partials: Dict[int, object], render) -> List[Dict[str, object]]:
+	"""Desglose por sucursal de un reporte consolidado, en el orden de los parciales."""
+	names = dict(Business.objects.filter(pk__in=list(partials)).values_list('id', 'name'))
+	return [
+		{'business_id': business_id, 'name': names.get(business_id, ''), **render(partial)}
+		for business_id, partial in partials.items()
+	]
+
+
 class ReportSummaryView(APIView):
 	permission_classes = [IsAuthenticated, HasBusinessMembership, HasPermission]
 	required_permission = 'view_dashboard'
@@ -293,97 +515,34 @@ class ReportSummaryView(APIView):
 		sale_payment_methods = _parse_list(request.query_params.get('payment_method'), Sale.PaymentMethod.values)
 		user_id = _parse_uuid(request.query_params.get('user_id'))
 
-		sale_queryset = Sale.objects.filter(
-			business__in=business_ids,
-			created_at__gte=date_range.start,
-			created_at__lte=date_range.end,
+		# Closed days come from the daily rollups; only partial edges and today hit raw rows.
+		plan = _plan_rollups(business_ids, date_range, tzinfo, enabled=user_id is None)
+		# One partial per branch (in parallel when possible), merged afterwards.
+		partials = fan_out(
+			business_ids,
+			lambda business_id: _summary_partial(
+				[business_id], plan, tzinfo, group_by, statuses, sale_payment_methods, user_id
+			),
 		)
-		sale_queryset = _apply_sale_filters(sale_queryset, statuses, sale_payment_methods, user_id)
+		summary = SummaryPartial.combine(partials.values())
 
-		aggregates = sale_queryset.aggregate(
-			gross=Coalesce(Sum('subtotal'), Decimal('0')),
-			net=Coalesce(Sum('total'), Decimal('0')),
-			discounts=Coalesce(Sum('discount'), Decimal('0')),
-			count=Count('id'),
-		)
-		sales_count = int(aggregates['count'] or 0)
-		gross_total = aggregates['gross'] or Decimal('0')
-		net_total = aggregates['net'] or Decimal('0')
-		discount_total = aggregates['discounts'] or Decimal('0')
-		avg_ticket = Decimal('0')
-		if sales_count:
-			avg_ticket = (net_total / sales_count).quantize(MONEY_PLACES)
-
-		items_queryset = SaleItem.objects.filter(
-			sale__business__in=business_ids,
-			sale__created_at__gte=date_range.start,
-			sale__created_at__lte=date_range.end,
-		)
-		if statuses:
-			items_queryset = items_queryset.filter(sale__status__in=statuses)
-		if sale_payment_methods:
-			items_queryset = items_queryset.filter(sale__payment_method__in=sale_payment_methods)
-		if user_id:
-			items_queryset = items_queryset.filter(sale__created_by__id=user_id)
-		units_sold = items_queryset.aggregate(total=Coalesce(Sum('quantity'), Decimal('0')))['total'] or Decimal('0')
-
-		cancellations_count = Sale.objects.filter(
-			business__in=business_ids,
-			status=Sale.Status.CANCELLED,
-			cancelled_at__isnull=False,
-			cancelled_at__gte=date_range.start,
-			cancelled_at__lte=date_range.end,
-		).count()
-
-		trunc_map = {'day': TruncDay, 'week': TruncWeek, 'month': TruncMonth}
-		grouper = trunc_map[group_by]
-		series_rows = (
-			sale_queryset.annotate(period=grouper('created_at', tzinfo=tzinfo))
-			.values('period')
-			.annotate(gross=Coalesce(Sum('total'), Decimal('0')), count=Count('id'))
-			.order_by('period')
-		)
 		series = []
-		for row in series_rows:
-			period = row['period']
-			if period is None:
-				continue
-			period_local = period.astimezone(tzinfo)
-			gross_value = row['gross'] or Decimal('0')
-			period_count = row['count'] or 0
+		for period_key in sorted(summary.series):
+			gross_value, period_count = summary.series[period_key]
 			avg_value = Decimal('0')
 			if period_count:
 				avg_value = (gross_value / period_count).quantize(MONEY_PLACES)
 			series.append(
 				{
-					'period': period_local.date().isoformat(),
+					'period': period_key.isoformat(),
 					'gross_sales': _format_money(gross_value),
 					'sales_count': period_count,
 					'avg_ticket': _format_money(avg_value),
 				}
 			)
 
-		payment_queryset = Payment.objects.filter(
-			business__in=business_ids,
-			created_at__gte=date_range.start,
-			created_at__lte=date_range.end,
-		)
-		payment_queryset = _apply_payment_sale_filters(payment_queryset, statuses, sale_payment_methods)
-		if user_id:
-			payment_queryset = payment_queryset.filter(created_by__id=user_id)
-
-		breakdown_rows = (
-			payment_queryset.values('method')
-			.annotate(
-				amount_total=Coalesce(Sum('amount'), Decimal('0')),
-				payments_count=Count('id'),
-				sales_count=Count('sale', distinct=True),
-			)
-			.order_by('-amount_total')
-		)
 		payments_breakdown: List[Dict[str, object]] = []
-		for row in breakdown_rows:
-			method = row['method']
+		for method, row in sorted(summary.payments.items(), key=lambda entry: entry[1]['amount_total'], reverse=True):
 			try:
 				method_label = Payment.Method(method).label
 			except ValueError:
@@ -398,68 +557,87 @@ class ReportSummaryView(APIView):
 				}
 			)
 
-		top_products_rows = (
-			items_queryset.values('product_name_snapshot')
-			.annotate(
-				total_quantity=Coalesce(Sum('quantity'), Decimal('0')),
-				total_amount=Coalesce(Sum('line_total'), Decimal('0')),
-			)
-			.order_by('-total_amount')[:5]
-		)
 		top_products = [
 			{
-				'name': row['product_name_snapshot'] or 'Producto',
+				'name': name or 'Producto',
 				'quantity': _format_decimal(row['total_quantity']),
 				'amount_total': _format_money(row['total_amount']),
 			}
-			for row in top_products_rows
+			for name, row in top_rows(summary.products.items(), 5, key=lambda entry: -entry[1]['total_amount'])
 		]
 
 		response_payload = {
 			'range': date_range.as_payload(group_by),
-			'kpis': {
-				'gross_sales_total': _format_money(gross_total),
-				'net_sales_total': _format_money(net_total),
-				'discounts_total': _format_money(discount_total),
-				'sales_count': sales_count,
-				'avg_ticket': _format_money(avg_ticket),
-				'units_sold': _format_decimal(units_sold),
-				'cancellations_count': cancellations_count,
-			},
+			'kpis': _summary_kpis(summary),
 			'series': series,
 			'payments_breakdown': payments_breakdown,
 			'top_products': top_products,
 		}
+		if len(partials) > 1:
+			response_payload['branches'] = _branch_breakdown(partials, lambda partial: {'kpis': _summary_kpis(partial)})
 		return Response(response_payload)
 
 
+def _report_sales_queryset(request):
+	business = getattr(request, 'business')
+	business_ids = _resolve_report_business_ids(request)
+	tzinfo = _resolve_timezone(business)
+	date_range = _parse_date_range(request.query_params, tzinfo)
+	statuses = _parse_statuses(request.query_params)
+	payment_methods = _parse_list(request.query_params.get('payment_method'), Sale.PaymentMethod.values)
+	user_id = _parse_uuid(request.query_params.get('user_id'))
+	search = (request.query_params.get('q') or '').strip()
+
+	queryset = (
+		Sale.objects.filter(business__in=business_ids, created_at__gte=date_range.start, created_at__lte=date_range.end)
+		.select_related('customer', 'created_by', 'invoice')
+		.prefetch_related('payments')
+		.annotate(items_count=Count('items'))
+	)
+	queryset = _apply_sale_filters(queryset, statuses, payment_methods, user_id)
+	queryset = _apply_sales_search(queryset, search)
+	queryset = _annotate_payments_total(queryset)
+	return queryset.order_by('-created_at', '-number')
+
+
 class ReportSalesListView(generics.ListAPIView):
 	serializer_class = ReportSaleListSerializer
 	permission_classes = [IsAuthenticated, HasBusinessMembership, HasEntitlement, HasPermission]
 	required_entitlement = 'gestion.reports'
 	required_permission = 'view_reports_sales'
 	pagination_class = ReportsPagination
+	keyset_ordering = ('-created_at', '-number')
 
 	def get_queryset(self):
-		business = getattr(self.request, 'business')
-		business_ids = _resolve_report_business_ids(self.request)
-		tzinfo = _resolve_timezone(business)
-		date_range = _parse_date_range(self.request.query_params, tzinfo)
-		statuses = _parse_statuses(self.request.query_params)
-		payment_methods = _parse_list(self.request.query_params.get('payment_method'), Sale.PaymentMethod.values)
-		user_id = _parse_uuid(self.request.query_params.get('user_id'))
-		search = (self.request.query_params.get('q') or '').strip()
+		return _report_sales_queryset(self.request)
+
+
+class ReportSalesExportView(ReportExportView):
+	report_permission = 'view_reports_sales'
+	columns = [
+		ExportColumn('Número', lambda sale: sale.number),
+		ExportColumn('Fecha', lambda sale: sale.created_at),
+		ExportColumn('Estado', lambda sale: sale.get_status_display()),
+		ExportColumn('Cliente', lambda sale: getattr(sale.customer, 'name', '')),
+		ExportColumn('Cajero', lambda sale: _user_label(sale.created_by)),
+		ExportColumn('Medio de pago', lambda sale: sale.get_payment_method_display()),
+		ExportColumn('Ítems', lambda sale: sale.items_count),
+		ExportColumn('Subtotal', lambda sale: sale.subtotal),
+		ExportColumn('Descuento', lambda sale: sale.discount),
+		ExportColumn('Total', lambda sale: sale.total),
+		ExportColumn('Cobrado', lambda sale: sale.payments_total),
+	]
 
-		queryset = (
-			Sale.objects.filter(business__in=business_ids, created_at__gte=date_range.start, created_at__lte=date_range.end)
-			.select_related('customer', 'created_by')
-			.prefetch_related('payments')
-			.annotate(items_count=Count('items'))
+	def get(self, request):
+		# Los pagos ya vienen sumados en `payments_total`: sin prefetch por lote.
+		queryset = _report_sales_queryset(request).prefetch_related(None)
+		return export_response(
+			request,
+			columns=self.columns,
+			rows=export_rows(queryset),
+			filename='ventas',
+			tzinfo=_resolve_timezone(request.business),
 		)
-		queryset = _apply_sale_filters(queryset, statuses, payment_methods, user_id)
-		queryset = _apply_sales_search(queryset, search)
-		queryset = _annotate_payments_total(queryset)
-		return queryset.order_by('-created_at', '-number')
 
 
 class ReportSalesDetailView(generics.RetrieveAPIView):
@@ -478,48 +656,52 @@ class ReportSalesDetailView(generics.RetrieveAPIView):
 		return _annotate_payments_total(queryset)
 
 
+def _report_payments_queryset(request):
+	business = getattr(request, 'business')
+	business_ids = _resolve_report_business_ids(request)
+	tzinfo = _resolve_timezone(business)
+	date_range = _parse_date_range(request.query_params, tzinfo)
+	statuses = _parse_statuses(request.query_params)
+	sale_payment_methods = _parse_list(request.query_params.get('payment_method'), Sale.PaymentMethod.values)
+	payment_methods = _parse_list(request.query_params.get('method'), Payment.Method.values)
+	user_id = _parse_uuid(request.query_params.get('user_id'))
+	register_id = _parse_uuid(request.query_params.get('register_id'))
+	sale_id = _parse_uuid(request.query_params.get('sale_id'))
+	search = (request.query_params.get('q') or '').strip()
+
+	queryset = Payment.objects.filter(
+		business__in=business_ids,
+		created_at__gte=date_range.start,
+		created_at__lte=date_range.end,
+	).select_related('sale', 'sale__customer', 'session__register', 'created_by')
+	queryset = _apply_payment_sale_filters(queryset, statuses, sale_payment_methods)
+	if payment_methods:
+		queryset = queryset.filter(method__in=payment_methods)
+	if user_id:
+		queryset = queryset.filter(created_by__id=user_id)
+	if register_id:
+		queryset = queryset.filter(session__register_id=register_id)
+	if sale_id:
+		queryset = queryset.filter(sale_id=sale_id)
+	if search:
+		filters = Q(reference__icontains=search) | Q(sale__customer__name__icontains=search)
+		if search.isdigit():
+			filters |= Q(sale__number=int(search))
+		term_uuid = _parse_uuid(search)
+		if term_uuid:
+			filters |= Q(pk=term_uuid)
+		queryset = queryset.filter(filters)
+	return queryset
+
+
 class PaymentsReportView(APIView):
 	permission_classes = [IsAuthenticated, HasBusinessMembership, HasEntitlement, HasPermission]
 	required_entitlement = 'gestion.reports'
 	required_permission = 'view_reports_sales'
-	pagination_class = ReportsPagination()
+	keyset_ordering = ('-created_at', '-id')
 
 	def get(self, request):
-		business = getattr(request, 'business')
-		business_ids = _resolve_report_business_ids(request)
-		tzinfo = _resolve_timezone(business)
-		date_range = _parse_date_range(request.query_params, tzinfo)
-		statuses = _parse_statuses(request.query_params)
-		sale_payment_methods = _parse_list(request.query_params.get('payment_method'), Sale.PaymentMethod.values)
-		payment_methods = _parse_list(request.query_params.get('method'), Payment.Method.values)
-		user_id = _parse_uuid(request.query_params.get('user_id'))
-		register_id = _parse_uuid(request.query_params.get('register_id'))
-		sale_id = _parse_uuid(request.query_params.get('sale_id'))
-		search = (request.query_params.get('q') or '').strip()
-
-		queryset = Payment.objects.filter(
-			business__in=business_ids,
-			created_at__gte=date_range.start,
-			created_at__lte=date_range.end,
-		).select_related('sale', 'sale__customer', 'session__register', 'created_by')
-		queryset = _apply_payment_sale_filters(queryset, statuses, sale_payment_methods)
-		if payment_methods:
-			queryset = queryset.filter(method__in=payment_methods)
-		if user_id:
-			queryset = queryset.filter(created_by__id=user_id)
-		if register_id:
-			queryset = queryset.filter(session__register_id=register_id)
-		if sale_id:
-			queryset = queryset.filter(sale_id=sale_id)
-		if search:
-			filters = Q(reference__icontains=search) | Q(sale__customer__name__icontains=search)
-			if search.isdigit():
-				filters |= Q(sale__number=int(search))
-			term_uuid = _parse_uuid(search)
-			if term_uuid:
-				filters |= Q(pk=term_uuid)
-			queryset = queryset.filter(filters)
-
+		queryset = _report_payments_queryset(request)
 		breakdown_rows = (
 			queryset.values('method')
 			.annotate(
@@ -549,17 +731,77 @@ class PaymentsReportView(APIView):
 		paginator = ReportsPagination()
 		page = paginator.paginate_queryset(queryset.order_by('-created_at'), request, view=self)
 		serializer = ReportPaymentSerializer(page, many=True)
-		return Response(
-			{
-				'breakdown': breakdown,
-				'results': serializer.data,
-				'count': paginator.count,
-				'next': paginator.get_next_link(),
-				'previous': paginator.get_previous_link(),
-			}
+		return Response({'breakdown': breakdown, **paginator.get_paginated_data(serializer.data)})
+
+
+class PaymentsReportExportView(ReportExportView):
+	report_permission = 'view_reports_sales'
+	columns = [
+		ExportColumn('Fecha', lambda payment: payment.created_at),
+		ExportColumn('Venta', lambda payment: payment.sale.number if payment.sale_id else None),
+		ExportColumn('Cliente', lambda payment: getattr(payment.sale.customer, 'name', '') if payment.sale_id else ''),
+		ExportColumn('Medio', lambda payment: payment.get_method_display()),
+		ExportColumn('Monto', lambda payment: payment.amount),
+		ExportColumn('Referencia', lambda payment: payment.reference),
+		ExportColumn('Caja', lambda payment: getattr(getattr(payment.session, 'register', None), 'name', '')),
+		ExportColumn('Cajero', lambda payment: _user_label(payment.created_by)),
+	]
+
+	def get(self, request):
+		queryset = _report_payments_queryset(request).order_by('-created_at', '-id')
+		return export_response(
+			request,
+			columns=self.columns,
+			rows=export_rows(queryset),
+			filename='pagos',
+			tzinfo=_resolve_timezone(request.business),
 		)
 
 
+def _report_cash_closures_queryset(request):
+	business = getattr(request, 'business')
+	tzinfo = _resolve_timezone(business)
+	date_range = _parse_date_range(request.query_params, tzinfo)
+	register_id = _parse_uuid(request.query_params.get('register_id'))
+	user_id = _parse_uuid(request.query_params.get('user_id'))
+	status_param = (request.query_params.get('status') or 'closed').lower()
+	if status_param not in {'open', 'closed', 'all', ''}:
+		raise ValidationError('status debe ser open, closed o all.')
+	search_query = (request.query_params.get('q') or '').strip()
+
+	closed_q = Q(
+		status=CashSession.Status.CLOSED,
+		closed_at__isnull=False,
+		closed_at__gte=date_range.start,
+		closed_at__lte=date_range.end,
+	)
+	open_q = Q(
+		status=CashSession.Status.OPEN,
+		opened_at__gte=date_range.start,
+		opened_at__lte=date_range.end,
+	)
+
+	base_queryset = CashSession.objects.filter(business=business).select_related('register', 'opened_by', 'closed_by')
+	if status_param == 'open':
+		queryset = base_queryset.filter(open_q)
+	elif status_param == 'closed' or status_param == '':
+		queryset = base_queryset.filter(closed_q)
+	else:
+		queryset = base_queryset.filter(open_q | closed_q)
+	if register_id:
+		queryset = queryset.filter(register_id=register_id)
+	if user_id:
+		queryset = queryset.filter(Q(closed_by__id=user_id) | Q(opened_by__id=user_id))
+	if search_query:
+		queryset = queryset.filter(
+			Q(register__name__icontains=search_query)
+			| Q(opened_by__name__icontains=search_query)
+			| Q(opened_by_name__icontains=search_query)
+			| Q(closed_by__name__icontains=search_query)
+		)
+	return queryset.annotate(report_sort_timestamp=Coalesce('closed_at', 'opened_at')).order_by('-report_sort_timestamp', '-opened_at')
+
+
 class CashClosureListView(generics.ListAPIView):
 	serializer_class = CashClosureListSerializer
 	permission_classes = [IsAuthenticated, HasBusinessMembership, HasEntitlement, HasPermission]
@@ -568,47 +810,33 @@ class CashClosureListView(generics.ListAPIView):
 	pagination_class = ReportsPagination
 
 	def get_queryset(self):
-		business = getattr(self.request, 'business')
-		tzinfo = _resolve_timezone(business)
-		date_range = _parse_date_range(self.request.query_params, tzinfo)
-		register_id = _parse_uuid(self.request.query_params.get('register_id'))
-		user_id = _parse_uuid(self.request.query_params.get('user_id'))
-		status_param = (self.request.query_params.get('status') or 'closed').lower()
-		if status_param not in {'open', 'closed', 'all', ''}:
-			raise ValidationError('status debe ser open, closed o all.')
-		search_query = (self.request.query_params.get('q') or '').strip()
-
-		closed_q = Q(
-			status=CashSession.Status.CLOSED,
-			closed_at__isnull=False,
-			closed_at__gte=date_range.start,
-			closed_at__lte=date_range.end,
-		)
-		open_q = Q(
-			status=CashSession.Status.OPEN,
-			opened_at__gte=date_range.start,
-			opened_at__lte=date_range.end,
-		)
+		return _report_cash_closures_queryset(self.request)
+
+
+class CashClosureExportView(ReportExportView):
+	report_permission = 'view_reports_cash'
+	columns = [
+		ExportColumn('Caja', lambda session: getattr(session.register, 'name', '')),
+		ExportColumn('Estado', lambda session: session.get_status_display()),
+		ExportColumn('Apertura', lambda session: session.opened_at),
+		ExportColumn('Cierre', lambda session: session.closed_at),
+		ExportColumn('Abrió', lambda session: session.opened_by_name or _user_label(session.opened_by)),
+		ExportColumn('Cerró', lambda session: _user_label(session.closed_by)),
+		ExportColumn('Monto inicial', lambda session: session.opening_cash_amount),
+		ExportColumn('Efectivo esperado', lambda session: session.expected_cash_total),
+		ExportColumn('Efectivo contado', lambda session: session.closing_cash_counted),
+		ExportColumn('Diferencia', lambda session: session.difference_amount),
+		ExportColumn('Nota', lambda session: session.closing_note),
+	]
 
-		base_queryset = CashSession.objects.filter(business=business).select_related('register', 'opened_by', 'closed_by')
-		if status_param == 'open':
-			queryset = base_queryset.filter(open_q)
-		elif status_param == 'closed' or status_param == '':
-			queryset = base_queryset.filter(closed_q)
-		else:
-			queryset = base_queryset.filter(open_q | closed_q)
-		if register_id:
-			queryset = queryset.filter(register_id=register_id)
-		if user_id:
-			queryset = queryset.filter(Q(closed_by__id=user_id) | Q(opened_by__id=user_id))
-		if search_query:
-			queryset = queryset.filter(
-				Q(register__name__icontains=search_query)
-				| Q(opened_by__name__icontains=search_query)
-				| Q(opened_by_name__icontains=search_query)
-				| Q(closed_by__name__icontains=search_query)
-			)
-		return queryset.annotate(report_sort_timestamp=Coalesce('closed_at', 'opened_at')).order_by('-report_sort_timestamp', '-opened_at')
+	def get(self, request):
+		return export_response(
+			request,
+			columns=self.columns,
+			rows=export_rows(_report_cash_closures_queryset(request)),
+			filename='cierres-de-caja',
+			tzinfo=_resolve_timezone(request.business),
+		)
 
 
 class CashClosureDetailView(APIView):
@@ -690,151 +918,120 @@ class CashClosureDetailView(APIView):
 		return Response(payload)
 
 
-class PaymentsReportView(APIView):
-	permission_classes = [IsAuthenticated, HasBusinessMembership, HasEntitlement, HasPermission]
-	required_entitlement = 'gestion.reports'
-	required_permission = 'view_reports'
-
-	def get(self, request):
-		business = getattr(request, 'business')
-		business_ids = _resolve_report_business_ids(request)
-		tzinfo = _resolve_timezone(business)
-		date_range = _parse_date_range(request.query_params, tzinfo)
-		statuses = _parse_statuses(request.query_params)
-		sale_payment_methods = _parse_list(request.query_params.get('payment_method'), Sale.PaymentMethod.values)
-		user_id = _parse_uuid(request.query_params.get('user_id'))
-		metric = (request.query_params.get('metric') or 'amount').lower()
-		if metric not in {'amount', 'units'}:
-			raise ValidationError('metric debe ser amount o units.')
-		limit = _parse_limit(request.query_params.get('limit'), default=10, max_value=25)
-
-		items_queryset = (
-			SaleItem.objects.filter(
-				sale__business__in=business_ids,
-				sale__created_at__gte=date_range.start,
-				sale__created_at__lte=date_range.end,
-			)
-		)
-		if statuses:
-			items_queryset = items_queryset.filter(sale__status__in=statuses)
-		if sale_payment_methods:
-			items_queryset = items_queryset.filter(sale__payment_method__in=sale_payment_methods)
-		if user_id:
-			items_queryset = items_queryset.filter(sale__created_by__id=user_id)
-
-		totals = items_queryset.aggregate(
-			total_amount=Coalesce(Sum('line_total'), Decimal('0')),
-			total_units=Coalesce(Sum('quantity'), Decimal('0')),
+def _products_items_queryset(business_ids, date_range: DateRange, statuses, sale_payment_methods, user_id, search: str):
+	items_queryset = SaleItem.objects.filter(
+		sale__business__in=business_ids,
+		sale__created_at__gte=date_range.start,
+		sale__created_at__lte=date_range.end,
+	)
+	if statuses:
+		items_queryset = items_queryset.filter(sale__status__in=statuses)
+	if sale_payment_methods:
+		items_queryset = items_queryset.filter(sale__payment_method__in=sale_payment_methods)
+	if user_id:
+		items_queryset = items_queryset.filter(sale__created_by__id=user_id)
+	if search:
+		items_queryset = items_queryset.filter(
+			Q(product_name_snapshot__icontains=search) | Q(product__sku__icontains=search)
 		)
-		total_amount = totals['total_amount'] or Decimal('0')
-		total_units = totals['total_units'] or Decimal('0')
-		denominator = total_amount if metric == 'amount' else total_units
+	return items_queryset
+
+
+def _products_totals(rows: List[Dict[str, object]]) -> Dict[str, object]:
+	units = sum((row['total_quantity'] for row in rows), Decimal('0'))
+	amount = sum((row['total_amount'] for row in rows), Decimal('0'))
+	avg_price = (amount / units).quantize(MONEY_PLACES) if units > 0 else Decimal('0')
+	return {
+		'products_count': len(rows),
+		'units': _format_decimal(units),
+		'gross_sales': _format_money(amount),
+		'avg_price': _format_money(avg_price),
+	}
 
-		ordering = '-total_amount' if metric == 'amount' else '-total_quantity'
-		aggregated_rows = (
-			items_queryset.values('product_id', 'product_name_snapshot')
-			.annotate(
-				total_quantity=Coalesce(Sum('quantity'), Decimal('0')),
-				total_amount=Coalesce(Sum('line_total'), Decimal('0')),
-			)
-			.order_by(ordering, '-total_amount', 'product_name_snapshot')[:limit]
-		)
 
-		items: List[Dict[str, object]] = []
-		for row in aggregated_rows:
-			amount_value = row.get('total_amount') or Decimal('0')
-			units_value = row.get('total_quantity') or Decimal('0')
-			numerator = amount_value if metric == 'amount' else units_value
-			share_value = Decimal('0')
-			if denominator > 0 and numerator > 0:
-				share_value = numerator / denominator * Decimal('100')
-			product_id = row.get('product_id')
-			items.append(
-				{
-					'product_id': str(product_id) if product_id else None,
-					'name': row.get('product_name_snapshot') or 'Producto',
-					'units': _format_decimal(units_value),
-					'amount_total': _format_money(amount_value),
-					'share_pct': _format_percentage(share_value),
-				}
-			)
+def _sort_rows(rows: List[Dict[str, object]], ordering: str) -> List[Dict[str, object]]:
+	"""Ordena en memoria filas agregadas con la misma expresión que `order_by(ordering)`."""
+	name = ordering.lstrip('-')
+	empty = '' if name == 'product_name_snapshot' else 0
+	return sorted(
+		rows,
+		key=lambda row: row[name] if row[name] is not None else empty,
+		reverse=ordering.startswith('-'),
+	)
 
-		return Response(
-			{
-				'range': {
-					'from': date_range.start_local.date().isoformat(),
-					'to': date_range.end_local.date().isoformat(),
-				},
-				'metric': metric,
-				'items': items,
-			}
-		)
 
+def _amount_share(amount: Decimal, total: Decimal) -> Decimal:
+	if total <= 0:
+		return Decimal('0')
+	return (amount / total * Decimal('100')).quantize(Decimal('0.01'))
 
-class ReportProductsView(APIView):
-	permission_classes = [IsAuthenticated, HasBusinessMembership, HasEntitlement, HasPermission]
-	required_entitlement = 'gestion.reports'
-	required_permission = 'view_reports_products'
 
-	def get(self, request):
-		business = getattr(request, 'business')
-		business_ids = _resolve_report_business_ids(request)
-		tzinfo = _resolve_timezone(business)
-		date_range = _parse_date_range(request.query_params, tzinfo)
-		statuses = _parse_statuses(request.query_params)
-		sale_payment_methods = _parse_list(request.query_params.get('payment_method'), Sale.PaymentMethod.values)
-		user_id = _parse_uuid(request.query_params.get('user_id'))
-		ordering = _parse_products_ordering(request.query_params.get('ordering'))
-		search = (request.query_params.get('q') or '').strip()
-
-		items_queryset = (
-			SaleItem.objects.filter(
-				sale__business__in=business_ids,
-				sale__created_at__gte=date_range.start,
-				sale__created_at__lte=date_range.end,
-			)
-			.select_related('product')
+def _report_products(request):
+	"""Filas agregadas del reporte de productos, sus totales y el desglose por sucursal (o None)."""
+	business = getattr(request, 'business')
+	business_ids = _resolve_report_business_ids(request)
+	tzinfo = _resolve_timezone(business)
+	date_range = _parse_date_range(request.query_params, tzinfo)
+	statuses = _parse_statuses(request.query_params)
+	sale_payment_methods = _parse_list(request.query_params.get('payment_method'), Sale.PaymentMethod.values)
+	user_id = _parse_uuid(request.query_params.get('user_id'))
+	ordering = _parse_products_ordering(request.query_params.get('ordering'))
+	search = (request.query_params.get('q') or '').strip()
+
+	def product_rows(ids):
+		items_queryset = _products_items_queryset(ids, date_range, statuses, sale_payment_methods, user_id, search)
+		return items_queryset.values('product_id', 'product_name_snapshot', 'product__sku').annotate(
+			total_quantity=Coalesce(Sum('quantity'), Decimal('0')),
+			total_amount=Coalesce(Sum('line_total'), Decimal('0')),
+			sales_count=Count('sale', distinct=True),
 		)
-		if statuses:
-			items_queryset = items_queryset.filter(sale__status__in=statuses)
-		if sale_payment_methods:
-			items_queryset = items_queryset.filter(sale__payment_method__in=sale_payment_methods)
-		if user_id:
-			items_queryset = items_queryset.filter(sale__created_by__id=user_id)
-		if search:
-			items_queryset = items_queryset.filter(
-				Q(product_name_snapshot__icontains=search) | Q(product__sku__icontains=search)
-			)
 
-		totals = items_queryset.aggregate(
+	branches = None
+	if len(business_ids) > 1:
+		# Consolidated: one grouped query per branch, merged and sorted in memory.
+		partials = fan_out(business_ids, lambda business_id: list(product_rows([business_id]).order_by()))
+		aggregated = _sort_rows(
+			merge_rows(
+				*partials.values(),
+				keys=('product_id', 'product_name_snapshot', 'product__sku'),
+				totals=('total_quantity', 'total_amount', 'sales_count'),
+			),
+			ordering,
+		)
+		total_units = sum((row['total_quantity'] for row in aggregated), Decimal('0'))
+		total_amount = sum((row['total_amount'] for row in aggregated), Decimal('0'))
+		branches = _branch_breakdown(partials, lambda rows: {'totals': _products_totals(rows)})
+	else:
+		totals = _products_items_queryset(
+			business_ids, date_range, statuses, sale_payment_methods, user_id, search
+		).aggregate(
 			units=Coalesce(Sum('quantity'), Decimal('0')),
 			amount=Coalesce(Sum('line_total'), Decimal('0')),
 		)
 		total_units = totals['units'] or Decimal('0')
 		total_amount = totals['amount'] or Decimal('0')
+		aggregated = product_rows(business_ids).order_by(ordering)
+	return aggregated, total_units, total_amount, branches
+
+
+class ReportProductsView(APIView):
+	permission_classes = [IsAuthenticated, HasBusinessMembership, HasEntitlement, HasPermission]
+	required_entitlement = 'gestion.reports'
+	required_permission = 'view_reports_products'
+
+	def get(self, request):
+		aggregated, total_units, total_amount, branches = _report_products(request)
 		avg_price = Decimal('0')
 		if total_units > 0:
 			avg_price = (total_amount / total_units).quantize(MONEY_PLACES)
 
-		aggregated = (
-			items_queryset.values('product_id', 'product_name_snapshot', 'product__sku')
-			.annotate(
-				total_quantity=Coalesce(Sum('quantity'), Decimal('0')),
-				total_amount=Coalesce(Sum('line_total'), Decimal('0')),
-				sales_count=Count('sale', distinct=True),
-			)
-			.order_by(ordering)
-		)
-
 		paginator = ReportsPagination()
 		page = paginator.paginate_queryset(aggregated, request, view=self)
 
 		results: List[Dict[str, object]] = []
 		for row in page:
 			amount_value = row.get('total_amount') or Decimal('0')
-			share_value = Decimal('0')
-			if total_amount > 0:
-				share_value = (amount_value / total_amount * Decimal('100')).quantize(Decimal('0.01'))
+			share_value = _amount_share(amount_value, total_amount)
 			product_id = row.get('product_id')
 			results.append(
 				{
@@ -848,20 +1045,38 @@ class ReportProductsView(APIView):
 				}
 			)
 
-		return Response(
-			{
-				'totals': {
-					'products_count': paginator.count,
-					'units': _format_decimal(total_units),
-					'gross_sales': _format_money(total_amount),
-					'avg_price': _format_money(avg_price),
-				},
-				'results': results,
-				'count': paginator.count,
-				'next': paginator.get_next_link(),
-				'previous': paginator.get_previous_link(),
-			}
-		)
+		payload = {
+			'totals': {
+				'products_count': paginator.count,
+				'units': _format_decimal(total_units),
+				'gross_sales': _format_money(total_amount),
+				'avg_price': _format_money(avg_price),
+			},
+			'results': results,
+			'count': paginator.count,
+			'next': paginator.get_next_link(),
+			'previous': paginator.get_previous_link(),
+		}
+		if branches is not None:
+			payload['branches'] = branches
+		return Response(payload)
+
+
+class ReportProductsExportView(ReportExportView):
+	report_permission = 'view_reports_products'
+
+	def get(self, request):
+		aggregated, _, total_amount, _ = _report_products(request)
+		columns = [
+			ExportColumn('Producto', lambda row: row['product_name_snapshot'] or 'Producto'),
+			ExportColumn('SKU', lambda row: row['product__sku'] or ''),
+			ExportColumn('Cantidad', lambda row: row['total_quantity']),
+			ExportColumn('Monto', lambda row: row['total_amount']),
+			ExportColumn('Ventas', lambda row: row['sales_count']),
+			ExportColumn('Participación %', lambda row: _amount_share(row['total_amount'] or Decimal('0'), total_amount)),
+		]
+		rows = aggregated if isinstance(aggregated, list) else export_rows(aggregated)
+		return export_response(request, columns=columns, rows=rows, filename='productos')
 
 
 class StockAlertsReportView(APIView):
@@ -876,21 +1091,30 @@ class StockAlertsReportView(APIView):
 			default_threshold = Decimal(str(default_threshold))
 		limit = _parse_limit(request.query_params.get('limit'), default=10, max_value=50)
 
-		base_queryset = ProductStock.objects.select_related('product').filter(
+		# Valorización materializada: columnas propias, sin join a Product, y
+		# los "sin stock" salen de los contadores del negocio.
+		headers = list(InventoryValuation.objects.filter(business_id__in=business_ids))
+		materialized = {header.business_id for header in headers}
+		headers += [
+			rebuild_inventory_valuation(business_id)
+			for business_id in business_ids
+			if business_id not in materialized
+		]
+		base_queryset = StockValuation.objects.filter(
 			business__in=business_ids,
-			product__is_active=True,
+			is_active=True,
 		)
 		annotated_queryset = base_queryset.annotate(
 			threshold_value=Case(
 				When(
-					product__stock_min__gt=0,
-					then=F('product__stock_min'),
+					stock_min__gt=0,
+					then=F('stock_min'),
 				),
 				default=Value(default_threshold),
 				output_field=DecimalField(max_digits=12, decimal_places=2),
 			),
 		).annotate(
-			status=Case(
+			alert_status=Case(
 				When(quantity__lte=0, then=Value('OUT')),
 				When(quantity__gt=0, quantity__lte=F('threshold_value'), then=Value('LOW')),
 				default=Value('OK'),
@@ -903,20 +1127,21 @@ class StockAlertsReportView(APIView):
 			),
 		)
 
-		alerts_queryset = annotated_queryset.filter(status__in=['OUT', 'LOW'])
-		out_of_stock_count = alerts_queryset.filter(status='OUT').count()
-		low_stock_count = alerts_queryset.filter(status='LOW').count()
-		rows = alerts_queryset.order_by('status_order', 'quantity', 'product__name')[:limit]
+		alerts_queryset = annotated_queryset.filter(alert_status__in=['OUT', 'LOW'])
+		out_of_stock_count = sum(header.out_count for header in headers)
+		# El umbral del reporte (stock mínimo o el default) no es el del estado persistido: se cuenta.
+		low_stock_count = alerts_queryset.filter(alert_status='LOW').count()
+		rows = alerts_queryset.order_by('status_order', 'quantity', 'name')[:limit]
 
 		items: List[Dict[str, object]] = []
 		for stock in rows:
 			items.append(
 				{
 					'product_id': str(stock.product_id),
-					'name': stock.product.name,
+					'name': stock.name,
 					'stock': _format_decimal(stock.quantity),
 					'threshold': _format_decimal(stock.threshold_value),
-					'status': stock.status,
+					'status': stock.alert_status,
 				}
 			)
 
@@ -930,6 +1155,75 @@ class StockAlertsReportView(APIView):
 		)
 
 
+def _top_product_rows(rows: List[Dict[str, object]], metric: str, limit: int) -> List[Dict[str, object]]:
+	primary = 'total_amount' if metric == 'amount' else 'total_quantity'
+	return top_rows(
+		rows,
+		limit,
+		key=lambda row: (-row[primary], -row['total_amount'], row['product_name_snapshot'] or ''),
+	)
+
+
+def _leaderboard_rows(business_ids, plan: RollupPlan, statuses: List[str], metric: str, limit: Optional[int] = None):
+	"""Totales por producto; con `limit`, solo el top (ordenado)."""
+	items_queryset = _raw_window_queryset(
+		SaleItem.objects.filter(sale__business__in=business_ids),
+		plan,
+		'sale__created_at',
+	)
+	if statuses:
+		items_queryset = items_queryset.filter(sale__status__in=statuses)
+
+	if plan.uses_rollup:
+		product_rows = _merge_product_rows(
+			items_queryset,
+			rollup_product_totals(business_ids, plan, statuses, []),
+		)
+		return _sort_product_rows(product_rows, metric)[:limit] if limit else product_rows
+
+	rows = items_queryset.values('product_id', 'product_name_snapshot').annotate(
+		total_quantity=Coalesce(Sum('quantity'), Decimal('0')),
+		total_amount=Coalesce(Sum('line_total'), Decimal('0')),
+	)
+	if not limit:
+		return list(rows.order_by())
+	ordering = '-total_amount' if metric == 'amount' else '-total_quantity'
+	return list(rows.order_by(ordering)[:limit])
+
+
+def _leaderboard_items(aggregated_list: List[Dict[str, object]], metric: str) -> List[Dict[str, object]]:
+	# Compute grand total for share_pct
+	if metric == 'amount':
+		grand_total = sum(row.get('total_amount') or Decimal('0') for row in aggregated_list)
+	else:
+		grand_total = sum(row.get('total_quantity') or Decimal('0') for row in aggregated_list)
+
+	results: List[Dict[str, object]] = []
+	for row in aggregated_list:
+		product_id = row.get('product_id')
+		total_amount = row.get('total_amount') or Decimal('0')
+		total_quantity = row.get('total_quantity') or Decimal('0')
+		if metric == 'amount':
+			row_value = total_amount
+		else:
+			row_value = total_quantity
+		share_pct = (
+			round(float(row_value) / float(grand_total) * 100, 1)
+			if grand_total and grand_total > 0
+			else 0.0
+		)
+		results.append(
+			{
+				'product_id': str(product_id) if product_id else None,
+				'name': row.get('product_name_snapshot') or 'Producto',
+				'units': _format_decimal(total_quantity),
+				'amount_total': _format_money(total_amount),
+				'share_pct': str(share_pct),
+			}
+		)
+	return results
+
+
 class TopProductsLeaderboardView(APIView):
 	permission_classes = [IsAuthenticated, HasBusinessMembership, HasPermission]
 	required_permission = 'view_dashboard'
@@ -942,65 +1236,36 @@ class TopProductsLeaderboardView(APIView):
 		metric = request.query_params.get('metric', 'amount')
 		limit = _parse_limit(request.query_params.get('limit'), default=10, max_value=50)
 		statuses = _parse_statuses(request.query_params)
-
-		items_queryset = (
-			SaleItem.objects.filter(
-				sale__business__in=business_ids,
-				sale__created_at__gte=date_range.start,
-				sale__created_at__lte=date_range.end,
+		plan = _plan_rollups(business_ids, date_range, tzinfo)
+
+		branches = None
+		if len(business_ids) > 1:
+			# Every branch returns all its products: the top-k is taken over the merged totals.
+			partials = fan_out(
+				business_ids,
+				lambda business_id: _leaderboard_rows([business_id], plan, statuses, metric),
 			)
-			.select_related('product')
-		)
-		if statuses:
-			items_queryset = items_queryset.filter(sale__status__in=statuses)
-
-		ordering = '-total_amount' if metric == 'amount' else '-total_quantity'
-		aggregated = (
-			items_queryset.values('product_id', 'product_name_snapshot')
-			.annotate(
-				total_quantity=Coalesce(Sum('quantity'), Decimal('0')),
-				total_amount=Coalesce(Sum('line_total'), Decimal('0')),
-			)
-			.order_by(ordering)[:limit]
-		)
-
-		aggregated_list = list(aggregated)
-
-		# Compute grand total for share_pct
-		if metric == 'amount':
-			grand_total = sum(row.get('total_amount') or Decimal('0') for row in aggregated_list)
-		else:
-			grand_total = sum(row.get('total_quantity') or Decimal('0') for row in aggregated_list)
-
-		results: List[Dict[str, object]] = []
-		for row in aggregated_list:
-			product_id = row.get('product_id')
-			total_amount = row.get('total_amount') or Decimal('0')
-			total_quantity = row.get('total_quantity') or Decimal('0')
-			if metric == 'amount':
-				row_value = total_amount
-			else:
-				row_value = total_quantity
-			share_pct = (
-				round(float(row_value) / float(grand_total) * 100, 1)
-				if grand_total and grand_total > 0
-				else 0.0
+			product_rows = merge_rows(
+				*partials.values(),
+				keys=('product_id', 'product_name_snapshot'),
+				totals=('total_quantity', 'total_amount'),
 			)
-			results.append(
-				{
-					'product_id': str(product_id) if product_id else None,
-					'name': row.get('product_name_snapshot') or 'Producto',
-					'units': _format_decimal(total_quantity),
-					'amount_total': _format_money(total_amount),
-					'share_pct': str(share_pct),
-				}
+			aggregated_list = _top_product_rows(product_rows, metric, limit)
+			branches = _branch_breakdown(
+				partials,
+				lambda rows: {'items': _leaderboard_items(_top_product_rows(rows, metric, limit), metric)},
 			)
+		else:
+			aggregated_list = _leaderboard_rows(business_ids, plan, statuses, metric, limit=limit)
 
-		return Response({
+		payload = {
 			'range': {
 				'from': date_range.start_local.date().isoformat(),
 				'to': date_range.end_local.date().isoformat(),
 			},
 			'metric': metric,
-			'items': results,
-		})
+			'items': _leaderboard_items(aggregated_list, metric),
+		}
+		if branches is not None:
+			payload['branches'] = branches
+		return Response(payload)
@@ -0,0 +1,246 @@
+"""
+Alta masiva de ventas para la sincronización del POS offline.
+
+El lote (cada venta con su `client_key`) se procesa en una transacción:
+
+- las claves ya cargadas devuelven la venta existente (`duplicate`);
+- clientes, sesiones de caja y productos se resuelven con una consulta por tabla;
+- el stock de todos los productos se bloquea una sola vez y cada venta se
+  valida contra lo que dejaron las anteriores del lote: una venta sin stock o
+  con datos inválidos queda `rejected` sin frenar al resto;
+- los números salen de un único incremento del contador;
+- ventas, ítems y movimientos se insertan con bulk_create y
+  `sales_bulk_created` avisa a caja, tesorería y reportes.
+
+Si dos lotes con la misma clave llegan a la vez, la restricción
+`sales_business_client_key_unique` hace fallar al segundo; al reintentarlo, la
+venta vuelve como `duplicate`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, List, Optional, Sequence
+
+from django.db import transaction
+
+from apps.business.models import CommercialSettings
+from apps.cash.models import CashSession
+from apps.catalog.models import Product
+from apps.customers.models import Customer
+from apps.inventory.models import StockMovement
+from apps.inventory.services import StockLine, lock_stock_records, register_stock_movements
+from .models import Sale, SaleItem
+from .sequences import reserve_sale_numbers
+from .signals import sales_bulk_created
+
+MAX_BULK_SALES = 500
+
+STATUS_CREATED = 'created'
+STATUS_DUPLICATE = 'duplicate'
+STATUS_REJECTED = 'rejected'
+
+
+@dataclass
+class BulkSaleResult:
+  client_key: str
+  status: str
+  sale: Optional[Sale] = None
+  errors: Any = None
+
+  def as_dict(self) -> dict:
+    sale = None
+    if self.sale is not None:
+      sale = {'id': str(self.sale.id), 'number': self.sale.number, 'total': f'{self.sale.total:.2f}'}
+    return {'client_key': self.client_key, 'status': self.status, 'sale': sale, 'errors': self.errors}
+
+
+@dataclass
+class _PlannedSale:
+  index: int
+  entry: dict
+  customer: Optional[Customer]
+  cash_session: Optional[CashSession]
+  subtotal: Decimal
+  discount: Decimal
+  items: List[SaleItem] = field(default_factory=list)
+  stock_lines: List[StockLine] = field(default_factory=list)
+
+
+class _Rejected(Exception):
+  def __init__(self, errors):
+    super().__init__(errors)
+    self.errors = errors
+
+
+def _error(code: str, message: str, **extra) -> dict:
+  payload = {'code': code, 'message': message}
+  payload.update(extra)
+  return {'error': payload}
+
+
+def _by_pk(queryset) -> Dict[Any, Any]:
+  return {obj.pk: obj for obj in queryset}
+
+
+def _plan_sale(index, entry, settings, customers, sessions, products, available) -> _PlannedSale:
+  """Valida una venta contra lo ya resuelto; descuenta su stock de `available` solo si pasa."""
+  customer = None
+  if entry.get('customer_id'):
+    customer = customers.get(entry['customer_id'])
+    if customer is None:
+      raise _Rejected({'customer_id': ['Cliente no encontrado en este negocio.']})
+  cash_session = None
+  if entry.get('cash_session_id'):
+    cash_session = sessions.get(entry['cash_session_id'])
+    if cash_session is None:
+      raise _Rejected({'cash_session_id': ['La sesión de caja no existe en este negocio.']})
+    if cash_session.status != CashSession.Status.OPEN:
+      raise _Rejected({'cash_session_id': ['Esta sesión de caja ya está cerrada.']})
+  if settings.require_customer_for_sales and customer is None:
+    raise _Rejected(_error('CUSTOMER_REQUIRED', 'Debes seleccionar un cliente para registrar la venta.'))
+  if settings.block_sales_if_no_open_cash_session and cash_session is None:
+    raise _Rejected(_error('CASH_SESSION_REQUIRED', 'Necesitás abrir una sesión de caja para registrar la venta.'))
+
+  plan = _PlannedSale(index, entry, customer, cash_session, Decimal('0'), Decimal('0'))
+  consumed: Dict[Any, Decimal] = {}
+  for payload in entry['items']:
+    product = products.get(payload['product_id'])
+    if product is None:
+      raise _Rejected({'items': [f'Producto {payload["product_id"]} no encontrado en este negocio.']})
+    quantity = Decimal(payload['quantity'])
+    raw_unit_price = payload.get('unit_price')
+    unit_price = Decimal(raw_unit_price) if raw_unit_price is not None else Decimal(product.price)
+    line_total = (unit_price * quantity).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    plan.subtotal += line_total
+
+    available_quantity = available[product.pk] - consumed.get(product.pk, Decimal('0'))
+    will_be_negative = (available_quantity - quantity) < 0
+    if will_be_negative and not settings.allow_sell_without_stock:
+      raise _Rejected(_error(
+        'OUT_OF_STOCK',
+        'No hay stock suficiente para vender este producto.',
+        product_id=str(product.id),
+        available_stock=f'{available_quantity}',
+        requested_qty=f'{quantity}',
+      ))
+    consumed[product.pk] = consumed.get(product.pk, Decimal('0')) + quantity
+
+    plan.items.append(SaleItem(
+      product=product,
+      product_name_snapshot=product.name,
+      quantity=quantity,
+      unit_price=unit_price,
+      line_total=line_total,
+    ))
+    line = StockLine(product=product, movement_type=StockMovement.MovementType.OUT, quantity=quantity)
+    if will_be_negative:
+      line.reason = 'SALE_ALLOW_NO_STOCK'
+      line.metadata = {
+        'allowed_without_stock': True,
+        'product_id': str(product.id),
+        'available_stock': f'{available_quantity}',
+        'requested_qty': f'{quantity}',
+      }
+      line.allow_negative_stock = True
+    plan.stock_lines.append(line)
+
+  discount_value = entry.get('discount')
+  plan.discount = Decimal(discount_value) if discount_value is not None else Decimal('0')
+  if not settings.allow_negative_price_or_discount and plan.discount > plan.subtotal:
+    raise _Rejected({'discount': ['El descuento no puede ser mayor al subtotal.']})
+
+  for product_id, quantity in consumed.items():
+    available[product_id] -= quantity
+  return plan
+
+
+def _create_sales(business, planned: Sequence[_PlannedSale], user, stocks) -> List[Sale]:
+  created_by = user if getattr(user, 'is_authenticated', False) else None
+  sales: List[Sale] = []
+  items: List[SaleItem] = []
+  stock_lines: List[StockLine] = []
+  for plan, number in zip(planned, reserve_sale_numbers(business, len(planned))):
+    entry = plan.entry
+    sale = Sale(
+      business=business,
+      customer=plan.customer,
+      number=number,
+      status=Sale.Status.COMPLETED,
+      payment_method=entry.get('payment_method', Sale.PaymentMethod.CASH),
+      notes=entry.get('notes', ''),
+      created_by=created_by,
+      cash_session=plan.cash_session,
+      subtotal=plan.subtotal,
+      discount=plan.discount,
+      total=plan.subtotal - plan.discount,
+      client_key=entry['client_key'],
+    )
+    sales.append(sale)
+    for item in plan.items:
+      item.sale = sale
+      items.append(item)
+    for line in plan.stock_lines:
+      line.note = f'Venta #{number}'
+      stock_lines.append(line)
+
+  Sale.objects.bulk_create(sales)
+  SaleItem.objects.bulk_create(items)
+  register_stock_movements(business=business, lines=stock_lines, created_by=user, stocks=stocks)
+  return sales
+
+
+def ingest_sales(*, business, entries: Sequence[dict], user=None, settings=None) -> List[BulkSaleResult]:
+  """Carga `entries` (validadas con `BulkSaleEntrySerializer`) y devuelve un resultado por venta, en orden."""
+  settings = settings or CommercialSettings.objects.for_business(business)
+  results: List[Optional[BulkSaleResult]] = [None] * len(entries)
+
+  keys = {entry['client_key'] for entry in entries}
+  existing = {sale.client_key: sale for sale in Sale.objects.filter(business=business, client_key__in=keys)}
+  first_index: Dict[str, int] = {}
+  fresh: List[int] = []
+  for index, entry in enumerate(entries):
+    key = entry['client_key']
+    if key in existing:
+      results[index] = BulkSaleResult(key, STATUS_DUPLICATE, sale=existing[key])
+    elif key not in first_index:
+      first_index[key] = index
+      fresh.append(index)
+
+  fresh_entries = [entries[index] for index in fresh]
+  customers = _by_pk(Customer.objects.filter(
+    business=business, pk__in={entry['customer_id'] for entry in fresh_entries if entry.get('customer_id')}
+  ))
+  sessions = _by_pk(CashSession.objects.filter(
+    business=business, pk__in={entry['cash_session_id'] for entry in fresh_entries if entry.get('cash_session_id')}
+  ))
+  products = _by_pk(Product.objects.filter(
+    business=business, pk__in={item['product_id'] for entry in fresh_entries for item in entry['items']}
+  ))
+
+  with transaction.atomic():
+    # Orden de locks de `apps.sales.sequences`, igual que el checkout y el cobro de órdenes:
+    # primero los ProductStock y recién en `_create_sales` el bloque de números de venta.
+    stocks = lock_stock_records(business, products.values())
+    available = {product_id: stock.quantity for product_id, stock in stocks.items()}
+    planned: List[_PlannedSale] = []
+    for index in fresh:
+      try:
+        planned.append(_plan_sale(index, entries[index], settings, customers, sessions, products, available))
+      except _Rejected as exc:
+        results[index] = BulkSaleResult(entries[index]['client_key'], STATUS_REJECTED, errors=exc.errors)
+
+    if planned:
+      created = _create_sales(business, planned, user, stocks)
+      for plan, sale in zip(planned, created):
+        results[plan.index] = BulkSaleResult(sale.client_key, STATUS_CREATED, sale=sale)
+      sales_bulk_created.send(sender=Sale, business=business, sales=created)
+
+  # Claves repetidas dentro del lote: mismo resultado que su primera aparición.
+  for index, entry in enumerate(entries):
+    if results[index] is None:
+      first = results[first_index[entry['client_key']]]
+      status = STATUS_DUPLICATE if first.sale is not None else first.status
+      results[index] = BulkSaleResult(first.client_key, status, sale=first.sale, errors=first.errors)
+  return results
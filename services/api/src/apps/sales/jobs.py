@@ -0,0 +1,46 @@
+"""Handlers de trabajos en segundo plano de ventas (ver `apps.jobs.registry`)."""
+
+from __future__ import annotations
+
+from apps.jobs.registry import JobContext, JobError, register_job
+from .models import Quote
+
+
+@register_job('quote_pdf', permission='view_quotes')
+def run_quote_pdf(ctx: JobContext) -> dict:
+    from apps.invoices.pdf_cache import PDF_CONTENT_TYPE
+    from .quote_pdf import quote_document_pdf
+
+    quote = (
+        Quote.objects.select_related('customer', 'business')
+        .prefetch_related('items__product')
+        .filter(pk=ctx.params.get('quote_id'), business=ctx.business, is_deleted=False)
+        .first()
+    )
+    if quote is None:
+        raise JobError('No encontramos el presupuesto.')
+    filename = f'Presupuesto_{quote.number}.pdf'
+    ctx.save_artifact(filename, quote_document_pdf(quote).content(), PDF_CONTENT_TYPE)
+    return {'quote_id': str(quote.pk), 'filename': filename}
+
+
+@register_job('quote_pdf_export', permission='view_quotes')
+def run_quote_pdf_export(ctx: JobContext) -> dict:
+    from apps.invoices.pdf_export import DocumentExport, export_documents, filter_period
+    from .quote_pdf import build_quote_pdf, quote_document_pdf
+
+    export = DocumentExport(
+        name='presupuestos',
+        document_pdf=quote_document_pdf,
+        filename=lambda quote: f'Presupuesto_{quote.number}.pdf',
+        render=build_quote_pdf,
+    )
+    queryset = filter_period(
+        Quote.objects.filter(business=ctx.business, is_deleted=False)
+        .select_related('customer', 'business')
+        .prefetch_related('items__product')
+        .order_by('created_at', 'number'),
+        'created_at',
+        ctx.params,
+    )
+    return export_documents(ctx, export, queryset, ctx.params.get('format'))
@@ -0,0 +1,147 @@
+"""
+Benchmark de concurrencia de la numeración de ventas.
+
+Lanza N hilos que simulan checkouts en paralelo sobre un mismo negocio y mide
+throughput, tiempo de espera al reservar el número (lock wait) y errores de
+numeración duplicada, comparando la estrategia anterior (select_for_update
+sobre la última venta) con el contador por negocio.
+
+Cada checkout corre en su propia transacción y se revierte al final, así que
+no deja ventas en la base.
+
+Uso:
+    python manage.py benchmark_sale_numbering --business <id> [--workers 16] [--checkouts 50] [--hold-ms 20]
+
+Ejemplos:
+    python manage.py benchmark_sale_numbering --business 1
+    python manage.py benchmark_sale_numbering --business 1 --strategy sequence --workers 32
+"""
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connection, connections, transaction
+
+from apps.business.models import Business
+from apps.sales.models import Sale
+from apps.sales.sequences import next_sale_number
+
+STRATEGIES = ('legacy', 'sequence')
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _legacy_number(business):
+    last_number = (
+        Sale.objects.select_for_update()
+        .filter(business=business)
+        .order_by('-number')
+        .values_list('number', flat=True)
+        .first()
+    ) or 0
+    return last_number + 1
+
+
+def _allocate(strategy, business):
+    if strategy == 'legacy':
+        return _legacy_number(business)
+    return next_sale_number(business)
+
+
+def _checkout(strategy, business, hold_seconds):
+    """Simula un checkout: reserva número, crea la venta, trabaja y revierte."""
+    wait = 0.0
+    error = None
+    try:
+        with transaction.atomic():
+            started = time.perf_counter()
+            number = _allocate(strategy, business)
+            wait = time.perf_counter() - started
+            Sale.objects.create(business=business, number=number)
+            if hold_seconds:
+                time.sleep(hold_seconds)
+            raise _Rollback()
+    except _Rollback:
+        pass
+    except IntegrityError as exc:
+        error = exc
+    return wait, error
+
+
+class Command(BaseCommand):
+    help = 'Mide throughput y lock wait de la numeración de ventas bajo checkouts concurrentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, required=True, help='ID del business')
+        parser.add_argument('--workers', type=int, default=16, help='Hilos concurrentes (default: 16)')
+        parser.add_argument('--checkouts', type=int, default=50, help='Checkouts por hilo (default: 50)')
+        parser.add_argument(
+            '--hold-ms',
+            type=int,
+            default=20,
+            help='Milisegundos de trabajo simulado dentro de la transacción (default: 20)',
+        )
+        parser.add_argument(
+            '--strategy',
+            choices=STRATEGIES + ('both',),
+            default='both',
+            help='Estrategia a medir (default: both)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('El benchmark requiere PostgreSQL (SQLite serializa todas las escrituras).')
+        try:
+            business = Business.objects.get(pk=options['business'])
+        except Business.DoesNotExist:
+            raise CommandError(f'Business con ID {options["business"]} no encontrado')
+
+        workers = max(options['workers'], 1)
+        checkouts = max(options['checkouts'], 1)
+        hold_seconds = max(options['hold_ms'], 0) / 1000
+        strategies = STRATEGIES if options['strategy'] == 'both' else (options['strategy'],)
+
+        self.stdout.write(
+            f'Negocio: {business.name} (ID: {business.id}) · {workers} hilos × {checkouts} checkouts · '
+            f'hold {options["hold_ms"]} ms'
+        )
+        for strategy in strategies:
+            self._run(strategy, business, workers, checkouts, hold_seconds)
+
+    def _run(self, strategy, business, workers, checkouts, hold_seconds):
+        waits = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                for _ in range(checkouts):
+                    wait, error = _checkout(strategy, business, hold_seconds)
+                    with lock:
+                        waits.append(wait)
+                        if error is not None:
+                            errors.append(error)
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(worker) for _ in range(workers)]:
+                future.result()
+        elapsed = time.perf_counter() - started
+
+        total = len(waits)
+        waits_ms = sorted(value * 1000 for value in waits)
+        p95 = waits_ms[min(int(len(waits_ms) * 0.95), len(waits_ms) - 1)] if waits_ms else 0.0
+        self.stdout.write(self.style.SUCCESS(f'✅ {strategy}'))
+        self.stdout.write(f'   Checkouts: {total} en {elapsed:.2f}s ({total / elapsed:.1f}/s)')
+        self.stdout.write(
+            f'   Lock wait: media {statistics.mean(waits_ms) if waits_ms else 0:.2f} ms · '
+            f'p95 {p95:.2f} ms · máx {waits_ms[-1] if waits_ms else 0:.2f} ms'
+        )
+        if errors:
+            self.stdout.write(self.style.WARNING(f'   Números duplicados: {len(errors)}'))
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.14 on 2026-10-16 22:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0014_menu_qr_plans_pro_module'),
+        ('sales', '0005_quotesequence_quote_quoteitem_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('sale', 'Venta'), ('order', 'Orden')], max_length=16)),
+                ('last_number', models.PositiveIntegerField(default=0)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='number_sequences', to='business.business')),
+            ],
+            options={
+                'db_table': 'sales_number_sequence',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='numbersequence',
+            constraint=models.UniqueConstraint(fields=('business', 'kind'), name='sales_number_sequence_unique_kind'),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+from common.search import search_index_operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_search_indexes'),
+        ('sales', '0006_numbersequence'),
+    ]
+
+    operations = [
+        search_index_operations('sales_sale', ['notes']),
+    ]
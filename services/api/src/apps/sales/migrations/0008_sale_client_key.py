@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-16 23:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0014_menu_qr_plans_pro_module'),
+        ('cash', '0003_session_running_totals'),
+        ('customers', '0005_search_indexes'),
+        ('sales', '0007_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sale',
+            name='client_key',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='sale',
+            constraint=models.UniqueConstraint(condition=models.Q(('client_key', ''), _negated=True), fields=('business', 'client_key'), name='sales_business_client_key_unique'),
+        ),
+    ]
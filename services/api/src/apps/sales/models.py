@@ -1,7 +1,7 @@
 import uuid
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 
 
 class Sale(models.Model):
@@ -55,11 +55,18 @@ class Sale(models.Model):
   created_at = models.DateTimeField(auto_now_add=True)
   updated_at = models.DateTimeField(auto_now=True)
   cancelled_at = models.DateTimeField(null=True, blank=True)
+  # Clave de idempotencia del POS offline (vacía en las ventas cargadas en línea).
+  client_key = models.CharField(max_length=64, blank=True, default='')
 
   class Meta:
     ordering = ['-created_at', '-number']
     constraints = [
       models.UniqueConstraint(fields=['business', 'number'], name='sales_business_number_unique'),
+      models.UniqueConstraint(
+        fields=['business', 'client_key'],
+        condition=~models.Q(client_key=''),
+        name='sales_business_client_key_unique',
+      ),
     ]
     indexes = [
       models.Index(fields=['business', 'status']),
@@ -69,6 +76,16 @@ class Sale(models.Model):
   def __str__(self) -> str:
     return f"Venta #{self.number} · {self.business_id}"
 
+  # atomic: el pendiente que la venta aporta a las sesiones de caja
+  # (apps.cash.totals) se confirma junto con la fila.
+  def save(self, *args, **kwargs):
+    with transaction.atomic():
+      super().save(*args, **kwargs)
+
+  def delete(self, *args, **kwargs):
+    with transaction.atomic():
+      return super().delete(*args, **kwargs)
+
 
 class SaleItem(models.Model):
   id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -103,6 +120,30 @@ class QuoteSequence(models.Model):
     return f"Quote Sequence · {self.business_id} · {self.last_number}"
 
 
+class NumberSequence(models.Model):
+  """Contador correlativo por negocio para ventas y órdenes.
+
+  Se incrementa con un único `UPDATE ... RETURNING` (ver `sales.sequences`),
+  sin bloquear la última venta u orden del negocio.
+  """
+  class Kind(models.TextChoices):
+    SALE = 'sale', 'Venta'
+    ORDER = 'order', 'Orden'
+
+  business = models.ForeignKey('business.Business', related_name='number_sequences', on_delete=models.CASCADE)
+  kind = models.CharField(max_length=16, choices=Kind.choices)
+  last_number = models.PositiveIntegerField(default=0)
+
+  class Meta:
+    db_table = 'sales_number_sequence'
+    constraints = [
+      models.UniqueConstraint(fields=['business', 'kind'], name='sales_number_sequence_unique_kind'),
+    ]
+
+  def __str__(self) -> str:
+    return f"Number Sequence · {self.business_id} · {self.kind} · {self.last_number}"
+
+
 class Quote(models.Model):
   """Presupuesto: cotización sin afectar stock ni finanzas."""
   class Status(models.TextChoices):
@@ -11,6 +11,8 @@ from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
 
 from .models import Quote
 from apps.business.services import get_business_document_config
+from apps.invoices.models import DocumentSeries
+from apps.invoices.pdf_cache import DocumentPDF, instance_fingerprint
 
 
 def format_money_ar(value) -> str:
@@ -69,14 +71,21 @@ def format_quantity_ar(value) -> str:
         return formatted
 
 
-def build_quote_pdf(quote: Quote) -> bytes:
+def build_quote_pdf(quote: Quote, config=None) -> bytes:
     """
     Genera un PDF tipo factura para el presupuesto.
     Retorna bytes que pueden servirse como FileResponse.
     """
     buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
+    quote_doc_template(buffer).build(quote_story(quote, config))
+    pdf_bytes = buffer.getvalue()
+    buffer.close()
+    return pdf_bytes
+
+
+def quote_doc_template(output) -> SimpleDocTemplate:
+    return SimpleDocTemplate(
+        output,
         pagesize=letter,
         rightMargin=0.5 * inch,
         leftMargin=0.5 * inch,
@@ -84,6 +93,12 @@ def build_quote_pdf(quote: Quote) -> bytes:
         bottomMargin=0.5 * inch
     )
 
+
+def quote_story(quote: Quote, config=None) -> list:
+    """
+    Flowables del presupuesto. `config` permite reusar la configuración del
+    negocio entre varios presupuestos (exportación masiva).
+    """
     # Estilos
     styles = getSampleStyleSheet()
     title_style = ParagraphStyle(
@@ -132,7 +147,7 @@ def build_quote_pdf(quote: Quote) -> bytes:
     story.append(Spacer(1, 0.3 * inch))
 
     # Obtener configuración centralizada del negocio
-    config = get_business_document_config(quote.business)
+    config = config or get_business_document_config(quote.business)
     issuer = config.get_issuer_data()
     
     # Información del negocio (emisor)
@@ -256,9 +271,22 @@ def build_quote_pdf(quote: Quote) -> bytes:
         alignment=TA_CENTER
     )
     story.append(Paragraph("Gracias por su consulta", footer_style))
+    return story
 
-    # Generar PDF
-    doc.build(story)
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    return pdf_bytes
+
+def quote_document_pdf(quote: Quote, config=None, branding=None) -> DocumentPDF:
+    """
+    PDF cacheado del presupuesto (ver `apps.invoices.pdf_cache`).
+    La versión es un hash del presupuesto, su cliente y sus ítems: recalcular
+    totales no toca `updated_at`, así que no alcanza con esa columna.
+    """
+    items = sorted(quote.items.all(), key=lambda item: (item.created_at, str(item.pk)))
+    return DocumentPDF(
+        business_id=quote.business_id,
+        document_type=DocumentSeries.DocumentType.QUOTE,
+        document_id=quote.pk,
+        version=instance_fingerprint(quote, quote.customer, *items),
+        render=lambda: build_quote_pdf(quote, config),
+        branding=branding,
+        source=quote,
+    )
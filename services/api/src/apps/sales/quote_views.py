@@ -1,11 +1,9 @@
 """Views para presupuestos (Quotes)."""
 from datetime import datetime
 from decimal import Decimal
-from io import BytesIO
 from uuid import UUID
 
 from django.db.models import Count, Q
-from django.http import FileResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import generics, status
@@ -16,6 +14,10 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.accounts.permissions import HasBusinessMembership, HasPermission
+from apps.invoices.serializers import DocumentPDFExportSerializer
+from apps.jobs.services import enqueue_job
+from apps.jobs.views import idempotency_key_from, job_accepted_response, prefers_async
+from common.downloads import cached_file_response
 from .models import Quote
 from .quote_serializers import (
     QuoteCreateSerializer,
@@ -259,7 +261,8 @@ class QuotePDFView(APIView):
     required_permission = 'view_quotes'
 
     def get(self, request, pk: str):
-        from .quote_pdf import build_quote_pdf
+        from apps.invoices.pdf_cache import PDF_CONTENT_TYPE
+        from .quote_pdf import quote_document_pdf
 
         business = getattr(request, 'business')
         quote = get_object_or_404(
@@ -270,13 +273,43 @@ class QuotePDFView(APIView):
             is_deleted=False
         )
 
-        pdf_bytes = build_quote_pdf(quote)
-        buffer = BytesIO(pdf_bytes)
-        filename = f"Presupuesto_{quote.number}.pdf"
-
-        return FileResponse(
-            buffer,
+        if prefers_async(request):
+            job, created = enqueue_job(
+                business=business,
+                kind='quote_pdf',
+                user=request.user,
+                params={'quote_id': str(quote.pk)},
+                idempotency_key=idempotency_key_from(request),
+            )
+            return job_accepted_response(request, job, created)
+
+        rendered = quote_document_pdf(quote).rendered()
+        return cached_file_response(
+            request,
+            rendered.file,
+            etag=rendered.cache_key,
+            last_modified=rendered.created_at,
+            size=rendered.size,
+            content_type=PDF_CONTENT_TYPE,
+            filename=f"Presupuesto_{quote.number}.pdf",
             as_attachment=True,
-            filename=filename,
-            content_type='application/pdf'
         )
+
+
+class QuotePDFExportView(APIView):
+    """Exporta en segundo plano los PDFs de los presupuestos filtrados (ZIP o un único PDF)."""
+    permission_classes = [IsAuthenticated, HasBusinessMembership, HasPermission]
+    required_permission = 'view_quotes'
+
+    def post(self, request):
+        business = getattr(request, 'business')
+        serializer = DocumentPDFExportSerializer(data=request.data, status_choices=Quote.Status.values)
+        serializer.is_valid(raise_exception=True)
+        job, created = enqueue_job(
+            business=business,
+            kind='quote_pdf_export',
+            user=request.user,
+            params=serializer.job_params(),
+            idempotency_key=idempotency_key_from(request),
+        )
+        return job_accepted_response(request, job, created)
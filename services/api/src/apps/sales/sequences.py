@@ -0,0 +1,73 @@
+"""Numeración correlativa de ventas y órdenes por negocio.
+
+Cada llamada incrementa el contador con un `UPDATE ... RETURNING` atómico: el
+único lock es el de la fila del contador (hasta el commit), en lugar de la
+última venta u orden del negocio. El incremento nunca queda por debajo del
+máximo número existente, así que convive con filas cargadas por seeds,
+importaciones o datos previos a la tabla.
+
+Orden de locks: quien además descuenta stock bloquea primero los ProductStock
+(`apps.inventory.services.lock_stock_records`, ordenados por producto) y recién
+después pide el número, porque la fila del contador queda bloqueada hasta el
+commit. Lo respetan el checkout (`SaleCreateSerializer`), el cobro de órdenes
+(`apps.orders.payments`) y la carga masiva (`apps.sales.bulk`).
+"""
+
+from __future__ import annotations
+
+from django.db import connection, transaction
+
+from .models import NumberSequence, Sale
+
+
+def _greatest() -> str:
+  return 'MAX' if connection.vendor == 'sqlite' else 'GREATEST'
+
+
+def _increment(business_id, kind: str, table: str, count: int = 1) -> int | None:
+  sequence_table = connection.ops.quote_name(NumberSequence._meta.db_table)
+  source_table = connection.ops.quote_name(table)
+  sql = (
+    f'UPDATE {sequence_table} '
+    f'SET last_number = {_greatest()}('
+    f'last_number, COALESCE((SELECT MAX(number) FROM {source_table} WHERE business_id = %s), 0)'
+    f') + %s '
+    f'WHERE business_id = %s AND kind = %s '
+    f'RETURNING last_number'
+  )
+  with connection.cursor() as cursor:
+    cursor.execute(sql, [business_id, count, business_id, kind])
+    row = cursor.fetchone()
+  return row[0] if row else None
+
+
+def next_number(business, kind: str, table: str, count: int = 1) -> int:
+  """Reserva `count` números consecutivos y devuelve el último."""
+  business_id = getattr(business, 'pk', business)
+  with transaction.atomic():
+    number = _increment(business_id, kind, table, count)
+    if number is None:
+      NumberSequence.objects.bulk_create(
+        [NumberSequence(business_id=business_id, kind=kind, last_number=0)],
+        ignore_conflicts=True,
+      )
+      number = _increment(business_id, kind, table, count)
+  return number
+
+
+def next_sale_number(business) -> int:
+  return next_number(business, NumberSequence.Kind.SALE, Sale._meta.db_table)
+
+
+def reserve_sale_numbers(business, count: int) -> range:
+  """Bloque de `count` números de venta consecutivos con un solo incremento."""
+  if count <= 0:
+    return range(0)
+  last = next_number(business, NumberSequence.Kind.SALE, Sale._meta.db_table, count)
+  return range(last - count + 1, last + 1)
+
+
+def next_order_number(business) -> int:
+  from apps.orders.models import Order
+
+  return next_number(business, NumberSequence.Kind.ORDER, Order._meta.db_table)
@@ -16,9 +16,10 @@ from apps.catalog.models import Product
 from apps.customers.models import Customer
 from apps.customers.serializers import CustomerSummarySerializer
 from apps.inventory.models import StockMovement
-from apps.inventory.services import ensure_stock_record, register_stock_movement
+from apps.inventory.services import StockLine, StockLineError, lock_stock_records, register_stock_movements
 from apps.invoices.models import Invoice
 from .models import Sale, SaleItem
+from .sequences import next_sale_number
 
 
 class SaleItemSerializer(serializers.ModelSerializer):
@@ -252,39 +253,34 @@ class SaleCreateSerializer(serializers.Serializer):
     settings = self._get_settings()
     allow_without_stock = settings.allow_sell_without_stock
 
-    last_number = (
-      Sale.objects.select_for_update()
-      .filter(business=business)
-      .order_by('-number')
-      .values_list('number', flat=True)
-      .first()
-    ) or 0
+    subtotal = Decimal('0')
+    bulk_items: List[SaleItem] = []
+    items_payload: List[dict[str, Any]] = validated_data['items']
 
+    resolved = [(payload, self._resolve_product(business, payload['product_id'])) for payload in items_payload]
+    # Stock antes que el número de venta (orden de locks de `apps.sales.sequences`).
+    stocks = lock_stock_records(business, [product for _, product in resolved])
     sale = Sale.objects.create(
       business=business,
       customer=customer,
-      number=last_number + 1,
+      number=next_sale_number(business),
       status=Sale.Status.COMPLETED,
       payment_method=validated_data.get('payment_method', Sale.PaymentMethod.CASH),
       notes=validated_data.get('notes', ''),
       created_by=user if getattr(user, 'is_authenticated', False) else None,
       cash_session=cash_session,
     )
+    available_by_product = {product_id: stock.quantity for product_id, stock in stocks.items()}
+    stock_lines: List[StockLine] = []
 
-    subtotal = Decimal('0')
-    bulk_items: List[SaleItem] = []
-    items_payload: List[dict[str, Any]] = validated_data['items']
-
-    for payload in items_payload:
-      product = self._resolve_product(business, payload['product_id'])
+    for payload, product in resolved:
       quantity = Decimal(payload['quantity'])
       raw_unit_price = payload.get('unit_price')
       unit_price = Decimal(raw_unit_price) if raw_unit_price is not None else Decimal(product.price)
       line_total = (unit_price * quantity).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
       subtotal += line_total
 
-      stock_record = ensure_stock_record(business, product)
-      available_quantity = stock_record.quantity
+      available_quantity = available_by_product[product.pk]
       will_be_negative = (available_quantity - quantity) < 0
       if will_be_negative and not allow_without_stock:
         raise self._out_of_stock_error(
@@ -292,6 +288,7 @@ class SaleCreateSerializer(serializers.Serializer):
           available=available_quantity,
           requested=quantity,
         )
+      available_by_product[product.pk] = available_quantity - quantity
 
       bulk_items.append(
         SaleItem(
@@ -304,32 +301,28 @@ class SaleCreateSerializer(serializers.Serializer):
         )
       )
 
-      movement_kwargs: dict[str, Any] = {}
+      line = StockLine(
+        product=product,
+        movement_type=StockMovement.MovementType.OUT,
+        quantity=quantity,
+        note=f'Venta #{sale.number}',
+      )
       if will_be_negative and allow_without_stock:
-        movement_kwargs = {
-          'reason': 'SALE_ALLOW_NO_STOCK',
-          'metadata': {
-            'allowed_without_stock': True,
-            'product_id': str(product.id),
-            'available_stock': f"{available_quantity}",
-            'requested_qty': f"{quantity}",
-          },
-          'allow_negative_stock': True,
+        line.reason = 'SALE_ALLOW_NO_STOCK'
+        line.metadata = {
+          'allowed_without_stock': True,
+          'product_id': str(product.id),
+          'available_stock': f"{available_quantity}",
+          'requested_qty': f"{quantity}",
         }
+        line.allow_negative_stock = True
+      stock_lines.append(line)
 
-      try:
-        register_stock_movement(
-          business=business,
-          product=product,
-          movement_type=StockMovement.MovementType.OUT,
-          quantity=quantity,
-          note=f'Venta #{sale.number}',
-          created_by=user,
-          **movement_kwargs,
-        )
-      except ValidationError as exc:
-        message = exc.messages[0] if exc.messages else 'No pudimos actualizar el stock.'
-        raise serializers.ValidationError({'items': [f'{product.name}: {message}']}) from exc
+    try:
+      register_stock_movements(business=business, lines=stock_lines, created_by=user, stocks=stocks)
+    except StockLineError as exc:
+      message = exc.messages[0] if exc.messages else 'No pudimos actualizar el stock.'
+      raise serializers.ValidationError({'items': [f'{exc.line.product.name}: {message}']}) from exc
 
     discount_value = validated_data.get('discount')
     discount = Decimal(discount_value) if discount_value is not None else Decimal('0')
@@ -348,6 +341,46 @@ class SaleCreateSerializer(serializers.Serializer):
     return SaleDetailSerializer(instance, context=self.context).data
 
 
+class BulkSaleEntrySerializer(serializers.Serializer):
+  """Una venta del lote offline: solo valida la forma; `apps.sales.bulk` resuelve
+  clientes, sesiones y productos de todo el lote en una consulta por tabla."""
+
+  client_key = serializers.CharField(max_length=64)
+  customer_id = serializers.UUIDField(required=False, allow_null=True)
+  payment_method = serializers.ChoiceField(choices=Sale.PaymentMethod.choices, default=Sale.PaymentMethod.CASH)
+  discount = serializers.DecimalField(max_digits=12, decimal_places=2, required=False, default=Decimal('0'))
+  notes = serializers.CharField(required=False, allow_blank=True, default='')
+  items = SaleCreateItemSerializer(many=True)
+  cash_session_id = serializers.UUIDField(required=False, allow_null=True)
+
+  def validate_client_key(self, value: str) -> str:
+    value = value.strip()
+    if not value:
+      raise serializers.ValidationError('Indicá la clave de la venta.')
+    return value
+
+  def validate_discount(self, value: Decimal) -> Decimal:
+    settings = self.context.get('commercial_settings')
+    if value < 0 and not getattr(settings, 'allow_negative_price_or_discount', False):
+      raise serializers.ValidationError('El descuento no puede ser negativo.')
+    return value
+
+  def validate_items(self, value: List[dict]) -> List[dict]:
+    if not value:
+      raise serializers.ValidationError('Agregá al menos un producto a la venta.')
+    return value
+
+
+class BulkSaleCreateSerializer(serializers.Serializer):
+  sales = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+  def validate_sales(self, value: List[dict]) -> List[dict]:
+    limit = self.context.get('max_sales')
+    if limit and len(value) > limit:
+      raise serializers.ValidationError(f'El lote admite hasta {limit} ventas.')
+    return value
+
+
 class SaleCancelSerializer(serializers.Serializer):
   reason = serializers.CharField(required=False, allow_blank=True)
 
@@ -360,17 +393,20 @@ class SaleCancelSerializer(serializers.Serializer):
     user = self.context.get('user')
     reason = (self.validated_data.get('reason') or '').strip()
 
-    for item in sale.items.select_related('product'):
-      if item.product is None:
-        continue
-      register_stock_movement(
-        business=sale.business,
-        product=item.product,
-        movement_type=StockMovement.MovementType.IN,
-        quantity=item.quantity,
-        note=f'Reversa venta #{sale.number}',
-        created_by=user,
-      )
+    register_stock_movements(
+      business=sale.business,
+      lines=[
+        StockLine(
+          product=item.product,
+          movement_type=StockMovement.MovementType.IN,
+          quantity=item.quantity,
+          note=f'Reversa venta #{sale.number}',
+        )
+        for item in sale.items.select_related('product')
+        if item.product is not None
+      ],
+      created_by=user,
+    )
 
     sale.status = Sale.Status.CANCELLED
     sale.cancelled_at = timezone.now()
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from apps.invoices.models import DocumentSeries
+from .models import Quote
+
+# Alta masiva de ventas (`apps.sales.bulk`): bulk_create no dispara post_save,
+# así que caja, tesorería y reportes reciben las ventas creadas en un solo
+# envío, dentro de la misma transacción. Argumentos: `business`, `sales`.
+sales_bulk_created = Signal()
+
+
+@receiver(post_save, sender=Quote)
+@receiver(post_delete, sender=Quote)
+def forget_quote_pdf(sender, instance, **kwargs):
+  """Borra los PDFs cacheados del presupuesto.
+
+  Los cambios de ítems siempre terminan en `recalc_quote_totals`, que guarda el
+  presupuesto, así que alcanza con escuchar a Quote.
+  """
+  if kwargs.get('raw') or kwargs.get('created'):
+    return
+  from apps.invoices.pdf_cache import forget_documents
+
+  forget_documents(DocumentSeries.DocumentType.QUOTE, [instance.pk])
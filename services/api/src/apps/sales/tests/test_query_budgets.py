@@ -0,0 +1,40 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Membership
+from apps.business.models import Business, Subscription
+from apps.customers.models import Customer
+from apps.sales.models import Sale, SaleItem
+from common.query_budget import QUERY_BUDGET_ROWS, query_budget
+
+
+class SaleListQueryBudgetTests(APITestCase):
+  def setUp(self):
+    self.user = get_user_model().objects.create_user(username='budget-sales', email='budget-sales@example.com', password='pass1234')
+    self.business = Business.objects.create(name='Comercio Budget')
+    Subscription.objects.create(business=self.business, plan='starter', status='active')
+    Membership.objects.create(user=self.user, business=self.business, role='owner')
+    self.client.force_authenticate(user=self.user)
+    self.client.cookies['bid'] = str(self.business.id)
+    for number in range(1, QUERY_BUDGET_ROWS + 1):
+      customer = Customer.objects.create(business=self.business, name=f'Cliente {number}')
+      sale = Sale.objects.create(business=self.business, number=number, customer=customer, total=Decimal('50.00'))
+      for index in range(2):
+        SaleItem.objects.create(
+          sale=sale,
+          product_name_snapshot=f'Producto {index}',
+          quantity=Decimal('1'),
+          unit_price=Decimal('25.00'),
+          line_total=Decimal('25.00'),
+        )
+
+  def test_sale_list_stays_within_budget(self):
+    with query_budget('sales.list'):
+      response = self.client.get(reverse('sales:sale-list'))
+
+    self.assertEqual(response.status_code, status.HTTP_200_OK)
+    self.assertEqual(len(response.data['results']), QUERY_BUDGET_ROWS)
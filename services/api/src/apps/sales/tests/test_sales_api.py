@@ -1,7 +1,10 @@
+from datetime import timedelta
 from decimal import Decimal
+from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
@@ -10,7 +13,9 @@ from apps.business.models import Business, CommercialSettings, Subscription
 from apps.catalog.models import Product
 from apps.cash.models import CashSession, Payment
 from apps.inventory.models import ProductStock, StockMovement
-from apps.sales.models import Sale, SaleItem
+from apps.sales.models import NumberSequence, Sale, SaleItem
+from apps.inventory.services import lock_stock_records
+from apps.sales.sequences import next_sale_number
 
 
 class SalesAPITests(APITestCase):
@@ -150,6 +155,46 @@ class SalesAPITests(APITestCase):
     self.assertEqual(response.data['total'], '400.00')
     self.assertEqual(len(response.data['items']), 1)
 
+  def test_sale_numbers_come_from_business_sequence(self):
+    business = self._create_business('Numeración')
+    other = self._create_business('Otra')
+    Sale.objects.create(business=business, number=7)
+
+    self.assertEqual(next_sale_number(business), 8)
+    self.assertEqual(next_sale_number(business), 9)
+    self.assertEqual(next_sale_number(other), 1)
+    sequence = NumberSequence.objects.get(business=business, kind=NumberSequence.Kind.SALE)
+    self.assertEqual(sequence.last_number, 9)
+
+    product = self._create_product(business, Decimal('5'))
+    self._authenticate(business, role='cashier')
+    payload = {
+      'payment_method': 'cash',
+      'items': [{'product_id': str(product.id), 'quantity': '1', 'unit_price': '120.00'}],
+    }
+    response = self.client.post(reverse('sales:sale-list'), payload, format='json')
+
+    self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+    self.assertEqual(response.data['number'], 10)
+
+  def test_create_sale_locks_stock_before_the_sale_number(self):
+    business = self._create_business('Orden de locks')
+    product = self._create_product(business, Decimal('5'))
+    self._authenticate(business, role='cashier')
+    calls = mock.Mock()
+    payload = {
+      'payment_method': 'cash',
+      'items': [{'product_id': str(product.id), 'quantity': '1', 'unit_price': '10.00'}],
+    }
+    with mock.patch('apps.sales.serializers.lock_stock_records', wraps=lock_stock_records) as lock, \
+        mock.patch('apps.sales.serializers.next_sale_number', wraps=next_sale_number) as number:
+      calls.attach_mock(lock, 'lock_stock_records')
+      calls.attach_mock(number, 'next_sale_number')
+      response = self.client.post(reverse('sales:sale-list'), payload, format='json')
+
+    self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+    self.assertEqual([call[0] for call in calls.mock_calls], ['lock_stock_records', 'next_sale_number'])
+
   def test_create_sale_links_cash_session_when_provided(self):
     business = self._create_business('Caja activa')
     product = self._create_product(business, Decimal('5'))
@@ -351,3 +396,40 @@ class SalesAPITests(APITestCase):
     self.assertEqual(response.status_code, status.HTTP_200_OK)
     self.assertEqual(Decimal(response.data['paid_total']), Decimal('7000.00'))
     self.assertEqual(Decimal(response.data['balance']), Decimal('2000.00'))
+
+  def test_sale_list_cursor_pagination_walks_pages_without_offset(self):
+    business = self._create_business('Cursor')
+    created_at = timezone.now()
+    for number in range(1, 6):
+      sale = Sale.objects.create(business=business, number=number, total=Decimal('10.00'))
+      # Dos ventas por instante: el desempate por número mantiene el orden estable.
+      Sale.objects.filter(pk=sale.pk).update(created_at=created_at - timedelta(minutes=number // 2))
+    self._authenticate(business, role='cashier')
+    url = reverse('sales:sale-list')
+
+    counted = self.client.get(url, {'pagination': 'cursor', 'limit': 2, 'count': 'exact'})
+    self.assertEqual(counted.data['count'], 5)
+
+    first = self.client.get(url, {'pagination': 'cursor', 'limit': 2})
+    self.assertEqual(first.status_code, status.HTTP_200_OK)
+    self.assertIsNone(first.data['count'])
+    self.assertIsNone(first.data['previous'])
+    self.assertNotIn('offset=', first.data['next'])
+    numbers = [row['number'] for row in first.data['results']]
+
+    second = self.client.get(first.data['next'])
+    numbers += [row['number'] for row in second.data['results']]
+    third = self.client.get(second.data['next'])
+    numbers += [row['number'] for row in third.data['results']]
+    self.assertEqual(numbers, [1, 3, 2, 5, 4])
+    self.assertIsNone(third.data['next'])
+
+    back = self.client.get(third.data['previous'])
+    self.assertEqual([row['number'] for row in back.data['results']], [2, 5])
+
+    offset = self.client.get(url, {'limit': 2, 'offset': 2})
+    self.assertEqual(offset.data['count'], 5)
+    self.assertEqual([row['number'] for row in offset.data['results']], [2, 5])
+
+    invalid = self.client.get(url, {'cursor': 'no-es-un-cursor'})
+    self.assertEqual(invalid.status_code, status.HTTP_404_NOT_FOUND)
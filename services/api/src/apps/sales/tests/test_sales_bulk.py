@@ -0,0 +1,91 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import Membership
+from apps.business.models import Business, CommercialSettings, Subscription
+from apps.cash.models import CashSession
+from apps.cash.services import compute_session_totals, diff_session_totals
+from apps.catalog.models import Product
+from apps.inventory.models import ProductStock, StockMovement
+from apps.sales.models import Sale
+from apps.treasury.models import Account, Transaction
+from apps.treasury.outbox import drain_outbox_until_empty
+
+
+class SaleBulkCreateTests(APITestCase):
+  def setUp(self):
+    self.user = get_user_model().objects.create_user(username='offline', email='offline@example.com', password='pass1234')
+    self.business = Business.objects.create(name='Kiosco offline')
+    Subscription.objects.create(business=self.business, plan='starter', status='active')
+    settings = CommercialSettings.objects.for_business(self.business)
+    settings.block_sales_if_no_open_cash_session = False
+    settings.allow_sell_without_stock = False
+    settings.save()
+    Membership.objects.create(user=self.user, business=self.business, role='owner')
+    self.client.force_authenticate(user=self.user)
+    self.client.cookies['bid'] = str(self.business.id)
+    self.url = reverse('sales:sale-bulk')
+
+    self.product = Product.objects.create(business=self.business, name='Agua', sku='AG-1', price=Decimal('100'))
+    ProductStock.objects.create(business=self.business, product=self.product, quantity=Decimal('5'))
+    self.session = CashSession.objects.create(business=self.business, opened_by=self.user, opening_cash_amount=Decimal('0'))
+    self.account = Account.objects.create(
+      business=self.business, name='Caja', type='cash', currency='ARS',
+      opening_balance=Decimal('0'), opening_balance_date=date.today(),
+    )
+
+  def _sale(self, key, quantity, **extra):
+    payload = {
+      'client_key': key,
+      'cash_session_id': str(self.session.id),
+      'items': [{'product_id': str(self.product.id), 'quantity': str(quantity)}],
+    }
+    payload.update(extra)
+    return payload
+
+  def test_batch_creates_sales_and_reports_each_result(self):
+    response = self.client.post(self.url, {'sales': [
+      self._sale('pos-1', 2),
+      self._sale('pos-2', 4),
+      self._sale('pos-3', 3, discount='50'),
+      {'client_key': 'pos-4', 'items': []},
+      self._sale('pos-1', 2),
+    ]}, format='json')
+
+    self.assertEqual(response.status_code, 200)
+    body = response.json()
+    self.assertEqual([row['status'] for row in body['results']], ['created', 'rejected', 'created', 'rejected', 'duplicate'])
+    self.assertEqual((body['created'], body['duplicate'], body['rejected']), (2, 1, 2))
+    self.assertEqual(body['results'][1]['errors']['error']['code'], 'OUT_OF_STOCK')
+    self.assertEqual(body['results'][0]['sale'], body['results'][4]['sale'])
+
+    sales = list(Sale.objects.filter(business=self.business).order_by('number'))
+    self.assertEqual([sale.number for sale in sales], [1, 2])
+    self.assertEqual([sale.total for sale in sales], [Decimal('200.00'), Decimal('250.00')])
+    self.assertEqual(ProductStock.objects.get(product=self.product).quantity, Decimal('0'))
+    self.assertEqual(StockMovement.objects.filter(business=self.business).count(), 2)
+
+    drain_outbox_until_empty()
+    self.assertEqual(Transaction.objects.filter(reference_type='sale').count(), 2)
+    self.account.refresh_from_db()
+    self.assertEqual(self.account.posted_net, Decimal('450'))
+    self.assertEqual(compute_session_totals(self.session)['pending_sales_total'], Decimal('450.00'))
+    self.assertEqual(diff_session_totals(self.session), [])
+
+  def test_retrying_a_batch_is_idempotent(self):
+    payload = {'sales': [self._sale('pos-1', 1), self._sale('pos-2', 1)]}
+    first = self.client.post(self.url, payload, format='json').json()
+    second = self.client.post(self.url, payload, format='json').json()
+
+    self.assertEqual(second['duplicate'], 2)
+    self.assertEqual([row['sale'] for row in first['results']], [row['sale'] for row in second['results']])
+    self.assertEqual(Sale.objects.filter(business=self.business).count(), 2)
+    self.assertEqual(ProductStock.objects.get(product=self.product).quantity, Decimal('3'))
+
+  def test_batch_size_is_limited(self):
+    response = self.client.post(self.url, {'sales': [self._sale(f'k{i}', 1) for i in range(501)]}, format='json')
+    self.assertEqual(response.status_code, 400)
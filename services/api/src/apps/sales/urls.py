@@ -1,6 +1,7 @@
 from django.urls import path
 
 from .views import (
+	SaleBulkCreateView,
 	SaleCancelView,
 	SaleDetailView,
 	SaleListCreateView,
@@ -15,12 +16,14 @@ from .quote_views import (
 	QuoteMarkAcceptedView,
 	QuoteMarkRejectedView,
 	QuotePDFView,
+	QuotePDFExportView,
 )
 
 app_name = 'sales'
 
 urlpatterns = [
 	path('', SaleListCreateView.as_view(), name='sale-list'),
+	path('bulk/', SaleBulkCreateView.as_view(), name='sale-bulk'),
 	path('summary/today/', SalesTodaySummaryView.as_view(), name='sales-summary-today'),
 	path('recent/', SalesRecentView.as_view(), name='sales-recent'),
 	path('top-products/', SalesTopProductsView.as_view(), name='sales-top-products'),
@@ -29,6 +32,7 @@ urlpatterns = [
 	
 	# Quotes (Presupuestos)
 	path('quotes/', QuoteListCreateView.as_view(), name='quote-list'),
+	path('quotes/pdf-export/', QuotePDFExportView.as_view(), name='quote-pdf-export'),
 	path('quotes/<uuid:pk>/', QuoteDetailView.as_view(), name='quote-detail'),
 	path('quotes/<uuid:pk>/mark-sent/', QuoteMarkSentView.as_view(), name='quote-mark-sent'),
 	path('quotes/<uuid:pk>/mark-accepted/', QuoteMarkAcceptedView.as_view(), name='quote-mark-accepted'),
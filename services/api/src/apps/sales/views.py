@@ -1,21 +1,25 @@
 from datetime import datetime, timedelta
 from decimal import Decimal
-from uuid import UUID
 
-from django.db.models import Count, Q, Sum, DecimalField, OuterRef, Subquery, Value
+from django.db.models import Count, Sum, DecimalField, OuterRef, Subquery, Value
 from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.accounts.permissions import HasBusinessMembership, HasPermission
+from apps.business.models import CommercialSettings
 from apps.cash.models import Payment
+from common.pagination import KeysetPagination
+from common.search import SALE_SEARCH, search_queryset
+from .bulk import MAX_BULK_SALES, STATUS_CREATED, STATUS_DUPLICATE, STATUS_REJECTED, BulkSaleResult, ingest_sales
 from .models import Sale, SaleItem
 from .serializers import (
+	BulkSaleCreateSerializer,
+	BulkSaleEntrySerializer,
 	SaleCancelSerializer,
 	SaleCreateSerializer,
 	SaleDetailSerializer,
@@ -40,7 +44,7 @@ def _annotate_payments_totals(queryset):
 	)
 
 
-class SalesPagination(LimitOffsetPagination):
+class SalesPagination(KeysetPagination):
 
 	default_limit = 25
 	max_limit = 100
@@ -56,6 +60,7 @@ class SaleListCreateView(generics.ListCreateAPIView):
 	}
 	serializer_class = SaleListSerializer
 	pagination_class = SalesPagination
+	keyset_ordering = ('-created_at', '-number')
 
 	def get_queryset(self):
 		business = getattr(self.request, 'business')
@@ -83,18 +88,7 @@ class SaleListCreateView(generics.ListCreateAPIView):
 		if date_to:
 			queryset = queryset.filter(created_at__date__lte=date_to)
 
-		search = (self.request.query_params.get('search') or '').strip()
-		if search:
-			uuid_filter = self._parse_uuid(search)
-			filters = Q(customer__name__icontains=search) | Q(notes__icontains=search)
-			filters |= Q(customer__doc_number__icontains=search)
-			filters |= Q(customer__email__icontains=search)
-			filters |= Q(customer__phone__icontains=search)
-			if search.isdigit():
-				filters |= Q(number=int(search))
-			if uuid_filter:
-				filters |= Q(pk=uuid_filter)
-			queryset = queryset.filter(filters)
+		queryset = search_queryset(queryset, self.request.query_params.get('search'), SALE_SEARCH)
 
 		queryset = _annotate_payments_totals(queryset)
 		return queryset.order_by('-created_at', '-number')
@@ -118,14 +112,38 @@ class SaleListCreateView(generics.ListCreateAPIView):
 		except ValueError:
 			return None
 
-	@staticmethod
-	def _parse_uuid(value: str | None):
-		if not value:
-			return None
-		try:
-			return UUID(value)
-		except (ValueError, AttributeError):
-			return None
+
+class SaleBulkCreateView(APIView):
+	"""POST /api/v1/sales/bulk/ — sincroniza un lote de ventas del POS offline."""
+	permission_classes = [IsAuthenticated, HasBusinessMembership, HasPermission]
+	required_permission = 'create_sales'
+
+	def post(self, request):
+		business = getattr(request, 'business')
+		serializer = BulkSaleCreateSerializer(data=request.data, context={'max_sales': MAX_BULK_SALES})
+		serializer.is_valid(raise_exception=True)
+
+		settings = CommercialSettings.objects.for_business(business)
+		context = {'business': business, 'commercial_settings': settings}
+		results = []
+		valid_positions, valid_entries = [], []
+		for position, raw in enumerate(serializer.validated_data['sales']):
+			entry = BulkSaleEntrySerializer(data=raw, context=context)
+			if entry.is_valid():
+				valid_positions.append(position)
+				valid_entries.append(entry.validated_data)
+				results.append(None)
+			else:
+				results.append(BulkSaleResult(str(raw.get('client_key') or ''), STATUS_REJECTED, errors=entry.errors))
+
+		ingested = ingest_sales(business=business, entries=valid_entries, user=request.user, settings=settings)
+		for position, result in zip(valid_positions, ingested):
+			results[position] = result
+
+		summary = {status: 0 for status in (STATUS_CREATED, STATUS_DUPLICATE, STATUS_REJECTED)}
+		for result in results:
+			summary[result.status] += 1
+		return Response({'results': [result.as_dict() for result in results], **summary})
 
 
 class SaleDetailView(generics.RetrieveAPIView):
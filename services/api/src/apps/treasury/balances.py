@@ -0,0 +1,254 @@
+"""
+Saldos de cuentas mantenidos de forma incremental.
+
+`Account.posted_net` guarda el neto de las transacciones confirmadas (IN suma,
+OUT resta; ADJUST no mueve el saldo, igual que la conciliación). Los signals
+de Transaction aplican la diferencia entre el estado previo y el nuevo con
+`UPDATE ... SET posted_net = posted_net + delta`, así dos altas concurrentes
+no se pisan. Los `AccountBalanceCheckpoint` guardan el neto acumulado al
+cierre de un día y resuelven el saldo histórico sumando solo lo posterior.
+
+Los checkpoints de fin de mes se agregan a medida que cierran los meses
+(`close_balance_months`, tarea diaria `treasury.close_balance_months`),
+sumando solo lo posterior al último; `rebuild_account_balance` los regenera
+todos desde cero.
+"""
+from calendar import monthrange
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Max, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Account, AccountBalanceCheckpoint, Transaction
+
+ZERO = Decimal('0')
+
+BALANCE_FIELDS = frozenset({'account', 'account_id', 'status', 'direction', 'amount', 'occurred_at'})
+
+
+def contribution(status, direction, amount) -> Decimal:
+    """Aporte de una transacción al saldo de su cuenta."""
+    if status != Transaction.Status.POSTED or amount in (None, ''):
+        return ZERO
+    value = Decimal(str(amount))
+    if direction == Transaction.Direction.IN:
+        return value
+    if direction == Transaction.Direction.OUT:
+        return -value
+    return ZERO
+
+
+def local_day(value) -> date:
+    if isinstance(value, str):
+        value = parse_datetime(value) or datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value
+
+
+def day_end(day: date) -> datetime:
+    """Primer instante del día local siguiente (límite exclusivo)."""
+    return timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+def snapshot(txn: Transaction) -> dict:
+    return {
+        'account_id': txn.account_id,
+        'status': txn.status,
+        'direction': txn.direction,
+        'amount': txn.amount,
+        'occurred_at': txn.occurred_at,
+    }
+
+
+def apply_balance_delta(account_id, day: date, delta: Decimal) -> None:
+    if not delta:
+        return
+    Account.objects.filter(pk=account_id).update(posted_net=F('posted_net') + delta)
+    AccountBalanceCheckpoint.objects.filter(account_id=account_id, day__gte=day).update(
+        posted_net=F('posted_net') + delta
+    )
+
+
+def _accumulate(changes, state, sign) -> None:
+    amount = contribution(state['status'], state['direction'], state['amount'])
+    if not amount:
+        return
+    key = (state['account_id'], local_day(state['occurred_at']))
+    changes[key] = changes.get(key, ZERO) + sign * amount
+
+
+def _apply_changes(changes) -> None:
+    for (account_id, day), delta in changes.items():
+        apply_balance_delta(account_id, day, delta)
+
+
+def apply_transaction_change(previous, current) -> None:
+    """Aplica al saldo el paso de `previous` a `current` (snapshots; None = no existe)."""
+    changes = {}
+    for state, sign in ((previous, -1), (current, 1)):
+        if state is not None:
+            _accumulate(changes, state, sign)
+    _apply_changes(changes)
+
+
+def apply_created_transactions(transactions) -> None:
+    """Aplica al saldo un alta con bulk_create (no dispara los signals de Transaction)."""
+    changes = {}
+    for txn in transactions:
+        _accumulate(changes, snapshot(txn), 1)
+    _apply_changes(changes)
+
+
+def _net_expression():
+    return Coalesce(
+        Sum(
+            Case(
+                When(direction=Transaction.Direction.IN, then=F('amount')),
+                When(direction=Transaction.Direction.OUT, then=-F('amount')),
+                default=Value(ZERO),
+                output_field=DecimalField(max_digits=19, decimal_places=4),
+            )
+        ),
+        Value(ZERO),
+        output_field=DecimalField(max_digits=19, decimal_places=4),
+    )
+
+
+def compute_posted_net(account_id, *, since=None, until=None) -> Decimal:
+    """Neto confirmado recalculado desde las filas, en [since, until)."""
+    qs = Transaction.objects.filter(account_id=account_id, status=Transaction.Status.POSTED)
+    if since is not None:
+        qs = qs.filter(occurred_at__gte=since)
+    if until is not None:
+        qs = qs.filter(occurred_at__lt=until)
+    return qs.aggregate(net=_net_expression())['net']
+
+
+def balance_as_of(account: Account, day: date) -> Decimal:
+    """Saldo al cierre de `day`: último checkpoint anterior + delta posterior."""
+    checkpoint = (
+        AccountBalanceCheckpoint.objects
+        .filter(account=account, day__lte=day)
+        .order_by('-day')
+        .first()
+    )
+    if checkpoint is None:
+        net = compute_posted_net(account.pk, until=day_end(day))
+    elif checkpoint.day == day:
+        net = checkpoint.posted_net
+    else:
+        net = checkpoint.posted_net + compute_posted_net(
+            account.pk, since=day_end(checkpoint.day), until=day_end(day)
+        )
+    return account.opening_balance + net
+
+
+def _month_ends(first: date, last: date):
+    year, month = first.year, first.month
+    while True:
+        end = date(year, month, monthrange(year, month)[1])
+        if end > last:
+            return
+        yield end
+        month += 1
+        if month > 12:
+            month, year = 1, year + 1
+
+
+def _last_closed_day() -> date:
+    return timezone.localdate().replace(day=1) - timedelta(days=1)
+
+
+def _expected_checkpoints(account_id, latest=None) -> dict:
+    """Checkpoints a fin de cada mes cerrado posterior a `latest` (sin `latest`,
+    desde la primera transacción confirmada)."""
+    if latest is None:
+        first_at = (
+            Transaction.objects
+            .filter(account_id=account_id, status=Transaction.Status.POSTED)
+            .order_by('occurred_at')
+            .values_list('occurred_at', flat=True)
+            .first()
+        )
+        if first_at is None:
+            return {}
+        first, running, since = local_day(first_at), ZERO, None
+    else:
+        first, running, since = latest.day + timedelta(days=1), latest.posted_net, day_end(latest.day)
+    expected = {}
+    for end in _month_ends(first, _last_closed_day()):
+        running += compute_posted_net(account_id, since=since, until=day_end(end))
+        expected[end] = running
+        since = day_end(end)
+    return expected
+
+
+def rebuild_account_balance(account_id) -> Decimal:
+    """Recalcula posted_net y los checkpoints mensuales de la cuenta.
+
+    Bloquea la fila de la cuenta: una transacción concurrente aplica su delta
+    después del commit, sobre el valor ya reconstruido.
+    """
+    with transaction.atomic():
+        Account.objects.select_for_update().filter(pk=account_id).first()
+        net = compute_posted_net(account_id)
+        Account.objects.filter(pk=account_id).update(posted_net=net)
+        AccountBalanceCheckpoint.objects.filter(account_id=account_id).delete()
+        AccountBalanceCheckpoint.objects.bulk_create([
+            AccountBalanceCheckpoint(account_id=account_id, day=day, posted_net=value)
+            for day, value in _expected_checkpoints(account_id).items()
+        ])
+    return net
+
+
+def close_account_balance_months(account_id) -> int:
+    """Agrega los checkpoints de los meses cerrados después del último.
+
+    Bloquea la fila de la cuenta igual que `rebuild_account_balance`: una
+    transacción concurrente ajusta el checkpoint nuevo después del commit.
+    """
+    with transaction.atomic():
+        Account.objects.select_for_update().filter(pk=account_id).first()
+        latest = AccountBalanceCheckpoint.objects.filter(account_id=account_id).order_by('-day').first()
+        rows = [
+            AccountBalanceCheckpoint(account_id=account_id, day=day, posted_net=value)
+            for day, value in _expected_checkpoints(account_id, latest).items()
+        ]
+        AccountBalanceCheckpoint.objects.bulk_create(rows)
+    return len(rows)
+
+
+def close_balance_months(business_id=None) -> int:
+    """`close_account_balance_months` para las cuentas a las que les falta el último mes cerrado."""
+    accounts = (
+        Account.objects
+        .annotate(last_checkpoint=Max('balance_checkpoints__day'))
+        .filter(Q(last_checkpoint__isnull=True) | Q(last_checkpoint__lt=_last_closed_day()))
+    )
+    if business_id is not None:
+        accounts = accounts.filter(business_id=business_id)
+    return sum(
+        close_account_balance_months(account_id)
+        for account_id in accounts.order_by('pk').values_list('pk', flat=True)
+    )
+
+
+def diff_account_balance(account: Account) -> list:
+    """Diferencias entre lo mantenido y lo recalculado desde cero."""
+    mismatches = []
+    expected_net = compute_posted_net(account.pk)
+    if expected_net != account.posted_net:
+        mismatches.append({'key': 'posted_net', 'expected': expected_net, 'stored': account.posted_net})
+    stored = dict(
+        AccountBalanceCheckpoint.objects.filter(account=account).values_list('day', 'posted_net')
+    )
+    for day, value in stored.items():
+        expected = compute_posted_net(account.pk, until=day_end(day))
+        if expected != value:
+            mismatches.append({'key': f'checkpoint {day}', 'expected': expected, 'stored': value})
+    return mismatches
@@ -0,0 +1,206 @@
+"""
+Motor de flujo de caja: ingresos y egresos confirmados agrupados por período.
+
+Una sola consulta agrupada por TruncDay/TruncWeek/TruncMonth en la zona
+horaria del negocio (la actual de Django), con sumas condicionales por
+dirección y, opcionalmente, desglose por cuenta o categoría. El rango se
+filtra por `occurred_at` con límites de día local, así la consulta usa el
+índice (business, occurred_at) en lugar de `occurred_at__date`.
+"""
+from calendar import monthrange
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+
+from django.db.models import Case, DateField, DecimalField, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import Transaction
+
+ZERO = Decimal('0')
+
+GRANULARITIES = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+BREAKDOWNS = {
+    'account': ('account_id', 'account__name'),
+    'category': ('category_id', 'category__name'),
+}
+
+
+@dataclass
+class CashflowBucket:
+    period: date
+    income: Decimal = ZERO
+    expense: Decimal = ZERO
+    breakdown: Dict[object, dict] = field(default_factory=dict)
+
+    @property
+    def result(self) -> Decimal:
+        return self.income - self.expense
+
+
+def local_start(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def add_months(day: date, months: int) -> date:
+    month_index = day.year * 12 + (day.month - 1) + months
+    year, month = divmod(month_index, 12)
+    return date(year, month + 1, min(day.day, monthrange(year, month + 1)[1]))
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    if granularity == 'month':
+        return day.replace(day=1)
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def iter_periods(start: date, end: date, granularity: str):
+    current = bucket_start(start, granularity)
+    while current <= end:
+        yield current
+        if granularity == 'month':
+            current = add_months(current, 1)
+        elif granularity == 'week':
+            current += timedelta(days=7)
+        else:
+            current += timedelta(days=1)
+
+
+def period_count(start: date, end: date, granularity: str) -> int:
+    """Cantidad de períodos que devuelve `iter_periods`, sin recorrerlos."""
+    first = bucket_start(start, granularity)
+    if first > end:
+        return 0
+    if granularity == 'month':
+        return (end.year - first.year) * 12 + end.month - first.month + 1
+    if granularity == 'week':
+        return (end - first).days // 7 + 1
+    return (end - first).days + 1
+
+
+def previous_range(start: date, end: date, granularity: str):
+    """Rango inmediatamente anterior con la misma cantidad de períodos."""
+    if granularity == 'month':
+        first = bucket_start(start, 'month')
+        months = period_count(start, end, 'month')
+        return add_months(first, -months), first - timedelta(days=1)
+    length = (end - start).days + 1
+    return start - timedelta(days=length), start - timedelta(days=1)
+
+
+def _decimal():
+    return DecimalField(max_digits=19, decimal_places=4)
+
+
+def _direction_sum(direction):
+    return Coalesce(
+        Sum(Case(When(direction=direction, then='amount'), default=Value(ZERO), output_field=_decimal())),
+        Value(ZERO),
+        output_field=_decimal(),
+    )
+
+
+def cashflow_buckets(
+    business,
+    *,
+    start: date,
+    end: date,
+    granularity: str = 'month',
+    breakdown: Optional[str] = None,
+    accounts: Optional[Sequence] = None,
+    categories: Optional[Sequence] = None,
+) -> List[CashflowBucket]:
+    """Ingresos/egresos por período entre `start` y `end` (inclusive), sin huecos."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f'Granularidad inválida: {granularity}')
+    if breakdown is not None and breakdown not in BREAKDOWNS:
+        raise ValueError(f'Desglose inválido: {breakdown}')
+
+    trunc = GRANULARITIES[granularity]('occurred_at', output_field=DateField(), tzinfo=timezone.get_current_timezone())
+    qs = Transaction.objects.filter(
+        business=business,
+        status=Transaction.Status.POSTED,
+        occurred_at__gte=local_start(start),
+        occurred_at__lt=local_start(end + timedelta(days=1)),
+    ).filter(Q(direction=Transaction.Direction.IN) | Q(direction=Transaction.Direction.OUT))
+    if accounts:
+        qs = qs.filter(account_id__in=accounts)
+    if categories:
+        qs = qs.filter(category_id__in=categories)
+
+    group_fields = BREAKDOWNS[breakdown] if breakdown else ()
+    rows = (
+        qs.annotate(period=trunc)
+        .values('period', *group_fields)
+        .annotate(
+            income=_direction_sum(Transaction.Direction.IN),
+            expense=_direction_sum(Transaction.Direction.OUT),
+        )
+        .order_by()
+    )
+
+    buckets = {period: CashflowBucket(period=period) for period in iter_periods(start, end, granularity)}
+    for row in rows:
+        bucket = buckets.get(row['period'])
+        if bucket is None:
+            continue
+        bucket.income += row['income']
+        bucket.expense += row['expense']
+        if breakdown:
+            key_field, name_field = group_fields
+            key = row[key_field]
+            entry = bucket.breakdown.setdefault(key, {'id': key, 'name': row[name_field], 'income': ZERO, 'expense': ZERO})
+            entry['income'] += row['income']
+            entry['expense'] += row['expense']
+    return list(buckets.values())
+
+
+def summarize(buckets: Sequence[CashflowBucket]) -> dict:
+    income = sum((bucket.income for bucket in buckets), ZERO)
+    expense = sum((bucket.expense for bucket in buckets), ZERO)
+    return {'income': income, 'expense': expense, 'result': income - expense}
+
+
+def category_spend(business, periods) -> Dict[tuple, Decimal]:
+    """Egresos confirmados por (category_id, año, mes) en una sola consulta.
+
+    `periods` es un iterable de (category_id, year, month); lo usan los
+    presupuestos para calcular lo gastado de toda la lista de una vez.
+    """
+    periods = set(periods)
+    if not periods:
+        return {}
+    months = {date(year, month, 1) for _, year, month in periods}
+    first = min(months)
+    last = max(months)
+    last_day = last.replace(day=monthrange(last.year, last.month)[1])
+    trunc = TruncMonth('occurred_at', output_field=DateField(), tzinfo=timezone.get_current_timezone())
+    rows = (
+        Transaction.objects.filter(
+            business=business,
+            status=Transaction.Status.POSTED,
+            direction=Transaction.Direction.OUT,
+            category_id__in={category_id for category_id, _, _ in periods},
+            occurred_at__gte=local_start(first),
+            occurred_at__lt=local_start(last_day + timedelta(days=1)),
+        )
+        .annotate(period=trunc)
+        .values('category_id', 'period')
+        .annotate(total=Sum('amount'))
+        .order_by()
+    )
+    spend = {key: ZERO for key in periods}
+    for row in rows:
+        key = (row['category_id'], row['period'].year, row['period'].month)
+        if key in spend:
+            spend[key] = row['total'] or ZERO
+    return spend
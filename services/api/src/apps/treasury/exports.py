@@ -0,0 +1,66 @@
+"""
+Filtros y filas CSV de movimientos, compartidos por la exportación en línea
+(TransactionViewSet.export_csv) y el trabajo en segundo plano equivalente.
+"""
+
+from typing import Iterator, Mapping
+
+from common.exports import csv_lines, export_rows
+
+TRANSACTION_FILTER_PARAMS = ('account', 'direction', 'category', 'date_from', 'date_to', 'status')
+
+TRANSACTION_CSV_HEADER = ['ID', 'Fecha', 'Dirección', 'Cuenta', 'Categoría', 'Descripción', 'Monto', 'Estado', 'Tipo', 'Creado por']
+
+
+def transaction_filters_from(params: Mapping) -> dict:
+    """Extrae de los query params solo los filtros soportados (serializable a JSON)."""
+    return {key: params.get(key) for key in TRANSACTION_FILTER_PARAMS if params.get(key)}
+
+
+def filter_transactions(qs, params: Mapping):
+    account_id = params.get('account')
+    if account_id:
+        qs = qs.filter(account_id=account_id)
+
+    direction = params.get('direction')
+    if direction:
+        qs = qs.filter(direction=direction)
+
+    category_id = params.get('category')
+    if category_id:
+        qs = qs.filter(category_id=category_id)
+
+    date_from = params.get('date_from')
+    if date_from:
+        qs = qs.filter(occurred_at__date__gte=date_from)
+
+    date_to = params.get('date_to')
+    if date_to:
+        qs = qs.filter(occurred_at__date__lte=date_to)
+
+    txn_status = params.get('status')
+    if txn_status:
+        qs = qs.filter(status=txn_status)
+
+    return qs.order_by('-occurred_at')
+
+
+def transaction_csv_values(qs) -> Iterator[list]:
+    """Valores de cada movimiento, en el orden de TRANSACTION_CSV_HEADER."""
+    for t in export_rows(qs, chunk_size=500):
+        yield [
+            str(t.id),
+            t.occurred_at.strftime('%Y-%m-%d %H:%M'),
+            t.direction,
+            t.account.name,
+            t.category.name if t.category else '',
+            t.description or '',
+            str(t.amount),
+            t.status,
+            t.reference_type or '',
+            str(t.created_by) if t.created_by else '',
+        ]
+
+
+def transaction_csv_rows(qs) -> Iterator[str]:
+    return csv_lines(TRANSACTION_CSV_HEADER, transaction_csv_values(qs))
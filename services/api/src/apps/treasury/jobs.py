@@ -0,0 +1,36 @@
+"""Handlers de trabajos en segundo plano de tesorería (ver `apps.jobs.registry`)."""
+
+import csv
+import io
+import tempfile
+
+from apps.jobs.registry import JobContext, register_job
+
+from .exports import TRANSACTION_CSV_HEADER, filter_transactions, transaction_csv_values
+from .models import Transaction
+
+PROGRESS_EVERY = 500
+
+
+@register_job('treasury_transactions_csv', permission='view_finance')
+def run_transactions_csv(ctx: JobContext) -> dict:
+    qs = filter_transactions(
+        Transaction.objects.filter(business=ctx.business).select_related('account', 'category', 'created_by'),
+        ctx.params,
+    )
+    total = qs.count()
+    ctx.set_progress(0, total)
+    # El CSV se escribe en disco a medida que se recorre: nunca entero en memoria.
+    with tempfile.TemporaryFile() as output:
+        text = io.TextIOWrapper(output, encoding='utf-8', newline='')
+        writer = csv.writer(text)
+        writer.writerow(TRANSACTION_CSV_HEADER)
+        for index, row in enumerate(transaction_csv_values(qs)):
+            writer.writerow(row)
+            if index and index % PROGRESS_EVERY == 0:
+                ctx.set_progress(index, total)
+        text.flush()
+        text.detach()
+        output.seek(0)
+        ctx.save_artifact('movimientos.csv', output, 'text/csv')
+    return {'rows': total}
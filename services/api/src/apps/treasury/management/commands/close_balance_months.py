@@ -0,0 +1,25 @@
+"""
+Management command para agregar los checkpoints de saldo de fin de mes.
+
+Para cada cuenta crea los AccountBalanceCheckpoint de los meses cerrados
+posteriores a su último checkpoint (o desde su primera transacción). Es lo
+mismo que corre la tarea diaria `treasury.close_balance_months`; sirve para
+ponerse al día sin el servicio beat.
+
+Uso:
+    python manage.py close_balance_months [--business <id>]
+"""
+from django.core.management.base import BaseCommand
+
+from apps.treasury.balances import close_balance_months
+
+
+class Command(BaseCommand):
+    help = 'Crea los checkpoints de saldo de los meses cerrados que faltan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, help='ID del business (default: todos)')
+
+    def handle(self, *args, **options):
+        created = close_balance_months(options.get('business'))
+        self.stdout.write(self.style.SUCCESS(f'✅ Checkpoints creados: {created}'))
@@ -0,0 +1,47 @@
+"""
+Management command para drenar el outbox de tesorería.
+
+Convierte en Transaction las ventas encoladas en TreasuryOutboxEntry, por
+lotes. Sirve como alternativa a la tarea de Celery (o para ponerse al día
+después de una caída del worker).
+
+Uso:
+    python manage.py drain_treasury_outbox [--batch-size 200] [--loop] [--interval 2] [--retry-failed] [--business <id>]
+
+Con --loop queda corriendo y drena cada --interval segundos.
+Con --retry-failed vuelve a encolar las entradas que quedaron sin cuenta.
+Guardar una cuenta o TreasurySettings ya las reencola solo para ese negocio;
+el flag sirve para forzarlo a mano.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.treasury.outbox import DRAIN_BATCH_SIZE, drain_outbox_until_empty, retry_failed_entries
+from apps.treasury.models import TreasuryOutboxEntry
+
+
+class Command(BaseCommand):
+    help = 'Crea las transacciones de tesorería pendientes en el outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DRAIN_BATCH_SIZE, help=f'Entradas por lote (default: {DRAIN_BATCH_SIZE})')
+        parser.add_argument('--loop', action='store_true', help='Drena en forma continua')
+        parser.add_argument('--interval', type=float, default=2.0, help='Segundos entre pasadas con --loop (default: 2)')
+        parser.add_argument('--retry-failed', action='store_true', help='Reencola las entradas que quedaron sin cuenta')
+        parser.add_argument('--business', type=int, help='Con --retry-failed, limita al business indicado')
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        if options['retry_failed']:
+            requeued = retry_failed_entries(options.get('business'))
+            self.stdout.write(f'Reencoladas: {requeued}')
+
+        while True:
+            processed = drain_outbox_until_empty(batch_size)
+            if processed or not options['loop']:
+                failed = TreasuryOutboxEntry.objects.filter(processed_at__isnull=False).exclude(last_error='').count()
+                self.stdout.write(self.style.SUCCESS(f'✅ Entradas procesadas: {processed} · sin cuenta: {failed}'))
+            if not options['loop']:
+                return
+            time.sleep(max(options['interval'], 0.1))
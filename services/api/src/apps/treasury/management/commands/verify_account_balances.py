@@ -0,0 +1,68 @@
+"""
+Management command para auditar los saldos mantenidos de las cuentas.
+
+Recalcula desde cero el neto confirmado de cada cuenta (y de cada checkpoint)
+y lo compara con Account.posted_net / AccountBalanceCheckpoint.
+
+Uso:
+    python manage.py verify_account_balances [--business <id>] [--account <id>] [--fix]
+
+Con --fix reescribe el saldo y regenera los checkpoints mensuales de las
+cuentas con diferencias (o de todas, si además se pasa --checkpoints).
+Sale con código 1 si encuentra diferencias y no se pasó --fix.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.treasury.balances import diff_account_balance, rebuild_account_balance
+from apps.treasury.models import Account
+
+
+class Command(BaseCommand):
+    help = 'Compara los saldos mantenidos de las cuentas con las transacciones y reporta diferencias'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, help='ID del business (default: todos)')
+        parser.add_argument('--account', type=int, help='ID de la cuenta (default: todas)')
+        parser.add_argument('--fix', action='store_true', help='Reconstruye las cuentas con diferencias')
+        parser.add_argument(
+            '--checkpoints',
+            action='store_true',
+            help='Con --fix, regenera los checkpoints mensuales de todas las cuentas',
+        )
+
+    def handle(self, *args, **options):
+        accounts = Account.objects.order_by('business_id', 'id')
+        if options.get('business') is not None:
+            accounts = accounts.filter(business_id=options['business'])
+        if options.get('account') is not None:
+            accounts = accounts.filter(id=options['account'])
+            if not accounts.exists():
+                raise CommandError(f"Cuenta con ID {options['account']} no encontrada")
+        fix = options.get('fix', False)
+        rebuild_all = fix and options.get('checkpoints', False)
+
+        drifted = 0
+        for account in accounts.iterator():
+            mismatches = diff_account_balance(account)
+            for row in mismatches:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"#{account.business_id} cuenta {account.id} ({account.name}) {row['key']}: "
+                        f"esperado={row['expected']} guardado={row['stored']}"
+                    )
+                )
+            if mismatches:
+                drifted += 1
+            if fix and (mismatches or rebuild_all):
+                rebuild_account_balance(account.id)
+
+        if not drifted:
+            if rebuild_all:
+                self.stdout.write(self.style.SUCCESS('✅ Saldos consistentes; checkpoints regenerados'))
+            else:
+                self.stdout.write(self.style.SUCCESS('✅ Saldos consistentes con las transacciones'))
+            return
+        if fix:
+            self.stdout.write(self.style.SUCCESS(f'✅ {drifted} cuentas reconstruidas'))
+            return
+        raise CommandError(f'{drifted} cuentas con diferencias (usar --fix para reconstruirlas)')
@@ -0,0 +1,65 @@
+# Generated by Django 5.0.14 on 2026-10-16 23:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Case, DecimalField, F, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+
+def backfill_posted_net(apps, schema_editor):
+    Account = apps.get_model('treasury', 'Account')
+    Transaction = apps.get_model('treasury', 'Transaction')
+    decimal = DecimalField(max_digits=19, decimal_places=4)
+    totals = (
+        Transaction.objects.filter(status='posted')
+        .values('account_id')
+        .annotate(
+            net=Coalesce(
+                Sum(
+                    Case(
+                        When(direction='IN', then=F('amount')),
+                        When(direction='OUT', then=-F('amount')),
+                        default=Value(0),
+                        output_field=decimal,
+                    )
+                ),
+                Value(0),
+                output_field=decimal,
+            )
+        )
+    )
+    for row in totals:
+        Account.objects.filter(pk=row['account_id']).update(posted_net=row['net'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('treasury', '0005_expense_auto_source_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='posted_net',
+            field=models.DecimalField(decimal_places=4, default=0, max_digits=19),
+        ),
+        migrations.CreateModel(
+            name='AccountBalanceCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('posted_net', models.DecimalField(decimal_places=4, default=0, max_digits=19)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_checkpoints', to='treasury.account')),
+            ],
+            options={
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='accountbalancecheckpoint',
+            constraint=models.UniqueConstraint(fields=('account', 'day'), name='treasury_balance_checkpoint_unique_day'),
+        ),
+        migrations.RunPython(backfill_posted_net, migrations.RunPython.noop),
+    ]
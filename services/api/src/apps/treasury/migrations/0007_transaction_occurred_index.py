@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-16 23:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0014_menu_qr_plans_pro_module'),
+        ('treasury', '0006_account_balances'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['business', 'occurred_at'], name='treasury_txn_biz_occurred_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.14 on 2026-10-17 00:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0014_menu_qr_plans_pro_module'),
+        ('treasury', '0007_transaction_occurred_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TreasuryOutboxEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('sale', 'Venta')], max_length=20)),
+                ('reference_id', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='treasury_outbox', to='business.business')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['created_at'], name='treasury_outbox_pending_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='treasuryoutboxentry',
+            constraint=models.UniqueConstraint(fields=('kind', 'reference_id'), name='treasury_outbox_reference_unique'),
+        ),
+    ]
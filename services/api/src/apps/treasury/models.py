@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from apps.business.models import Business
 from django.utils import timezone
@@ -19,6 +19,9 @@ class Account(models.Model):
     currency = models.CharField(max_length=10, default='ARS')
     opening_balance = models.DecimalField(max_digits=19, decimal_places=4, default=0)
     opening_balance_date = models.DateField(default=date.today)
+    # Neto de transacciones confirmadas (IN - OUT). Lo mantienen los signals de
+    # Transaction (ver apps.treasury.balances); verify_account_balances lo audita.
+    posted_net = models.DecimalField(max_digits=19, decimal_places=4, default=0)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -26,6 +29,10 @@ class Account(models.Model):
     def __str__(self):
         return f"{self.name} ({self.get_type_display()})"
 
+    @property
+    def balance(self):
+        return self.opening_balance + self.posted_net
+
 class TransactionCategory(models.Model):
     class Direction(models.TextChoices):
         INCOME = 'income', 'Ingreso'
@@ -69,9 +76,46 @@ class Transaction(models.Model):
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Reportes de flujo de caja: rangos por occurred_at dentro del negocio.
+            models.Index(fields=['business', 'occurred_at'], name='treasury_txn_biz_occurred_idx'),
+        ]
+
     def __str__(self):
         return f"{self.direction} {self.amount} - {self.description}"
 
+    # Los signals de saldo (apps.treasury.signals) corren dentro del mismo
+    # atomic: la fila y Account.posted_net se confirman juntas.
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
+class AccountBalanceCheckpoint(models.Model):
+    """Neto confirmado acumulado de una cuenta hasta el cierre de `day` (día local).
+
+    Permite calcular el saldo a una fecha sumando solo las transacciones
+    posteriores al último checkpoint. Las transacciones con fecha anterior o
+    igual a un checkpoint lo ajustan al guardarse.
+    """
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='balance_checkpoints')
+    day = models.DateField()
+    posted_net = models.DecimalField(max_digits=19, decimal_places=4, default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'day'], name='treasury_balance_checkpoint_unique_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id} · {self.day} · {self.posted_net}"
+
 class FixedExpense(models.Model):
     """Representa un gasto fijo recurrente (ej: Internet, Alquiler, Luz)"""
     class Frequency(models.TextChoices):
@@ -284,3 +328,37 @@ class Budget(models.Model):
 
     def __str__(self):
         return f"Budget {self.category.name} {self.year}-{self.month:02d}: {self.limit_amount}"
+
+
+class TreasuryOutboxEntry(models.Model):
+    """Asiento de tesorería pendiente, escrito en la misma transacción que su origen.
+
+    `apps.treasury.outbox.drain_outbox` los convierte en Transaction por lotes,
+    fuera del camino del checkout. La restricción única hace idempotente el alta.
+    """
+    class Kind(models.TextChoices):
+        SALE = 'sale', 'Venta'
+
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='treasury_outbox')
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    reference_id = models.CharField(max_length=100)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'reference_id'], name='treasury_outbox_reference_unique'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(processed_at__isnull=True),
+                name='treasury_outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.reference_id} ({'procesado' if self.processed_at else 'pendiente'})"
@@ -0,0 +1,216 @@
+"""
+Outbox de asientos de tesorería originados en ventas.
+
+Guardar una venta completada solo inserta una fila en `TreasuryOutboxEntry`
+(en la misma transacción, `ON CONFLICT DO NOTHING` sobre la restricción
+única). El drenado (`drain_outbox`, desde la tarea de Celery o el comando
+`drain_treasury_outbox`) toma lotes con `SELECT ... FOR UPDATE SKIP LOCKED`,
+resuelve las cuentas con el mapeo cacheado por negocio, crea las Transaction
+con un bulk_create y aplica los saldos de una vez.
+
+Cada alta encola una tarea de drenado al confirmar la transacción (si el
+broker falla se registra y sigue) y, además, el beat de Celery drena cada
+`TREASURY_OUTBOX_DRAIN_SECONDS` lo que haya quedado pendiente. Con
+`JOBS_RUN_INLINE` / `CELERY_TASK_ALWAYS_EAGER` el lote se drena en el
+momento, como los jobs.
+"""
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from apps.jobs.services import jobs_run_inline
+from apps.sales.models import Sale
+from .balances import apply_created_transactions
+from .models import Account, Transaction, TreasuryOutboxEntry, TreasurySettings
+
+logger = logging.getLogger(__name__)
+
+DRAIN_BATCH_SIZE = 200
+ACCOUNT_MAP_CACHE_TTL = 60 * 60
+NO_ACCOUNT_ERROR = 'No hay una cuenta activa para el medio de pago.'
+
+_TYPE_FALLBACK = {
+    Sale.PaymentMethod.CASH: Account.Type.CASH,
+    Sale.PaymentMethod.TRANSFER: Account.Type.BANK,
+    Sale.PaymentMethod.CARD: Account.Type.CARD_FLOAT,
+    Sale.PaymentMethod.OTHER: None,
+}
+
+
+# Mapeo medio de pago → cuenta ---------------------------------------------
+
+def resolve_sale_account(business_id, settings, payment_method):
+    """
+    Cuenta destino de una venta según su medio de pago.
+    Prioridad:
+      1. Mapeo de TreasurySettings para ese medio
+      2. Cualquier cuenta activa del tipo esperado
+      3. Última opción: cualquier caja activa
+    Devuelve None si no hay ninguna (la venta queda sin asiento).
+    """
+    if settings:
+        account = settings.get_account_for_payment_method(payment_method)
+        if account and account.is_active:
+            return account
+
+    fallback_type = _TYPE_FALLBACK.get(payment_method)
+    if fallback_type:
+        account = Account.objects.filter(business_id=business_id, type=fallback_type, is_active=True).first()
+        if account:
+            logger.warning(
+                "TreasurySettings: No mapped account for payment_method=%s in business %s. "
+                "Used fallback account '%s' (type=%s). Configure TreasurySettings to fix this.",
+                payment_method, business_id, account.name, fallback_type
+            )
+            return account
+
+    account = Account.objects.filter(business_id=business_id, type=Account.Type.CASH, is_active=True).first()
+    if account:
+        logger.error(
+            "TreasurySettings: No suitable account for payment_method=%s in business %s. "
+            "Falling back to first cash account '%s'. Configure TreasurySettings to fix this.",
+            payment_method, business_id, account.name
+        )
+    return account
+
+
+def _account_map_key(business_id):
+    return f'treasury-sale-accounts:{business_id}'
+
+
+def sale_account_id(business_id, payment_method):
+    """Id de la cuenta para el medio de pago; el mapeo por negocio queda cacheado
+    hasta que cambie una cuenta o la configuración de tesorería."""
+    key = _account_map_key(business_id)
+    mapping = cache.get(key) or {}
+    if payment_method not in mapping:
+        settings = TreasurySettings.objects.filter(business_id=business_id).first()
+        account = resolve_sale_account(business_id, settings, payment_method)
+        mapping[payment_method] = account.pk if account else None
+        cache.set(key, mapping, ACCOUNT_MAP_CACHE_TTL)
+    return mapping[payment_method]
+
+
+def forget_account_map(business_id):
+    if business_id is None:
+        return
+    cache.delete(_account_map_key(business_id))
+    transaction.on_commit(lambda: cache.delete(_account_map_key(business_id)))
+
+
+# Alta en el outbox -------------------------------------------------------
+
+def needs_posting(sale):
+    return sale.status == Sale.Status.COMPLETED and sale.total > 0
+
+
+def enqueue_sale_postings(sales):
+    """Encola el asiento de cada venta completada; las ya encoladas se ignoran."""
+    entries = [
+        TreasuryOutboxEntry(business_id=sale.business_id, kind=TreasuryOutboxEntry.Kind.SALE, reference_id=str(sale.pk))
+        for sale in sales
+        if needs_posting(sale)
+    ]
+    if not entries:
+        return
+    TreasuryOutboxEntry.objects.bulk_create(entries, ignore_conflicts=True)
+    schedule_drain()
+
+
+def schedule_drain():
+    if jobs_run_inline():
+        drain_outbox()
+        return
+    transaction.on_commit(_delay_drain)
+
+
+def _delay_drain():
+    # Best-effort: la venta ya está confirmada; si el broker no responde, la
+    # entrada queda pendiente y la toma el drenado periódico (CELERY_BEAT_SCHEDULE).
+    from .tasks import drain_treasury_outbox_task
+
+    try:
+        drain_treasury_outbox_task.delay()
+    except Exception:
+        logger.exception("Could not enqueue the treasury outbox drain; the periodic drain will pick it up.")
+
+
+# Drenado -----------------------------------------------------------------
+
+def _sale_transaction(sale, account_id):
+    return Transaction(
+        business_id=sale.business_id,
+        account_id=account_id,
+        direction=Transaction.Direction.IN,
+        amount=sale.total,
+        occurred_at=sale.created_at or timezone.now(),
+        description=f"Venta #{sale.number}",
+        reference_type='sale',
+        reference_id=str(sale.pk),
+        created_by_id=sale.created_by_id,
+    )
+
+
+@transaction.atomic
+def drain_outbox(batch_size=DRAIN_BATCH_SIZE):
+    """Procesa un lote de pendientes y devuelve cuántas entradas cerró."""
+    entries = list(
+        TreasuryOutboxEntry.objects.select_for_update(skip_locked=True)
+        .filter(processed_at__isnull=True)
+        .order_by('created_at', 'id')[:batch_size]
+    )
+    if not entries:
+        return 0
+
+    reference_ids = [entry.reference_id for entry in entries]
+    sales = {str(sale.pk): sale for sale in Sale.objects.filter(pk__in=reference_ids)}
+    posted = set(
+        Transaction.objects.filter(reference_type='sale', reference_id__in=reference_ids)
+        .values_list('reference_id', flat=True)
+    )
+
+    transactions = []
+    failed = {}
+    for entry in entries:
+        sale = sales.get(entry.reference_id)
+        if sale is None or entry.reference_id in posted or not needs_posting(sale):
+            continue
+        account_id = sale_account_id(sale.business_id, sale.payment_method)
+        if account_id is None:
+            logger.error(
+                "Cannot create treasury Transaction for sale %s (business %s): no active account found.",
+                sale.pk, sale.business_id
+            )
+            failed[entry.pk] = NO_ACCOUNT_ERROR
+            continue
+        transactions.append(_sale_transaction(sale, account_id))
+
+    Transaction.objects.bulk_create(transactions)
+    apply_created_transactions(transactions)
+
+    now = timezone.now()
+    for entry in entries:
+        entry.processed_at = now
+        entry.attempts += 1
+        entry.last_error = failed.get(entry.pk, '')
+    TreasuryOutboxEntry.objects.bulk_update(entries, ['processed_at', 'attempts', 'last_error'])
+    return len(entries)
+
+
+def drain_outbox_until_empty(batch_size=DRAIN_BATCH_SIZE):
+    total = 0
+    while True:
+        processed = drain_outbox(batch_size)
+        total += processed
+        if processed < batch_size:
+            return total
+
+
+def retry_failed_entries(business_id=None):
+    """Vuelve a encolar las entradas que quedaron sin cuenta; lo llaman los signals de Account y TreasurySettings."""
+    queryset = TreasuryOutboxEntry.objects.filter(processed_at__isnull=False).exclude(last_error='')
+    if business_id is not None:
+        queryset = queryset.filter(business_id=business_id)
+    return queryset.update(processed_at=None, last_error='')
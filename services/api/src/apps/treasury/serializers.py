@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from django.db import models as db_models
+from .cashflow import category_spend
 from .models import Account, TransactionCategory, Transaction, ExpenseTemplate, Expense, Employee, PayrollPayment, FixedExpense, FixedExpensePeriod, TreasurySettings, Budget
 from apps.business.models import Business
 
@@ -9,13 +9,10 @@ class AccountSerializer(serializers.ModelSerializer):
     class Meta:
         model = Account
         fields = '__all__'
-        read_only_fields = ('business', 'created_at', 'updated_at')
+        read_only_fields = ('business', 'posted_net', 'created_at', 'updated_at')
 
     def get_balance(self, obj):
-        posted = obj.transactions.filter(status='posted')
-        in_total = posted.filter(direction=Transaction.Direction.IN).aggregate(s=db_models.Sum('amount'))['s'] or 0
-        out_total = posted.filter(direction=Transaction.Direction.OUT).aggregate(s=db_models.Sum('amount'))['s'] or 0
-        return float(obj.opening_balance) + float(in_total) - float(out_total)
+        return float(obj.balance)
 
 class TransactionCategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -220,6 +217,21 @@ class TreasurySettingsSerializer(serializers.ModelSerializer):
         read_only_fields = ('business',)
 
 
+class BudgetListSerializer(serializers.ListSerializer):
+    """Calcula lo gastado de todos los presupuestos de la lista en una sola consulta."""
+
+    def to_representation(self, data):
+        budgets = list(data.all() if hasattr(data, 'all') else data)
+        spend = {}
+        by_business = {}
+        for budget in budgets:
+            by_business.setdefault(budget.business_id, set()).add((budget.category_id, budget.year, budget.month))
+        for business_id, periods in by_business.items():
+            spend.update(category_spend(business_id, periods))
+        self.child._spent_cache = spend
+        return super().to_representation(budgets)
+
+
 class BudgetSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     spent = serializers.SerializerMethodField()
@@ -229,24 +241,17 @@ class BudgetSerializer(serializers.ModelSerializer):
         model = Budget
         fields = '__all__'
         read_only_fields = ('business', 'created_at', 'updated_at')
+        list_serializer_class = BudgetListSerializer
 
     def get_spent(self, obj):
         """Calculate amount spent in this category for the budget month."""
-        from django.db.models import Sum
-        from datetime import date
-        month_start = date(obj.year, obj.month, 1)
-        from calendar import monthrange
-        last_day = monthrange(obj.year, obj.month)[1]
-        month_end = date(obj.year, obj.month, last_day)
-        result = Transaction.objects.filter(
-            business=obj.business,
-            category=obj.category,
-            direction=Transaction.Direction.OUT,
-            status=Transaction.Status.POSTED,
-            occurred_at__date__gte=month_start,
-            occurred_at__date__lte=month_end,
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        return float(result)
+        key = (obj.category_id, obj.year, obj.month)
+        cache = getattr(self, '_spent_cache', None)
+        if cache is None:
+            cache = self._spent_cache = {}
+        if key not in cache:
+            cache.update(category_spend(obj.business_id, [key]))
+        return float(cache[key])
 
     def get_percentage(self, obj):
         spent = self.get_spent(obj)
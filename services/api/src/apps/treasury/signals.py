@@ -1,95 +1,61 @@
-import logging
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from django.utils import timezone
 from apps.sales.models import Sale
+from apps.sales.signals import sales_bulk_created
+from .balances import BALANCE_FIELDS, apply_transaction_change, snapshot
 from .models import Transaction, TreasurySettings, Account
+from .outbox import enqueue_sale_postings, forget_account_map, retry_failed_entries, schedule_drain
 
-logger = logging.getLogger(__name__)
 
+SALE_POSTING_FIELDS = frozenset({'status', 'total'})
 
-def _resolve_account_for_sale(sale, settings):
-    """
-    Return an Account for the given sale's payment method.
-    Priority:
-      1. TreasurySettings mapping for the exact payment method
-      2. Fallback: any active account matching the expected type
-      3. Last resort: any active cash account
-    Returns None if no account found (transaction won't be created).
-    """
-    pm = sale.payment_method  # 'cash' | 'transfer' | 'card' | 'other'
-    business = sale.business
 
-    # 1. Check TreasurySettings configured mapping
-    if settings:
-        account = settings.get_account_for_payment_method(pm)
-        if account and account.is_active:
-            return account
+@receiver(post_save, sender=Sale)
+def enqueue_transaction_from_sale(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Solo el alta en el outbox: el asiento lo crea el drenado (apps.treasury.outbox).
+    if raw or (update_fields is not None and not SALE_POSTING_FIELDS.intersection(update_fields)):
+        return
+    enqueue_sale_postings([instance])
 
-    # 2. Type-based fallback
-    TYPE_FALLBACK = {
-        Sale.PaymentMethod.CASH: Account.Type.CASH,
-        Sale.PaymentMethod.TRANSFER: Account.Type.BANK,
-        Sale.PaymentMethod.CARD: Account.Type.CARD_FLOAT,
-        Sale.PaymentMethod.OTHER: None,
-    }
-    fallback_type = TYPE_FALLBACK.get(pm)
-    if fallback_type:
-        account = Account.objects.filter(
-            business=business, type=fallback_type, is_active=True
-        ).first()
-        if account:
-            logger.warning(
-                "TreasurySettings: No mapped account for payment_method=%s in business %s. "
-                "Used fallback account '%s' (type=%s). Configure TreasurySettings to fix this.",
-                pm, business.pk, account.name, fallback_type
-            )
-            return account
 
-    # 3. Last resort: any active cash account
-    account = Account.objects.filter(business=business, type=Account.Type.CASH, is_active=True).first()
-    if account:
-        logger.error(
-            "TreasurySettings: No suitable account for payment_method=%s in business %s. "
-            "Falling back to first cash account '%s'. Configure TreasurySettings to fix this.",
-            pm, business.pk, account.name
-        )
-    return account
+@receiver(sales_bulk_created)
+def enqueue_transactions_from_bulk_sales(sender, sales, **kwargs):
+    enqueue_sale_postings(sales)
 
 
-@receiver(post_save, sender=Sale)
-def create_transaction_from_sale(sender, instance, created, **kwargs):
-    sale = instance
-    if sale.status != Sale.Status.COMPLETED:
-        return
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+@receiver(post_save, sender=TreasurySettings)
+@receiver(post_delete, sender=TreasurySettings)
+def invalidate_sale_account_map(sender, instance, raw=False, **kwargs):
+    forget_account_map(instance.business_id)
+    # Las ventas que quedaron sin cuenta vuelven al outbox con el mapeo nuevo.
+    if not raw and retry_failed_entries(instance.business_id):
+        schedule_drain()
 
-    # Idempotency: skip if a Transaction already exists for this sale
-    if Transaction.objects.filter(reference_type='sale', reference_id=str(sale.id)).exists():
-        return
 
-    business = sale.business
-    amount = sale.total
-    if amount <= 0:
+@receiver(pre_save, sender=Transaction)
+def capture_previous_balance_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Estado previo para aplicar solo la diferencia en post_save.
+    instance._balance_previous = None
+    instance._balance_skip = update_fields is not None and not BALANCE_FIELDS.intersection(update_fields)
+    if raw or instance.pk is None or instance._balance_skip:
         return
+    instance._balance_previous = (
+        Transaction.objects
+        .filter(pk=instance.pk)
+        .values('account_id', 'status', 'direction', 'amount', 'occurred_at')
+        .first()
+    )
 
-    settings = getattr(business, 'treasury_settings', None)
-    account = _resolve_account_for_sale(sale, settings)
 
-    if not account:
-        logger.error(
-            "Cannot create treasury Transaction for sale %s (business %s): no active account found.",
-            sale.id, business.pk
-        )
+@receiver(post_save, sender=Transaction)
+def update_account_balance_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw or getattr(instance, '_balance_skip', False):
         return
+    apply_transaction_change(getattr(instance, '_balance_previous', None), snapshot(instance))
 
-    Transaction.objects.create(
-        business=business,
-        account=account,
-        direction=Transaction.Direction.IN,
-        amount=amount,
-        occurred_at=sale.created_at or timezone.now(),
-        description=f"Venta #{sale.number}",
-        reference_type='sale',
-        reference_id=str(sale.id),
-        created_by=sale.created_by,
-    )
+
+@receiver(post_delete, sender=Transaction)
+def update_account_balance_on_delete(sender, instance, **kwargs):
+    apply_transaction_change(snapshot(instance), None)
@@ -0,0 +1,14 @@
+from celery import shared_task
+
+from .balances import close_balance_months
+from .outbox import drain_outbox_until_empty
+
+
+@shared_task(name='treasury.drain_outbox', acks_late=True)
+def drain_treasury_outbox_task() -> int:
+    return drain_outbox_until_empty()
+
+
+@shared_task(name='treasury.close_balance_months')
+def close_balance_months_task() -> int:
+    return close_balance_months()
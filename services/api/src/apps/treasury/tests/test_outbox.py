@@ -0,0 +1,90 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.business.models import Business
+from apps.sales.models import Sale
+from apps.treasury.models import Account, Transaction, TreasuryOutboxEntry, TreasurySettings
+from apps.treasury.outbox import NO_ACCOUNT_ERROR, drain_outbox, retry_failed_entries, sale_account_id
+from apps.treasury.tasks import drain_treasury_outbox_task
+
+
+@override_settings(JOBS_RUN_INLINE=False, CELERY_TASK_ALWAYS_EAGER=False)
+class TreasuryOutboxTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.business = Business.objects.create(name='Outbox')
+
+    def make_account(self, name='Caja', account_type='cash'):
+        return Account.objects.create(
+            business=self.business,
+            name=name,
+            type=account_type,
+            currency='ARS',
+            opening_balance=Decimal('0'),
+            opening_balance_date=date.today(),
+        )
+
+    def make_sale(self, number, total, payment_method=Sale.PaymentMethod.CASH):
+        sale = Sale.objects.create(business=self.business, number=number, payment_method=payment_method)
+        sale.total = total
+        sale.save(update_fields=['total', 'updated_at'])
+        return sale
+
+    def test_sale_save_only_enqueues_and_drain_posts_once(self):
+        account = self.make_account()
+        sale = self.make_sale(1, Decimal('300'))
+        sale.notes = 'sin cambios de importe'
+        sale.save(update_fields=['notes', 'updated_at'])
+
+        self.assertEqual(TreasuryOutboxEntry.objects.filter(reference_id=str(sale.pk)).count(), 1)
+        self.assertFalse(Transaction.objects.filter(reference_id=str(sale.pk)).exists())
+
+        self.assertEqual(drain_outbox(), 1)
+        self.assertEqual(drain_outbox(), 0)
+        txn = Transaction.objects.get(reference_type='sale', reference_id=str(sale.pk))
+        self.assertEqual((txn.account_id, txn.amount, txn.description), (account.pk, Decimal('300'), 'Venta #1'))
+        account.refresh_from_db()
+        self.assertEqual(account.posted_net, Decimal('300'))
+
+    def test_sales_without_account_can_be_retried(self):
+        sale = self.make_sale(1, Decimal('150'), Sale.PaymentMethod.TRANSFER)
+        drain_outbox()
+        entry = TreasuryOutboxEntry.objects.get(reference_id=str(sale.pk))
+        self.assertEqual(entry.last_error, NO_ACCOUNT_ERROR)
+
+        self.assertEqual(retry_failed_entries(self.business.pk), 1)
+        drain_outbox()
+        self.assertEqual(TreasuryOutboxEntry.objects.get(pk=entry.pk).last_error, NO_ACCOUNT_ERROR)
+
+        # Configurar una cuenta reencola las pendientes sin pasar por el comando.
+        bank = self.make_account('Banco', Account.Type.BANK)
+        entry.refresh_from_db()
+        self.assertEqual((entry.processed_at, entry.last_error), (None, ''))
+        drain_outbox()
+        self.assertEqual(Transaction.objects.get(reference_id=str(sale.pk)).account_id, bank.pk)
+
+    def test_account_map_is_cached_until_settings_change(self):
+        cash = self.make_account()
+        other_cash = self.make_account('Caja 2')
+        self.assertEqual(sale_account_id(self.business.pk, 'cash'), cash.pk)
+        with self.assertNumQueries(0):
+            sale_account_id(self.business.pk, 'cash')
+
+        TreasurySettings.objects.create(business=self.business, default_cash_account=other_cash)
+        self.assertEqual(sale_account_id(self.business.pk, 'cash'), other_cash.pk)
+
+    def test_broker_errors_do_not_fail_the_committed_sale(self):
+        self.make_account()
+        with mock.patch.object(drain_treasury_outbox_task, 'delay', side_effect=ConnectionError('broker down')) as delay:
+            with self.assertLogs('apps.treasury.outbox', level='ERROR'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    sale = self.make_sale(1, Decimal('200'))
+
+        self.assertTrue(delay.called)
+        self.assertTrue(TreasuryOutboxEntry.objects.filter(reference_id=str(sale.pk), processed_at__isnull=True).exists())
+        drain_outbox()
+        self.assertTrue(Transaction.objects.filter(reference_id=str(sale.pk)).exists())
@@ -2,12 +2,15 @@
 Treasury module tests
 Run with: python manage.py test apps.treasury.tests
 """
+import tempfile
 from decimal import Decimal
+from io import StringIO
 from datetime import date, datetime, timezone
 from unittest.mock import patch, MagicMock
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
 
 from apps.treasury.models import (
     Account, Transaction, TransactionCategory, FixedExpense,
@@ -252,3 +255,262 @@ class FixedExpensePeriodTest(TestCase):
 def models_sum(field):
     from django.db.models import Sum
     return Sum(field)
+
+
+class MaintainedAccountBalanceTest(TestCase):
+    """Account.posted_net se mantiene con cada alta, edición, anulación y baja."""
+
+    def setUp(self):
+        self.business = Business.objects.create(name='Biz Running Balance')
+        self.account = make_account(self.business, 'Caja', 'cash', Decimal('100'))
+        self.other = make_account(self.business, 'Banco', 'bank', Decimal('0'))
+
+    def _txn(self, direction, amount, occurred_at=None, account=None, status='posted'):
+        return Transaction.objects.create(
+            business=self.business,
+            account=account or self.account,
+            direction=direction,
+            amount=Decimal(amount),
+            occurred_at=occurred_at or datetime.now(tz=timezone.utc),
+            status=status,
+        )
+
+    def _balance(self, account=None):
+        account = account or self.account
+        account.refresh_from_db()
+        return account.balance
+
+    def test_balance_tracks_create_void_edit_and_delete(self):
+        from apps.treasury.serializers import AccountSerializer
+
+        income = self._txn('IN', '500')
+        self._txn('OUT', '120')
+        self._txn('IN', '999', status='voided')
+        self._txn('ADJUST', '50')
+        self.assertEqual(self._balance(), Decimal('480'))
+
+        income.amount = Decimal('600')
+        income.save()
+        self.assertEqual(self._balance(), Decimal('580'))
+
+        income.account = self.other
+        income.save()
+        self.assertEqual(self._balance(), Decimal('-20'))
+        self.assertEqual(self._balance(self.other), Decimal('600'))
+
+        income.status = 'voided'
+        income.save(update_fields=['status'])
+        self.assertEqual(self._balance(self.other), Decimal('0'))
+
+        Transaction.objects.filter(direction='OUT').first().delete()
+        self.assertEqual(self._balance(), Decimal('100'))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(AccountSerializer(self.account).data['balance'], 100.0)
+
+    def test_balance_as_of_uses_checkpoints(self):
+        from apps.treasury.balances import balance_as_of, rebuild_account_balance
+        from apps.treasury.models import AccountBalanceCheckpoint
+
+        self._txn('IN', '300', occurred_at=datetime(2025, 1, 10, 15, tzinfo=timezone.utc))
+        self._txn('OUT', '100', occurred_at=datetime(2025, 2, 10, 15, tzinfo=timezone.utc))
+        self._txn('IN', '40', occurred_at=datetime(2025, 3, 5, 15, tzinfo=timezone.utc))
+        rebuild_account_balance(self.account.id)
+
+        checkpoint = AccountBalanceCheckpoint.objects.get(account=self.account, day=date(2025, 1, 31))
+        self.assertEqual(checkpoint.posted_net, Decimal('300'))
+        self.assertEqual(balance_as_of(self.account, date(2025, 2, 15)), Decimal('300'))
+        self.assertEqual(balance_as_of(self.account, date(2025, 3, 5)), Decimal('340'))
+
+        # Una transacción con fecha pasada ajusta los checkpoints posteriores.
+        self._txn('OUT', '50', occurred_at=datetime(2025, 1, 20, 15, tzinfo=timezone.utc))
+        checkpoint.refresh_from_db()
+        self.assertEqual(checkpoint.posted_net, Decimal('250'))
+        self.assertEqual(balance_as_of(self.account, date(2025, 2, 15)), Decimal('250'))
+
+    def test_month_end_checkpoints_are_added_incrementally(self):
+        from django.core.management import call_command
+        from apps.treasury.balances import balance_as_of, close_balance_months, diff_account_balance
+        from apps.treasury.models import AccountBalanceCheckpoint
+
+        self._txn('IN', '300', occurred_at=datetime(2025, 1, 10, 15, tzinfo=timezone.utc))
+        self._txn('OUT', '100', occurred_at=datetime(2025, 2, 10, 15, tzinfo=timezone.utc))
+        checkpoints = AccountBalanceCheckpoint.objects.filter(account=self.account)
+
+        with patch('apps.treasury.balances._last_closed_day', return_value=date(2025, 1, 31)):
+            self.assertEqual(close_balance_months(self.business.id), 1)
+            self.assertEqual(close_balance_months(self.business.id), 0)
+        self.assertEqual(list(checkpoints.values_list('day', 'posted_net')), [(date(2025, 1, 31), Decimal('300'))])
+
+        # Los meses siguientes parten del último checkpoint, no de la primera transacción.
+        self._txn('IN', '40', occurred_at=datetime(2025, 3, 5, 15, tzinfo=timezone.utc))
+        with patch('apps.treasury.balances._last_closed_day', return_value=date(2025, 3, 31)):
+            call_command('close_balance_months', business=self.business.id, stdout=StringIO())
+        self.assertEqual(
+            list(checkpoints.order_by('day').values_list('day', 'posted_net')),
+            [(date(2025, 1, 31), Decimal('300')), (date(2025, 2, 28), Decimal('200')), (date(2025, 3, 31), Decimal('240'))],
+        )
+        self.account.refresh_from_db()
+        self.assertEqual(diff_account_balance(self.account), [])
+        self.assertEqual(balance_as_of(self.account, date(2025, 3, 10)), Decimal('340'))
+
+    def test_verify_command_reports_and_fixes_drift(self):
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+
+        self._txn('IN', '200')
+        Account.objects.filter(pk=self.account.pk).update(posted_net=Decimal('7'))
+
+        with self.assertRaises(CommandError):
+            call_command('verify_account_balances', business=self.business.id, stdout=StringIO())
+
+        call_command('verify_account_balances', business=self.business.id, fix=True, stdout=StringIO())
+        self.assertEqual(self._balance(), Decimal('300'))
+
+
+class CashflowEngineTest(TestCase):
+    """Flujo de caja agrupado en una consulta, en la zona horaria del negocio."""
+
+    def setUp(self):
+        self.business = Business.objects.create(name='Biz Cashflow')
+        self.cash = make_account(self.business, 'Caja', 'cash', Decimal('0'))
+        self.bank = make_account(self.business, 'Banco', 'bank', Decimal('0'))
+        self.rent = TransactionCategory.objects.create(business=self.business, name='Alquiler', direction='expense')
+        self.food = TransactionCategory.objects.create(business=self.business, name='Comida', direction='expense')
+
+    def _txn(self, account, direction, amount, occurred_at, category=None, status='posted'):
+        return Transaction.objects.create(
+            business=self.business,
+            account=account,
+            direction=direction,
+            amount=Decimal(amount),
+            occurred_at=occurred_at,
+            category=category,
+            status=status,
+        )
+
+    def test_monthly_buckets_use_local_timezone(self):
+        from apps.treasury.cashflow import cashflow_buckets, summarize
+
+        # 2025-02-01 01:00 UTC es todavía 31 de enero en Buenos Aires.
+        self._txn(self.cash, 'IN', '100', datetime(2025, 2, 1, 1, tzinfo=timezone.utc))
+        self._txn(self.cash, 'OUT', '30', datetime(2025, 2, 10, 15, tzinfo=timezone.utc), category=self.rent)
+        self._txn(self.bank, 'IN', '50', datetime(2025, 3, 3, 15, tzinfo=timezone.utc))
+        self._txn(self.bank, 'IN', '999', datetime(2025, 3, 3, 15, tzinfo=timezone.utc), status='voided')
+
+        with self.assertNumQueries(1):
+            buckets = cashflow_buckets(self.business, start=date(2025, 1, 1), end=date(2025, 3, 31), breakdown='account')
+
+        self.assertEqual([b.period for b in buckets], [date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1)])
+        self.assertEqual([(b.income, b.expense) for b in buckets], [(100, 0), (0, 30), (50, 0)])
+        self.assertEqual(buckets[2].breakdown[self.bank.id]['income'], Decimal('50'))
+        self.assertEqual(summarize(buckets)['result'], Decimal('120'))
+
+    def test_budget_list_spent_in_one_query(self):
+        from apps.treasury.models import Budget
+        from apps.treasury.serializers import BudgetSerializer
+
+        self._txn(self.cash, 'OUT', '400', datetime(2025, 4, 5, 15, tzinfo=timezone.utc), category=self.rent)
+        self._txn(self.cash, 'OUT', '25', datetime(2025, 4, 6, 15, tzinfo=timezone.utc), category=self.food)
+        self._txn(self.cash, 'OUT', '70', datetime(2025, 5, 6, 15, tzinfo=timezone.utc), category=self.food)
+        Budget.objects.create(business=self.business, year=2025, month=4, category=self.rent, limit_amount=Decimal('800'))
+        Budget.objects.create(business=self.business, year=2025, month=4, category=self.food, limit_amount=Decimal('50'))
+        Budget.objects.create(business=self.business, year=2025, month=5, category=self.food, limit_amount=Decimal('100'))
+
+        budgets = list(Budget.objects.select_related('category').order_by('month', 'category__name'))
+        with self.assertNumQueries(1):
+            data = BudgetSerializer(budgets, many=True).data
+
+        self.assertEqual([row['spent'] for row in data], [400.0, 25.0, 70.0])
+        self.assertEqual(data[0]['percentage'], 50.0)
+
+
+class CashflowApiTest(APITestCase):
+    """Validación de parámetros del endpoint de flujo de caja."""
+
+    url = '/api/v1/treasury/transactions/cashflow/'
+
+    def setUp(self):
+        from apps.accounts.models import Membership
+        from apps.business.models import Subscription
+
+        self.business = Business.objects.create(name='Biz Cashflow API')
+        Subscription.objects.create(business=self.business, plan='pro', status='active')
+        user = User.objects.create_user(username='cashflow-owner', email='cashflow@example.com', password='pass')
+        Membership.objects.create(user=user, business=self.business, role='owner')
+        self.client.force_authenticate(user=user)
+        self.client.cookies['bid'] = str(self.business.id)
+
+    def test_impossible_dates_are_a_bad_request(self):
+        for params in ({'date_from': '2024-02-30'}, {'date_from': '2024-01-01', 'date_to': '2024-13-01'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertEqual(response.data['error'], 'Rango de fechas inválido')
+
+    def test_non_integer_filters_are_a_bad_request(self):
+        account = make_account(self.business)
+        for params, error in (
+            ({'account': [str(account.id), 'abc']}, 'account inválido'),
+            ({'category': '1; DROP'}, 'category inválida'),
+        ):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertEqual(response.data['error'], error)
+
+        response = self.client.get(self.url, {'account': account.id})
+        self.assertEqual(response.status_code, 200)
+
+    def test_impossible_balance_date_is_a_bad_request(self):
+        account = make_account(self.business)
+        response = self.client.get(f'/api/v1/treasury/accounts/{account.id}/balance/', {'as_of': '2024-02-30'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], 'Invalid as_of')
+
+    def test_period_limit_is_counted_without_iterating(self):
+        from apps.treasury.cashflow import iter_periods, period_count
+
+        for granularity in ('day', 'week', 'month'):
+            for start, end in ((date(2024, 1, 31), date(2024, 3, 1)), (date(2023, 12, 31), date(2025, 1, 1)), (date(2024, 5, 5), date(2024, 5, 5))):
+                self.assertEqual(period_count(start, end, granularity), len(list(iter_periods(start, end, granularity))))
+
+        response = self.client.get(self.url, {'granularity': 'day', 'date_from': '2000-01-01', 'date_to': '2024-12-31'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], 'El rango tiene demasiados períodos')
+
+
+@override_settings(JOBS_RUN_INLINE=True)
+class TransactionsCsvJobTest(APITestCase):
+    """El CSV de movimientos en segundo plano coincide con la descarga en línea."""
+
+    url = '/api/v1/treasury/transactions/export-csv/'
+
+    def setUp(self):
+        from apps.accounts.models import Membership
+        from apps.business.models import Subscription
+
+        self.business = Business.objects.create(name='Biz CSV')
+        Subscription.objects.create(business=self.business, plan='pro', status='active')
+        user = User.objects.create_user(username='csv-owner', email='csv@example.com', password='pass')
+        Membership.objects.create(user=user, business=self.business, role='owner')
+        self.client.force_authenticate(user=user)
+        self.client.cookies['bid'] = str(self.business.id)
+        account = make_account(self.business)
+        for index in range(3):
+            Transaction.objects.create(
+                business=self.business, account=account, direction='IN', amount=Decimal('10'),
+                occurred_at=datetime(2025, 1, 10 + index, 15, tzinfo=timezone.utc),
+                description=f'Cobro "{index}", contado',
+            )
+
+    def test_job_writes_the_same_csv_as_the_streaming_export(self):
+        from apps.jobs.models import Job
+
+        streamed = b''.join(self.client.get(self.url).streaming_content)
+        with tempfile.TemporaryDirectory() as media, self.settings(MEDIA_ROOT=media):
+            response = self.client.get(self.url, HTTP_PREFER='respond-async')
+            self.assertEqual(response.status_code, 202)
+            job = Job.objects.get(pk=response.data['id'])
+            self.assertEqual(job.status, Job.Status.SUCCEEDED, job.error)
+            self.assertEqual(job.result, {'rows': 3})
+            with job.artifact.open('rb') as artifact:
+                self.assertEqual(artifact.read(), streamed)
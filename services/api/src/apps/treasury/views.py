@@ -3,19 +3,26 @@ import uuid
 import logging
 from decimal import Decimal
 from datetime import date, timedelta
-from calendar import monthrange
 
 from rest_framework import viewsets, status, filters, serializers
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import LimitOffsetPagination
 from django.db import transaction
-from django.db.models import Sum, Q
+from django.db.models import Q
 from django.http import StreamingHttpResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 from apps.accounts.permissions import HasBusinessMembership, HasPermission, HasEntitlement
+from apps.jobs.services import enqueue_job
+from apps.jobs.views import idempotency_key_from, job_accepted_response, prefers_async
+from common.pagination import KeysetPagination
+from .balances import balance_as_of
+from .cashflow import (
+    BREAKDOWNS, GRANULARITIES, add_months, cashflow_buckets, period_count, previous_range, summarize,
+)
+from .exports import filter_transactions, transaction_csv_rows, transaction_filters_from
 from .models import (
     Account, TransactionCategory, Transaction, ExpenseTemplate,
     Expense, Employee, PayrollPayment, FixedExpense, FixedExpensePeriod,
@@ -31,7 +38,40 @@ from .serializers import (
 logger = logging.getLogger(__name__)
 
 
-class TreasuryPagination(LimitOffsetPagination):
+MAX_CASHFLOW_PERIODS = 400
+
+
+def _id_list(params, name):
+    """Ids enteros del parámetro repetible `name` (ValueError si alguno no lo es)."""
+    return [int(value) for value in params.getlist(name)]
+
+
+def _serialize_totals(totals):
+    return {key: float(value) for key, value in totals.items()}
+
+
+def _serialize_bucket(bucket, with_breakdown=False):
+    data = {
+        'period': bucket.period,
+        'income': float(bucket.income),
+        'expense': float(bucket.expense),
+        'result': float(bucket.result),
+    }
+    if with_breakdown:
+        data['breakdown'] = [
+            {
+                'id': entry['id'],
+                'name': entry['name'],
+                'income': float(entry['income']),
+                'expense': float(entry['expense']),
+                'result': float(entry['income'] - entry['expense']),
+            }
+            for entry in bucket.breakdown.values()
+        ]
+    return data
+
+
+class TreasuryPagination(KeysetPagination):
     default_limit = 50
     max_limit = 200
 
@@ -79,13 +119,8 @@ class AccountViewSet(BaseTreasuryViewSet):
         except:
              return Response({'error': 'Invalid real_balance'}, status=status.HTTP_400_BAD_REQUEST)
         
-        transactions = Transaction.objects.filter(account=account, status=Transaction.Status.POSTED)
-        
-        in_total = transactions.filter(direction=Transaction.Direction.IN).aggregate(s=Sum('amount'))['s'] or 0
-        out_total = transactions.filter(direction=Transaction.Direction.OUT).aggregate(s=Sum('amount'))['s'] or 0
-        
         # NOTE: Ignoring ADJUST direction for calculation as decided, using IN/OUT for reconciliation entries
-        current_balance = account.opening_balance + in_total - out_total
+        current_balance = account.balance
         
         diff = real_balance - current_balance
         
@@ -109,6 +144,22 @@ class AccountViewSet(BaseTreasuryViewSet):
         
         return Response({'message': 'Reconciled', 'diff': diff, 'new_balance': real_balance})
 
+    @action(detail=True, methods=['get'], url_path='balance')
+    def balance(self, request, pk=None):
+        """Saldo actual, o al cierre de `as_of` (YYYY-MM-DD) usando checkpoints."""
+        account = self.get_object()
+        raw_day = request.query_params.get('as_of')
+        if not raw_day:
+            return Response({'account': account.id, 'as_of': None, 'balance': account.balance})
+        try:
+            day = parse_date(raw_day)
+        except ValueError:
+            # Formato válido pero fecha imposible (p. ej. 2024-02-30).
+            day = None
+        if day is None:
+            return Response({'error': 'Invalid as_of'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'account': account.id, 'as_of': day, 'balance': balance_as_of(account, day)})
+
 class TransactionCategoryViewSet(BaseTreasuryViewSet):
     queryset = TransactionCategory.objects.all()
     serializer_class = TransactionCategorySerializer
@@ -117,38 +168,12 @@ class TransactionViewSet(BaseTreasuryViewSet):
     queryset = Transaction.objects.all().select_related('account', 'category', 'created_by')
     serializer_class = TransactionSerializer
     pagination_class = TreasuryPagination
+    keyset_ordering = ('-occurred_at', '-id')
     filter_backends = [filters.SearchFilter]
     search_fields = ['description', 'reference_type', 'reference_id']
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        params = self.request.query_params
-
-        account_id = params.get('account')
-        if account_id:
-            qs = qs.filter(account_id=account_id)
-
-        direction = params.get('direction')
-        if direction:
-            qs = qs.filter(direction=direction)
-
-        category_id = params.get('category')
-        if category_id:
-            qs = qs.filter(category_id=category_id)
-
-        date_from = params.get('date_from')
-        if date_from:
-            qs = qs.filter(occurred_at__date__gte=date_from)
-
-        date_to = params.get('date_to')
-        if date_to:
-            qs = qs.filter(occurred_at__date__lte=date_to)
-
-        txn_status = params.get('status')
-        if txn_status:
-            qs = qs.filter(status=txn_status)
-
-        return qs.order_by('-occurred_at')
+        return filter_transactions(super().get_queryset(), self.request.query_params)
 
     def perform_create(self, serializer):
         serializer.save(business=self.request.business, created_by=self.request.user)
@@ -203,26 +228,18 @@ class TransactionViewSet(BaseTreasuryViewSet):
     @action(detail=False, methods=['get'], url_path='export-csv')
     def export_csv(self, request):
         """Export current filtered transactions as CSV."""
-        qs = self.get_queryset().select_related('account', 'category', 'created_by')
+        if prefers_async(request):
+            job, created = enqueue_job(
+                business=request.business,
+                kind='treasury_transactions_csv',
+                user=request.user,
+                params=transaction_filters_from(request.query_params),
+                idempotency_key=idempotency_key_from(request),
+            )
+            return job_accepted_response(request, job, created)
 
-        def rows():
-            yield ','.join(['ID', 'Fecha', 'Dirección', 'Cuenta', 'Categoría', 'Descripción', 'Monto', 'Estado', 'Tipo', 'Creado por']) + '\n'
-            for t in qs.iterator(chunk_size=500):
-                row = [
-                    str(t.id),
-                    t.occurred_at.strftime('%Y-%m-%d %H:%M'),
-                    t.direction,
-                    t.account.name,
-                    t.category.name if t.category else '',
-                    (t.description or '').replace(',', ';'),
-                    str(t.amount),
-                    t.status,
-                    t.reference_type or '',
-                    str(t.created_by) if t.created_by else '',
-                ]
-                yield ','.join(row) + '\n'
-
-        response = StreamingHttpResponse(rows(), content_type='text/csv')
+        qs = self.get_queryset().select_related('account', 'category', 'created_by')
+        response = StreamingHttpResponse(transaction_csv_rows(qs), content_type='text/csv')
         response['Content-Disposition'] = 'attachment; filename="movimientos.csv"'
         return response
 
@@ -230,41 +247,84 @@ class TransactionViewSet(BaseTreasuryViewSet):
     def monthly_report(self, request):
         """Monthly cashflow report: last 12 months IN/OUT/result per month."""
         business = getattr(request, 'business', None)
-        today = date.today()
+        today = timezone.localdate()
+        start = add_months(today.replace(day=1), -11)
         results = []
 
-        for i in range(11, -1, -1):
-            # Go back i months from current month
-            year = today.year
-            month = today.month - i
-            while month <= 0:
-                month += 12
-                year -= 1
-
-            month_start = date(year, month, 1)
-            last_day = monthrange(year, month)[1]
-            month_end = date(year, month, last_day)
-
-            qs = Transaction.objects.filter(
-                business=business,
-                status=Transaction.Status.POSTED,
-                occurred_at__date__gte=month_start,
-                occurred_at__date__lte=month_end,
-            )
-            income = qs.filter(direction=Transaction.Direction.IN).aggregate(s=Sum('amount'))['s'] or 0
-            expense = qs.filter(direction=Transaction.Direction.OUT).aggregate(s=Sum('amount'))['s'] or 0
-
+        for bucket in cashflow_buckets(business, start=start, end=today, granularity='month'):
             results.append({
-                'year': year,
-                'month': month,
-                'label': month_start.strftime('%b %Y'),
-                'income': float(income),
-                'expense': float(expense),
-                'result': float(income) - float(expense),
+                'year': bucket.period.year,
+                'month': bucket.period.month,
+                'label': bucket.period.strftime('%b %Y'),
+                'income': float(bucket.income),
+                'expense': float(bucket.expense),
+                'result': float(bucket.result),
             })
 
         return Response(results)
 
+    @action(detail=False, methods=['get'], url_path='cashflow')
+    def cashflow(self, request):
+        """
+        Flujo de caja por período.
+        Params: granularity (day|week|month), date_from, date_to, breakdown
+        (account|category), account, category y compare=true para sumar el
+        período anterior equivalente.
+        """
+        business = getattr(request, 'business', None)
+        params = request.query_params
+        granularity = params.get('granularity', 'month')
+        breakdown = params.get('breakdown') or None
+        if granularity not in GRANULARITIES:
+            return Response({'error': 'granularity inválida'}, status=status.HTTP_400_BAD_REQUEST)
+        if breakdown is not None and breakdown not in BREAKDOWNS:
+            return Response({'error': 'breakdown inválido'}, status=status.HTTP_400_BAD_REQUEST)
+
+        today = timezone.localdate()
+        try:
+            end = parse_date(params['date_to']) if params.get('date_to') else today
+            start = parse_date(params['date_from']) if params.get('date_from') else add_months(today.replace(day=1), -11)
+        except ValueError:
+            # Formato válido pero fecha imposible (p. ej. 2024-02-30).
+            start = end = None
+        if start is None or end is None or start > end:
+            return Response({'error': 'Rango de fechas inválido'}, status=status.HTTP_400_BAD_REQUEST)
+        if period_count(start, end, granularity) > MAX_CASHFLOW_PERIODS:
+            return Response({'error': 'El rango tiene demasiados períodos'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            accounts = _id_list(params, 'account')
+        except ValueError:
+            return Response({'error': 'account inválido'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            categories = _id_list(params, 'category')
+        except ValueError:
+            return Response({'error': 'category inválida'}, status=status.HTTP_400_BAD_REQUEST)
+
+        filters = {
+            'granularity': granularity,
+            'accounts': accounts or None,
+            'categories': categories or None,
+        }
+        buckets = cashflow_buckets(business, start=start, end=end, breakdown=breakdown, **filters)
+        payload = {
+            'granularity': granularity,
+            'date_from': start,
+            'date_to': end,
+            'periods': [_serialize_bucket(bucket, breakdown is not None) for bucket in buckets],
+            'totals': _serialize_totals(summarize(buckets)),
+        }
+        if params.get('compare') in ('1', 'true', 'True'):
+            prev_start, prev_end = previous_range(start, end, granularity)
+            previous = cashflow_buckets(business, start=prev_start, end=prev_end, **filters)
+            payload['previous'] = {
+                'date_from': prev_start,
+                'date_to': prev_end,
+                'periods': [_serialize_bucket(bucket) for bucket in previous],
+                'totals': _serialize_totals(summarize(previous)),
+            }
+        return Response(payload)
+
     @action(detail=False, methods=['post'], url_path='transfer')
     def transfer(self, request):
         self.required_permission = 'manage_finance'
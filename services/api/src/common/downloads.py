@@ -0,0 +1,105 @@
+"""Descarga de archivos ya generados (PDFs cacheados) con validación condicional.
+
+`cached_file_response` responde con `ETag` y `Last-Modified`, devuelve 304
+ante `If-None-Match` / `If-Modified-Since` y atiende un único rango
+`Range: bytes=...` (206, o 416 si queda fuera del archivo). Un pedido
+multi-rango, mal formado o con un `If-Range` que ya no coincide recibe el
+archivo completo, como permite la RFC 9110.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional, Tuple
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+
+
+class RangeNotSatisfiable(Exception):
+  pass
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+  """(inicio, fin) inclusivos del rango pedido, o None si hay que mandar el archivo entero."""
+  if not header or not header.startswith('bytes='):
+    return None
+  spec = header[len('bytes='):].strip()
+  if ',' in spec or '-' not in spec:
+    return None
+  first, last = (part.strip() for part in spec.split('-', 1))
+  try:
+    if not first:
+      suffix = int(last)
+      if suffix <= 0 or size == 0:
+        raise RangeNotSatisfiable
+      return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+  except ValueError:
+    return None
+  if start >= size:
+    raise RangeNotSatisfiable
+  if end < start:
+    return None
+  return start, min(end, size - 1)
+
+
+def _if_range_matches(request, etag: str, last_modified: Optional[int]) -> bool:
+  value = request.headers.get('If-Range')
+  if not value:
+    return True
+  if value.startswith('"') or value.startswith('W/'):
+    return value == etag
+  return last_modified is not None and parse_http_date_safe(value) == last_modified
+
+
+def _read(file, start: int, length: int) -> bytes:
+  file.open('rb')
+  try:
+    file.seek(start)
+    return file.read(length)
+  finally:
+    file.close()
+
+
+def cached_file_response(
+  request,
+  file,
+  *,
+  etag: str,
+  content_type: str,
+  filename: str,
+  size: Optional[int] = None,
+  last_modified: Optional[datetime] = None,
+  as_attachment: bool = False,
+) -> HttpResponse:
+  """Respuesta para `file` (un FieldFile) identificado por `etag`."""
+  etag = quote_etag(etag)
+  timestamp = int(last_modified.timestamp()) if last_modified else None
+  size = file.size if size is None else size
+
+  response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+  if response is None:
+    try:
+      byte_range = parse_byte_range(request.headers.get('Range'), size)
+    except RangeNotSatisfiable:
+      response = HttpResponse(status=416)
+      response['Content-Range'] = f'bytes */{size}'
+      return response
+    if byte_range is not None and _if_range_matches(request, etag, timestamp):
+      start, end = byte_range
+      response = HttpResponse(_read(file, start, end - start + 1), content_type=content_type, status=206)
+      response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    else:
+      response = HttpResponse(_read(file, 0, size), content_type=content_type)
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    response['Accept-Ranges'] = 'bytes'
+
+  response['ETag'] = etag
+  if timestamp is not None:
+    response['Last-Modified'] = http_date(timestamp)
+  # Son documentos del negocio: el navegador puede guardarlos, pero revalida siempre.
+  patch_cache_control(response, private=True, no_cache=True)
+  return response
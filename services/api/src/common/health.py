@@ -1,7 +1,13 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from apps.accounts.authorization_cache import auth_cache_stats
+
 
 @api_view(['GET'])
-def health_check(_request):
-  return Response({'status': 'ok'})
+def health_check(request):
+  data = {'status': 'ok'}
+  # Contadores internos del proceso: solo para staff.
+  if request.user.is_staff:
+    data['auth_cache'] = auth_cache_stats()
+  return Response(data)
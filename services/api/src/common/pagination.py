@@ -0,0 +1,187 @@
+"""Paginación por cursor (keyset) con el modo offset como compatibilidad.
+
+Las vistas que declaran `keyset_ordering` (p. ej. `('-created_at', '-number')`,
+con un último campo único como desempate) aceptan `?pagination=cursor` o
+`?cursor=<token>`: la página siguiente se pide con un `WHERE` sobre la última
+fila vista en lugar de `OFFSET n`, y no se cuenta el total salvo que se pida
+con `?count=exact` o `?count=approx` (estimación del planner en PostgreSQL).
+
+Sin esos parámetros la respuesta es la de siempre (`LimitOffsetPagination`,
+o la lista sin paginar si `offset_fallback` es False).
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import List, Optional, Sequence, Tuple
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimate_count(queryset) -> int:
+  """Cantidad estimada de filas: `EXPLAIN` en PostgreSQL, COUNT exacto en otros motores."""
+  connection = connections[queryset.db]
+  if connection.vendor != 'postgresql':
+    return queryset.count()
+  sql, params = queryset.order_by().query.sql_with_params()
+  with connection.cursor() as cursor:
+    cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+    plan = cursor.fetchone()[0]
+  if isinstance(plan, str):
+    plan = json.loads(plan)
+  return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _parse_ordering(ordering: Sequence[str]) -> List[Tuple[str, bool]]:
+  return [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+
+
+def keyset_filter(ordering: Sequence[str], position: Sequence, *, reverse: bool = False) -> Q:
+  """Filas posteriores a `position` en `ordering` (anteriores si `reverse`).
+
+  Para `('-created_at', '-number')` y posición (t, n) arma
+  `created_at < t OR (created_at = t AND number < n)`.
+  """
+  condition = Q()
+  prefix = Q()
+  for (name, descending), value in zip(_parse_ordering(ordering), position):
+    lookup = 'lt' if descending != reverse else 'gt'
+    condition |= prefix & Q(**{f'{name}__{lookup}': value})
+    prefix &= Q(**{name: value})
+  return condition
+
+
+class KeysetPagination(LimitOffsetPagination):
+  cursor_query_param = 'cursor'
+  mode_query_param = 'pagination'
+  count_query_param = 'count'
+  # Sin cursor: True pagina por offset como antes; False devuelve None y la
+  # vista mantiene su respuesta sin paginar.
+  offset_fallback = True
+  invalid_cursor_message = 'Cursor inválido.'
+
+  def get_keyset_ordering(self, view) -> Optional[Sequence[str]]:
+    return getattr(view, 'keyset_ordering', None)
+
+  def cursor_requested(self, request, view=None) -> bool:
+    if not self.get_keyset_ordering(view):
+      return False
+    params = request.query_params
+    return bool(params.get(self.cursor_query_param)) or params.get(self.mode_query_param) == 'cursor'
+
+  def paginate_queryset(self, queryset, request, view=None):
+    self.cursor_mode = self.cursor_requested(request, view)
+    if not self.cursor_mode:
+      if not self.offset_fallback:
+        return None
+      return super().paginate_queryset(queryset, request, view)
+
+    self.request = request
+    self.limit = self.get_limit(request)
+    self.ordering = tuple(self.get_keyset_ordering(view))
+    position, reverse = self._decode_cursor(request, queryset.model)
+    self.count = self._requested_count(queryset, request)
+
+    ordering = self.ordering
+    if reverse:
+      ordering = tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+    if position is not None:
+      queryset = queryset.filter(keyset_filter(self.ordering, position, reverse=reverse))
+    rows = list(queryset.order_by(*ordering)[: self.limit + 1])
+    has_more = len(rows) > self.limit
+    rows = rows[: self.limit]
+    if reverse:
+      rows.reverse()
+
+    self.next_position = self.previous_position = None
+    if rows:
+      if has_more or reverse:
+        self.next_position = self._position(rows[-1])
+      if (reverse and has_more) or (not reverse and position is not None):
+        self.previous_position = self._position(rows[0])
+    return rows
+
+  def _requested_count(self, queryset, request) -> Optional[int]:
+    mode = request.query_params.get(self.count_query_param)
+    if mode == 'exact':
+      return queryset.count()
+    if mode == 'approx':
+      return estimate_count(queryset)
+    return None
+
+  def _position(self, row) -> list:
+    return [getattr(row, name) for name, _ in _parse_ordering(self.ordering)]
+
+  @staticmethod
+  def _cursor_value(value):
+    # DjangoJSONEncoder recorta los datetimes a milisegundos; el cursor
+    # necesita el valor exacto para no saltear ni repetir filas.
+    if isinstance(value, (datetime, date)):
+      return value.isoformat()
+    return value
+
+  def _encode_cursor(self, position, reverse: bool) -> str:
+    values = [self._cursor_value(value) for value in position]
+    payload = json.dumps({'p': values, 'r': int(reverse)}, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+  def _decode_cursor(self, request, model):
+    token = request.query_params.get(self.cursor_query_param)
+    if not token:
+      return None, False
+    try:
+      padded = token + '=' * (-len(token) % 4)
+      payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+      values = payload['p']
+      fields = [model._meta.get_field(name) for name, _ in _parse_ordering(self.ordering)]
+      if len(values) != len(fields):
+        raise ValueError('largo de posición')
+      position = [field.to_python(value) for field, value in zip(fields, values)]
+      return position, bool(payload.get('r'))
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError, ValidationError) as exc:
+      raise NotFound(self.invalid_cursor_message) from exc
+
+  def _cursor_link(self, position, reverse: bool) -> Optional[str]:
+    if position is None:
+      return None
+    url = self.request.build_absolute_uri()
+    url = remove_query_param(url, self.offset_query_param)
+    url = remove_query_param(url, self.mode_query_param)
+    return replace_query_param(url, self.cursor_query_param, self._encode_cursor(position, reverse))
+
+  def get_next_link(self):
+    if not getattr(self, 'cursor_mode', False):
+      return super().get_next_link()
+    return self._cursor_link(self.next_position, False)
+
+  def get_previous_link(self):
+    if not getattr(self, 'cursor_mode', False):
+      return super().get_previous_link()
+    return self._cursor_link(self.previous_position, True)
+
+  def get_paginated_data(self, data) -> OrderedDict:
+    return OrderedDict([
+      ('count', self.count),
+      ('next', self.get_next_link()),
+      ('previous', self.get_previous_link()),
+      ('results', data),
+    ])
+
+  def get_paginated_response(self, data):
+    return Response(self.get_paginated_data(data))
+
+  def get_paginated_response_schema(self, schema):
+    response_schema = super().get_paginated_response_schema(schema)
+    response_schema['properties']['count']['nullable'] = True
+    return response_schema
@@ -0,0 +1,195 @@
+"""Pub/sub con historial corto por canal, para streams SSE reanudables.
+
+Cada evento publicado recibe un id creciente dentro de su canal; un cliente
+que se reconecta con `Last-Event-ID` recibe lo que se perdió mientras siga en
+el historial (`PUBSUB_BACKLOG` eventos por canal).
+
+Backends (setting `PUBSUB_BACKEND`):
+- `local`: memoria del proceso. Sirve para tests y para un único proceso.
+- `redis`: Redis Streams (XADD/XREAD) en `PUBSUB_REDIS_URL`; comparte los
+  eventos entre procesos y workers. Es el default cuando hay `REDIS_URL`.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+@dataclass(frozen=True)
+class Event:
+  id: str
+  event: str
+  data: dict
+
+
+class LocalPubSub:
+  def __init__(self, backlog: int):
+    self._backlog = backlog
+    self._condition = threading.Condition()
+    self._channels: Dict[str, deque] = {}
+    self._counters: Dict[str, int] = {}
+
+  def publish(self, channel: str, event: str, data: dict) -> str:
+    payload = json.loads(json.dumps(data, cls=DjangoJSONEncoder))
+    with self._condition:
+      self._counters[channel] = self._counters.get(channel, 0) + 1
+      event_id = str(self._counters[channel])
+      self._channels.setdefault(channel, deque(maxlen=self._backlog)).append(Event(event_id, event, payload))
+      self._condition.notify_all()
+    return event_id
+
+  def latest_id(self, channel: str) -> str:
+    with self._condition:
+      return str(self._counters.get(channel, 0))
+
+  def _pending(self, channel: str, last_id: str) -> List[Event]:
+    try:
+      after = int(last_id)
+    except (TypeError, ValueError):
+      after = 0
+    return [event for event in self._channels.get(channel, ()) if int(event.id) > after]
+
+  def has_gap(self, channel: str, last_id: str) -> bool:
+    """True si hubo eventos posteriores a `last_id` que ya salieron del historial."""
+    with self._condition:
+      try:
+        after = int(last_id)
+      except (TypeError, ValueError):
+        return True
+      history = self._channels.get(channel)
+      if after > self._counters.get(channel, 0):
+        return True
+      return bool(history) and int(history[0].id) > after + 1
+
+  def read(self, channel: str, last_id: str, timeout: float) -> List[Event]:
+    with self._condition:
+      events = self._pending(channel, last_id)
+      deadline = time.monotonic() + timeout
+      while not events:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+          break
+        # notify_all despierta a los lectores de todos los canales.
+        self._condition.wait(remaining)
+        events = self._pending(channel, last_id)
+      return events
+
+  def reset(self) -> None:
+    with self._condition:
+      self._channels.clear()
+      self._counters.clear()
+
+
+class RedisPubSub:
+  def __init__(self, url: str, backlog: int):
+    import redis
+
+    self._client = redis.Redis.from_url(url, decode_responses=True)
+    self._backlog = backlog
+
+  def _key(self, channel: str) -> str:
+    return f'pubsub:{channel}'
+
+  def publish(self, channel: str, event: str, data: dict) -> str:
+    fields = {'event': event, 'data': json.dumps(data, cls=DjangoJSONEncoder)}
+    return self._client.xadd(self._key(channel), fields, maxlen=self._backlog, approximate=True)
+
+  def latest_id(self, channel: str) -> str:
+    entries = self._client.xrevrange(self._key(channel), count=1)
+    return entries[0][0] if entries else '0-0'
+
+  @staticmethod
+  def _parse_id(value: str):
+    try:
+      millis, _, seq = value.partition('-')
+      return int(millis), int(seq or 0)
+    except (AttributeError, ValueError):
+      return None
+
+  def has_gap(self, channel: str, last_id: str) -> bool:
+    requested = self._parse_id(last_id)
+    if requested is None:
+      return True
+    first = self._client.xrange(self._key(channel), count=1)
+    if not first:
+      return False
+    # El recorte es aproximado: si el id pedido es anterior al primero
+    # disponible, asumimos que se perdieron eventos.
+    return requested < self._parse_id(first[0][0])
+
+  def read(self, channel: str, last_id: str, timeout: float) -> List[Event]:
+    response = self._client.xread({self._key(channel): last_id or '0-0'}, block=int(timeout * 1000) or None)
+    events: List[Event] = []
+    for _stream, entries in response or ():
+      for entry_id, fields in entries:
+        events.append(Event(entry_id, fields.get('event', 'message'), json.loads(fields.get('data') or '{}')))
+    return events
+
+
+_lock = threading.Lock()
+_backends: Dict[tuple, object] = {}
+
+
+def get_pubsub():
+  backend = getattr(settings, 'PUBSUB_BACKEND', 'local')
+  backlog = getattr(settings, 'PUBSUB_BACKLOG', 500)
+  url = getattr(settings, 'PUBSUB_REDIS_URL', None)
+  key = (backend, backlog, url)
+  with _lock:
+    instance = _backends.get(key)
+    if instance is None:
+      if backend == 'redis':
+        instance = RedisPubSub(url, backlog)
+      elif backend == 'local':
+        instance = LocalPubSub(backlog)
+      else:
+        raise ValueError(f'PUBSUB_BACKEND desconocido: {backend}')
+      _backends[key] = instance
+    return instance
+
+
+def format_sse(event: Optional[Event] = None, *, comment: str = '') -> str:
+  """Serializa un evento (o un comentario de keep-alive) en formato text/event-stream."""
+  if event is None:
+    return f': {comment}\n\n'
+  data = json.dumps(event.data, cls=DjangoJSONEncoder, separators=(',', ':'))
+  return f'id: {event.id}\nevent: {event.event}\ndata: {data}\n\n'
+
+
+def _sse_chunks(events: List[Event]):
+  for event in events:
+    yield event.id, format_sse(event)
+
+
+def iter_sse(pubsub, channel: str, cursor: str, *, keepalive: float, max_seconds: float):
+  """Stream SSE síncrono (WSGI): bloquea hasta `keepalive` segundos por lectura."""
+  deadline = time.monotonic() + max_seconds
+  while time.monotonic() < deadline:
+    events = pubsub.read(channel, cursor, min(keepalive, max(deadline - time.monotonic(), 0)))
+    if not events:
+      yield format_sse(comment='keep-alive')
+      continue
+    for cursor, chunk in _sse_chunks(events):
+      yield chunk
+
+
+async def aiter_sse(pubsub, channel: str, cursor: str, *, keepalive: float, max_seconds: float):
+  """Variante asíncrona (ASGI): la lectura bloqueante corre en un hilo aparte."""
+  read = sync_to_async(pubsub.read, thread_sensitive=False)
+  deadline = time.monotonic() + max_seconds
+  while time.monotonic() < deadline:
+    events = await read(channel, cursor, min(keepalive, max(deadline - time.monotonic(), 0)))
+    if not events:
+      yield format_sse(comment='keep-alive')
+      continue
+    for cursor, chunk in _sse_chunks(events):
+      yield chunk
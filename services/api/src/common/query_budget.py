@@ -0,0 +1,81 @@
+"""Presupuestos de consultas SQL por endpoint, para que un N+1 rompa los tests.
+
+`QUERY_BUDGETS` es la tabla de máximos por endpoint. Cada presupuesto se mide
+con varios registros en juego (los tests cargan al menos
+`QUERY_BUDGET_ROWS` filas por colección), así una consulta por fila lo
+excede. Si un cambio necesita subir un presupuesto, se actualiza la tabla en
+el mismo commit y queda a la vista en la revisión.
+
+Uso en tests:
+
+    @query_budget('sales.list')
+    def test_list(self):
+        self.client.get('/api/v1/sales/')
+
+    with query_budget('menu.public_by_slug'):
+        ...
+
+    with assert_max_queries(3):
+        ...
+"""
+
+from __future__ import annotations
+
+from contextlib import ContextDecorator
+from typing import Optional
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+# Filas por colección con las que se miden los presupuestos.
+QUERY_BUDGET_ROWS = 5
+
+QUERY_BUDGETS = {
+  'menu.public_by_slug': 10,
+  'orders.list': 5,
+  'reports.sales': 6,
+  'reports.cash_closures': 5,
+  'sales.list': 4,
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+  pass
+
+
+class assert_max_queries(ContextDecorator):
+  """Falla si el bloque ejecuta más de `limit` consultas; lista las capturadas."""
+
+  def __init__(self, limit: int, *, label: Optional[str] = None, using: str = DEFAULT_DB_ALIAS):
+    self.limit = limit
+    self.label = label or f'máximo {limit}'
+    self.using = using
+    self.captured: Optional[CaptureQueriesContext] = None
+
+  def __enter__(self):
+    self.captured = CaptureQueriesContext(connections[self.using])
+    self.captured.__enter__()
+    return self.captured
+
+  def __exit__(self, exc_type, exc, tb):
+    self.captured.__exit__(exc_type, exc, tb)
+    if exc_type is not None:
+      return False
+    executed = len(self.captured)
+    if executed > self.limit:
+      queries = '\n'.join(
+        f'{index}. {query["sql"]}' for index, query in enumerate(self.captured.captured_queries, start=1)
+      )
+      raise QueryBudgetExceeded(
+        f'{self.label}: se ejecutaron {executed} consultas (presupuesto {self.limit}).\n{queries}'
+      )
+    return False
+
+
+def query_budget(key: str, *, using: str = DEFAULT_DB_ALIAS) -> assert_max_queries:
+  """`assert_max_queries` con el presupuesto registrado en `QUERY_BUDGETS`."""
+  try:
+    limit = QUERY_BUDGETS[key]
+  except KeyError as exc:
+    raise KeyError(f'No hay presupuesto de consultas para "{key}" en QUERY_BUDGETS') from exc
+  return assert_max_queries(limit, label=key, using=using)
@@ -0,0 +1,215 @@
+"""Búsqueda de texto para productos, clientes y ventas.
+
+Todas las vistas con `search`/`q` pasan por `search_queryset` con la
+`SearchSpec` de la entidad:
+
+- Cada palabra del término tiene que aparecer en alguno de los campos (igual
+  que el `SearchFilter` de DRF), sin distinguir mayúsculas ni acentos:
+  "jose" encuentra "José".
+- En PostgreSQL la comparación es `mirubro_search_normalize(campo) LIKE
+  '%palabra%'`, que resuelve el índice GIN `gin_trgm_ops` creado sobre la
+  misma expresión (ver `search_index_operations`) en lugar de recorrer la
+  tabla. En otros motores (SQLite en tests) se usa `icontains`.
+- Si el término es un código (sin espacios) y coincide exacto con un campo de
+  `code_fields` (SKU, código de barras, documento), se devuelven solo esas
+  filas: un escaneo en el POS es una búsqueda por índice btree.
+- `search_rank` ordena por similitud trigram (PostgreSQL) o por coincidencia
+  al inicio del campo.
+"""
+
+from __future__ import annotations
+
+import unicodedata
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+from uuid import UUID
+
+from django.db import connections, migrations
+from django.db.models import Case, F, FloatField, Func, Q, TextField, Value, When
+from django.db.models.functions import Greatest
+from django.db.models.lookups import Contains
+from rest_framework.filters import BaseFilterBackend
+
+SEARCH_NORMALIZE_FUNCTION = 'mirubro_search_normalize'
+SEARCH_RANK_FIELD = 'search_rank'
+
+
+@dataclass(frozen=True)
+class SearchSpec:
+  fields: Tuple[str, ...]
+  # Campos que un escaneo o tipeo exacto resuelve sin buscar por texto.
+  code_fields: Tuple[str, ...] = ()
+  # Campo entero que se compara exacto cuando el término es numérico (nro. de venta).
+  number_field: Optional[str] = None
+  match_pk: bool = False
+
+  def prefixed(self, prefix: str) -> 'SearchSpec':
+    """La misma búsqueda sobre una relación (`product__` desde ProductStock)."""
+    return SearchSpec(
+      fields=tuple(f'{prefix}{name}' for name in self.fields),
+      code_fields=tuple(f'{prefix}{name}' for name in self.code_fields),
+      number_field=f'{prefix}{self.number_field}' if self.number_field else None,
+      match_pk=False,
+    )
+
+
+PRODUCT_SEARCH = SearchSpec(fields=('name', 'sku', 'barcode'), code_fields=('sku', 'barcode'))
+CUSTOMER_SEARCH = SearchSpec(fields=('name', 'doc_number', 'email', 'phone', 'note'), code_fields=('doc_number',))
+SALE_SEARCH = SearchSpec(
+  fields=('customer__name', 'notes', 'customer__doc_number', 'customer__email', 'customer__phone'),
+  number_field='number',
+  match_pk=True,
+)
+
+
+class SearchNormalize(Func):
+  """`lower(unaccent(valor))` como función IMMUTABLE, indexable en PostgreSQL."""
+
+  function = SEARCH_NORMALIZE_FUNCTION
+  output_field = TextField()
+
+
+def normalize_text(value: str) -> str:
+  """Equivalente en Python de `mirubro_search_normalize` para el término buscado."""
+  decomposed = unicodedata.normalize('NFKD', value or '')
+  return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def search_tokens(term: Optional[str]) -> list:
+  return [token for token in (term or '').split() if token]
+
+
+def uses_trigram(queryset) -> bool:
+  return connections[queryset.db].vendor == 'postgresql'
+
+
+def _parse_uuid(value: str) -> Optional[UUID]:
+  try:
+    return UUID(value)
+  except (ValueError, AttributeError):
+    return None
+
+
+def _token_condition(field: str, token: str, trigram: bool) -> Q:
+  if trigram:
+    return Q(Contains(SearchNormalize(F(field)), normalize_text(token)))
+  return Q(**{f'{field}__icontains': token})
+
+
+def search_condition(queryset, term: str, spec: SearchSpec) -> Q:
+  trigram = uses_trigram(queryset)
+  condition = Q()
+  for token in search_tokens(term):
+    token_condition = Q()
+    for field in spec.fields:
+      token_condition |= _token_condition(field, token, trigram)
+    condition &= token_condition
+
+  term = term.strip()
+  if spec.number_field and term.isdigit():
+    condition |= Q(**{spec.number_field: int(term)})
+  if spec.match_pk:
+    term_uuid = _parse_uuid(term)
+    if term_uuid:
+      condition |= Q(pk=term_uuid)
+  return condition
+
+
+def exact_code_matches(queryset, term: str, spec: SearchSpec):
+  """Filas cuyo código coincide exacto con el término, o None si no hay."""
+  code = (term or '').strip()
+  if not spec.code_fields or not code or len(code.split()) != 1:
+    return None
+  condition = Q()
+  for field in spec.code_fields:
+    condition |= Q(**{field: code})
+  matches = queryset.filter(condition)
+  return matches if matches.exists() else None
+
+
+def rank_expression(queryset, term: str, spec: SearchSpec):
+  term = term.strip()
+  if uses_trigram(queryset):
+    normalized = normalize_text(term)
+    scores = [
+      Func(SearchNormalize(F(field)), Value(normalized), function='similarity', output_field=FloatField())
+      for field in spec.fields
+    ]
+    return scores[0] if len(scores) == 1 else Greatest(*scores)
+  prefix = Q()
+  for field in spec.fields:
+    prefix |= Q(**{f'{field}__istartswith': term})
+  return Case(When(prefix, then=Value(1.0)), default=Value(0.0), output_field=FloatField())
+
+
+def search_queryset(queryset, term: Optional[str], spec: SearchSpec, *, rank: bool = False):
+  """Filtra `queryset` por `term`; con `rank` anota `search_rank` para ordenar."""
+  term = (term or '').strip()
+  if not term:
+    return queryset
+  matches = exact_code_matches(queryset, term, spec)
+  if matches is not None:
+    queryset = matches
+  else:
+    queryset = queryset.filter(search_condition(queryset, term, spec))
+  if rank:
+    queryset = queryset.annotate(**{SEARCH_RANK_FIELD: rank_expression(queryset, term, spec)})
+  return queryset
+
+
+class TrigramSearchFilter(BaseFilterBackend):
+  """Reemplazo del `SearchFilter` de DRF: usa `view.search_spec` y ordena por relevancia."""
+
+  search_param = 'search'
+
+  def filter_queryset(self, request, queryset, view):
+    spec = getattr(view, 'search_spec', None)
+    term = (request.query_params.get(self.search_param) or '').strip()
+    if spec is None or not term:
+      return queryset
+    ordering = queryset.query.order_by
+    queryset = search_queryset(queryset, term, spec, rank=True)
+    return queryset.order_by(f'-{SEARCH_RANK_FIELD}', *ordering)
+
+
+# Migraciones -------------------------------------------------------------
+
+SEARCH_FUNCTION_SQL = f"""
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+CREATE OR REPLACE FUNCTION {SEARCH_NORMALIZE_FUNCTION}(text) RETURNS text
+  LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+  AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, $1)) $$;
+"""
+
+
+def _postgres_only(statements):
+  def run(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+      return
+    for statement in statements:
+      schema_editor.execute(statement)
+  return run
+
+
+def search_function_operation() -> migrations.RunPython:
+  """Crea pg_trgm, unaccent y la función de normalización (solo PostgreSQL)."""
+  return migrations.RunPython(
+    _postgres_only([SEARCH_FUNCTION_SQL]),
+    _postgres_only([f'DROP FUNCTION IF EXISTS {SEARCH_NORMALIZE_FUNCTION}(text)']),
+  )
+
+
+def search_index_name(table: str, column: str) -> str:
+  return f'{table}_{column}_trgm'[:63]
+
+
+def search_index_operations(table: str, columns: Sequence[str]) -> migrations.RunPython:
+  """Índices GIN trigram sobre `mirubro_search_normalize(columna)` (solo PostgreSQL)."""
+  create = [
+    f'CREATE INDEX IF NOT EXISTS {search_index_name(table, column)} ON {table} '
+    f'USING gin ({SEARCH_NORMALIZE_FUNCTION}({column}) gin_trgm_ops)'
+    for column in columns
+  ]
+  drop = [f'DROP INDEX IF EXISTS {search_index_name(table, column)}' for column in columns]
+  return migrations.RunPython(_postgres_only(create), _postgres_only(drop))
@@ -2,7 +2,9 @@ from pathlib import Path
 from datetime import timedelta
 from decimal import Decimal
 import os
+import sys
 
+from celery.schedules import crontab
 from dotenv import load_dotenv
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -47,6 +49,7 @@ INSTALLED_APPS = [
   'apps.resto',
   'apps.billing',
   'apps.treasury',
+  'apps.jobs',
 ]
 
 MIDDLEWARE = [
@@ -175,8 +178,71 @@ SPECTACULAR_SETTINGS = {
   'SERVE_INCLUDE_SCHEMA': False,
 }
 
-CELERY_BROKER_URL = os.getenv('REDIS_URL', 'redis://redis:6379/0')
+REDIS_URL = os.getenv('REDIS_URL', '')
+RUNNING_TESTS = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
+CELERY_BROKER_URL = REDIS_URL or 'redis://redis:6379/0'
 CELERY_RESULT_BACKEND = CELERY_BROKER_URL
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', 'False').lower() == 'true'
+# Los crontab de CELERY_BEAT_SCHEDULE se leen en hora local.
+CELERY_TIMEZONE = TIME_ZONE
+
+# Caché compartida por todos los procesos: las invalidaciones por sello de
+# versión (autorización, escaneo, sesión, menú) tienen que verse en cada
+# worker. Los tests usan la LocMemCache de un proceso; CACHE_BACKEND=locmem
+# la fuerza en un entorno sin Redis.
+if RUNNING_TESTS or os.getenv('CACHE_BACKEND', '').lower() == 'locmem':
+  CACHES = {
+    'default': {
+      'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+  }
+else:
+  CACHES = {
+    'default': {
+      'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+      'LOCATION': os.getenv('CACHE_REDIS_URL', CELERY_BROKER_URL),
+      'KEY_PREFIX': 'mirubro',
+    },
+  }
+
+# Tareas periódicas (servicio `beat` de infra/docker-compose.yml).
+TREASURY_OUTBOX_DRAIN_SECONDS = int(os.getenv('TREASURY_OUTBOX_DRAIN_SECONDS', '30'))
+CELERY_BEAT_SCHEDULE = {
+  # Red de seguridad del outbox de tesorería: drena lo que no llegó a encolarse.
+  'treasury-drain-outbox': {
+    'task': 'treasury.drain_outbox',
+    'schedule': TREASURY_OUTBOX_DRAIN_SECONDS,
+  },
+  # Checkpoints de saldo de fin de mes (apps.treasury.balances); idempotente.
+  'treasury-close-balance-months': {
+    'task': 'treasury.close_balance_months',
+    'schedule': crontab(hour=0, minute=15),
+  },
+  # Foto diaria de la valorización de inventario (historial de apps.inventory.valuation).
+  'inventory-snapshot-valuation': {
+    'task': 'inventory.snapshot_valuation',
+    'schedule': crontab(hour=23, minute=55),
+  },
+}
+
+# Trabajos en segundo plano (apps.jobs): True ejecuta en el mismo proceso, sin worker.
+JOBS_RUN_INLINE = os.getenv('JOBS_RUN_INLINE', 'False').lower() == 'true'
+JOBS_STALE_AFTER_SECONDS = int(os.getenv('JOBS_STALE_AFTER_SECONDS', '3600'))
+# Procesos que renderizan los PDFs de una exportación masiva (apps.invoices.pdf_pool);
+# 1 renderiza en el mismo proceso, que es lo que usan los tests.
+PDF_EXPORT_WORKERS = int(os.getenv('PDF_EXPORT_WORKERS') or (1 if RUNNING_TESTS else min(4, os.cpu_count() or 1)))
+
+# Pub/sub de eventos en vivo (common.pubsub): 'redis' comparte los eventos
+# entre procesos (default con REDIS_URL); 'local' solo sirve con un proceso
+# y es lo que usan los tests.
+PUBSUB_BACKEND = os.getenv('PUBSUB_BACKEND') or ('redis' if REDIS_URL and not RUNNING_TESTS else 'local')
+PUBSUB_REDIS_URL = os.getenv('PUBSUB_REDIS_URL', CELERY_BROKER_URL)
+PUBSUB_BACKLOG = int(os.getenv('PUBSUB_BACKLOG', '500'))
+KITCHEN_STREAM_KEEPALIVE_SECONDS = int(os.getenv('KITCHEN_STREAM_KEEPALIVE_SECONDS', '15'))
+# Bajo WSGI cada stream abierto ocupa un hilo del worker hasta este tope;
+# para muchas pantallas conviene servir la API con ASGI (config.asgi).
+KITCHEN_STREAM_MAX_SECONDS = int(os.getenv('KITCHEN_STREAM_MAX_SECONDS', '300'))
 
 REPORTS_LOW_STOCK_THRESHOLD_DEFAULT = Decimal(os.getenv('REPORTS_LOW_STOCK_THRESHOLD_DEFAULT', '5'))
 